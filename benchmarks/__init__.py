@@ -0,0 +1,4 @@
+"""
+benchmarks package
+Headless performance benchmarks (run with `python -m benchmarks.suite`)
+"""
@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+"""
+benchmarks/suite.py
+Headless benchmark suite for the heavy paths
+
+Builds synthetic roofs of increasing size and obstacle/tree density for all
+four roof types on off-screen PyVista plotters and times:
+- add_panels per handler and side
+- _create_panel_batch (timed inside add_panels)
+- ObstacleDetector checks (replayed from the checks add_panels performed)
+- ModificationsTab._shadow_factors_for_sun
+- daily (IncrementalEnergyModel) and annual (layout_energy) energy integration
+- EnhancedRealisticSunSystem.create_photorealistic_sun
+
+Results are written as JSON; a previous result file can be used as the
+baseline, and cases slower than the threshold are reported as regressions.
+
+Usage:
+    python -m benchmarks.suite --output bench.json
+    python -m benchmarks.suite --quick --baseline bench.json --threshold 0.2
+"""
+import argparse
+import itertools
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+ROOF_TYPES = ('flat', 'gable', 'hip', 'pyramid')
+
+# (length, width, height) in metres
+SIZES = {
+    'small': (6.0, 5.0, 3.0),
+    'medium': (10.0, 8.0, 4.0),
+    'large': (16.0, 12.0, 5.0),
+    'xlarge': (24.0, 16.0, 6.0),
+}
+
+# (roof obstacles, trees)
+DENSITIES = {
+    'none': (0, 0),
+    'light': (2, 3),
+    'dense': (6, 10),
+}
+
+QUICK_SIZES = ('small', 'large')
+QUICK_DENSITIES = ('none', 'dense')
+
+LATITUDE = 48.15
+PANEL_CONFIG = {
+    'panel_width': 1134, 'panel_length': 1722, 'panel_gap': 20,
+    'panel_power': 430, 'edge_offset': 300,
+}
+OBSTACLE_TYPES = ('Chimney', 'Ventilation')
+
+
+def _summary(samples):
+    """Statistics (ms) for a list of durations in seconds"""
+    if not samples:
+        return None
+    ms = [s * 1000.0 for s in samples]
+    return {
+        'runs': len(ms),
+        'min_ms': round(min(ms), 4),
+        'median_ms': round(statistics.median(ms), 4),
+        'mean_ms': round(statistics.fmean(ms), 4),
+    }
+
+
+def _time(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+# ==================== SCENE ====================
+
+class _ShadingHarness:
+    """The roof state ModificationsTab's shading methods read (no widget needed)"""
+
+    def __init__(self, roof, shading_mode='ray_sphere'):
+        from solar_system.sun_depth_map import OccluderCache
+        from ui.panel.model_tab_left.modifications_tab import ModificationsTab
+
+        self.current_roof = roof
+        self.shading_mode = shading_mode
+        self.occluder_cache = OccluderCache()
+        self._tab = ModificationsTab
+
+    def _get_tree_crowns(self):
+        return self._tab._get_tree_crowns(self)
+
+    def _ray_intersects_sphere(self, *args):
+        return self._tab._ray_intersects_sphere(*args)
+
+    def _occluder_triangles(self, roof=None):
+        return self._tab._occluder_triangles(self, roof)
+
+    def _depth_map_shadow_factors(self, *args):
+        return self._tab._depth_map_shadow_factors(self, *args)
+
+    def shadow_factors(self, sides_info, elevation, azimuth):
+        return self._tab._shadow_factors_for_sun(self, sides_info, elevation, azimuth)
+
+
+def build_scene(roof_type, dimensions, n_obstacles, n_trees):
+    """Headless roof with panel config, roof obstacles and trees"""
+    from roofs.headless_scene import create_headless_roof, panel_layout, roof_sides
+    from roofs.roof_obstacle import RoofObstacle
+
+    roof = create_headless_roof(roof_type, dimensions)
+    handler = roof.solar_panel_handler
+    handler.update_panel_config(PANEL_CONFIG)
+
+    # Obstacles sit on panel positions of an obstacle-free layout, so they
+    # are on the roof surface and actually collide with panels
+    if n_obstacles:
+        layout = panel_layout(roof, PANEL_CONFIG, roof_sides(roof_type))
+        candidates = np.concatenate([p for p in layout.values() if len(p)] or [np.zeros((0, 3))])
+        if len(candidates):
+            picks = np.linspace(0, len(candidates) - 1, n_obstacles).astype(int)
+            if not hasattr(roof, 'obstacles') or roof.obstacles is None:
+                roof.obstacles = []
+            for i, index in enumerate(picks):
+                roof.obstacles.append(RoofObstacle(OBSTACLE_TYPES[i % len(OBSTACLE_TYPES)],
+                                                   candidates[index], roof))
+
+    if n_trees and getattr(roof, 'environment_manager', None):
+        roof.environment_manager.handle_environment_action('add_multiple_trees', {'count': n_trees})
+        roof.environment_obstacles = roof.environment_manager.environment_obstacles
+    return roof
+
+
+# ==================== BENCHMARKS ====================
+
+def bench_placement(roof, roof_type, repeat):
+    """add_panels / _create_panel_batch per side, plus replayed obstacle checks"""
+    from roofs.headless_scene import roof_sides
+    from roofs.solar_panel_handlers.utils.obstacle_detection import ObstacleDetector
+
+    handler = roof.solar_panel_handler
+    results = {}
+    positions = {}
+    checks = []
+
+    # Untimed pass: record every obstacle check and the resulting layout
+    record_check = handler.check_obstacle_intersection
+    handler.check_obstacle_intersection = lambda *args: checks.append(args) or record_check(*args)
+    try:
+        for side in roof_sides(roof_type):
+            handler.clear_panels()
+            handler.add_panels(side)
+            positions[side] = np.array(handler.panel_positions_by_side.get(side, []),
+                                       dtype=float).reshape(-1, 3)
+    finally:
+        del handler.check_obstacle_intersection
+    handler.clear_panels()
+
+    batch_samples = []
+    create_batch = handler._create_panel_batch
+
+    def timed_batch(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return create_batch(*args, **kwargs)
+        finally:
+            batch_samples.append(time.perf_counter() - start)
+
+    handler._create_panel_batch = timed_batch
+    try:
+        for side in roof_sides(roof_type):
+            side_batches = len(batch_samples)
+            samples = []
+            for _ in range(repeat):
+                handler.clear_panels()
+                start = time.perf_counter()
+                handler.add_panels(side)
+                samples.append(time.perf_counter() - start)
+            handler.clear_panels()
+            results[f'add_panels.{side}'] = dict(_summary(samples), panels=len(positions[side]))
+            results[f'create_panel_batch.{side}'] = _summary(batch_samples[side_batches:])
+    finally:
+        del handler._create_panel_batch
+
+    if checks:
+        def replay():
+            for args in checks:
+                ObstacleDetector.check_panel_obstacle_intersection(*args)
+        results['obstacle_checks'] = dict(_summary(_time(replay, repeat)), checks=len(checks))
+    else:
+        results['obstacle_checks'] = None
+    return results, positions
+
+
+def _sides_info(roof, positions):
+    from roofs.headless_scene import face_orientation
+
+    sides = []
+    for name, pts in positions.items():
+        if len(pts):
+            tilt, azimuth = face_orientation(roof, name)
+            sides.append({'name': name, 'tilt': tilt, 'azimuth': azimuth,
+                          'count': len(pts), 'positions': pts})
+    return sides
+
+
+def bench_energy(roof, positions, repeat):
+    """Shadow factors for one sun position, daily and annual energy"""
+    from solar_system.energy_model import IncrementalEnergyModel, annual_sun_table, layout_energy
+
+    sides = _sides_info(roof, positions)
+    if not sides:
+        return {}
+
+    harness = _ShadingHarness(roof)
+    crowns = harness._get_tree_crowns()
+    panel_area = PANEL_CONFIG['panel_width'] * PANEL_CONFIG['panel_length'] / 1e6
+    power = float(PANEL_CONFIG['panel_power'])
+    efficiency = power / (panel_area * 1000.0)
+    positions_by_side = {s['name']: s['positions'] for s in sides}
+
+    # The handler keeps the positions _shadow_factors_for_sun reads
+    handler = roof.solar_panel_handler
+    handler.panel_positions_by_side = {k: [list(p) for p in v] for k, v in positions_by_side.items()}
+
+    depth_harness = _ShadingHarness(roof, 'depth_map')
+    results = {
+        'shadow_factors_for_sun': _summary(_time(
+            lambda: harness.shadow_factors(sides, 35.0, 200.0), repeat)),
+        'shadow_factors_depth_map': _summary(_time(
+            lambda: depth_harness.shadow_factors(sides, 35.0, 200.0), repeat)),
+        'daily_energy_cold': _summary(_time(
+            lambda: IncrementalEnergyModel().daily_energy(
+                sides, positions_by_side, crowns, LATITUDE, 172, panel_area, efficiency, power),
+            repeat)),
+    }
+
+    warm_model = IncrementalEnergyModel()
+    warm_model.daily_energy(sides, positions_by_side, crowns, LATITUDE, 172,
+                            panel_area, efficiency, power)
+    results['daily_energy_warm'] = _summary(_time(
+        lambda: warm_model.daily_energy(sides, positions_by_side, crowns, LATITUDE, 172,
+                                        panel_area, efficiency, power), repeat))
+
+    sun = annual_sun_table(LATITUDE)
+    results['annual_sun_table'] = _summary(_time(lambda: annual_sun_table(LATITUDE), repeat))
+    results['annual_energy'] = _summary(_time(
+        lambda: layout_energy(sides, sun, panel_area, efficiency, power, crowns=crowns), repeat))
+    results['crowns'] = len(crowns)
+    return results
+
+
+def bench_sun(roof, dimensions, repeat):
+    """create_photorealistic_sun over a sweep of sun positions"""
+    from solar_system.enhanced_sun_system import EnhancedRealisticSunSystem
+
+    sun_system = EnhancedRealisticSunSystem(roof.plotter)
+    sun_system.set_building_center([0, 0, dimensions[2] / 2])
+    sun_system.set_building_dimensions(dimensions[0], dimensions[1], dimensions[2], 2.0)
+    if hasattr(sun_system, 'performance_auto_adjust'):
+        sun_system.performance_auto_adjust = False
+
+    samples = []
+    for i in range(repeat):
+        hour = 8.0 + 8.0 * i / max(repeat - 1, 1)
+        azimuth = math.radians(90.0 + (hour - 6.0) * 15.0)
+        elevation = math.radians(15.0 + 40.0 * math.sin(math.pi * (hour - 6.0) / 12.0))
+        position = [50 * math.cos(elevation) * math.sin(azimuth),
+                    50 * math.cos(elevation) * math.cos(azimuth),
+                    50 * math.sin(elevation)]
+        # Defeat the skip-if-unchanged throttle so every call does the work
+        sun_system.last_sun_pos = None
+        sun_system.last_update_time = 0
+        start = time.perf_counter()
+        sun_system.create_photorealistic_sun(position, {
+            'current_hour': hour, 'sun_elevation': math.degrees(elevation),
+            'sun_azimuth': math.degrees(azimuth) % 360.0})
+        samples.append(time.perf_counter() - start)
+    try:
+        sun_system.destroy()
+    except Exception:
+        pass
+    return {'create_photorealistic_sun': _summary(samples)}
+
+
+def run_case(roof_type, size, density, repeat):
+    dimensions = SIZES[size]
+    n_obstacles, n_trees = DENSITIES[density]
+
+    start = time.perf_counter()
+    roof = build_scene(roof_type, dimensions, n_obstacles, n_trees)
+    build_s = time.perf_counter() - start
+    try:
+        placement, positions = bench_placement(roof, roof_type, repeat)
+        results = {'scene_build_ms': round(build_s * 1000.0, 3)}
+        results.update(placement)
+        results.update(bench_energy(roof, positions, repeat))
+        results.update(bench_sun(roof, dimensions, repeat))
+        return results
+    finally:
+        try:
+            roof.plotter.close()
+        except Exception:
+            pass
+
+
+def run_suite(roof_types=ROOF_TYPES, sizes=tuple(SIZES), densities=tuple(DENSITIES),
+              repeat=5, on_case=None):
+    """Run every (roof type, size, density) case; returns the result document"""
+    from utils.tracing import tracer
+
+    # Traced spans would add their own overhead to every timing
+    tracer.disable()
+    cases = {}
+    for roof_type, size, density in itertools.product(roof_types, sizes, densities):
+        key = f'{roof_type}/{size}/{density}'
+        try:
+            cases[key] = run_case(roof_type, size, density, repeat)
+        except Exception as e:
+            cases[key] = {'error': f'{type(e).__name__}: {e}'}
+        if on_case:
+            on_case(key, cases[key])
+
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'machine': {'python': platform.python_version(), 'platform': platform.platform(),
+                    'processor': platform.processor(), 'cpus': os.cpu_count()},
+        'repeat': repeat,
+        'cases': cases,
+    }
+
+
+# ==================== BASELINE ====================
+
+def compare(results, baseline, threshold=0.15, stat='median_ms'):
+    """Compare two result documents.
+
+    Returns a list of (case, metric, baseline_ms, current_ms, ratio) for every
+    metric present in both; ratio > 1 + threshold is a regression.
+    """
+    rows = []
+    for case, metrics in results.get('cases', {}).items():
+        base_metrics = baseline.get('cases', {}).get(case) or {}
+        for metric, value in metrics.items():
+            base = base_metrics.get(metric)
+            if not isinstance(value, dict) or not isinstance(base, dict):
+                continue
+            if stat not in value or not base.get(stat):
+                continue
+            rows.append((case, metric, base[stat], value[stat], value[stat] / base[stat]))
+    return rows
+
+
+def _print_comparison(rows, threshold):
+    regressions = [r for r in rows if r[4] > 1.0 + threshold]
+    improvements = [r for r in rows if r[4] < 1.0 - threshold]
+    print(f"\n📊 Compared {len(rows)} metrics against baseline (threshold ±{threshold:.0%})")
+    for label, selected in (("❌ Regressions", regressions), ("✅ Improvements", improvements)):
+        if selected:
+            print(label)
+            for case, metric, base, current, ratio in sorted(selected, key=lambda r: -abs(r[4] - 1)):
+                print(f"   {case:<24} {metric:<28} {base:9.3f} → {current:9.3f} ms ({ratio:5.2f}x)")
+    if not regressions:
+        print("✅ No regressions")
+    return regressions
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description="PVmizer headless benchmark suite")
+    parser.add_argument('--roof', nargs='+', choices=ROOF_TYPES, default=list(ROOF_TYPES))
+    parser.add_argument('--size', nargs='+', choices=list(SIZES), default=None)
+    parser.add_argument('--density', nargs='+', choices=list(DENSITIES), default=None)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--quick', action='store_true',
+                        help=f"only sizes {QUICK_SIZES} and densities {QUICK_DENSITIES}, 3 repeats")
+    parser.add_argument('--output', help="write results to this JSON file")
+    parser.add_argument('--baseline', help="compare against this result JSON file")
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help="relative slowdown reported as regression (default 0.15)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = _parse_args(argv if argv is not None else sys.argv[1:])
+    sizes = args.size or (QUICK_SIZES if args.quick else tuple(SIZES))
+    densities = args.density or (QUICK_DENSITIES if args.quick else tuple(DENSITIES))
+    repeat = 3 if args.quick and args.repeat == 5 else args.repeat
+
+    def on_case(key, result):
+        if 'error' in result:
+            print(f"❌ {key}: {result['error']}")
+            return
+        add = [v['median_ms'] for k, v in result.items() if k.startswith('add_panels.') and v]
+        annual = (result.get('annual_energy') or {}).get('median_ms', float('nan'))
+        sun = (result.get('create_photorealistic_sun') or {}).get('median_ms', float('nan'))
+        print(f"✅ {key:<24} add_panels {sum(add):8.1f} ms  annual {annual:7.1f} ms  sun {sun:7.1f} ms")
+
+    started = time.time()
+    results = run_suite(args.roof, sizes, densities, repeat, on_case=on_case)
+    print(f"⏱️ {len(results['cases'])} cases in {time.time() - started:.1f}s")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = _print_comparison(compare(results, baseline, args.threshold), args.threshold)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -112,7 +112,7 @@ class BuildingManager:
     
     def main_generator_strategy(self, points, settings):
         """Strategy 3: Use main building generator (FALLBACK)"""
-        if not (hasattr(self.main_window, 'building_generator') and self.main_window.building_generator):
+        if not self.ensure_building_generator():
             return False
         
         print("🏗️ Using main building generator...")
@@ -231,11 +231,11 @@ class BuildingManager:
     def ensure_building_generator(self):
         """Ensure building generator is properly initialized"""
         try:
-            if not hasattr(self.main_window, 'building_generator') or not self.main_window.building_generator:
-                from models.pyvista_building_generator import PyVistaBuildingGenerator
-                self.main_window.building_generator = PyVistaBuildingGenerator(self.main_window)
+            if not getattr(self.main_window, 'building_generator', None):
+                # Created on first use so PyVista is not imported at startup
+                self.initialize_building_generator()
             
-            return True
+            return self.main_window.building_generator is not None
         except Exception as e:
             print(f"❌ Building generator initialization failed: {e}")
             return False
@@ -25,6 +25,7 @@ class ComponentManager:
         self.main_window.canvas_integrator = None
         self.main_window.pyvista_integration = None
         self.main_window.model_generator = None
+        self.main_window.building_generator = None
         self.main_window.snipping_tool = None
         
         # Tab references (will be set by ContentTabWidget)
@@ -12,30 +12,20 @@ import sys
 import warnings
 import logging
 
+from utils.startup_timeline import phase as startup_phase
+
 # ✅ SUPPRESS ALL VTK/OpenGL ERRORS COMPLETELY
 def suppress_vtk_errors():
-    """Completely suppress VTK and OpenGL error messages"""
+    """Completely suppress VTK and OpenGL error messages.
+
+    VTK itself is not imported here; its output window is silenced by
+    utils.lazy_imports.load_pyvista() when the 3D view is first created.
+    """
     
-    # 1. Suppress VTK output observer errors
-    try:
-        import vtk
-        
-        # Create error observer that does nothing
-        def vtk_error_handler(obj, event):
-            pass
-        
-        # Set up VTK error suppression
-        vtk_out = vtk.vtkOutputWindow()
-        vtk_out.SetInstance(vtk_out)
-        vtk_out.GlobalWarningDisplayOff()
-        
-        # Alternative: Redirect VTK output to null
-        vtk.vtkObject.GlobalWarningDisplayOff()
-        
-        print("✅ VTK error suppression enabled")
-        
-    except ImportError:
-        pass
+    # 1. Suppress VTK output observer errors (only if VTK is already loaded)
+    if 'vtk' in sys.modules:
+        from utils.lazy_imports import silence_vtk_output
+        silence_vtk_output()
     
     # 2. Suppress Python logging errors
     logging.getLogger('root').setLevel(logging.CRITICAL)
@@ -137,10 +127,12 @@ class MainWindow(QMainWindow):
         }
         
         # Initialize core managers
-        self._initialize_core_managers()
+        with startup_phase('core managers'):
+            self._initialize_core_managers()
         
         # Initialize modular managers
-        self._initialize_modular_managers()
+        with startup_phase('modular managers'):
+            self._initialize_modular_managers()
         
         # Timer for checking completion
         self.check_timer = QTimer()
@@ -211,7 +203,8 @@ class MainWindow(QMainWindow):
             self.window_manager.setup_initial_window_size()
             
             # Setup UI
-            self._setup_ui()
+            with startup_phase('setup_ui'):
+                self._setup_ui()
             
             # Show window
             self.window_manager.show_and_activate()
@@ -248,16 +241,18 @@ class MainWindow(QMainWindow):
             main_layout.setSpacing(10)
             
             # Setup toolbar
-            self._setup_toolbar()
+            with startup_phase('toolbar'):
+                self._setup_toolbar()
             
             # Initialize component references
             self.component_manager.initialize_component_references()
             
-            # Initialize building generator
-            self.building_manager.initialize_building_generator()
+            # Building generator (PyVista) is created on first use by
+            # BuildingManager.ensure_building_generator()
             
             # Create UI components (this creates tabs and sets references)
-            self.component_manager.create_ui_components()
+            with startup_phase('ui components'):
+                self.component_manager.create_ui_components()
             
             # Setup layout
             if self.left_panel and self.content_tabs:
@@ -271,10 +266,12 @@ class MainWindow(QMainWindow):
                 print("⚠️ Using fallback UI")
             
             # Setup integration (this connects tabs)
-            self.component_manager.setup_integration()
+            with startup_phase('integration'):
+                self.component_manager.setup_integration()
             
             # Connect signals
-            self.signal_manager.connect_all_signals()
+            with startup_phase('signals'):
+                self.signal_manager.connect_all_signals()
             
             # Initialize status bar
             self.statusBar().showMessage("PVmizer GEO Enhanced - Initializing...", 3000)
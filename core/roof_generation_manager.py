@@ -11,46 +11,72 @@ from PyQt5.QtWidgets import QMessageBox
 from PyQt5.QtCore import QTimer, QObject, pyqtSignal
 import numpy as np
 
-# Import your GableRoof class - with fallback handling
-try:
-    from roofs.concrete.gable_roof import GableRoof
-    GABLE_ROOF_AVAILABLE = True
-except ImportError:
-    print("⚠️ Could not import GableRoof from roofs.gable_roof")
-    GABLE_ROOF_AVAILABLE = False
-    GableRoof = None
+from utils.lazy_imports import pyvista_installed
+from utils.tracing import traced
+from utils.log import get_logger
 
-# Try to import other roof types
-try:
-    from roofs.concrete.flat_roof import FlatRoof
-    FLAT_ROOF_AVAILABLE = True
-except ImportError:
-    print("⚠️ Could not import FlatRoof from roofs.flat_roof")
-    FLAT_ROOF_AVAILABLE = False
-    FlatRoof = None
+log = get_logger('roof')
 
-try:
-    from roofs.concrete.hip_roof import HipRoof
-    HIP_ROOF_AVAILABLE = True
-except ImportError:
-    print("⚠️ Could not import HipRoof from roofs.hip_roof")
-    HIP_ROOF_AVAILABLE = False
-    HipRoof = None
+# Roof classes are imported on first use (each pulls in PyVista/VTK)
+ROOF_CLASS_PATHS = {
+    'gable': ('roofs.concrete.gable_roof', 'GableRoof'),
+    'flat': ('roofs.concrete.flat_roof', 'FlatRoof'),
+    'hip': ('roofs.concrete.hip_roof', 'HipRoof'),
+    'pyramid': ('roofs.concrete.pyramid_roof', 'PyramidRoof'),
+}
+
+# Panel placement keys per roof class (key -> side/area)
+PANEL_KEY_BINDINGS = {
+    'FlatRoof': {'1': 'north', '2': 'center', '3': 'south', '4': 'east', '5': 'west'},
+    'GableRoof': {'1': 'left', '2': 'right', 'Left': 'left', 'Right': 'right'},
+    'HipRoof': {'1': 'front', '2': 'right', '3': 'back', '4': 'left'},
+    'PyramidRoof': {'1': 'front', '2': 'right', '3': 'back', '4': 'left'},
+}
+
+
+def key_press_callbacks(plotter):
+    """pyvista's {key: [callbacks]} registry of a plotter (kept on the
+    interactor in current pyvista, on the plotter in older releases)"""
+    for owner in (getattr(plotter, 'iren', None), plotter):
+        callbacks = getattr(owner, '_key_press_event_callbacks', None)
+        if callbacks is not None:
+            return callbacks
+    return {}
+
+
+def clear_key_events(plotter, keys=None):
+    """Drop every callback bound to the keys (all keys when None).
+
+    add_key_event appends callbacks instead of replacing them, so a key has
+    to be cleared before it is re-bound. Returns the number of keys cleared.
+    """
+    callbacks = key_press_callbacks(plotter)
+    keys = list(callbacks) if keys is None else [key for key in keys if key in callbacks]
+    for key in keys:
+        callbacks.pop(key, None)
+    return len(keys)
+
+
+def load_roof_class(roof_type):
+    """Import and return the roof class for a roof type, or None if unavailable"""
+    module_name, class_name = ROOF_CLASS_PATHS[roof_type]
+    try:
+        return getattr(importlib.import_module(module_name), class_name)
+    except ImportError:
+        log.warning("⚠️ Could not import %s from %s", class_name, module_name)
+        return None
 
 try:
-    from roofs.concrete.pyramid_roof import PyramidRoof
-    PYRAMID_ROOF_AVAILABLE = True
+    from roofs.base.scene_graph import SceneGraph
 except ImportError:
-    print("⚠️ Could not import PyramidRoof from roofs.pyramid_roof")
-    PYRAMID_ROOF_AVAILABLE = False
-    PyramidRoof = None
+    SceneGraph = None
 
 # Import the existing roof dialog
 try:
     from ui.dialogs.roof_dialog import RoofDimensionDialog
     ROOF_DIALOG_AVAILABLE = True
 except ImportError:
-    print("⚠️ Could not import RoofDimensionDialog from ui.dialogs.roof_dialog")
+    log.warning("⚠️ Could not import RoofDimensionDialog from ui.dialogs.roof_dialog")
     ROOF_DIALOG_AVAILABLE = False
 
 
@@ -73,25 +99,23 @@ class RoofGenerationManager(QObject):
     
     def _initialize_plotter(self):
         """Initialize PyVista plotter for 3D model display"""
-        try:
-            import pyvista as pv
-            from pyvistaqt import QtInteractor
-            
-            print("✅ PyVista and PyVistaQt available for 3D visualization")
+        # Only locate the packages here; they are imported with the 3D view
+        if pyvista_installed():
+            log.debug("✅ PyVista and PyVistaQt available for 3D visualization")
             self.pyvista_available = True
-        except ImportError:
-            print("⚠️ PyVista or PyVistaQt not available. 3D visualization will be limited.")
+        else:
+            log.warning("⚠️ PyVista or PyVistaQt not available. 3D visualization will be limited.")
             self.pyvista_available = False
     
     def show_roof_dialog(self, roof_type):
         """Show roof dimension dialog for the specified roof type"""
         try:
             if not ROOF_DIALOG_AVAILABLE:
-                print("❌ RoofDimensionDialog not available")
+                log.error("❌ RoofDimensionDialog not available")
                 self._show_error("Dialog Error", "Roof dialog component is not available.")
                 return False
             
-            print(f"🏠 Opening {roof_type} roof dialog...")
+            log.debug("🏠 Opening %s roof dialog...", roof_type)
             
             # Create dialog
             dialog = RoofDimensionDialog(roof_type.title(), self.main_window)
@@ -101,7 +125,7 @@ class RoofGenerationManager(QObject):
             
             # Check result
             if result == dialog.Accepted and dialog.dimensions:
-                print(f"✅ Roof dialog accepted with dimensions: {dialog.dimensions}")
+                log.debug("✅ Roof dialog accepted with dimensions: %s", dialog.dimensions)
                 
                 # IMPORTANT: Force enable model tab access BEFORE switching
                 self._force_enable_model_tab()
@@ -112,17 +136,17 @@ class RoofGenerationManager(QObject):
                     self.main_window.content_tabs.blockSignals(True)
                     self.main_window.content_tabs.setCurrentIndex(2)  # Model tab index
                     self.main_window.content_tabs.blockSignals(False)
-                    print("✅ Forced switch to model tab for roof generation")
+                    log.debug("✅ Forced switch to model tab for roof generation")
                 
                 # Generate roof with the specified dimensions
                 self.generate_roof(roof_type, dialog.dimensions)
                 return True
             else:
-                print("❌ Roof dialog cancelled or no dimensions provided")
+                log.error("❌ Roof dialog cancelled or no dimensions provided")
                 return False
             
         except Exception as e:
-            print(f"❌ Error showing roof dialog: {e}")
+            log.error("❌ Error showing roof dialog: %s", e)
             traceback.print_exc()
             self._show_error("Dialog Error", f"Error showing roof dialog: {str(e)}")
             return False
@@ -130,7 +154,7 @@ class RoofGenerationManager(QObject):
     def _force_enable_model_tab(self):
         """Force enable model tab access by setting all necessary workflow flags"""
         try:
-            print("🔧 FORCE ENABLING MODEL TAB ACCESS FOR ROOF GENERATION")
+            log.debug("🔧 FORCE ENABLING MODEL TAB ACCESS FOR ROOF GENERATION")
             
             # Set main window flag
             self.main_window._building_generated = True
@@ -157,62 +181,65 @@ class RoofGenerationManager(QObject):
                 if hasattr(content_tabs, '_force_unlock_model_tab'):
                     content_tabs._force_unlock_model_tab()
                 
-                print("✅ Model tab access forcibly enabled for roof generation")
+                log.debug("✅ Model tab access forcibly enabled for roof generation")
             
         except Exception as e:
-            print(f"❌ Error forcing model tab access: {e}")
+            log.error("❌ Error forcing model tab access: %s", e)
     
     def _clean_previous_roof(self):
         """Clean up previous roof instance if it exists - ENHANCED VERSION"""
         try:
-            print("🧹 Cleaning up previous roof...")
+            log.debug("🧹 Cleaning up previous roof...")
             
             # STEP 1: Clean the current roof object
             if hasattr(self, 'current_roof') and self.current_roof:
                 # Clean solar panels if handler exists
                 if hasattr(self.current_roof, 'solar_panel_handler'):
                     try:
+                        if hasattr(self.current_roof.solar_panel_handler, 'request_panels'):
+                            from roofs.solar_panel_handlers.base.placement_queue import placement_queue
+                            placement_queue.discard(self.current_roof.solar_panel_handler)
                         if hasattr(self.current_roof.solar_panel_handler, 'clear_panels'):
                             self.current_roof.solar_panel_handler.clear_panels()
-                            print("✅ Cleared solar panels")
+                            log.debug("✅ Cleared solar panels")
                         
                         # Detach solar panel handler
                         self.current_roof.solar_panel_handler = None
                     except Exception as e:
-                        print(f"⚠️ Could not clear solar panels: {e}")
+                        log.warning("⚠️ Could not clear solar panels: %s", e)
                 
                 # Clean obstacles
                 if hasattr(self.current_roof, 'obstacles'):
                     try:
                         # Clear obstacles list
                         self.current_roof.obstacles = []
-                        print("✅ Cleared obstacles list")
+                        log.debug("✅ Cleared obstacles list")
                     except Exception as e:
-                        print(f"⚠️ Could not clear obstacles list: {e}")
+                        log.warning("⚠️ Could not clear obstacles list: %s", e)
                 
                 if hasattr(self.current_roof, 'clear_obstacles'):
                     try:
                         self.current_roof.clear_obstacles()
-                        print("✅ Cleared obstacles")
+                        log.debug("✅ Cleared obstacles")
                     except Exception as e:
-                        print(f"⚠️ Could not clear obstacles: {e}")
+                        log.warning("⚠️ Could not clear obstacles: %s", e)
                 
                 # Clean attachment points
                 if hasattr(self.current_roof, 'attachment_points'):
                     try:
                         self.current_roof.attachment_points = []
-                        print("✅ Cleared attachment points")
+                        log.debug("✅ Cleared attachment points")
                     except Exception as e:
-                        print(f"⚠️ Could not clear attachment points: {e}")
+                        log.warning("⚠️ Could not clear attachment points: %s", e)
                 
                 if hasattr(self.current_roof, 'attachment_point_actor') and self.current_roof.attachment_point_actor:
                     try:
                         if hasattr(self.current_roof, 'plotter') and self.current_roof.plotter:
                             self.current_roof.plotter.remove_actor(self.current_roof.attachment_point_actor)
                         self.current_roof.attachment_point_actor = None
-                        print("✅ Cleared attachment point actor")
+                        log.debug("✅ Cleared attachment point actor")
                     except Exception as e:
-                        print(f"⚠️ Could not clear attachment point actor: {e}")
+                        log.warning("⚠️ Could not clear attachment point actor: %s", e)
                 
                 # Clean placement instruction
                 if hasattr(self.current_roof, 'placement_instruction') and self.current_roof.placement_instruction:
@@ -220,35 +247,30 @@ class RoofGenerationManager(QObject):
                         if hasattr(self.current_roof, 'plotter') and self.current_roof.plotter:
                             self.current_roof.plotter.remove_actor(self.current_roof.placement_instruction)
                         self.current_roof.placement_instruction = None
-                        print("✅ Cleared placement instruction")
+                        log.debug("✅ Cleared placement instruction")
                     except Exception as e:
-                        print(f"⚠️ Could not clear placement instruction: {e}")
+                        log.warning("⚠️ Could not clear placement instruction: %s", e)
                 
                 # Clean any other references
                 if hasattr(self.current_roof, 'plotter') and self.current_roof.plotter:
                     try:
                         # Remove key bindings
-                        if hasattr(self.current_roof.plotter, 'remove_key_event'):
-                            for key in ['1', '2', '3', 'c', 'C', 'Left', 'Right', 'r', 'R', 'h', 'H', 's', 'S', 'o', 'O']:
-                                try:
-                                    self.current_roof.plotter.remove_key_event(key)
-                                except:
-                                    pass
-                        print("✅ Removed key bindings")
+                        cleared = clear_key_events(self.current_roof.plotter)
+                        log.debug("✅ Removed %s key bindings", cleared)
                         
                         # Disable picking
                         if hasattr(self.current_roof.plotter, 'disable_picking'):
                             try:
                                 self.current_roof.plotter.disable_picking()
-                                print("✅ Disabled picking")
+                                log.debug("✅ Disabled picking")
                             except:
                                 pass
                     except Exception as e:
-                        print(f"⚠️ Could not clean plotter references: {e}")
+                        log.warning("⚠️ Could not clean plotter references: %s", e)
                 
                 # Set current_roof to None
                 self.current_roof = None
-                print("✅ Previous roof cleaned up")
+                log.debug("✅ Previous roof cleaned up")
             
             # STEP 2: Clear tracked actors
             if hasattr(self, 'roof_actors') and self.roof_actors:
@@ -260,10 +282,10 @@ class RoofGenerationManager(QObject):
                         except:
                             pass
                 self.roof_actors = []
-                print("✅ Cleared tracked roof actors")
+                log.debug("✅ Cleared tracked roof actors")
                 
         except Exception as e:
-            print(f"❌ Error cleaning previous roof: {e}")
+            log.error("❌ Error cleaning previous roof: %s", e)
             traceback.print_exc()
     
     def _remove_all_key_bindings(self, plotter):
@@ -272,36 +294,18 @@ class RoofGenerationManager(QObject):
             if not plotter:
                 return
                 
-            # Get all key events
-            if hasattr(plotter, '_key_press_event_callbacks'):
-                keys = list(plotter._key_press_event_callbacks.keys())
-                for key in keys:
-                    try:
-                        plotter.remove_key_event(key)
-                    except:
-                        pass
-                print(f"✅ Removed {len(keys)} key bindings")
-            
-            # Common keys to remove
-            common_keys = ['1', '2', '3', 'c', 'C', 'Left', 'Right', 'r', 'R', 'h', 'H', 's', 'S', 'o', 'O']
-            for key in common_keys:
-                try:
-                    plotter.remove_key_event(key)
-                except:
-                    pass
-                    
+            log.debug("✅ Removed %s key bindings", clear_key_events(plotter))
+
         except Exception as e:
-            print(f"⚠️ Error removing key bindings: {e}")
+            log.warning("⚠️ Error removing key bindings: %s", e)
     
     def _override_roof_key_bindings(self, plotter):
         """Override the roof's key bindings with our safe ones"""
         try:
-            print("🔧 Overriding roof key bindings with safe handlers...")
-            
-            # First, remove all existing key bindings
-            self._remove_all_key_bindings(plotter)
+            log.debug("🔧 Overriding roof key bindings with safe handlers...")
             
-            # Now add our safe key handlers
+            # Our handlers clear the keys they re-bind; the roof's other keys
+            # (environment objects 7/8/9, E) stay bound
             self._add_safe_key_handlers(plotter)
             
             # If the roof has a setup_key_bindings method, disable it
@@ -311,17 +315,17 @@ class RoofGenerationManager(QObject):
                 
                 # Replace it with a dummy method
                 def dummy_setup(*args, **kwargs):
-                    print("⚠️ Roof tried to set up key bindings, but was prevented")
+                    log.warning("⚠️ Roof tried to set up key bindings, but was prevented")
                     return
                 
                 # Replace the method
                 self.current_roof.setup_key_bindings = dummy_setup
-                print("✅ Disabled roof's original key binding setup method")
+                log.debug("✅ Disabled roof's original key binding setup method")
             
-            print("✅ Roof key bindings successfully overridden")
+            log.debug("✅ Roof key bindings successfully overridden")
             
         except Exception as e:
-            print(f"❌ Error overriding roof key bindings: {e}")
+            log.error("❌ Error overriding roof key bindings: %s", e)
             traceback.print_exc()
     
     def _add_safe_key_handlers(self, plotter):
@@ -332,225 +336,39 @@ class RoofGenerationManager(QObject):
                 
             # Check roof type for specific handlers
             roof_type = type(self.current_roof).__name__
-            print(f"🔧 Adding safe key handlers for {roof_type}...")
+            log.debug("🔧 Adding safe key handlers for %s...", roof_type)
             
-            # FlatRoof specific handlers
-            if roof_type == 'FlatRoof':
-                # ✅ FIXED: Use add_panels() method instead of place_panels()
-                def safe_place_panels_north():
-                    try:
-                        if self.current_roof and hasattr(self.current_roof, 'solar_panel_handler') and self.current_roof.solar_panel_handler:
-                            print(f"🔧 FLAT: Adding panels to NORTH area")
-                            self.current_roof.solar_panel_handler.add_panels(area="north")  # ✅ CORRECT METHOD
-                        else:
-                            print("⚠️ Cannot place north panels - solar panel handler not available")
-                    except Exception as e:
-                        print(f"⚠️ Error placing north panels: {e}")
-                        
-                def safe_place_panels_center():
-                    try:
-                        if self.current_roof and hasattr(self.current_roof, 'solar_panel_handler') and self.current_roof.solar_panel_handler:
-                            print(f"🔧 FLAT: Adding panels to CENTER area")
-                            self.current_roof.solar_panel_handler.add_panels(area="center")  # ✅ CORRECT METHOD
-                        else:
-                            print("⚠️ Cannot place center panels - solar panel handler not available")
-                    except Exception as e:
-                        print(f"⚠️ Error placing center panels: {e}")
-                        
-                def safe_place_panels_south():
-                    try:
-                        if self.current_roof and hasattr(self.current_roof, 'solar_panel_handler') and self.current_roof.solar_panel_handler:
-                            print(f"🔧 FLAT: Adding panels to SOUTH area")
-                            self.current_roof.solar_panel_handler.add_panels(area="south")  # ✅ CORRECT METHOD
-                        else:
-                            print("⚠️ Cannot place south panels - solar panel handler not available")
-                    except Exception as e:
-                        print(f"⚠️ Error placing south panels: {e}")
-                
-                def safe_place_panels_east():
-                    try:
-                        if self.current_roof and hasattr(self.current_roof, 'solar_panel_handler') and self.current_roof.solar_panel_handler:
-                            print(f"🔧 FLAT: Adding panels to EAST area")
-                            self.current_roof.solar_panel_handler.add_panels(area="east")  # ✅ CORRECT METHOD
-                        else:
-                            print("⚠️ Cannot place east panels - solar panel handler not available")
-                    except Exception as e:
-                        print(f"⚠️ Error placing east panels: {e}")
-                
-                def safe_place_panels_west():
-                    try:
-                        if self.current_roof and hasattr(self.current_roof, 'solar_panel_handler') and self.current_roof.solar_panel_handler:
-                            print(f"🔧 FLAT: Adding panels to WEST area")
-                            self.current_roof.solar_panel_handler.add_panels(area="west")  # ✅ CORRECT METHOD
-                        else:
-                            print("⚠️ Cannot place west panels - solar panel handler not available")
-                    except Exception as e:
-                        print(f"⚠️ Error placing west panels: {e}")
-                        
-                def safe_clear_panels():
-                    try:
-                        if self.current_roof and hasattr(self.current_roof, 'solar_panel_handler') and self.current_roof.solar_panel_handler:
-                            print(f"🔧 FLAT: Clearing panels")
-                            self.current_roof.solar_panel_handler.clear_panels()
-                        else:
-                            print("⚠️ Cannot clear panels - solar panel handler not available")
-                    except Exception as e:
-                        print(f"⚠️ Error clearing panels: {e}")
-                        
-                # ✅ CORRECT FLAT ROOF KEY MAPPINGS
-                plotter.add_key_event("1", safe_place_panels_north)   # Key 1 → NORTH
-                plotter.add_key_event("2", safe_place_panels_center)  # Key 2 → CENTER
-                plotter.add_key_event("3", safe_place_panels_south)   # Key 3 → SOUTH
-                plotter.add_key_event("4", safe_place_panels_east)    # Key 4 → EAST
-                plotter.add_key_event("5", safe_place_panels_west)    # Key 5 → WEST
-                plotter.add_key_event("c", safe_clear_panels)
-                plotter.add_key_event("C", safe_clear_panels)
-                
-                print("✅ Added FlatRoof-specific safe key handlers")
-                print("✅ Key 1 → NORTH, Key 2 → CENTER, Key 3 → SOUTH, Key 4 → EAST, Key 5 → WEST")
-
-            
-            # ✅ GABLE ROOF SPECIFIC HANDLERS
-            elif roof_type == 'GableRoof':
-                def safe_add_panels_left():
-                    try:
-                        if self.current_roof and hasattr(self.current_roof, 'solar_panel_handler') and self.current_roof.solar_panel_handler:
-                            print(f"🔧 GABLE: Adding panels to LEFT side")
-                            self.current_roof.solar_panel_handler.add_panels("left")
-                        else:
-                            print("⚠️ Cannot add left panels - solar panel handler not available")
-                    except Exception as e:
-                        print(f"⚠️ Error adding left panels: {e}")
-                        
-                def safe_add_panels_right():
-                    try:
-                        if self.current_roof and hasattr(self.current_roof, 'solar_panel_handler') and self.current_roof.solar_panel_handler:
-                            print(f"🔧 GABLE: Adding panels to RIGHT side")
-                            self.current_roof.solar_panel_handler.add_panels("right")
-                        else:
-                            print("⚠️ Cannot add right panels - solar panel handler not available")
-                    except Exception as e:
-                        print(f"⚠️ Error adding right panels: {e}")
-                        
-                def safe_clear_panels():
-                    try:
-                        if self.current_roof and hasattr(self.current_roof, 'solar_panel_handler') and self.current_roof.solar_panel_handler:
-                            print(f"🔧 GABLE: Clearing panels")
-                            self.current_roof.solar_panel_handler.clear_panels()
-                        else:
-                            print("⚠️ Cannot clear panels - solar panel handler not available")
-                    except Exception as e:
-                        print(f"⚠️ Error clearing panels: {e}")
-                
-                # ✅ CORRECT GABLE ROOF KEY MAPPINGS
-                plotter.add_key_event("1", safe_add_panels_left)   # Key 1 → LEFT (correct!)
-                plotter.add_key_event("2", safe_add_panels_right)  # Key 2 → RIGHT (correct!)
-                plotter.add_key_event("c", safe_clear_panels)
-                plotter.add_key_event("C", safe_clear_panels)
-                plotter.add_key_event("Left", safe_add_panels_left)   # Arrow key support
-                plotter.add_key_event("Right", safe_add_panels_right) # Arrow key support
-                
-                print("✅ Added GABLE roof specific safe key handlers")
-                print("✅ Key 1 → LEFT, Key 2 → RIGHT")
-            
-            # ✅ HIP/PYRAMID ROOF SPECIFIC HANDLERS  
-            elif roof_type in ['HipRoof', 'PyramidRoof']:
-                # ✅ ADD CALL PROTECTION
-                _last_call_time = {}
-                
-                def safe_add_panels_front():
-                    try:
-                        # ✅ CALL PROTECTION
-                        import time
-                        current_time = time.time()
-                        if 'front' in _last_call_time and current_time - _last_call_time['front'] < 0.5:
-                            print(f"🚨 BLOCKED RAPID CALL: Front panel call too soon")
-                            return
-                        _last_call_time['front'] = current_time
-                        
-                        if self.current_roof and hasattr(self.current_roof, 'solar_panel_handler') and self.current_roof.solar_panel_handler:
-                            print(f"🔧 {roof_type.upper()}: Adding panels to FRONT side")
-                            self.current_roof.solar_panel_handler.add_panels("front")
-                        else:
-                            print("⚠️ Cannot add front panels - solar panel handler not available")
-                    except Exception as e:
-                        print(f"⚠️ Error adding front panels: {e}")
-                
-                # ✅ ADD SAME PROTECTION TO OTHER METHODS
-                def safe_add_panels_right():
-                    try:
-                        import time
-                        current_time = time.time()
-                        if 'right' in _last_call_time and current_time - _last_call_time['right'] < 0.5:
-                            print(f"🚨 BLOCKED RAPID CALL: Right panel call too soon")
-                            return
-                        _last_call_time['right'] = current_time
-                        
-                        if self.current_roof and hasattr(self.current_roof, 'solar_panel_handler') and self.current_roof.solar_panel_handler:
-                            print(f"🔧 {roof_type.upper()}: Adding panels to RIGHT side")
-                            self.current_roof.solar_panel_handler.add_panels("right")
-                        else:
-                            print("⚠️ Cannot add right panels - solar panel handler not available")
-                    except Exception as e:
-                        # ✅ ADD EXCEPTION HANDLING
-                     print(f"⚠️ Error adding right panels: {e}")
-                        
-                def safe_add_panels_back():
-                    try:
-                        if self.current_roof and hasattr(self.current_roof, 'solar_panel_handler') and self.current_roof.solar_panel_handler:
-                            print(f"🔧 {roof_type.upper()}: Adding panels to BACK side")
-                            self.current_roof.solar_panel_handler.add_panels("back")
-                        else:
-                            print("⚠️ Cannot add back panels - solar panel handler not available")
-                    except Exception as e:
-                        print(f"⚠️ Error adding back panels: {e}")
-                        
-                def safe_add_panels_left():
-                    try:
-                        if self.current_roof and hasattr(self.current_roof, 'solar_panel_handler') and self.current_roof.solar_panel_handler:
-                            print(f"🔧 {roof_type.upper()}: Adding panels to LEFT side")
-                            self.current_roof.solar_panel_handler.add_panels("left")
-                        else:
-                            print("⚠️ Cannot add left panels - solar panel handler not available")
-                    except Exception as e:
-                        print(f"⚠️ Error adding left panels: {e}")
-                        
-                def safe_clear_panels():
-                    try:
-                        if self.current_roof and hasattr(self.current_roof, 'solar_panel_handler') and self.current_roof.solar_panel_handler:
-                            print(f"🔧 {roof_type.upper()}: Clearing panels")
-                            self.current_roof.solar_panel_handler.clear_panels()
-                        else:
-                            print("⚠️ Cannot clear panels - solar panel handler not available")
-                    except Exception as e:
-                        print(f"⚠️ Error clearing panels: {e}")
-                
-                # ✅ CORRECT HIP/PYRAMID KEY MAPPINGS
-                plotter.add_key_event("1", safe_add_panels_front)  # Key 1 → FRONT
-                plotter.add_key_event("2", safe_add_panels_right)  # Key 2 → RIGHT  
-                plotter.add_key_event("3", safe_add_panels_back)   # Key 3 → BACK
-                plotter.add_key_event("4", safe_add_panels_left)   # Key 4 → LEFT
-                plotter.add_key_event("c", safe_clear_panels)
-                plotter.add_key_event("C", safe_clear_panels)
-                
-                print("✅ Added Hip/Pyramid roof specific safe key handlers")
-                print("✅ Key 1 → FRONT, Key 2 → RIGHT, Key 3 → BACK, Key 4 → LEFT")
+            def request_panels(side):
+                handler = getattr(self.current_roof, 'solar_panel_handler', None) if self.current_roof else None
+                if handler is None:
+                    log.warning("⚠️ Cannot place %s panels - solar panel handler not available", side)
+                    return
+                # Queued: repeated presses are merged and placed once after the key event
+                handler.request_panels(side)
             
-            # Unknown roof type fallback
-            else:
-                print(f"⚠️ Unknown roof type: {roof_type}, using basic handlers")
-                # Add basic clear handler
-                def safe_clear_panels():
-                    try:
-                        if self.current_roof and hasattr(self.current_roof, 'solar_panel_handler') and self.current_roof.solar_panel_handler:
-                            self.current_roof.solar_panel_handler.clear_panels()
-                        else:
-                            print("⚠️ Cannot clear panels - solar panel handler not available")
-                    except Exception as e:
-                        print(f"⚠️ Error clearing panels: {e}")
-                
-                plotter.add_key_event("c", safe_clear_panels)
-                plotter.add_key_event("C", safe_clear_panels)
+            def request_clear():
+                handler = getattr(self.current_roof, 'solar_panel_handler', None) if self.current_roof else None
+                if handler is None:
+                    log.warning("⚠️ Cannot clear panels - solar panel handler not available")
+                    return
+                handler.request_clear()
+            
+            bindings = PANEL_KEY_BINDINGS.get(roof_type)
+            if bindings is None:
+                log.warning("⚠️ Unknown roof type: %s, using basic handlers", roof_type)
+                bindings = {}
+            # The roof bound its own panel keys in initialize_roof; a second
+            # callback would submit a second toggle that cancels the first
+            clear_key_events(plotter, list(bindings) + ['c', 'C', 'r', 'R', 'h', 'H',
+                                                        's', 'S', 'o', 'O'])
+            for key, side in bindings.items():
+                plotter.add_key_event(key, lambda side=side: request_panels(side))
+            plotter.add_key_event("c", request_clear)
+            plotter.add_key_event("C", request_clear)
+            
+            if bindings:
+                log.debug("✅ Added %s panel keys: %s", roof_type,
+                          ", ".join(f"{key} → {side.upper()}" for key, side in bindings.items()))
             
             # Common handlers for all roof types
             def safe_reset_camera():
@@ -560,28 +378,28 @@ class RoofGenerationManager(QObject):
                     elif plotter and hasattr(plotter, 'reset_camera'):
                         plotter.reset_camera()
                 except Exception as e:
-                    print(f"⚠️ Error resetting camera: {e}")
+                    log.warning("⚠️ Error resetting camera: %s", e)
                     
             def safe_toggle_help():
                 try:
                     if self.current_roof and hasattr(self.current_roof, 'toggle_help'):
                         self.current_roof.toggle_help()
                 except Exception as e:
-                    print(f"⚠️ Error toggling help: {e}")
+                    log.warning("⚠️ Error toggling help: %s", e)
                     
             def safe_save_screenshot():
                 try:
                     if self.current_roof and hasattr(self.current_roof, 'save_roof_screenshot'):
                         self.current_roof.save_roof_screenshot()
                 except Exception as e:
-                    print(f"⚠️ Error saving screenshot: {e}")
+                    log.warning("⚠️ Error saving screenshot: %s", e)
                     
             def safe_clear_obstacles():
                 try:
                     if self.current_roof and hasattr(self.current_roof, 'clear_obstacles'):
                         self.current_roof.clear_obstacles()
                 except Exception as e:
-                    print(f"⚠️ Error clearing obstacles: {e}")
+                    log.warning("⚠️ Error clearing obstacles: %s", e)
                     
             # Add common handlers
             plotter.add_key_event("r", safe_reset_camera)
@@ -593,45 +411,73 @@ class RoofGenerationManager(QObject):
             plotter.add_key_event("o", safe_clear_obstacles)
             plotter.add_key_event("O", safe_clear_obstacles)
             
-            print("✅ Added common safe key handlers")
+            log.debug("✅ Added common safe key handlers")
+            self._check_single_key_handlers(plotter, list(bindings) + ['c', 'C'])
                 
         except Exception as e:
-            print(f"⚠️ Error adding safe key handlers: {e}")
+            log.warning("⚠️ Error adding safe key handlers: %s", e)
             traceback.print_exc()
 
     
+    def _check_single_key_handlers(self, plotter, keys):
+        """Every panel key must run exactly one callback, or one press would
+        queue several placement commands for the same side"""
+        callbacks = key_press_callbacks(plotter)
+        duplicated = {key: len(callbacks.get(key, [])) for key in keys
+                      if len(callbacks.get(key, [])) != 1}
+        if duplicated:
+            log.error("❌ Panel keys without exactly one handler: %s", duplicated)
+        return not duplicated
+
+    @traced('roof.generate', 'roof')
     def generate_roof(self, roof_type, dimensions):
         """Generate roof with the given dimensions"""
         try:
-            print(f"🏗️ Generating {roof_type} roof with dimensions: {dimensions}")
+            log.info("🏗️ Generating %s roof with dimensions: %s", roof_type, dimensions)
             
             # Update status
             self.main_window.statusBar().showMessage(f"Generating {roof_type} roof model...", 3000)
             
-            # IMPORTANT: Clean up previous roof first
-            self._clean_previous_roof()
-            
-            # IMPORTANT: Reset model tab plotter if available
-            if hasattr(self.main_window, 'content_tabs') and hasattr(self.main_window.content_tabs, 'model_tab'):
-                model_tab = self.main_window.content_tabs.model_tab
-                if hasattr(model_tab, 'reset_plotter'):
-                    model_tab.reset_plotter()
-                    print("✅ Used model_tab.reset_plotter()")
-            
-            # Get plotter from the model tab
+            # Layered switch: keep ground, lights, sun and trees when the scene holds them
             plotter = self.get_plotter_from_model_tab()
+            scene_graph = SceneGraph.for_plotter(plotter) if (SceneGraph and plotter) else None
+            layered = (scene_graph is not None and self.current_roof is not None
+                       and scene_graph.can_retain_environment())
+            
+            if layered:
+                # Only the building, panel, obstacle and overlay layers are replaced
+                scene_graph.detach_roof(self.current_roof)
+                self._clean_previous_roof()
+                log.debug("✅ Replaced building layers, environment kept")
+            else:
+                # IMPORTANT: Clean up previous roof first
+                self._clean_previous_roof()
+                
+                # IMPORTANT: Reset model tab plotter if available
+                if hasattr(self.main_window, 'content_tabs') and hasattr(self.main_window.content_tabs, 'model_tab'):
+                    model_tab = self.main_window.content_tabs.model_tab
+                    if hasattr(model_tab, 'reset_plotter'):
+                        model_tab.reset_plotter()
+                        log.debug("✅ Used model_tab.reset_plotter()")
+                
+                # Get plotter from the model tab
+                plotter = self.get_plotter_from_model_tab()
             
             if not plotter:
-                print("❌ Could not get plotter from model tab")
+                log.error("❌ Could not get plotter from model tab")
                 self._show_error("Plotter Error", "Could not get 3D visualization plotter from model tab.\n\nMake sure the 3D Model tab is properly initialized.")
                 return False
             
-            # Thoroughly clear the plotter
-            self._thorough_plotter_clear(plotter)
+            if not layered:
+                # Thoroughly clear the plotter (full rebuild of every layer)
+                if SceneGraph:
+                    scene_graph = SceneGraph.for_plotter(plotter)
+                    scene_graph.reset()
+                self._thorough_plotter_clear(plotter)
             
             # IMPORTANT: Check if plotter has an interactor
             if not hasattr(plotter, 'iren') or not plotter.iren:
-                print("❌ Plotter does not have an interactor")
+                log.error("❌ Plotter does not have an interactor")
                 self._show_error("Plotter Error", "The 3D visualization plotter does not have an interactor.\n\nTry switching to the 3D Model tab first, then try again.")
                 return False
             
@@ -642,12 +488,13 @@ class RoofGenerationManager(QObject):
             original_actor_count = 0
             if hasattr(plotter, 'renderer') and hasattr(plotter.renderer, 'actors'):
                 original_actor_count = len(plotter.renderer.actors)
-                print(f"📊 Original actor count: {original_actor_count}")
+                log.debug("📊 Original actor count: %s", original_actor_count)
             
             # Create roof based on type
             if roof_type.lower() == 'gable':
-                if not GABLE_ROOF_AVAILABLE:
-                    print("❌ GableRoof class not available")
+                GableRoof = load_roof_class('gable')
+                if GableRoof is None:
+                    log.error("❌ GableRoof class not available")
                     self._show_error("Generation Error", "GableRoof class not available.")
                     return False
                 
@@ -662,11 +509,12 @@ class RoofGenerationManager(QObject):
                     dimensions=(length, width, height),
                     theme="light"
                 )
-                print("✅ Gable roof created successfully")
+                log.info("✅ Gable roof created successfully")
                 
             elif roof_type.lower() == 'flat':
-                if not FLAT_ROOF_AVAILABLE:
-                    print("❌ FlatRoof class not available")
+                FlatRoof = load_roof_class('flat')
+                if FlatRoof is None:
+                    log.error("❌ FlatRoof class not available")
                     self._show_error("Generation Error", "FlatRoof class not available.")
                     return False
                 
@@ -681,11 +529,12 @@ class RoofGenerationManager(QObject):
                     dimensions=(length, width, height),
                     theme="light"
                 )
-                print("✅ Flat roof created successfully")
+                log.info("✅ Flat roof created successfully")
                 
             elif roof_type.lower() == 'hip':
-                if not HIP_ROOF_AVAILABLE:
-                    print("❌ HipRoof class not available")
+                HipRoof = load_roof_class('hip')
+                if HipRoof is None:
+                    log.error("❌ HipRoof class not available")
                     self._show_error("Generation Error", "HipRoof class not available.")
                     return False
                 
@@ -700,11 +549,12 @@ class RoofGenerationManager(QObject):
                     dimensions=(length, width, height),
                     theme="light"
                 )
-                print("✅ Hip roof created successfully")
+                log.info("✅ Hip roof created successfully")
                 
             elif roof_type.lower() == 'pyramid':
-                if not PYRAMID_ROOF_AVAILABLE:
-                    print("❌ PyramidRoof class not available")
+                PyramidRoof = load_roof_class('pyramid')
+                if PyramidRoof is None:
+                    log.error("❌ PyramidRoof class not available")
                     self._show_error("Generation Error", "PyramidRoof class not available.")
                     return False
                 
@@ -719,10 +569,10 @@ class RoofGenerationManager(QObject):
                     dimensions=(length, width, height),
                     theme="light"
                 )
-                print("✅ Pyramid roof created successfully")
+                log.info("✅ Pyramid roof created successfully")
                 
             else:
-                print(f"❌ Unknown roof type: {roof_type}")
+                log.error("❌ Unknown roof type: %s", roof_type)
                 self._show_error("Generation Error", f"Unknown roof type: {roof_type}")
                 return False
             
@@ -730,17 +580,20 @@ class RoofGenerationManager(QObject):
             self._override_roof_key_bindings(plotter)
             
             # Track new actors added by the roof
-            if hasattr(plotter, 'renderer') and hasattr(plotter.renderer, 'actors'):
+            if scene_graph is not None:
+                self.roof_actors = scene_graph.register_roof(self.current_roof)
+                log.debug("📊 Tracking %s building actors", len(self.roof_actors))
+            elif hasattr(plotter, 'renderer') and hasattr(plotter.renderer, 'actors'):
                 current_actor_count = len(plotter.renderer.actors)
                 new_actor_count = current_actor_count - original_actor_count
-                print(f"📊 Current actor count: {current_actor_count}, New actors: {new_actor_count}")
+                log.debug("📊 Current actor count: %s, New actors: %s", current_actor_count, new_actor_count)
                 
                 # Get the new actors
                 if new_actor_count > 0:
                     all_actors = list(plotter.renderer.actors.keys())
                     new_actors = all_actors[-new_actor_count:]
                     self.roof_actors = new_actors
-                    print(f"📊 Tracking {len(new_actors)} new actors")
+                    log.debug("📊 Tracking %s new actors", len(new_actors))
             
             # Emit signal that roof was generated
             self.roof_generated.emit(self.current_roof)
@@ -760,7 +613,7 @@ class RoofGenerationManager(QObject):
             return True
             
         except Exception as e:
-            print(f"❌ Error generating roof: {e}")
+            log.error("❌ Error generating roof: %s", e)
             traceback.print_exc()
             self._show_error("Generation Error", f"Failed to generate roof: {str(e)}")
             return False
@@ -774,7 +627,7 @@ class RoofGenerationManager(QObject):
                 if hasattr(self.main_window.content_tabs, 'get_model_plotter'):
                     plotter = self.main_window.content_tabs.get_model_plotter()
                     if plotter:
-                        print("✅ Got plotter from content_tabs.get_model_plotter()")
+                        log.debug("✅ Got plotter from content_tabs.get_model_plotter()")
                         return plotter
                 
                 # Method 2: Check if model tab has a plotter attribute
@@ -787,7 +640,7 @@ class RoofGenerationManager(QObject):
                             if hasattr(model_tab, attr_name):
                                 plotter = getattr(model_tab, attr_name)
                                 if plotter:
-                                    print(f"✅ Got plotter from model_tab.{attr_name}")
+                                    log.debug("✅ Got plotter from model_tab.%s", attr_name)
                                     return plotter
             
             # Method 3: If we have pyvista_integration, try to get plotter from there
@@ -795,22 +648,22 @@ class RoofGenerationManager(QObject):
                 if hasattr(self.main_window.pyvista_integration, 'get_plotter'):
                     plotter = self.main_window.pyvista_integration.get_plotter()
                     if plotter:
-                        print("✅ Got plotter from pyvista_integration.get_plotter()")
+                        log.debug("✅ Got plotter from pyvista_integration.get_plotter()")
                         return plotter
                 
                 # Try to get the plotter directly from the integration
                 if hasattr(self.main_window.pyvista_integration, 'plotter'):
                     plotter = self.main_window.pyvista_integration.plotter
                     if plotter:
-                        print("✅ Got plotter directly from pyvista_integration")
+                        log.debug("✅ Got plotter directly from pyvista_integration")
                         return plotter
             
             # IMPORTANT: Do NOT create a new plotter - it won't have the interactor set up properly
-            print("❌ Could not find an existing plotter - will NOT create a new one")
+            log.error("❌ Could not find an existing plotter - will NOT create a new one")
             return None
             
         except Exception as e:
-            print(f"❌ Error getting plotter from model tab: {e}")
+            log.error("❌ Error getting plotter from model tab: %s", e)
             return None
     
     def find_model_tab_index(self):
@@ -833,18 +686,18 @@ class RoofGenerationManager(QObject):
             return self.main_window.content_tabs.count() - 1
             
         except Exception as e:
-            print(f"❌ Error finding model tab index: {e}")
+            log.error("❌ Error finding model tab index: %s", e)
             return None
     
     def _thorough_plotter_clear(self, plotter):
         """Thoroughly clear the plotter and reset all state - ENHANCED VERSION"""
         try:
-            print("🧹 Performing thorough plotter clearing...")
+            log.debug("🧹 Performing thorough plotter clearing...")
             
             # STEP 1: Clear all actors
             if hasattr(plotter, 'clear'):
                 plotter.clear()
-                print("✅ Plotter.clear() called")
+                log.debug("✅ Plotter.clear() called")
             
             # STEP 2: Remove all actors manually
             if hasattr(plotter, 'renderer') and hasattr(plotter.renderer, 'actors'):
@@ -853,37 +706,30 @@ class RoofGenerationManager(QObject):
                     try:
                         plotter.remove_actor(actor)
                     except Exception as e:
-                        print(f"⚠️ Could not remove actor {actor}: {e}")
-                print(f"✅ Removed {len(actors)} actors manually")
+                        log.warning("⚠️ Could not remove actor %s: %s", actor, e)
+                log.debug("✅ Removed %s actors manually", len(actors))
             
             # STEP 3: Reset camera and view
             if hasattr(plotter, 'reset_camera'):
                 plotter.reset_camera()
-                print("✅ Reset camera")
+                log.debug("✅ Reset camera")
             
             # STEP 4: Disable picking
             if hasattr(plotter, 'disable_picking'):
                 try:
                     plotter.disable_picking()
-                    print("✅ Disabled picking")
+                    log.debug("✅ Disabled picking")
                 except:
                     pass
             
             # STEP 5: Remove all key bindings
-            if hasattr(plotter, '_key_press_event_callbacks'):
-                keys = list(plotter._key_press_event_callbacks.keys())
-                for key in keys:
-                    try:
-                        plotter.remove_key_event(key)
-                    except:
-                        pass
-                print(f"✅ Removed {len(keys)} key bindings")
+            log.debug("✅ Removed %s key bindings", clear_key_events(plotter))
             
             # STEP 6: Restore axes
             if hasattr(plotter, 'add_axes'):
                 try:
                     plotter.add_axes()
-                    print("✅ Restored axes")
+                    log.debug("✅ Restored axes")
                 except:
                     pass
             
@@ -894,11 +740,11 @@ class RoofGenerationManager(QObject):
             if hasattr(plotter, 'render'):
                 plotter.render()
             
-            print("✅ Plotter thoroughly cleared")
+            log.debug("✅ Plotter thoroughly cleared")
             return plotter
             
         except Exception as e:
-            print(f"❌ Error in thorough plotter clear: {e}")
+            log.error("❌ Error in thorough plotter clear: %s", e)
             traceback.print_exc()
             return plotter
     
@@ -927,7 +773,7 @@ class RoofGenerationManager(QObject):
             return False
             
         except Exception as e:
-            print(f"❌ Error clearing plotter: {e}")
+            log.error("❌ Error clearing plotter: %s", e)
             return False
     
     def _show_error(self, title, message):
@@ -935,4 +781,4 @@ class RoofGenerationManager(QObject):
         try:
             QMessageBox.warning(self.main_window, title, message)
         except Exception as e:
-            print(f"❌ Could not show error dialog: {e}")
\ No newline at end of file
+            log.error("❌ Could not show error dialog: %s", e)
\ No newline at end of file
@@ -16,6 +16,10 @@ from pathlib import Path
 current_dir = Path(__file__).parent
 sys.path.insert(0, str(current_dir))
 
+# Startup timeline must be enabled before the heavy imports it measures
+from utils.startup_timeline import timeline as startup_timeline
+startup_timeline.enable_from_argv()
+
 def setup_environment():
     """Setup environment variables and Qt configuration"""
     # Qt WebEngine settings (for Google Maps)
@@ -43,39 +47,36 @@ def setup_qt_message_handler():
     qInstallMessageHandler(silent_message_handler)
 
 def check_dependencies():
-    """Check for required and optional dependencies"""
+    """Check for required and optional dependencies.
+
+    Only locates the modules (find_spec) - VTK, PyVista and QtWebEngine are
+    imported when first used, not at startup.
+    """
+    from utils.lazy_imports import module_available
+
     required_deps = {
         'PyQt5': 'PyQt5',
-        'PyQt5.QtWebEngineWidgets': 'PyQt5.QtWebEngineWidgets'
     }
     
     optional_deps = {
+        'PyQt5.QtWebEngineWidgets': 'Qt WebEngine (for maps)',
         'vtk': 'VTK (for 3D visualization)',
         'numpy': 'NumPy (for calculations)',
         'models.solar_simulation': 'Solar Simulation (for solar analysis)'
     }
     
     # Check required dependencies
-    missing_required = []
-    for dep_name, dep_desc in required_deps.items():
-        try:
-            __import__(dep_name)
-        except ImportError:
-            missing_required.append(dep_desc)
+    missing_required = [dep_desc for dep_name, dep_desc in required_deps.items()
+                        if not module_available(dep_name)]
     
     if missing_required:
         print(f"Missing required dependencies: {', '.join(missing_required)}")
-        print("Please install with: pip install PyQt5 PyQtWebEngine")
+        print("Please install with: pip install PyQt5")
         return False
     
     # Check optional dependencies
-    available_optional = []
-    for dep_name, dep_desc in optional_deps.items():
-        try:
-            __import__(dep_name)
-            available_optional.append(dep_name)
-        except ImportError:
-            pass
+    available_optional = [dep_name for dep_name in optional_deps
+                          if module_available(dep_name)]
     
     return True
 
@@ -174,24 +175,28 @@ def main():
         setup_exception_handler()
         
         # Check dependencies
-        if not check_dependencies():
-            return 1
+        with startup_timeline.phase('check_dependencies'):
+            if not check_dependencies():
+                return 1
         
         # Setup Qt message handler (after PyQt5 is confirmed to be available)
         setup_qt_message_handler()
         
         # Create Qt application
-        app = create_application()
+        with startup_timeline.phase('create_application'):
+            app = create_application()
         if not app:
             return 1
         
         # Create main window
-        window = create_main_window()
+        with startup_timeline.phase('create_main_window'):
+            window = create_main_window()
         if not window:
             return 1
         
         # Show window
-        window.show()
+        with startup_timeline.phase('show_window'):
+            window.show()
         
         # Center on screen if possible
         try:
@@ -204,6 +209,11 @@ def main():
         except Exception:
             pass
         
+        # Time-to-interactive: the first event loop turn after the window is shown
+        if startup_timeline.enabled:
+            from PyQt5.QtCore import QTimer
+            QTimer.singleShot(0, startup_timeline.mark_interactive)
+        
         # Start event loop
         exit_code = app.exec_()
         
@@ -264,9 +274,11 @@ if __name__ == "__main__":
         elif sys.argv[1] == "--help":
             print("PVmizer GEO")
             print("Usage:")
-            print("  python main.py        - Start the application")
-            print("  python main.py --test - Run basic tests")
-            print("  python main.py --help - Show this help")
+            print("  python main.py                  - Start the application")
+            print("  python main.py --startup-report - Start and print the startup timeline")
+            print("                                    (--startup-report=FILE.json also saves it)")
+            print("  python main.py --test           - Run basic tests")
+            print("  python main.py --help           - Show this help")
             sys.exit(0)
     
     # Run the application
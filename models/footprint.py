@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+models/footprint.py
+Footprint clean-up and triangulation for traced building outlines
+
+Outlines from the drawing canvas and the traced map snip carry duplicate
+clicks, runs of nearly collinear points and the odd crossing. They are
+prepared in three steps:
+
+    simplify    vertices closer than `tolerance` to the chord of their
+                neighbours are removed (duplicates and collinear points go too)
+    repair      self-intersections are cut away, keeping the larger loop
+    orient      every footprint is returned counter-clockwise
+
+Simplification and ear-clipping triangulation work on many outlines at
+once: all vertices live in flat arrays with per-vertex previous/next links,
+and every pass removes an independent set of vertices (no two within two
+links of each other) across all outlines with array operations.
+"""
+import numpy as np
+
+DEFAULT_TOLERANCE = 0.05     # metres
+_EPS = 1e-12
+
+
+# ==================== LINKED VERTEX ARRAYS ====================
+
+def _pack(polygons):
+    """Flat points, group ids, offsets and prev/next links of closed polygons"""
+    sizes = np.array([len(p) for p in polygons], dtype=int)
+    offsets = np.concatenate([[0], np.cumsum(sizes)])
+    points = np.concatenate([np.asarray(p, dtype=float)[:, :2] for p in polygons]) if len(polygons) else np.zeros((0, 2))
+    group = np.repeat(np.arange(len(polygons)), sizes)
+    index = np.arange(len(points))
+    nxt = index + 1
+    last = offsets[1:] - 1
+    nxt[last[sizes > 0]] = offsets[:-1][sizes > 0]
+    prv = index - 1
+    prv[offsets[:-1][sizes > 0]] = last[sizes > 0]
+    return points, group, offsets, prv, nxt
+
+
+def _unpack(points, group, offsets, alive, nxt, count):
+    """Surviving vertices of every polygon in link order"""
+    result = []
+    for g in range(count):
+        members = np.nonzero(alive[offsets[g]:offsets[g + 1]])[0] + offsets[g]
+        if len(members) == 0:
+            result.append(np.zeros((0, 2)))
+            continue
+        order = [members[0]]
+        for _ in range(len(members) - 1):
+            order.append(nxt[order[-1]])
+        result.append(points[order])
+    return result
+
+
+def _cross(a, b, c):
+    """z of (b - a) x (c - b) for rows of points"""
+    return (b[:, 0] - a[:, 0]) * (c[:, 1] - b[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - b[:, 0])
+
+
+def _independent(candidates, score, prv, nxt):
+    """Candidates with the lowest score within two links (ties by index)"""
+    key = np.full(len(prv), np.inf)
+    key[candidates] = score
+    keep = np.ones(len(candidates), dtype=bool)
+    for neighbour in (prv[candidates], prv[prv[candidates]], nxt[candidates], nxt[nxt[candidates]]):
+        other = key[neighbour]
+        keep &= (other > score) | ((other == score) & (neighbour > candidates)) | (neighbour == candidates)
+    return candidates[keep]
+
+
+def _unlink(removed, prv, nxt, alive):
+    # Removed vertices are never neighbours, so both links update at once
+    nxt[prv[removed]] = nxt[removed]
+    prv[nxt[removed]] = prv[removed]
+    alive[removed] = False
+
+
+# ==================== CLEAN-UP ====================
+
+def simplify_outlines(outlines, tolerance=DEFAULT_TOLERANCE):
+    """Drop duplicate, collinear and near-collinear vertices of many outlines.
+
+    A vertex goes when it is within `tolerance` of the chord between its
+    neighbours; the closest ones go first. Outlines keep at least 3 vertices.
+    A repeated closing vertex is removed as a duplicate.
+    """
+    points, group, offsets, prv, nxt = _pack(list(outlines))
+    alive = np.ones(len(points), dtype=bool)
+    remaining = np.diff(offsets).copy()
+
+    while True:
+        ids = np.nonzero(alive & (remaining[group] > 3))[0]
+        if len(ids) == 0:
+            break
+        a, b, c = points[prv[ids]], points[ids], points[nxt[ids]]
+        chord = np.linalg.norm(c - a, axis=1)
+        area2 = np.abs(_cross(a, b, c))
+        # Distance to the chord; with coincident neighbours, distance to them
+        deviation = np.where(chord > _EPS, area2 / np.maximum(chord, _EPS), np.linalg.norm(b - a, axis=1))
+        candidates = ids[deviation <= tolerance]
+        if len(candidates) == 0:
+            break
+        removed = _independent(candidates, deviation[deviation <= tolerance], prv, nxt)
+        # Never take an outline below a triangle
+        removed = removed[np.argsort(group[removed], kind='stable')]
+        rank = np.arange(len(removed)) - np.searchsorted(group[removed], group[removed])
+        removed = removed[rank < remaining[group[removed]] - 3]
+        if len(removed) == 0:
+            break
+        _unlink(removed, prv, nxt, alive)
+        np.subtract.at(remaining, group[removed], 1)
+
+    return _unpack(points, group, offsets, alive, nxt, len(offsets) - 1)
+
+
+def signed_areas(polygons):
+    """Signed areas of many polygons (positive = counter-clockwise)"""
+    points, group, offsets, _, nxt = _pack(list(polygons))
+    if len(points) == 0:
+        return np.zeros(len(offsets) - 1)
+    terms = points[:, 0] * points[nxt, 1] - points[nxt, 0] * points[:, 1]
+    return 0.5 * np.bincount(group, weights=terms, minlength=len(offsets) - 1)
+
+
+def _first_crossing(polygon):
+    """(i, j, point) of the first pair of crossing non-adjacent edges, or None"""
+    a = polygon
+    b = np.roll(polygon, -1, axis=0)
+    d = b - a
+    n = len(polygon)
+    # Solve a_i + s d_i = a_j + t d_j for all edge pairs
+    denom = d[:, None, 0] * d[None, :, 1] - d[:, None, 1] * d[None, :, 0]
+    diff = a[None, :, :] - a[:, None, :]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s = (diff[..., 0] * d[None, :, 1] - diff[..., 1] * d[None, :, 0]) / denom
+        t = (diff[..., 0] * d[:, None, 1] - diff[..., 1] * d[:, None, 0]) / denom
+    i, j = np.indices((n, n))
+    gap = (j - i) % n
+    crossing = ((np.abs(denom) > _EPS) & (s > _EPS) & (s < 1 - _EPS) & (t > _EPS) & (t < 1 - _EPS)
+                & (gap > 1) & (gap < n - 1) & (i < j))
+    hits = np.argwhere(crossing)
+    if len(hits) == 0:
+        return None
+    i, j = hits[0]
+    return int(i), int(j), a[i] + s[i, j] * d[i]
+
+
+def repair_self_intersections(polygon, max_repairs=64):
+    """Cut a crossing outline at its crossings, keeping the larger loop each time"""
+    polygon = np.asarray(polygon, dtype=float)[:, :2]
+    for _ in range(max_repairs):
+        if len(polygon) < 4:
+            break
+        crossing = _first_crossing(polygon)
+        if crossing is None:
+            break
+        i, j, point = crossing
+        inner = np.vstack([[point], polygon[i + 1:j + 1]])
+        outer = np.vstack([[point], polygon[j + 1:], polygon[:i + 1]])
+        areas = signed_areas([inner, outer])
+        polygon = inner if abs(areas[0]) >= abs(areas[1]) else outer
+    return polygon
+
+
+def prepare_footprints(outlines, tolerance=DEFAULT_TOLERANCE):
+    """Simplified, crossing-free, counter-clockwise footprints of many outlines.
+
+    Outlines that shrink below a triangle or to zero area come back as None.
+    """
+    simplified = simplify_outlines(outlines, tolerance)
+    repaired = [repair_self_intersections(p) if len(p) >= 4 else p for p in simplified]
+    # Cutting loops can leave new collinear points behind
+    repaired = simplify_outlines(repaired, tolerance)
+    areas = signed_areas(repaired)
+    result = []
+    for polygon, area in zip(repaired, areas):
+        if len(polygon) < 3 or abs(area) <= tolerance * tolerance:
+            result.append(None)
+        else:
+            result.append(polygon if area > 0 else polygon[::-1].copy())
+    return result
+
+
+def prepare_footprint(outline, tolerance=DEFAULT_TOLERANCE):
+    """Single-outline prepare_footprints (None when nothing usable is left)"""
+    return prepare_footprints([outline], tolerance)[0]
+
+
+# ==================== TRIANGULATION ====================
+
+def _ear_blocked(candidates, reflex, group, points, prv, nxt):
+    """For each candidate ear, whether a reflex vertex of its polygon lies in it"""
+    blocked = np.zeros(len(candidates), dtype=bool)
+    if len(reflex) == 0 or len(candidates) == 0:
+        return blocked
+    # Reflex vertices are sorted by group: each candidate tests a contiguous range
+    reflex = reflex[np.argsort(group[reflex], kind='stable')]
+    lo = np.searchsorted(group[reflex], group[candidates], side='left')
+    hi = np.searchsorted(group[reflex], group[candidates], side='right')
+    counts = hi - lo
+    if counts.sum() == 0:
+        return blocked
+    owner = np.repeat(np.arange(len(candidates)), counts)
+    tested = reflex[np.repeat(lo - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())]
+
+    ear = candidates[owner]
+    a, b, c = points[prv[ear]], points[ear], points[nxt[ear]]
+    p = points[tested]
+    inside = (_cross(a, b, p) >= -_EPS) & (_cross(b, c, p) >= -_EPS) & (_cross(c, a, p) >= -_EPS)
+    # The ear's own corners (and vertices on top of them) do not block it
+    corner = (tested == prv[ear]) | (tested == nxt[ear])
+    corner |= np.all(p == a, axis=1) | np.all(p == c, axis=1)
+    np.logical_or.at(blocked, owner, inside & ~corner)
+    return blocked
+
+
+def triangulate_polygons(polygons):
+    """Ear-clipping triangulation of many simple counter-clockwise polygons.
+
+    Returns one (k, 3) array of vertex indices per polygon (k = n - 2).
+    """
+    polygons = list(polygons)
+    points, group, offsets, prv, nxt = _pack(polygons)
+    alive = np.ones(len(points), dtype=bool)
+    remaining = np.diff(offsets).copy()
+    triangles = []
+
+    while True:
+        ids = np.nonzero(alive & (remaining[group] > 3))[0]
+        if len(ids) == 0:
+            break
+        turn = _cross(points[prv[ids]], points[ids], points[nxt[ids]])
+        convex = ids[turn > _EPS]
+        blocked = _ear_blocked(convex, ids[turn <= _EPS], group, points, prv, nxt)
+        ears = convex[~blocked]
+        # Sharper ears first keeps slivers out of the triangulation
+        score = -_corner_cosine(points, prv, nxt, ears)
+        clipped = _independent(ears, score, prv, nxt)
+
+        stuck = np.setdiff1d(np.unique(group[ids]), group[clipped])
+        if len(stuck):
+            # Degenerate leftovers (numerically flat corners): clip the most convex vertex
+            order = np.lexsort((-turn, group[ids]))
+            first = order[np.searchsorted(group[ids][order], stuck)]
+            clipped = np.concatenate([clipped, ids[first]])
+
+        triangles.append(np.column_stack([prv[clipped], clipped, nxt[clipped]]))
+        _unlink(clipped, prv, nxt, alive)
+        np.subtract.at(remaining, group[clipped], 1)
+
+    last = np.nonzero(alive & (remaining[group] == 3))[0]
+    last = last[np.unique(group[last], return_index=True)[1]]
+    triangles.append(np.column_stack([prv[last], last, nxt[last]]))
+
+    triangles = np.concatenate(triangles) if triangles else np.zeros((0, 3), dtype=int)
+    owner = group[triangles[:, 1]]
+    order = np.argsort(owner, kind='stable')
+    triangles, owner = triangles[order], owner[order]
+    bounds = np.searchsorted(owner, np.arange(len(polygons) + 1))
+    return [triangles[bounds[g]:bounds[g + 1]] - offsets[g] for g in range(len(polygons))]
+
+
+def _corner_cosine(points, prv, nxt, ids):
+    u = points[prv[ids]] - points[ids]
+    v = points[nxt[ids]] - points[ids]
+    norms = np.linalg.norm(u, axis=1) * np.linalg.norm(v, axis=1)
+    return np.einsum('ij,ij->i', u, v) / np.maximum(norms, _EPS)
+
+
+def triangulate(polygon):
+    """Triangles (k, 3) of one simple counter-clockwise polygon"""
+    return triangulate_polygons([polygon])[0]
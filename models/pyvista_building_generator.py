@@ -7,6 +7,11 @@ import pyvista as pv
 from PyQt5.QtCore import QObject, pyqtSignal, QTimer
 import math
 import traceback
+from utils.log import get_logger
+from models.footprint import DEFAULT_TOLERANCE, prepare_footprint, signed_areas, triangulate_polygons
+from models.straight_skeleton import SkeletonError, roof_geometry, roof_surfaces
+
+log = get_logger('buildings')
 
 class PyVistaBuildingGenerator(QObject):
     """Complete PyVista building generator with solar simulation - FIXED VERSION"""
@@ -34,6 +39,21 @@ class PyVistaBuildingGenerator(QObject):
         self.current_roof_type = 'flat'
         self.current_roof_pitch = 30.0
         self.current_points = []
+        self.current_roof_faces = []
+        
+        # Traced outlines are simplified to this tolerance (metres) before meshing
+        self.footprint_tolerance = DEFAULT_TOLERANCE
+        
+        # How mesh point heights follow height/pitch (see _update_mesh_in_place)
+        self._mesh_layout = None
+        self.building_actor = None
+        
+        # Slider updates are coalesced and applied at most every update_interval_ms
+        self.update_interval_ms = 40
+        self._pending_update = {}
+        self.update_timer = QTimer()
+        self.update_timer.setSingleShot(True)
+        self.update_timer.timeout.connect(self._apply_pending_update)
         
         # Animation timer
         self.animation_timer = QTimer()
@@ -47,30 +67,30 @@ class PyVistaBuildingGenerator(QObject):
         self.reflections_enabled = True
         self.volumetric_lighting = True
         
-        print("✅ PyVista Building Generator initialized - FIXED VERSION")
+        log.debug("✅ PyVista Building Generator initialized - FIXED VERSION")
         
     def set_plotter(self, plotter):
         """Set the PyVista plotter reference - FIXED WITH RENDERING"""
         self.plotter = plotter
         if self.plotter:
             self._setup_scene_comprehensive()
-            print("✅ Plotter connected to building generator")
+            log.debug("✅ Plotter connected to building generator")
         
     def _setup_scene_comprehensive(self):
         """Setup initial 3D scene - FIXED FOR RELIABILITY"""
         try:
             if not self.plotter:
-                print("❌ No plotter available for scene setup")
+                log.error("❌ No plotter available for scene setup")
                 return
                 
-            print("🔧 Setting up 3D scene...")
+            log.debug("🔧 Setting up 3D scene...")
             
             # FIXED: Simplified background setting
             try:
                 self.plotter.set_background('lightblue')
-                print("✅ Background set")
+                log.debug("✅ Background set")
             except Exception as e:
-                print(f"⚠️ Background warning: {e}")
+                log.warning("⚠️ Background warning: %s", e)
             
             # FIXED: Simplified ground plane
             try:
@@ -91,16 +111,16 @@ class PyVistaBuildingGenerator(QObject):
                     show_edges=True,
                     edge_color='darkgreen'
                 )
-                print("✅ Ground plane added")
+                log.debug("✅ Ground plane added")
             except Exception as e:
-                print(f"⚠️ Ground plane warning: {e}")
+                log.warning("⚠️ Ground plane warning: %s", e)
             
             # FIXED: Simplified axes
             try:
                 self.plotter.add_axes(interactive=True)
-                print("✅ Axes added")
+                log.debug("✅ Axes added")
             except Exception as e:
-                print(f"⚠️ Axes warning: {e}")
+                log.warning("⚠️ Axes warning: %s", e)
             
             # FIXED: Reliable camera positioning
             try:
@@ -109,17 +129,17 @@ class PyVistaBuildingGenerator(QObject):
                     (0, 0, 0),     # Look at point
                     (0, 0, 1)      # Up vector
                 ]
-                print("✅ Camera positioned")
+                log.debug("✅ Camera positioned")
             except Exception as e:
-                print(f"⚠️ Camera warning: {e}")
+                log.warning("⚠️ Camera warning: %s", e)
             
             # FIXED: Single render call
             self._force_render_multiple()
             
-            print("✅ Scene setup complete")
+            log.debug("✅ Scene setup complete")
             
         except Exception as e:
-            print(f"❌ Error setting up scene: {e}")
+            log.error("❌ Error setting up scene: %s", e)
             traceback.print_exc()
     
     def _force_render_multiple(self):
@@ -128,30 +148,30 @@ class PyVistaBuildingGenerator(QObject):
             if not self.plotter:
                 return
                 
-            print("🔄 Rendering...")
+            log.debug("🔄 Rendering...")
             
             # FIXED: Single, reliable render call
             if hasattr(self.plotter, 'render'):
                 self.plotter.render()
-                print("✅ Render complete")
+                log.debug("✅ Render complete")
             else:
-                print("⚠️ No render method available")
+                log.warning("⚠️ No render method available")
                 
         except Exception as e:
-            print(f"⚠️ Render warning: {e}")
+            log.warning("⚠️ Render warning: %s", e)
     
     def create_building_from_canvas(self, points, height=3.0, roof_type='flat', roof_pitch=30.0):
         """Create 3D building from canvas points - FIXED VERSION"""
         try:
-            print(f"🏗️ Creating building from {len(points)} canvas points")
-            print(f"Parameters: height={height}m, roof={roof_type}, pitch={roof_pitch}°")
+            log.info("🏗️ Creating building from %s canvas points", len(points))
+            log.debug("Parameters: height=%sm, roof=%s, pitch=%s°", height, roof_type, roof_pitch)
             
             if not points or len(points) < 3:
-                print("❌ Need at least 3 points to create building")
+                log.error("❌ Need at least 3 points to create building")
                 return False
                 
             if not self.plotter:
-                print("❌ Plotter not set")
+                log.error("❌ Plotter not set")
                 return False
                 
             # Store current parameters
@@ -167,19 +187,19 @@ class PyVistaBuildingGenerator(QObject):
             vertices_3d = self._canvas_points_to_3d(points)
             
             if not vertices_3d:
-                print("❌ Failed to convert points to 3D")
+                log.error("❌ Failed to convert points to 3D")
                 return False
             
             # Create building mesh
             building_mesh = self._create_building_mesh(vertices_3d, height, roof_type, roof_pitch)
             
             if not building_mesh:
-                print("❌ Failed to create building mesh")
+                log.error("❌ Failed to create building mesh")
                 return False
             
             # FIXED: Add building with reliable settings
             try:
-                self.plotter.add_mesh(
+                self.building_actor = self.plotter.add_mesh(
                     building_mesh, 
                     name='building',
                     color='lightcoral',
@@ -188,13 +208,16 @@ class PyVistaBuildingGenerator(QObject):
                     line_width=2,
                     opacity=0.9
                 )
-                print("✅ Building mesh added to plotter")
+                log.debug("✅ Building mesh added to plotter")
             except Exception as e:
-                print(f"❌ Error adding building mesh: {e}")
+                log.error("❌ Error adding building mesh: %s", e)
                 return False
             
-            # Store building reference
-            self.current_building = building_mesh
+            # Store building reference (the dataset the actor renders, so
+            # in-place height/pitch updates reach the screen)
+            mapper = getattr(self.building_actor, 'mapper', None)
+            rendered = getattr(mapper, 'dataset', None)
+            self.current_building = rendered if rendered is not None else building_mesh
             
             # FIXED: Reset camera for building
             self._reset_camera_for_building_fixed(building_mesh)
@@ -212,11 +235,11 @@ class PyVistaBuildingGenerator(QObject):
             # Emit signal
             self.building_generated.emit()
             
-            print("✅ 3D Building created successfully!")
+            log.info("✅ 3D Building created successfully!")
             return True
                 
         except Exception as e:
-            print(f"❌ Error creating building: {e}")
+            log.error("❌ Error creating building: %s", e)
             traceback.print_exc()
             return False
     
@@ -238,25 +261,31 @@ class PyVistaBuildingGenerator(QObject):
             scale = 0.1  # Increased from 0.05 to 0.1 for better visibility
             scaled_points = centered_points * scale
             
+            # Drop duplicate and near-collinear clicks, cut self-intersections, make CCW
+            footprint = prepare_footprint(scaled_points, self.footprint_tolerance)
+            if footprint is None:
+                log.error("❌ Footprint has no area left after simplification")
+                return None
+            
             # Create base vertices (ground level z=0)
             base_vertices = []
-            for point in scaled_points:
+            for point in footprint:
                 base_vertices.append([point[0], point[1], 0.0])
             
-            print(f"📐 Converted {len(canvas_points)} canvas points to {len(base_vertices)} 3D vertices")
-            print(f"📐 Scale factor: {scale}")
+            log.debug("📐 Converted %s canvas points to %s 3D vertices", len(canvas_points), len(base_vertices))
+            log.debug("📐 Scale factor: %s", scale)
             
             # Debug: Print coordinate ranges
             if base_vertices:
                 x_coords = [v[0] for v in base_vertices]
                 y_coords = [v[1] for v in base_vertices]
-                print(f"📍 X range: {min(x_coords):.3f} to {max(x_coords):.3f}")
-                print(f"📍 Y range: {min(y_coords):.3f} to {max(y_coords):.3f}")
+                log.debug("📍 X range: %.3f to %.3f", min(x_coords), max(x_coords))
+                log.debug("📍 Y range: %.3f to %.3f", min(y_coords), max(y_coords))
                 
             return base_vertices
             
         except Exception as e:
-            print(f"❌ Error converting canvas points: {e}")
+            log.error("❌ Error converting canvas points: %s", e)
             return None
     
     def _create_building_mesh(self, vertices_3d, height, roof_type, roof_pitch):
@@ -265,7 +294,7 @@ class PyVistaBuildingGenerator(QObject):
             base_verts = vertices_3d
             n_points = len(base_verts)
             
-            print(f"🏗️ Creating mesh: {n_points} base points, height={height}")
+            log.debug("🏗️ Creating mesh: %s base points, height=%s", n_points, height)
             
             # Create wall top vertices
             wall_top_verts = []
@@ -278,33 +307,36 @@ class PyVistaBuildingGenerator(QObject):
             # Create faces list
             faces = []
             
-            # Ground face (bottom) - reverse order for correct normal
-            ground_face = [n_points] + list(reversed(range(n_points)))
-            faces.append(ground_face)
+            # Ground and flat roof as triangles of the (CCW) footprint, so
+            # concave outlines render and shade correctly
+            footprint_triangles = triangulate_polygons([[v[:2] for v in base_verts]])[0]
+            
+            # Ground faces (bottom) - reverse order for correct normal
+            for a, b, c in footprint_triangles.tolist():
+                faces.append([3, c, b, a])
+            n_ground = len(faces)
+            self.current_roof_faces = []
+            self._roof_cell_faces = []
+            self._roof_offsets = []
+            self._roof_kind = None
             
             # Create roof vertices and faces
-            if roof_type.lower() == 'flat':
-                # Flat roof - just the top face
-                roof_face = [n_points] + list(range(n_points, 2 * n_points))
-                faces.append(roof_face)
-                
-            elif roof_type.lower() == 'gabled':
+            roof_faces = []
+            if roof_type.lower() == 'gabled':
                 # Gabled roof
                 roof_vertices, roof_faces = self._create_gabled_roof(base_verts, height, roof_pitch)
-                if roof_vertices:
-                    all_vertices.extend(roof_vertices)
-                    faces.extend(roof_faces)
+                all_vertices.extend(roof_vertices)
                     
             elif roof_type.lower() == 'hipped':
                 # Hipped roof
                 roof_vertices, roof_faces = self._create_hipped_roof(base_verts, height, roof_pitch)
-                if roof_vertices:
-                    all_vertices.extend(roof_vertices)
-                    faces.extend(roof_faces)
-            else:
-                # Default to flat roof
-                roof_face = [n_points] + list(range(n_points, 2 * n_points))
-                faces.append(roof_face)
+                all_vertices.extend(roof_vertices)
+            
+            if not roof_faces:
+                # Flat roof (also the default) - just the top face
+                roof_faces = [[3, a + n_points, b + n_points, c + n_points]
+                              for a, b, c in footprint_triangles.tolist()]
+            faces.extend(roof_faces)
             
             # Wall faces
             for i in range(n_points):
@@ -325,19 +357,35 @@ class PyVistaBuildingGenerator(QObject):
             # Create mesh
             mesh = pv.PolyData(vertices_array, faces_array)
             
+            # Points above the ground sit at height + offset * tan(pitch) (wall tops: offset 0)
+            self._mesh_layout = {
+                'n_base': n_points,
+                'n_points': len(vertices_array),
+                'offsets': np.concatenate([np.zeros(n_points), np.asarray(self._roof_offsets, dtype=float)]),
+                'footprint': [v[:2] for v in base_verts],
+                'kind': self._roof_kind,
+                'pitch': roof_pitch,
+            }
+            
+            # Roof face index per cell (-1 for ground and walls), matches current_roof_faces
+            roof_face_ids = np.full(len(faces), -1, dtype=int)
+            if self.current_roof_faces:
+                roof_face_ids[n_ground:n_ground + len(roof_faces)] = self._roof_cell_faces
+            mesh.cell_data['roof_face'] = roof_face_ids
+            
             # FIXED: Compute normals for better rendering
             try:
                 mesh = mesh.compute_normals()
             except Exception as e:
-                print(f"⚠️ Could not compute normals: {e}")
+                log.warning("⚠️ Could not compute normals: %s", e)
             
-            print(f"✅ Created building mesh: {len(vertices_array)} vertices, {len(faces)} faces")
-            print(f"📐 Mesh bounds: {mesh.bounds}")
+            log.debug("✅ Created building mesh: %s vertices, %s faces", len(vertices_array), len(faces))
+            log.debug("📐 Mesh bounds: %s", mesh.bounds)
             
             return mesh
             
         except Exception as e:
-            print(f"❌ Error creating building mesh: {e}")
+            log.error("❌ Error creating building mesh: %s", e)
             traceback.print_exc()
             return None
     
@@ -347,14 +395,14 @@ class PyVistaBuildingGenerator(QObject):
             if not building_mesh or not self.plotter:
                 return
                 
-            print("📹 Resetting camera for building...")
+            log.debug("📹 Resetting camera for building...")
             
             # Get building bounds and center
             bounds = building_mesh.bounds
             center = building_mesh.center
             
-            print(f"📐 Building bounds: {bounds}")
-            print(f"📐 Building center: {center}")
+            log.debug("📐 Building bounds: %s", bounds)
+            log.debug("📐 Building center: %s", center)
             
             # Calculate appropriate camera distance
             x_range = bounds[1] - bounds[0]
@@ -375,27 +423,27 @@ class PyVistaBuildingGenerator(QObject):
             # FIXED: Apply camera position safely
             try:
                 self.plotter.camera_position = [camera_pos, center, (0, 0, 1)]
-                print(f"✅ Camera position set: {camera_pos}")
+                log.debug("✅ Camera position set: %s", camera_pos)
             except Exception as e:
-                print(f"⚠️ Camera position warning: {e}")
+                log.warning("⚠️ Camera position warning: %s", e)
             
             # FIXED: Additional camera commands with error handling
             try:
                 self.plotter.reset_camera()
-                print("✅ Camera reset")
+                log.debug("✅ Camera reset")
             except Exception as e:
-                print(f"⚠️ Camera reset warning: {e}")
+                log.warning("⚠️ Camera reset warning: %s", e)
                 
             try:
                 self.plotter.view_isometric()
-                print("✅ Isometric view set")
+                log.debug("✅ Isometric view set")
             except Exception as e:
-                print(f"⚠️ Isometric view warning: {e}")
+                log.warning("⚠️ Isometric view warning: %s", e)
             
-            print(f"✅ Camera setup complete: distance={camera_distance:.2f}")
+            log.debug("✅ Camera setup complete: distance=%.2f", camera_distance)
             
         except Exception as e:
-            print(f"❌ Camera reset error: {e}")
+            log.error("❌ Camera reset error: %s", e)
             traceback.print_exc()
     
     def _add_enhanced_ground_plane(self):
@@ -432,10 +480,10 @@ class PyVistaBuildingGenerator(QObject):
                 line_width=1
             )
             
-            print("✅ Enhanced ground plane added")
+            log.debug("✅ Enhanced ground plane added")
             
         except Exception as e:
-            print(f"⚠️ Could not add enhanced ground plane: {e}")
+            log.warning("⚠️ Could not add enhanced ground plane: %s", e)
     
     def clear_current_building(self):
         """Clear current building from plotter - FIXED"""
@@ -446,7 +494,7 @@ class PyVistaBuildingGenerator(QObject):
                 for actor_name in actors_to_remove:
                     try:
                         self.plotter.remove_actor(actor_name)
-                        print(f"✅ Removed actor: {actor_name}")
+                        log.debug("✅ Removed actor: %s", actor_name)
                     except:
                         pass
                 
@@ -454,10 +502,12 @@ class PyVistaBuildingGenerator(QObject):
                 self._force_render_multiple()
                 
             self.current_building = None
-            print("✅ Building cleared")
+            self.building_actor = None
+            self._mesh_layout = None
+            log.debug("✅ Building cleared")
             
         except Exception as e:
-            print(f"❌ Error clearing building: {e}")
+            log.error("❌ Error clearing building: %s", e)
     
     def set_debug_mode(self, debug=True):
         """Enable debug mode - disables complex features for basic building display"""
@@ -467,142 +517,141 @@ class PyVistaBuildingGenerator(QObject):
             self.sunshafts_enabled = False
             self.reflections_enabled = False
             self.volumetric_lighting = False
-            print("🔧 Debug mode enabled - complex features disabled")
+            log.debug("🔧 Debug mode enabled - complex features disabled")
         else:
             self.shadows_enabled = True
             self.sunshafts_enabled = True
             self.reflections_enabled = True
             self.volumetric_lighting = True
-            print("🔧 Debug mode disabled - all features enabled")
+            log.debug("🔧 Debug mode disabled - all features enabled")
     
     def debug_plotter_state(self):
         """Debug plotter state for troubleshooting"""
         try:
-            print("\n🔍 === PLOTTER DEBUG INFO ===")
+            log.debug("\n🔍 === PLOTTER DEBUG INFO ===")
             
             if not self.plotter:
-                print("❌ No plotter available")
+                log.error("❌ No plotter available")
                 return
             
             # Check plotter type and attributes
-            print(f"📊 Plotter type: {type(self.plotter)}")
+            log.debug("📊 Plotter type: %s", type(self.plotter))
             
             # Check actors
             try:
                 if hasattr(self.plotter, 'actors'):
                     actors = list(self.plotter.actors.keys())
-                    print(f"🎭 Actors in scene: {actors}")
+                    log.debug("🎭 Actors in scene: %s", actors)
                 else:
-                    print("⚠️ No actors attribute")
+                    log.warning("⚠️ No actors attribute")
             except Exception as e:
-                print(f"❌ Error checking actors: {e}")
+                log.error("❌ Error checking actors: %s", e)
             
             # Check camera
             try:
                 if hasattr(self.plotter, 'camera'):
                     cam_pos = self.plotter.camera_position
-                    print(f"📹 Camera position: {cam_pos}")
+                    log.debug("📹 Camera position: %s", cam_pos)
                 else:
-                    print("⚠️ No camera attribute")
+                    log.warning("⚠️ No camera attribute")
             except Exception as e:
-                print(f"❌ Error checking camera: {e}")
+                log.error("❌ Error checking camera: %s", e)
             
             # Check bounds
             try:
                 if hasattr(self.plotter, 'bounds'):
                     bounds = self.plotter.bounds
-                    print(f"🌍 Scene bounds: {bounds}")
+                    log.debug("🌍 Scene bounds: %s", bounds)
                 else:
-                    print("⚠️ No bounds attribute")
+                    log.warning("⚠️ No bounds attribute")
             except Exception as e:
-                print(f"❌ Error checking bounds: {e}")
+                log.error("❌ Error checking bounds: %s", e)
             
             # Check render window
             try:
                 if hasattr(self.plotter, 'ren_win'):
-                    print(f"🖼️ Render window: {self.plotter.ren_win}")
+                    log.debug("🖼️ Render window: %s", self.plotter.ren_win)
                 else:
-                    print("⚠️ No render window")
+                    log.warning("⚠️ No render window")
             except Exception as e:
-                print(f"❌ Error checking render window: {e}")
+                log.error("❌ Error checking render window: %s", e)
             
-            print("🔍 === DEBUG INFO END ===\n")
+            log.debug("🔍 === DEBUG INFO END ===\n")
             
         except Exception as e:
-            print(f"❌ Error in debug info: {e}")
+            log.error("❌ Error in debug info: %s", e)
     
     # ==========================================
     # ROOF CREATION METHODS
     # ==========================================
     
     def _create_gabled_roof(self, base_verts, height, roof_pitch):
-        """Create gabled roof vertices and faces"""
+        """Create gabled roof vertices and faces (gable walls at the roof ends)"""
+        return self._create_skeleton_roof(base_verts, height, roof_pitch, 'gable')
+    
+    def _create_hipped_roof(self, base_verts, height, roof_pitch):
+        """Create hipped roof vertices and faces"""
+        return self._create_skeleton_roof(base_verts, height, roof_pitch, 'hip')
+    
+    def _create_skeleton_roof(self, base_verts, height, roof_pitch, kind):
+        """Straight-skeleton roof over any simple footprint.
+        
+        The skeleton is cached per footprint (see models.straight_skeleton),
+        so height and pitch changes only recompute vertex heights. Per-face
+        normals, tilt and azimuth are stored in self.current_roof_faces.
+        """
+        n_points = len(base_verts)
         try:
-            roof_vertices = []
-            roof_faces = []
-            n_points = len(base_verts)
-            
-            # Find the longest side for the ridge direction
-            max_length = 0
-            ridge_start_idx = 0
-            
-            for i in range(n_points):
-                next_i = (i + 1) % n_points
-                length = np.linalg.norm(np.array(base_verts[next_i][:2]) - np.array(base_verts[i][:2]))
-                if length > max_length:
-                    max_length = length
-                    ridge_start_idx = i
-                    
-            ridge_end_idx = (ridge_start_idx + 1) % n_points
-            
-            # Calculate roof height from pitch
-            building_width = max_length
-            roof_height_add = (building_width / 2) * math.tan(math.radians(roof_pitch))
-            total_height = height + roof_height_add
-            
-            # Create ridge line (midpoints of opposite sides)
-            ridge_start = [
-                (base_verts[ridge_start_idx][0] + base_verts[ridge_end_idx][0]) / 2,
-                (base_verts[ridge_start_idx][1] + base_verts[ridge_end_idx][1]) / 2,
-                total_height
-            ]
-            
-            # Find opposite side midpoint
-            opposite_idx = (ridge_start_idx + n_points // 2) % n_points
-            opposite_next_idx = (opposite_idx + 1) % n_points
-            
-            ridge_end = [
-                (base_verts[opposite_idx][0] + base_verts[opposite_next_idx][0]) / 2,
-                (base_verts[opposite_idx][1] + base_verts[opposite_next_idx][1]) / 2,
-                total_height
-            ]
-            
-            roof_vertices = [ridge_start, ridge_end]
-            ridge_start_idx_3d = 2 * n_points  # Index in all_vertices
-            ridge_end_idx_3d = 2 * n_points + 1
-            
-            # Create triangular roof faces
-            for i in range(n_points):
-                next_i = (i + 1) % n_points
-                
-                # Determine which ridge point to use
-                if i < n_points // 2:
-                    ridge_idx = ridge_start_idx_3d
-                else:
-                    ridge_idx = ridge_end_idx_3d
-                
-                # Triangle from wall edge to ridge
-                triangle = [3, i + n_points, next_i + n_points, ridge_idx]
-                roof_faces.append(triangle)
-            
-            return roof_vertices, roof_faces
-            
+            points, roof_loops, face_info = roof_geometry(base_verts, height, roof_pitch, kind)
+        except SkeletonError as e:
+            log.warning("⚠️ Straight skeleton failed (%s), using a single apex roof", e)
+            return self._create_apex_roof(base_verts, height, roof_pitch)
         except Exception as e:
-            print(f"❌ Error creating gabled roof: {e}")
+            log.error("❌ Error creating %s roof: %s", kind, e)
             return [], []
+        
+        # Footprint points are the wall tops; skeleton points follow the walls
+        index = np.arange(len(points)) + n_points
+        roof_faces = []
+        self._roof_cell_faces = []
+        for face, triangles in enumerate(self._triangulate_roof_loops(points, roof_loops)):
+            roof_faces.extend([3] + index[loop].tolist() for loop in triangles)
+            self._roof_cell_faces.extend([face] * len(triangles))
+        
+        self._set_roof_faces(points, roof_loops, face_info)
+        self._roof_offsets = roof_surfaces(base_verts, kind)['offsets'][n_points:]
+        self._roof_kind = kind
+        log.debug("🏠 %s roof: %s faces (%s triangles), %s skeleton points",
+                  kind, len(roof_loops), len(roof_faces), len(points) - n_points)
+        return points[n_points:].tolist(), roof_faces
     
-    def _create_hipped_roof(self, base_verts, height, roof_pitch):
-        """Create hipped roof vertices and faces"""
+    def _triangulate_roof_loops(self, points, roof_loops):
+        """Triangles (as point indices) of every roof face, in face order.
+        
+        Sloped faces are ear-clipped in plan view (they may be concave);
+        vertical gable ends and triangles are fanned.
+        """
+        loops = [np.asarray(loop) for loop in roof_loops]
+        plan = [i for i, loop in enumerate(loops) if len(loop) > 3]
+        plan = [i for i, area in zip(plan, signed_areas([points[loops[i], :2] for i in plan])) if area > 1e-9]
+        clipped = dict(zip(plan, triangulate_polygons([points[loops[i], :2] for i in plan])))
+        
+        result = []
+        for i, loop in enumerate(loops):
+            if i in clipped:
+                result.append(loop[clipped[i]])
+            else:
+                result.append(np.array([[loop[0], loop[k], loop[k + 1]] for k in range(1, len(loop) - 1)]))
+        return result
+    
+    def _set_roof_faces(self, points, roof_loops, face_info):
+        """Store per-face roof data (edge, kind, normal, tilt, azimuth, vertices)"""
+        self.current_roof_faces = [
+            dict(info, vertices=points[loop]) for loop, info in zip(roof_loops, face_info)
+        ]
+    
+    def _create_apex_roof(self, base_verts, height, roof_pitch):
+        """Fallback roof: every wall top edge joined to one apex above the centroid"""
         try:
             # Calculate center point
             center_x = np.mean([v[0] for v in base_verts])
@@ -616,6 +665,7 @@ class PyVistaBuildingGenerator(QObject):
             # Single apex point
             apex = [center_x, center_y, total_height]
             roof_vertices = [apex]
+            self._roof_offsets = [max_distance]
             
             n_points = len(base_verts)
             apex_idx = 2 * n_points  # Index in all_vertices
@@ -630,7 +680,7 @@ class PyVistaBuildingGenerator(QObject):
             return roof_vertices, roof_faces
             
         except Exception as e:
-            print(f"❌ Error creating hipped roof: {e}")
+            log.error("❌ Error creating apex roof: %s", e)
             return [], []
     
     # ==========================================
@@ -641,7 +691,7 @@ class PyVistaBuildingGenerator(QObject):
         """Update solar time for simulation"""
         try:
             self.solar_time = max(0, min(23, hour))  # Clamp to valid range
-            print(f"☀️ Solar time updated: {self.solar_time}:00")
+            log.debug("☀️ Solar time updated: %s:00", self.solar_time)
             
             # Calculate sun position
             azimuth, elevation = self._calculate_sun_position(self.solar_time, self.solar_day)
@@ -652,13 +702,13 @@ class PyVistaBuildingGenerator(QObject):
                 self._update_solar_visualization()
             
         except Exception as e:
-            print(f"❌ Error updating solar time: {e}")
+            log.error("❌ Error updating solar time: %s", e)
 
     def update_solar_day(self, day):
         """Update solar day for simulation"""
         try:
             self.solar_day = max(1, min(365, day))  # Clamp to valid range
-            print(f"☀️ Solar day updated: {self.solar_day}")
+            log.debug("☀️ Solar day updated: %s", self.solar_day)
             
             # Recalculate sun position with new day
             azimuth, elevation = self._calculate_sun_position(self.solar_time, self.solar_day)
@@ -669,7 +719,7 @@ class PyVistaBuildingGenerator(QObject):
                 self._update_solar_visualization()
             
         except Exception as e:
-            print(f"❌ Error updating solar day: {e}")
+            log.error("❌ Error updating solar day: %s", e)
 
     def _calculate_sun_position(self, hour, day_of_year):
         """Calculate sun position based on time and day"""
@@ -702,7 +752,7 @@ class PyVistaBuildingGenerator(QObject):
             return azimuth_deg, max(0, elevation_deg)  # Ensure elevation is not negative
             
         except Exception as e:
-            print(f"❌ Error calculating sun position: {e}")
+            log.error("❌ Error calculating sun position: %s", e)
             return 180, 45  # Default values
 
     def _update_solar_visualization(self):
@@ -747,7 +797,7 @@ class PyVistaBuildingGenerator(QObject):
                 self._force_render_multiple()
                 
         except Exception as e:
-            print(f"⚠️ Could not update solar visualization: {e}")
+            log.warning("⚠️ Could not update solar visualization: %s", e)
     
     def start_sun_animation(self):
         """Start sun path animation"""
@@ -755,17 +805,17 @@ class PyVistaBuildingGenerator(QObject):
             if not self.animation_timer.isActive():
                 self.animation_step_count = 0
                 self.animation_timer.start(200)  # Update every 200ms
-                print("🎬 Sun animation started")
+                log.debug("🎬 Sun animation started")
         except Exception as e:
-            print(f"❌ Error starting sun animation: {e}")
+            log.error("❌ Error starting sun animation: %s", e)
             
     def stop_sun_animation(self):
         """Stop sun path animation"""
         try:
             self.animation_timer.stop()
-            print("⏹️ Sun animation stopped")
+            log.debug("⏹️ Sun animation stopped")
         except Exception as e:
-            print(f"❌ Error stopping sun animation: {e}")
+            log.error("❌ Error stopping sun animation: %s", e)
             
     def _animate_sun(self):
         """Animate sun position through the day"""
@@ -782,51 +832,86 @@ class PyVistaBuildingGenerator(QObject):
                 self.stop_sun_animation()
                 
         except Exception as e:
-            print(f"❌ Error in sun animation: {e}")
+            log.error("❌ Error in sun animation: %s", e)
     
     # ==========================================
     # BUILDING UPDATE METHODS
     # ==========================================
     
     def update_building_height(self, height):
-        """Update building height and regenerate"""
-        try:
-            if self.current_points and height != self.current_height:
-                self.current_height = height
-                self.create_building_from_canvas(
-                    self.current_points, height, 
-                    self.current_roof_type, self.current_roof_pitch
-                )
-                print(f"🏗️ Building height updated to {height}m")
-        except Exception as e:
-            print(f"❌ Error updating building height: {e}")
+        """Update building height (wall tops and roof move in place)"""
+        self._schedule_update(height=height)
         
     def update_roof_type(self, roof_type):
-        """Update roof type and regenerate"""
-        try:
-            if self.current_points and roof_type != self.current_roof_type:
-                self.current_roof_type = roof_type
-                self.create_building_from_canvas(
-                    self.current_points, self.current_height, 
-                    roof_type, self.current_roof_pitch
-                )
-                print(f"🏗️ Roof type updated to {roof_type}")
-        except Exception as e:
-            print(f"❌ Error updating roof type: {e}")
+        """Update roof type (rebuilds the mesh - the topology changes)"""
+        self._schedule_update(roof_type=roof_type)
         
     def update_roof_pitch(self, pitch):
-        """Update roof pitch and regenerate"""
+        """Update roof pitch (roof points move in place)"""
+        self._schedule_update(pitch=pitch)
+    
+    def _schedule_update(self, **changes):
+        """Queue slider changes; the newest values are applied on the next tick.
+        
+        While a slider is dragged the building updates at most once per
+        update_interval_ms instead of once per slider event.
+        """
+        if not self.current_points:
+            return
+        self._pending_update.update(changes)
+        if not self.update_timer.isActive():
+            self.update_timer.start(self.update_interval_ms)
+    
+    def _apply_pending_update(self):
+        """Apply queued height/type/pitch changes in place or by a rebuild"""
+        pending, self._pending_update = self._pending_update, {}
         try:
-            if self.current_points and pitch != self.current_roof_pitch:
-                self.current_roof_pitch = pitch
-                if self.current_roof_type != 'flat':  # Only update if not flat roof
-                    self.create_building_from_canvas(
-                        self.current_points, self.current_height, 
-                        self.current_roof_type, pitch
-                    )
-                print(f"🏗️ Roof pitch updated to {pitch}°")
+            height = pending.get('height', self.current_height)
+            roof_type = pending.get('roof_type', self.current_roof_type)
+            pitch = pending.get('pitch', self.current_roof_pitch)
+            if (height, roof_type, pitch) == (self.current_height, self.current_roof_type, self.current_roof_pitch):
+                return
+            
+            topology_changed = roof_type != self.current_roof_type
+            self.current_height = height
+            self.current_roof_type = roof_type
+            self.current_roof_pitch = pitch
+            
+            if topology_changed or not self._update_mesh_in_place():
+                self.create_building_from_canvas(self.current_points, height, roof_type, pitch)
+            log.info("🏗️ Building updated: height=%sm, roof=%s, pitch=%s°", height, roof_type, pitch)
         except Exception as e:
-            print(f"❌ Error updating roof pitch: {e}")
+            log.error("❌ Error updating building: %s", e)
+    
+    def _update_mesh_in_place(self):
+        """Move wall-top and roof points of the existing mesh to the current
+        height and pitch. Returns False when the mesh has to be rebuilt.
+        """
+        mesh = self.current_building
+        layout = self._mesh_layout
+        if mesh is None or layout is None or mesh.n_points != layout['n_points']:
+            return False
+        
+        n_base = layout['n_base']
+        z = self.current_height + layout['offsets'] * math.tan(math.radians(self.current_roof_pitch))
+        mesh.points[n_base:, 2] = z
+        mesh.GetPoints().Modified()
+        mesh.Modified()
+        
+        # Roof slopes change with the pitch; a pure height change keeps every normal
+        if layout['pitch'] != self.current_roof_pitch:
+            mesh.compute_normals(inplace=True)
+            layout['pitch'] = self.current_roof_pitch
+        if self.building_actor is not None:
+            self.building_actor.Modified()
+        
+        if layout['kind']:
+            points, roof_loops, face_info = roof_geometry(
+                layout['footprint'], self.current_height, self.current_roof_pitch, layout['kind'])
+            self._set_roof_faces(points, roof_loops, face_info)
+        
+        self._force_render_multiple()
+        return True
     
     # ==========================================
     # PUBLIC API METHODS
@@ -849,14 +934,16 @@ class PyVistaBuildingGenerator(QObject):
                 return {'status': 'failed', 'building': None}
                 
         except Exception as e:
-            print(f"❌ Error in generate_from_points: {e}")
+            log.error("❌ Error in generate_from_points: %s", e)
             return {'status': 'error', 'building': None, 'error': str(e)}
     
     def cleanup(self):
         """Cleanup resources"""
         try:
             self.stop_sun_animation()
+            self.update_timer.stop()
+            self._pending_update = {}
             self.clear_current_building()
-            print("✅ Building generator cleanup completed")
+            log.debug("✅ Building generator cleanup completed")
         except Exception as e: 
-            print(f"❌ Error during cleanup: {e}")
\ No newline at end of file
+            log.error("❌ Error during cleanup: %s", e)
\ No newline at end of file
@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+"""
+models/straight_skeleton.py
+Straight-skeleton hip and gable roofs for arbitrary simple footprints
+
+The roof over a footprint with one pitch on every eave is the straight
+skeleton of the footprint lifted by distance: every point of a roof face
+lies `d * tan(pitch)` above the eaves, where d is its distance to the face's
+eave edge. The skeleton is computed with a wavefront simulation - all edges
+move inward at unit speed, polygon vertices move along their bisectors, and
+the two kinds of events change the wavefront:
+
+    edge event   an edge shrinks to zero length; its two vertices merge
+    split event  a reflex vertex hits a non-adjacent edge; the polygon splits
+
+Simultaneous events (rectangles, symmetric L/T/U shapes) are handled as a
+series of zero-time events; skeleton nodes closer than a tolerance merge.
+
+Gable roofs start from the hip skeleton: every triangular end face whose
+apex continues into a single ridge becomes a vertical gable wall by
+extending the ridge to the eave line. The neighbouring faces stay planar
+because the ridge lies in both of them.
+
+The result is independent of wall height and pitch (nodes carry their
+offset distance), so it is cached per footprint and reused while the height
+and pitch sliders move.
+"""
+import math
+
+import numpy as np
+
+ROOF_KINDS = ('hip', 'gable')
+MAX_CACHED = 32
+
+_SURFACE_CACHE = {}
+
+
+class SkeletonError(ValueError):
+    """Footprint the straight skeleton cannot be computed for"""
+
+
+# ==================== FOOTPRINT ====================
+
+def signed_area(polygon):
+    """Signed area of a 2D polygon (positive = counter-clockwise)"""
+    x, y = polygon[:, 0], polygon[:, 1]
+    return 0.5 * float(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y))
+
+
+def _edge_frames(polygon):
+    """Unit directions and inward (left) normals of a CCW polygon's edges"""
+    d = np.roll(polygon, -1, axis=0) - polygon
+    lengths = np.linalg.norm(d, axis=1)
+    if np.any(lengths <= 0):
+        raise SkeletonError("Footprint has duplicate consecutive vertices")
+    d = d / lengths[:, None]
+    return d, np.column_stack([-d[:, 1], d[:, 0]])
+
+
+def _velocity(n_in, n_out):
+    """Bisector velocity that moves both adjacent edges inward at unit speed"""
+    det = n_in[0] * n_out[1] - n_in[1] * n_out[0]
+    if abs(det) < 1e-9:
+        # Collinear edges move the vertex straight in; opposite edges pin it
+        return n_out.copy() if np.dot(n_in, n_out) > 0 else np.zeros(2)
+    return np.array([n_out[1] - n_in[1], n_in[0] - n_out[0]]) / det
+
+
+# ==================== SKELETON ====================
+
+class _Wavefront:
+    """Shrinking wavefront polygons and the skeleton they trace"""
+
+    def __init__(self, polygon, node_ids, tolerance):
+        self.origins = polygon
+        self.directions, self.normals = _edge_frames(polygon)
+        self.tolerance = tolerance
+        self.time = 0.0
+        self.nodes = [None] * len(polygon)
+        self.node_times = [0.0] * len(polygon)
+        for i, node in enumerate(node_ids):
+            self.nodes[node] = polygon[i].copy()
+        self.arcs = []                      # (node a, node b, {edge, edge})
+
+        n = len(polygon)
+        self.polygons = [[self._vertex(polygon[i], node_ids[i], (i - 1) % n, i) for i in range(n)]]
+
+    def _vertex(self, position, node, e_in, e_out):
+        return {'p': np.asarray(position, dtype=float), 'node': node, 'e_in': e_in, 'e_out': e_out,
+                'v': _velocity(self.normals[e_in], self.normals[e_out])}
+
+    def _node(self, position):
+        """Skeleton node at a position (reuses a node within tolerance)"""
+        for i, existing in enumerate(self.nodes):
+            if np.linalg.norm(existing - position) <= self.tolerance:
+                return i
+        self.nodes.append(np.asarray(position, dtype=float).copy())
+        self.node_times.append(self.time)
+        return len(self.nodes) - 1
+
+    def _arc(self, a, b, vertex):
+        if a != b:
+            self.arcs.append((a, b, {vertex['e_in'], vertex['e_out']}))
+
+    # ---------- events ----------
+
+    def _next_event(self, k):
+        """Earliest (delay, kind, data) event of polygon k"""
+        poly = self.polygons[k]
+        m = len(poly)
+        P = np.array([v['p'] for v in poly])
+        V = np.array([v['v'] for v in poly])
+        e_out = np.array([v['e_out'] for v in poly])
+        D = self.directions[e_out]
+        best = (math.inf, None, None)
+
+        # Edge events: edge j (vertex j -> j+1) shrinks to zero length
+        length = np.einsum('ij,ij->i', np.roll(P, -1, axis=0) - P, D)
+        rate = np.einsum('ij,ij->i', np.roll(V, -1, axis=0) - V, D)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            delay = np.where(length <= self.tolerance, 0.0,
+                             np.where(rate < -1e-12, -length / rate, math.inf))
+        j = int(np.argmin(delay))
+        if delay[j] < best[0]:
+            best = (max(0.0, float(delay[j])), 'edge', j)
+
+        # Split events: a reflex vertex r reaches the moving line of edge j
+        d_in = self.directions[[v['e_in'] for v in poly]]
+        reflex = np.nonzero(d_in[:, 0] * D[:, 1] - d_in[:, 1] * D[:, 0] < -1e-9)[0]
+        if len(reflex):
+            N = self.normals[e_out]                                          # (m, 2)
+            O = self.origins[e_out]
+            distance = np.einsum('rjk,jk->rj', P[reflex][:, None, :] - O[None], N) - self.time
+            closing = 1.0 - V[reflex] @ N.T
+            with np.errstate(divide='ignore', invalid='ignore'):
+                delay = np.where((closing > 1e-9) & (distance >= -self.tolerance),
+                                 np.maximum(distance, 0.0) / closing, math.inf)
+            # The vertex's own edges and the edges it meets by edge events are excluded
+            rows = np.arange(len(reflex))
+            delay[rows, reflex] = math.inf
+            delay[rows, (reflex - 1) % m] = math.inf
+            for row in np.argsort(delay.min(axis=1)):
+                r = reflex[row]
+                for j in np.argsort(delay[row]):
+                    s = delay[row, j]
+                    if not s < best[0]:
+                        break
+                    hit = P[r] + V[r] * s
+                    a, b = P[j] + V[j] * s, P[(j + 1) % m] + V[(j + 1) % m] * s
+                    if (np.dot(hit - a, D[j]) >= -self.tolerance
+                            and np.dot(hit - b, D[j]) <= self.tolerance):
+                        best = (float(s), 'split', (int(r), int(j)))
+                        break
+        return best
+
+    def _advance(self, delay):
+        if delay <= 0:
+            return
+        for poly in self.polygons:
+            for vertex in poly:
+                vertex['p'] = vertex['p'] + vertex['v'] * delay
+        self.time += delay
+
+    def _edge_event(self, k, j):
+        poly = self.polygons[k]
+        a, b = poly[j], poly[(j + 1) % len(poly)]
+        node = self._node((a['p'] + b['p']) / 2)
+        self._arc(a['node'], node, a)
+        self._arc(b['node'], node, b)
+        merged = self._vertex(self.nodes[node], node, a['e_in'], b['e_out'])
+        if j + 1 < len(poly):
+            poly[j:j + 2] = [merged]
+        else:
+            poly[j:] = []
+            poly[0] = merged
+
+    def _split_event(self, k, r, j):
+        poly = self.polygons[k]
+        m = len(poly)
+        vertex = poly[r]
+        node = self._node(vertex['p'])
+        self._arc(vertex['node'], node, vertex)
+        edge = poly[j]['e_out']
+        first = self._vertex(self.nodes[node], node, vertex['e_in'], edge)
+        second = self._vertex(self.nodes[node], node, edge, vertex['e_out'])
+        # first: r -> j+1 ... r-1        second: r -> r+1 ... j
+        part_a = [first] + [poly[(j + 1 + i) % m] for i in range((r - j - 1) % m)]
+        part_b = [second] + [poly[(r + 1 + i) % m] for i in range((j - r) % m)]
+        self.polygons[k:k + 1] = [part_a, part_b]
+
+    def _collapsed(self, poly):
+        """Whether a wavefront polygon has shrunk to lines (zero area)"""
+        if len(poly) <= 2:
+            return True
+        P = np.array([v['p'] for v in poly])
+        perimeter = np.linalg.norm(np.roll(P, -1, axis=0) - P, axis=1).sum()
+        return abs(signed_area(P)) <= self.tolerance * max(perimeter, 1.0)
+
+    def _close(self, k):
+        """Finish a polygon that has collapsed to ridge lines.
+
+        Its edges now lie on top of each other; each one becomes a ridge arc
+        of its own face.
+        """
+        poly = self.polygons.pop(k)
+        ends = []
+        for vertex in poly:
+            node = self._node(vertex['p'])
+            self._arc(vertex['node'], node, vertex)
+            ends.append(node)
+        for i, vertex in enumerate(poly):
+            a, b = ends[i], ends[(i + 1) % len(poly)]
+            if a != b:
+                self.arcs.append((a, b, {vertex['e_out']}))
+
+    def run(self):
+        limit = 20 * len(self.origins) ** 2 + 100
+        for _ in range(limit):
+            for k in range(len(self.polygons) - 1, -1, -1):
+                if self._collapsed(self.polygons[k]):
+                    self._close(k)
+            if not self.polygons:
+                return
+            events = [self._next_event(k) + (k,) for k in range(len(self.polygons))]
+            delay, kind, data, k = min(events, key=lambda event: event[0])
+            if kind is None:
+                raise SkeletonError("Wavefront stalled before collapsing")
+            self._advance(delay)
+            if kind == 'edge':
+                self._edge_event(k, data)
+            else:
+                self._split_event(k, *data)
+        raise SkeletonError("Straight skeleton did not converge")
+
+
+def _face_path(arcs, edge, start, end):
+    """Node path from `start` to `end` over the arcs bounding one edge's face"""
+    neighbours = {}
+    for a, b, edges in arcs:
+        if edge in edges:
+            neighbours.setdefault(a, set()).add(b)
+            neighbours.setdefault(b, set()).add(a)
+    # Breadth-first: the shortest walk skips zero-area detours of degenerate events
+    previous = {start: None}
+    queue = [start]
+    for node in queue:
+        if node == end:
+            path = []
+            while node is not None:
+                path.append(node)
+                node = previous[node]
+            return path[::-1]
+        for other in sorted(neighbours.get(node, ())):
+            if other not in previous:
+                previous[other] = node
+                queue.append(other)
+    raise SkeletonError(f"Roof face of edge {edge} is not closed")
+
+
+def straight_skeleton(footprint):
+    """Straight skeleton of a simple polygon.
+
+    Returns a dict with 'nodes' (m, 2) - the first n are the footprint
+    vertices in input order -, 'offsets' (m,) distance of every node to its
+    faces' eave edges, 'arcs' [(a, b)] and 'faces': for every input edge k
+    (vertex k -> k+1) the node loop of its roof face, counter-clockwise seen
+    from above, starting with the edge.
+    """
+    polygon = np.asarray(footprint, dtype=float)[:, :2]
+    n = len(polygon)
+    if n < 3:
+        raise SkeletonError("Footprint needs at least 3 vertices")
+
+    clockwise = signed_area(polygon) < 0
+    order = np.arange(n)[::-1] if clockwise else np.arange(n)
+    scale = float(np.ptp(polygon, axis=0).max()) or 1.0
+    wavefront = _Wavefront(polygon[order], order, tolerance=1e-7 * scale)
+    wavefront.run()
+
+    nodes = np.array(wavefront.nodes)
+    faces = []
+    for k in range(n):
+        # Input edge k is edge n-2-k of the reversed (counter-clockwise) polygon
+        edge = (n - 2 - k) % n if clockwise else k
+        first, second = order[edge], order[(edge + 1) % n]
+        path = _face_path(wavefront.arcs, edge, second, first)
+        faces.append(_ccw_face([first] + path[:-1], nodes))
+
+    return {'nodes': nodes, 'offsets': np.array(wavefront.node_times),
+            'arcs': [(a, b) for a, b, _ in wavefront.arcs], 'faces': faces}
+
+
+def _ccw_face(face, nodes):
+    """Face loop without repeated nodes, counter-clockwise seen from above"""
+    loop = [node for i, node in enumerate(face) if node != face[i - 1]]
+    if signed_area(nodes[loop]) < 0:
+        loop = loop[::-1]
+    return loop
+
+
+# ==================== ROOF SURFACES ====================
+
+def _gable_ends(skeleton, n):
+    """Turn triangular hip ends into vertical gables.
+
+    Returns (points, offsets, faces, kinds) with the moved apexes appended.
+    """
+    points = list(skeleton['nodes'])
+    offsets = list(skeleton['offsets'])
+    faces = [list(face) for face in skeleton['faces']]
+    kinds = ['slope'] * n
+
+    neighbours = {}
+    for a, b in skeleton['arcs']:
+        neighbours.setdefault(a, set()).add(b)
+        neighbours.setdefault(b, set()).add(a)
+
+    moves = {}
+    for k, face in enumerate(faces):
+        apexes = [node for node in face if node >= n]
+        corners = {k, (k + 1) % n}
+        if len(face) != 3 or len(apexes) != 1:
+            continue
+        apex = apexes[0]
+        ridge = neighbours.get(apex, set()) - corners
+        if len(ridge) != 1 or sum(apex in f for f in faces) != 3:
+            continue
+        other = ridge.pop()
+
+        start, end = points[k], points[(k + 1) % n]
+        along = (end - start) / np.linalg.norm(end - start)
+        normal = np.array([-along[1], along[0]])
+        direction = points[apex] - points[other]
+        closing = float(np.dot(direction, normal))
+        if abs(closing) < 1e-12:
+            continue
+        s = -float(np.dot(points[apex] - start, normal)) / closing
+        position = points[apex] + s * direction
+        t = float(np.dot(position - start, along)) / np.linalg.norm(end - start)
+        if s <= 0 or not -1e-6 <= t <= 1 + 1e-6:
+            continue
+        # The ridge keeps its slope (it lies in both neighbouring faces)
+        offset = offsets[apex] + s * (offsets[apex] - offsets[other])
+        moves[apex] = (position, offset)
+        kinds[k] = 'gable'
+
+    for apex, (position, offset) in moves.items():
+        points[apex] = position
+        offsets[apex] = offset
+    return np.array(points), np.array(offsets), faces, kinds
+
+
+def roof_surfaces(footprint, kind='hip'):
+    """Roof faces of a footprint, independent of wall height and pitch.
+
+    Returns a dict with 'points' (m, 2) - the first n are the footprint
+    vertices -, 'offsets' (m,) (height above the eaves is offset * tan(pitch)),
+    'faces' (point loops, counter-clockwise seen from above), 'edges' (the
+    footprint edge of every face) and 'kinds' ('slope' or 'gable').
+    Results are cached per footprint and kind.
+    """
+    if kind not in ROOF_KINDS:
+        raise ValueError(f"Unknown roof kind: {kind}. Available: {list(ROOF_KINDS)}")
+    polygon = np.asarray(footprint, dtype=float)[:, :2]
+    key = (np.round(polygon, 6).tobytes(), kind)
+    if key in _SURFACE_CACHE:
+        return _SURFACE_CACHE[key]
+
+    n = len(polygon)
+    skeleton = straight_skeleton(polygon)
+    if kind == 'gable':
+        points, offsets, faces, kinds = _gable_ends(skeleton, n)
+    else:
+        points, offsets, faces, kinds = skeleton['nodes'], skeleton['offsets'], skeleton['faces'], ['slope'] * n
+
+    # Drop skeleton nodes no face uses (merged or moved apexes); footprint stays first
+    used = sorted({node for face in faces for node in face} | set(range(n)))
+    index = {node: i for i, node in enumerate(used)}
+    result = {
+        'points': points[used],
+        'offsets': offsets[used],
+        'faces': [[index[node] for node in face] for face in faces],
+        'edges': list(range(n)),
+        'kinds': kinds,
+    }
+    if len(_SURFACE_CACHE) >= MAX_CACHED:
+        _SURFACE_CACHE.pop(next(iter(_SURFACE_CACHE)))
+    _SURFACE_CACHE[key] = result
+    return result
+
+
+def face_normal(vertices):
+    """Unit normal of a planar 3D polygon (Newell's method)"""
+    v = np.asarray(vertices, dtype=float)
+    w = np.roll(v, -1, axis=0)
+    normal = np.array([np.sum((v[:, 1] - w[:, 1]) * (v[:, 2] + w[:, 2])),
+                       np.sum((v[:, 2] - w[:, 2]) * (v[:, 0] + w[:, 0])),
+                       np.sum((v[:, 0] - w[:, 0]) * (v[:, 1] + w[:, 1]))])
+    length = np.linalg.norm(normal)
+    return normal / length if length > 0 else np.array([0.0, 0.0, 1.0])
+
+
+def roof_geometry(footprint, height, pitch, kind='hip'):
+    """3D roof over a footprint with its eaves at `height`.
+
+    Returns (points (m, 3), faces, face_info). The first n points are the
+    footprint vertices at eave height. face_info holds per face: 'edge',
+    'kind', 'normal' (outward), 'tilt' (degrees from horizontal) and
+    'azimuth' (degrees clockwise from +y, the direction the face looks at).
+    """
+    surfaces = roof_surfaces(footprint, kind)
+    rise = math.tan(math.radians(pitch))
+    points = np.column_stack([surfaces['points'], height + surfaces['offsets'] * rise])
+
+    face_info = []
+    for face, edge, face_kind in zip(surfaces['faces'], surfaces['edges'], surfaces['kinds']):
+        normal = face_normal(points[face])
+        face_info.append({
+            'edge': edge,
+            'kind': face_kind,
+            'normal': normal,
+            'tilt': math.degrees(math.acos(max(-1.0, min(1.0, normal[2])))),
+            'azimuth': math.degrees(math.atan2(normal[0], normal[1])) % 360,
+        })
+    return points, surfaces['faces'], face_info
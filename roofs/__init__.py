@@ -1,16 +1,29 @@
 """
 Roof visualization system with refactored architecture
 Now uses Template Method pattern with Abstract Base Classes
+
+Roof classes are imported on first attribute access so that importing a
+light submodule (e.g. roofs.solar_panel_handlers.config) does not load
+PyVista/VTK at application startup.
 """
+import importlib
+
+_LAZY_EXPORTS = {
+    'BaseRoof': '.base.base_roof',
+    'FlatRoof': '.concrete.flat_roof',
+    'GableRoof': '.concrete.gable_roof',
+    'HipRoof': '.concrete.hip_roof',
+    'PyramidRoof': '.concrete.pyramid_roof',
+}
+
 
-# Import the base class
-from .base.base_roof import BaseRoof
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Import concrete roof implementations
-from .concrete.flat_roof import FlatRoof
-from .concrete.gable_roof import GableRoof
-from .concrete.hip_roof import HipRoof
-from .concrete.pyramid_roof import PyramidRoof
 
 # For backward compatibility, export all roof types
 __all__ = [
@@ -19,4 +32,4 @@ __all__ = [
     'GableRoof',
     'HipRoof',
     'PyramidRoof'
-]
\ No newline at end of file
+]
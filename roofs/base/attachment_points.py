@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+roofs/base/attachment_points.py
+Array-backed attachment point store with a uniform grid index
+
+Environment ring points and roof face points are kept as NumPy arrays
+(position, occupied flag, group, normal) with a grid index over XY for
+nearest-point picking. Items can still be read and written dict-style
+(store[i]['occupied'] = True) by the existing placement code.
+"""
+import numpy as np
+
+
+def ring_points(radius, count, start_angle=0.0, z=0.3):
+    """(count, 3) points on a horizontal circle, angles from start_angle up to 2π"""
+    angles = np.linspace(start_angle, 2 * np.pi, count, endpoint=False)
+    return np.column_stack([radius * np.cos(angles), radius * np.sin(angles),
+                            np.full(count, float(z))])
+
+
+class AttachmentPoint:
+    """Dict-style view of one stored point (reads and writes go to the store)"""
+    __slots__ = ('store', 'index')
+
+    _KEYS = ('position', 'occupied', 'obstacle', 'ring', 'face', 'normal', 'roof_point')
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    def __getitem__(self, key):
+        store, i = self.store, self.index
+        if key == 'position':
+            return store.positions[i]
+        if key == 'occupied':
+            return bool(store.occupied[i])
+        if key == 'obstacle':
+            return store.obstacles[i]
+        if key in ('ring', 'face'):
+            return store.group_names[store.groups[i]]
+        if key == 'normal':
+            normal = store.normals[i]
+            return None if np.isnan(normal[0]) else normal
+        if key == 'roof_point':
+            roof_point = store.roof_points[i]
+            return None if np.isnan(roof_point[0]) else roof_point
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        store, i = self.store, self.index
+        if key == 'occupied':
+            store.occupied[i] = bool(value)
+        elif key == 'obstacle':
+            store.obstacles[i] = value
+        elif key == 'position':
+            store.positions[i] = value
+            store._grid = None
+        else:
+            raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            value = self[key]
+        except KeyError:
+            return default
+        return default if value is None else value
+
+    def __contains__(self, key):
+        return key in self._KEYS
+
+    def keys(self):
+        return self._KEYS
+
+
+class AttachmentPointStore:
+    """Attachment points as parallel arrays with nearest-point queries.
+
+    Iterating yields AttachmentPoint views in index order, like the list of
+    dicts it replaces; integer indexing, `in`, get() and items() cover the
+    dict-of-index usage of roof points.
+    """
+
+    def __init__(self):
+        self.positions = np.zeros((0, 3))
+        self.occupied = np.zeros(0, dtype=bool)
+        self.groups = np.zeros(0, dtype=int)
+        self.normals = np.zeros((0, 3))
+        self.roof_points = np.zeros((0, 3))
+        self.obstacles = []
+        self.group_names = []
+        self._grid = None
+
+    # ==================== BUILD ====================
+
+    def add(self, positions, group, normals=None, roof_points=None):
+        """Append a batch of points belonging to one ring or face"""
+        positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+        n = len(positions)
+        if group not in self.group_names:
+            self.group_names.append(group)
+        nan3 = np.full((n, 3), np.nan)
+        normals = nan3 if normals is None else np.broadcast_to(np.asarray(normals, dtype=float), (n, 3))
+        roof_points = nan3 if roof_points is None else np.asarray(roof_points, dtype=float).reshape(-1, 3)
+
+        self.positions = np.vstack([self.positions, positions])
+        self.occupied = np.concatenate([self.occupied, np.zeros(n, dtype=bool)])
+        self.groups = np.concatenate([self.groups, np.full(n, self.group_names.index(group))])
+        self.normals = np.vstack([self.normals, normals])
+        self.roof_points = np.vstack([self.roof_points, roof_points])
+        self.obstacles.extend([None] * n)
+        self._grid = None
+        return range(len(self.positions) - n, len(self.positions))
+
+    @classmethod
+    def from_face_points(cls, points, face_normals):
+        """Store built from a roof's attachment point list and its
+        {index: {'normal', 'face', 'roof_point'}} face info"""
+        store = cls()
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        infos = [face_normals.get(i) or {} for i in range(len(points))]
+        nan3 = [np.nan] * 3
+        normals = [nan3 if info.get('normal') is None else info['normal'] for info in infos]
+        roof_points = [nan3 if info.get('roof_point') is None else info['roof_point'] for info in infos]
+        store.add(points, None, np.array(normals, dtype=float).reshape(-1, 3),
+                  np.array(roof_points, dtype=float).reshape(-1, 3))
+        # Per-point face names, keeping the point order of the roof's list
+        faces = [info.get('face') for info in infos]
+        store.group_names = list(dict.fromkeys(faces))
+        store.groups = np.array([store.group_names.index(f) for f in faces], dtype=int)
+        return store
+
+    def clear(self):
+        self.__init__()
+
+    # ==================== OCCUPANCY ====================
+
+    def mark(self, index, obstacle=None):
+        self.occupied[index] = True
+        self.obstacles[index] = obstacle
+
+    def release_all(self):
+        self.occupied[:] = False
+        self.obstacles = [None] * len(self.obstacles)
+
+    def free_indices(self):
+        return np.flatnonzero(~self.occupied)
+
+    # ==================== QUERIES ====================
+
+    def _build_grid(self):
+        """Bucket point indices by XY cell; about two points per cell"""
+        xy = self.positions[:, :2]
+        extent = np.ptp(xy, axis=0).max() if len(xy) > 1 else 1.0
+        cell = max(extent / max(np.sqrt(len(xy) / 2.0), 1.0), 1e-3)
+        keys = np.floor(xy / cell).astype(int)
+        order = np.lexsort((keys[:, 1], keys[:, 0]))
+        unique, starts = np.unique(keys[order], axis=0, return_index=True)
+        buckets = np.split(order, starts[1:])
+        self._grid = (cell, {tuple(k): b for k, b in zip(unique, buckets)},
+                      keys.min(axis=0), keys.max(axis=0))
+
+    def nearest(self, point, max_distance=np.inf, free_only=False, xy_only=False):
+        """(index, distance) of the closest point, or (None, inf).
+
+        Searches grid cells in growing square rings around the query and
+        stops once no unvisited cell can hold a closer point.
+        """
+        if len(self.positions) == 0:
+            return None, np.inf
+        if self._grid is None:
+            self._build_grid()
+        cell, buckets, key_min, key_max = self._grid
+        query = np.asarray(point, dtype=float).ravel()[:3]
+        centre = np.floor(query[:2] / cell).astype(int)
+
+        best_index, best_distance = None, np.inf
+        max_ring = int(max(np.abs(key_max - centre).max(), np.abs(centre - key_min).max()))
+        for ring in range(max_ring + 1):
+            # Cells in this ring are at least (ring - 1) * cell away in XY
+            if (ring - 1) * cell > min(best_distance, max_distance):
+                break
+            cx = np.arange(centre[0] - ring, centre[0] + ring + 1)
+            if ring == 0:
+                cells = [(centre[0], centre[1])]
+            else:
+                cells = ([(x, centre[1] - ring) for x in cx] + [(x, centre[1] + ring) for x in cx] +
+                         [(centre[0] - ring, y) for y in range(centre[1] - ring + 1, centre[1] + ring)] +
+                         [(centre[0] + ring, y) for y in range(centre[1] - ring + 1, centre[1] + ring)])
+            candidates = [buckets[c] for c in cells if c in buckets]
+            if not candidates:
+                continue
+            index = np.concatenate(candidates)
+            if free_only:
+                index = index[~self.occupied[index]]
+                if len(index) == 0:
+                    continue
+            delta = self.positions[index] - query
+            if xy_only:
+                delta = delta[:, :2]
+            distance = np.sqrt(np.einsum('ij,ij->i', delta, delta))
+            k = int(np.argmin(distance))
+            if distance[k] < best_distance:
+                best_index, best_distance = int(index[k]), float(distance[k])
+
+        if best_distance > max_distance:
+            return None, np.inf
+        return best_index, best_distance
+
+    def match(self, point, tolerance_xy=0.01, tolerance_z=0.1, free_only=True):
+        """Index of a point at `point` within tolerance, or None"""
+        index, _ = self.nearest(point, max_distance=tolerance_xy, free_only=free_only, xy_only=True)
+        if index is not None and abs(self.positions[index][2] - point[2]) >= tolerance_z:
+            return None
+        return index
+
+    def positions_where(self, occupied):
+        """(n, 3) positions of free (occupied=False) or occupied points"""
+        return self.positions[self.occupied == bool(occupied)]
+
+    # ==================== CONTAINER PROTOCOL ====================
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __bool__(self):
+        return len(self.positions) > 0
+
+    def __getitem__(self, index):
+        if not 0 <= index < len(self.positions):
+            raise IndexError(index)
+        return AttachmentPoint(self, int(index))
+
+    def __contains__(self, index):
+        return isinstance(index, (int, np.integer)) and 0 <= index < len(self.positions)
+
+    def __iter__(self):
+        return (AttachmentPoint(self, i) for i in range(len(self.positions)))
+
+    def get(self, index, default=None):
+        return self[index] if index in self else default
+
+    def keys(self):
+        return range(len(self.positions))
+
+    def items(self):
+        return ((i, AttachmentPoint(self, i)) for i in range(len(self.positions)))
@@ -4,6 +4,7 @@ roofs/base/base_roof.py
 Main base roof class with core functionality
 """
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 import pyvista as pv
 import numpy as np
 import os
@@ -19,6 +20,11 @@ from .environment_manager import EnvironmentManager
 from .texture_manager import TextureManager
 from .sun_system_manager import SunSystemManager
 from .camera_manager import CameraManager
+from .scene_graph import SceneGraph
+from .static_batch import StaticMeshBatch, HIGHLIGHT_ACTOR_NAME
+from utils.log import get_logger
+
+log = get_logger('roof')
 
 class BaseRoof(ABC):
     """Base class for all roof types with modular components"""
@@ -38,20 +44,34 @@ class BaseRoof(ABC):
         
         # Setup plotter
         self._setup_plotter(plotter)
-        
+
+        # Layered scene: ground, trees and sun survive roof type switches
+        self.scene_graph = SceneGraph.for_plotter(self.plotter)
+
+        # Static building parts are merged into one actor per material
+        self.static_batch = StaticMeshBatch(self.plotter)
+        self._batching = False
+        self._batch_shadow_parts = set()
+
         # Find sun system
         self.sun_system = None
         self._find_and_configure_sun_system()
-        
+
         # Initialize managers
         self.texture_manager = TextureManager(self)
         self.sun_system_manager = SunSystemManager(self)
-        
+
         # Pass already-found sun system to manager
         if self.sun_system:
             self.sun_system_manager.sun_system = self.sun_system
-        
-        self.environment_manager = EnvironmentManager(self)
+
+        # Reuse the previous roof's environment when the scene still holds it
+        retained_environment = self.scene_graph.take_environment() if self.scene_graph else None
+        if retained_environment:
+            retained_environment.attach_roof(self)
+            self.environment_manager = retained_environment
+        else:
+            self.environment_manager = EnvironmentManager(self)
         self.camera_manager = CameraManager(self)
         
         # Make environment attributes accessible at root level for compatibility
@@ -89,9 +109,20 @@ class BaseRoof(ABC):
         self.enable_help_system = False
         self.annotator = None
         
-        # Create ground and environment
-        self.environment_manager.initialize_environment()
-        
+        # Create ground and environment, or re-fit the retained one
+        if retained_environment:
+            self.environment_manager.refit_to_dimensions()
+        elif self.scene_graph:
+            with self.scene_graph.capture('environment'):
+                self.environment_manager.initialize_environment()
+        else:
+            self.environment_manager.initialize_environment()
+
+        # Everything added from here on belongs to the building layer
+        if self.scene_graph:
+            self.scene_graph.environment = self.environment_manager
+            self.scene_graph.mark_building_start()
+
         # Update references after environment initialization
         self.ground_mesh = self.environment_manager.ground_mesh
         self.ground_actor = self.environment_manager.ground_actor
@@ -129,59 +160,13 @@ class BaseRoof(ABC):
             if not attachment_points:
                 return None
             
-            min_distance = float('inf')
-            closest_point = None
-            
-            # Safely convert clicked_point to numpy array
-            try:
-                clicked_array = np.array(clicked_point[:3])  # Ensure 3D
-            except:
+            index, _ = attachment_points.nearest(np.asarray(clicked_point, dtype=float)[:3],
+                                                 max_distance=max_distance)
+            if index is None:
                 return None
             
-            for i, point_data in enumerate(attachment_points):
-                try:
-                    # Extract position from dictionary format
-                    if isinstance(point_data, dict) and 'position' in point_data:
-                        position = point_data['position']
-                        
-                        # Convert position to array
-                        if isinstance(position, (list, tuple)) and len(position) >= 3:
-                            point_array = np.array(position[:3])
-                        elif isinstance(position, np.ndarray) and position.size >= 3:
-                            point_array = np.array([position.flat[0], position.flat[1], position.flat[2]])
-                        else:
-                            continue
-                            
-                    elif isinstance(point_data, (list, tuple)) and len(point_data) >= 3:
-                        # Handle legacy format (direct coordinates)
-                        point_array = np.array(point_data[:3])
-                        position = point_data
-                        
-                    elif isinstance(point_data, np.ndarray) and point_data.size >= 3:
-                        # Handle numpy array format
-                        point_array = np.array([point_data.flat[0], point_data.flat[1], point_data.flat[2]])
-                        position = point_data
-                        
-                    else:
-                        continue
-                    
-                    # Calculate distance
-                    distance = np.linalg.norm(clicked_array - point_array)
-                    
-                    if distance < min_distance and distance <= max_distance:
-                        min_distance = distance
-                        # Return the position as tuple
-                        if isinstance(position, (list, tuple)):
-                            closest_point = tuple(float(x) for x in position[:3])
-                        elif isinstance(position, np.ndarray):
-                            closest_point = (float(position.flat[0]), float(position.flat[1]), float(position.flat[2]))
-                        else:
-                            closest_point = tuple(float(x) for x in point_array)
-                            
-                except Exception:
-                    continue
-            
-            return closest_point
+            # Return the position as tuple
+            return tuple(float(x) for x in attachment_points.positions[index])
             
         except Exception:
             return None
@@ -193,16 +178,8 @@ class BaseRoof(ABC):
                 return
             
             # Find the index of the attachment point that matches this position
-            point_index = None
-            for i, point_data in enumerate(self.environment_manager.environment_attachment_points):
-                if not point_data['occupied']:
-                    pos = point_data['position']
-                    # Check if positions match (with small tolerance for floating point comparison)
-                    if (abs(pos[0] - point[0]) < 0.01 and 
-                        abs(pos[1] - point[1]) < 0.01 and 
-                        abs(pos[2] - point[2]) < 0.1):
-                        point_index = i
-                        break
+            # (small tolerance for floating point comparison)
+            point_index = self.environment_manager.environment_attachment_points.match(point)
             
             if point_index is None:
                 return
@@ -276,6 +253,13 @@ class BaseRoof(ABC):
     def _find_and_configure_sun_system(self):
         """Find and properly configure sun system"""
         try:
+            # Method 0: Sun system kept by the layered scene graph
+            scene_graph = getattr(self, 'scene_graph', None)
+            if scene_graph and scene_graph.sun_system:
+                self.sun_system = scene_graph.sun_system
+                self._configure_sun_system()
+                return True
+
             # Method 1: Check if plotter has parent with enhanced_sun_system
             if hasattr(self.plotter, 'parent'):
                 parent = self.plotter.parent()
@@ -305,6 +289,8 @@ class BaseRoof(ABC):
             
             # Configure sun system if found
             if self.sun_system:
+                if scene_graph:
+                    scene_graph.sun_system = self.sun_system
                 self._configure_sun_system()
                 return True
             else:
@@ -441,6 +427,122 @@ class BaseRoof(ABC):
         """Load texture safely - delegate to texture manager"""
         return self.texture_manager.load_texture_safely(filename, default_color)
     
+    # ==================== STATIC MESH BATCHING ====================
+
+    @contextmanager
+    def batch_static_meshes(self):
+        """Queue static building parts added inside the block and add them as
+        one actor per material when it ends (replaces the previous build's
+        merged actors)"""
+        self.static_batch.remove()
+        self._batching = True
+        try:
+            yield self.static_batch
+        finally:
+            self._batching = False
+            self._flush_static_batch()
+
+    def add_static_mesh(self, mesh, **kwargs):
+        """plotter.add_mesh for static building parts (queued inside a batch)"""
+        if self._batching:
+            return self.static_batch.add(mesh, **kwargs)
+        return self.plotter.add_mesh(mesh, **kwargs)
+
+    def _flush_static_batch(self):
+        """Add the queued parts and register the merged meshes for shadows"""
+        try:
+            actors = self.static_batch.flush()
+        except Exception as e:
+            log.error("❌ Static batch flush failed: %s", e)
+            self._batch_shadow_parts = set()
+            return
+
+        building_actors = getattr(self, 'building_actors', None)
+        if isinstance(building_actors, dict):
+            building_actors.update(actors)
+
+        if self.sun_system and hasattr(self.sun_system, 'register_scene_object'):
+            scene_objects = getattr(self.sun_system, 'scene_objects', {})
+            for name, mesh in self.static_shadow_meshes(
+                    {name: None for name in self._batch_shadow_parts}).items():
+                if mesh is None:
+                    continue
+                # Replace a previous build's mesh of the same name
+                scene_objects.pop(name, None)
+                self.sun_system.register_scene_object(mesh, name, cast_shadow='foundation' not in name)
+        self._batch_shadow_parts = set()
+
+    def static_shadow_meshes(self, part_meshes):
+        """{name: mesh} with merged parts replaced by their batch mesh"""
+        meshes = {}
+        batched = {}
+        for batch in self.static_batch.batches:
+            for part in batch['groups']:
+                batched[part] = batch
+        for name, mesh in part_meshes.items():
+            batch = batched.get(name)
+            if batch is None:
+                if mesh is None:
+                    mesh = self.static_batch_part_mesh(name)
+                meshes[name] = mesh
+            else:
+                meshes[batch['name']] = batch['mesh']
+        return meshes
+
+    def static_batch_part_mesh(self, name):
+        """Mesh of a part added alone (not merged) by the last flush"""
+        try:
+            actor = self.plotter.renderer.actors.get(name)
+            return actor.GetMapper().GetInput() if actor is not None else None
+        except Exception:
+            return None
+
+    def face_group_at(self, actor, cell_id):
+        """Building part name of a picked cell (merged batch actors only)"""
+        return self.static_batch.face_group_at(actor, cell_id)
+
+    def highlight_face_group(self, part_name, color='yellow'):
+        """Outline a single building part inside a merged actor"""
+        self.clear_face_highlight()
+        mesh = self.static_batch.face_group_mesh(part_name)
+        if mesh is None or mesh.n_cells == 0:
+            return None
+        actor = self.plotter.add_mesh(mesh, color=color, style='wireframe', line_width=4,
+                                      name=HIGHLIGHT_ACTOR_NAME, pickable=False,
+                                      lighting=False, reset_camera=False)
+        self.track_actor('overlays', actor)
+        return actor
+
+    def clear_face_highlight(self):
+        try:
+            self.plotter.remove_actor(HIGHLIGHT_ACTOR_NAME, reset_camera=False)
+        except Exception:
+            pass
+
+    def pick_face_group(self, renderer, x, y):
+        """Highlight the building part under a screen position.
+
+        Cell picking finds the merged actor and cell; the batch maps the cell
+        back to its part. Clicks off the merged building clear the highlight.
+        Returns the part name or None.
+        """
+        part = None
+        try:
+            import vtk as _vtk
+            picker = _vtk.vtkCellPicker()
+            picker.SetTolerance(0.0005)
+            if picker.Pick(x, y, 0, renderer):
+                part = self.face_group_at(picker.GetActor(), picker.GetCellId())
+        except Exception as e:
+            log.debug("⚠️ Face pick failed: %s", e)
+
+        if part is None:
+            self.clear_face_highlight()
+            return None
+        self.highlight_face_group(part)
+        log.debug("🎯 Picked building part %s", part)
+        return part
+
     def add_sun_compatible_mesh(self, mesh, **kwargs):
         """Add mesh with proper material properties for sun system"""
         # Force proper lighting parameters
@@ -482,6 +584,12 @@ class BaseRoof(ABC):
             kwargs.setdefault('specular', 0.1)
             kwargs.setdefault('specular_power', 5)
         
+        if self._batching:
+            name = kwargs.get('name', 'unnamed')
+            if 'ground' not in name.lower():
+                self._batch_shadow_parts.add(name)
+            return self.static_batch.add(mesh, **kwargs)
+        
         # Add mesh
         actor = self.plotter.add_mesh(mesh, **kwargs)
         
@@ -738,6 +846,11 @@ class BaseRoof(ABC):
         except Exception:
             return False
     
+    def track_actor(self, layer, actor):
+        """Register an actor in the scene graph layer it belongs to"""
+        if actor is not None and getattr(self, 'scene_graph', None):
+            self.scene_graph.add_actor(layer, actor)
+    
     def clear_obstacles(self):
         """Remove all obstacles"""
         if hasattr(self, 'obstacles') and self.obstacles:
@@ -745,13 +858,13 @@ class BaseRoof(ABC):
                 if hasattr(obstacle, 'actor') and obstacle.actor:
                     self.plotter.remove_actor(obstacle.actor)
             
+            if getattr(self, 'scene_graph', None):
+                self.scene_graph.prune('obstacles')
             self.obstacles = []
             self.obstacle_count = 0
             
             if hasattr(self, 'attachment_points_occupied'):
-                for idx in self.attachment_points_occupied:
-                    self.attachment_points_occupied[idx]['occupied'] = False
-                    self.attachment_points_occupied[idx]['obstacle'] = None
+                self.attachment_points_occupied.release_all()
             
             self.update_instruction("")
     
@@ -811,6 +924,7 @@ class BaseRoof(ABC):
         )
         
         obstacle.add_to_plotter(self.plotter)
+        self.track_actor('obstacles', getattr(obstacle, 'actor', None))
         return obstacle
     
     def is_point_occupied(self, point):
@@ -833,27 +947,12 @@ class BaseRoof(ABC):
         if not hasattr(self, 'attachment_points_occupied') or not self.attachment_points_occupied:
             return None, None
 
-        min_distance = float('inf')
-        closest_idx = None
-        closest_point = None
-
-        cx, cy = float(click_point[0]), float(click_point[1])
-
-        for idx, point_data in self.attachment_points_occupied.items():
-            point = point_data['position']
-            dx = float(point[0]) - cx
-            dy = float(point[1]) - cy
-            distance = (dx * dx + dy * dy) ** 0.5
-
-            if distance < min_distance:
-                min_distance = distance
-                closest_idx = idx
-                closest_point = point
-
-        if min_distance > 4.0:
+        closest_idx, _ = self.attachment_points_occupied.nearest(
+            click_point, max_distance=4.0, xy_only=True)
+        if closest_idx is None:
             return None, None
 
-        return closest_idx, closest_point
+        return closest_idx, self.attachment_points_occupied.positions[closest_idx]
 
     # ---- VTK observer-based roof obstacle picking ----
 
@@ -885,6 +984,8 @@ class BaseRoof(ABC):
                     renderer = self.plotter.renderers[0]
                 if renderer is None:
                     return
+                # Show which building part the click landed on
+                self.pick_face_group(renderer, *self._obstacle_press_pos[:2])
                 picker = _vtk.vtkWorldPointPicker()
                 picker.Pick(self._obstacle_press_pos[0], self._obstacle_press_pos[1], 0, renderer)
                 world_pos = picker.GetPickPosition()
@@ -908,6 +1009,7 @@ class BaseRoof(ABC):
                 except Exception:
                     pass
                 setattr(self, attr, None)
+        self.clear_face_highlight()
         # Restore camera interaction
         saved = getattr(self, '_saved_obstacle_interactor_style', None)
         if saved is not None:
@@ -931,18 +1033,18 @@ class BaseRoof(ABC):
             self.solar_panel_handler = None
     
     def safe_add_panels(self, area):
-        """Safely add panels"""
+        """Queue a panel toggle for an area (merged with repeated key presses)"""
         if hasattr(self, 'solar_panel_handler') and self.solar_panel_handler:
             try:
-                self.solar_panel_handler.add_panels(area)
+                self.solar_panel_handler.request_panels(area)
             except Exception:
                 pass
     
     def safe_clear_panels(self):
-        """Safely clear panels"""
+        """Queue removal of all panels"""
         if hasattr(self, 'solar_panel_handler') and self.solar_panel_handler:
             try:
-                self.solar_panel_handler.clear_panels()
+                self.solar_panel_handler.request_clear()
             except Exception:
                 pass
     
@@ -988,8 +1090,9 @@ class BaseRoof(ABC):
             self.current_placement_type = None
             self._update_placement_instruction()
             
-            # Cleanup managers
-            self.environment_manager.cleanup()
+            # Cleanup managers (a retained environment already serves the next roof)
+            if self.environment_manager.roof is self:
+                self.environment_manager.cleanup()
             self.sun_system_manager.cleanup()
             
             if hasattr(self, 'solar_panel_handler'):
@@ -5,6 +5,9 @@ Manages camera positioning and screenshots
 """
 import datetime
 from pathlib import Path
+from utils.log import get_logger
+
+log = get_logger('camera')
 
 class CameraManager:
     """Manages camera operations and screenshots"""
@@ -14,7 +17,7 @@ class CameraManager:
         self.roof = base_roof
         self.plotter = base_roof.plotter
         self.screenshot_directory = None
-        print("✅ CameraManager initialized")
+        log.debug("✅ CameraManager initialized")
     
     def reset_camera(self):
         """Reset camera to default position"""
@@ -45,7 +48,7 @@ class CameraManager:
                 self.plotter.reset_camera()
                 
         except Exception as e:
-            print(f"❌ Camera reset failed: {e}")
+            log.error("❌ Camera reset failed: %s", e)
             self.plotter.reset_camera()
     
     def set_default_camera_view(self):
@@ -72,6 +75,6 @@ class CameraManager:
         
         try:
             self.plotter.screenshot(str(filepath))
-            print(f"✅ Screenshot saved to {filepath}")
+            log.debug("✅ Screenshot saved to %s", filepath)
         except Exception as e:
-            print(f"❌ Error saving screenshot: {e}")
+            log.error("❌ Error saving screenshot: %s", e)
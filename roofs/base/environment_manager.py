@@ -7,6 +7,8 @@ import pyvista as pv
 import numpy as np
 import os
 
+from .attachment_points import AttachmentPointStore, ring_points
+
 class EnvironmentManager:
     """Manages environment objects with shadow casting capabilities"""
     
@@ -22,7 +24,7 @@ class EnvironmentManager:
         self.grass_ground_level = -0.05  # SAME AS WORKING CODE
         
         self.environment_obstacles = []
-        self.environment_attachment_points = []
+        self.environment_attachment_points = AttachmentPointStore()
         self.environment_meshes = {}  # Store meshes for shadow casting
         
         # Attachment point visualization
@@ -64,6 +66,66 @@ class EnvironmentManager:
         self._create_environment_attachment_points()
         self._create_attachment_points_visualization()
     
+    def release_roof(self):
+        """Detach from the current roof, keeping ground, trees and poles in the scene"""
+        try:
+            self.hide_environment_attachment_points()
+            try:
+                self.plotter.remove_actor("all_occupied_message")
+            except:
+                pass
+        except Exception as e:
+            pass
+
+    def attach_roof(self, base_roof):
+        """Serve a new roof on the same plotter (layered scene graph hand-over)"""
+        self.roof = base_roof
+        self.plotter = base_roof.plotter
+
+    def refit_to_dimensions(self):
+        """Re-fit the retained ground and attachment points to the new roof.
+
+        The ground mesh is rescaled in place and attachment point rings are
+        regenerated; points next to existing trees and poles stay occupied.
+        """
+        try:
+            old_size = self.ground_size
+            self._calculate_ground_size()
+
+            if self.ground_mesh is not None and old_size and self.ground_size != old_size:
+                points = self.ground_mesh.points.copy()
+                points[:, :2] *= self.ground_size / old_size
+                self.ground_mesh.points = points
+
+                # Keep the texture tile size: re-tile the UVs for the new size
+                uv = self.ground_mesh.active_texture_coordinates
+                if uv is not None:
+                    self.ground_mesh.active_texture_coordinates = (
+                        uv * (self._ground_texture_tiles(self.ground_size) /
+                              self._ground_texture_tiles(old_size)))
+
+            self.environment_attachment_points.clear()
+            self._create_environment_attachment_points()
+
+            points = self.environment_attachment_points
+            for obstacle in self.environment_obstacles:
+                position = obstacle.get('position')
+                if position is None:
+                    continue
+                index, _ = points.nearest([position[0], position[1], 0.0], max_distance=1.0,
+                                          free_only=True, xy_only=True)
+                if index is not None:
+                    points.mark(index, obstacle)
+
+            self._create_attachment_points_visualization()
+
+            if self.roof.sun_system and hasattr(self.roof.sun_system, 'set_shadow_height'):
+                self.roof.sun_system.set_shadow_height(self.grass_ground_level + 0.02)
+
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+
     def _calculate_ground_size(self):
         """Calculate ground size based on building dimensions"""
         try:
@@ -81,6 +143,11 @@ class EnvironmentManager:
         except Exception as e:
             self.ground_size = 40.0
     
+    @staticmethod
+    def _ground_texture_tiles(ground_size):
+        """Texture repeats across the ground (about one per 5 m)"""
+        return max(4, int(ground_size / 5))
+
     def _create_coordinated_grass_ground(self):
         """Create grass ground using pv.Plane for reliable texture support"""
         try:
@@ -99,7 +166,7 @@ class EnvironmentManager:
             )
 
             # Scale texture so it tiles instead of stretching
-            texture_tiles = max(4, int(ground_size / 5))
+            texture_tiles = self._ground_texture_tiles(ground_size)
             raw_tc = self.ground_mesh.active_texture_coordinates
             if raw_tc is not None:
                 self.ground_mesh.active_texture_coordinates = raw_tc * texture_tiles
@@ -142,100 +209,31 @@ class EnvironmentManager:
             else:
                 min_safe_radius = 6.0
 
+            points = self.environment_attachment_points
+
             # Very close ring - right around the building (but never inside it)
             very_close_radius = max(building_buffer * 0.5, min_safe_radius)
-            very_close_angles = np.linspace(0, 2*np.pi, 16, endpoint=False)
-            
-            for angle in very_close_angles:
-                x = very_close_radius * np.cos(angle)
-                y = very_close_radius * np.sin(angle)
-                z = 0.3  # Above ground level for visibility
-                self.environment_attachment_points.append({
-                    'position': [x, y, z],
-                    'occupied': False,
-                    'obstacle': None,
-                    'ring': 'very_close'
-                })
-            
+            points.add(ring_points(very_close_radius, 16), 'very_close')
+
             # Inner ring - closer to building (but never inside it)
             inner_radius = max(building_buffer, min_safe_radius)
-            inner_angles = np.linspace(np.pi/16, 2*np.pi, 12, endpoint=False)
-            
-            for angle in inner_angles:
-                x = inner_radius * np.cos(angle)
-                y = inner_radius * np.sin(angle)
-                z = 0.3
-                self.environment_attachment_points.append({
-                    'position': [x, y, z],
-                    'occupied': False,
-                    'obstacle': None,
-                    'ring': 'inner'
-                })
-            
+            points.add(ring_points(inner_radius, 12, np.pi / 16), 'inner')
+
             # Middle ring
-            middle_radius = building_buffer * 1.5
-            middle_angles = np.linspace(0, 2*np.pi, 10, endpoint=False)
-            
-            for angle in middle_angles:
-                x = middle_radius * np.cos(angle)
-                y = middle_radius * np.sin(angle)
-                z = 0.3
-                self.environment_attachment_points.append({
-                    'position': [x, y, z],
-                    'occupied': False,
-                    'obstacle': None,
-                    'ring': 'middle'
-                })
-            
+            points.add(ring_points(building_buffer * 1.5, 10), 'middle')
+
             # Outer ring
-            outer_radius = building_buffer * 2.0
-            outer_angles = np.linspace(np.pi/12, 2*np.pi, 8, endpoint=False)
-            
-            for angle in outer_angles:
-                x = outer_radius * np.cos(angle)
-                y = outer_radius * np.sin(angle)
-                z = 0.3
-                self.environment_attachment_points.append({
-                    'position': [x, y, z],
-                    'occupied': False,
-                    'obstacle': None,
-                    'ring': 'outer'
-                })
-            
+            points.add(ring_points(building_buffer * 2.0, 8, np.pi / 12), 'outer')
+
             # Far ring (for large grounds)
             if self.ground_size > 40:
-                far_radius = building_buffer * 2.5
-                far_angles = np.linspace(0, 2*np.pi, 6, endpoint=False)
-                
-                for angle in far_angles:
-                    x = far_radius * np.cos(angle)
-                    y = far_radius * np.sin(angle)
-                    z = 0.3
-                    self.environment_attachment_points.append({
-                        'position': [x, y, z],
-                        'occupied': False,
-                        'obstacle': None,
-                        'ring': 'far'
-                    })
-            
+                points.add(ring_points(building_buffer * 2.5, 6), 'far')
+
             # Corner points for rectangular arrangement (outside building footprint)
             corner_offset = max(building_buffer * 0.7, min_safe_radius)
-            corners = [
-                (corner_offset, corner_offset),
-                (corner_offset, -corner_offset),
-                (-corner_offset, corner_offset),
-                (-corner_offset, -corner_offset)
-            ]
-            
-            for x, y in corners:
-                self.environment_attachment_points.append({
-                    'position': [x, y, 0.3],
-                    'occupied': False,
-                    'obstacle': None,
-                    'ring': 'corner'
-                })
-            
-            
+            corners = np.array([[1, 1], [1, -1], [-1, 1], [-1, -1]]) * corner_offset
+            points.add(np.column_stack([corners, np.full(4, 0.3)]), 'corner')
+
         except Exception as e:
             pass
 
@@ -247,17 +245,14 @@ class EnvironmentManager:
                 return
             
             # Create a single mesh with all attachment points as spheres
-            points = []
-            for point_data in self.environment_attachment_points:
-                points.append(point_data['position'])
+            points_array = self.environment_attachment_points.positions
             
-            if points:
+            if len(points_array):
                 # Create point cloud
-                points_array = np.array(points)
-                self.attachment_points_mesh = pv.PolyData(points_array)
+                self.attachment_points_mesh = pv.PolyData(points_array.copy())
                 
                 # Add scalar values for coloring (could be used for different states)
-                scalars = np.ones(len(points))
+                scalars = np.ones(len(points_array))
                 self.attachment_points_mesh['state'] = scalars
                 
                 
@@ -276,18 +271,10 @@ class EnvironmentManager:
                     pass
             
             # Get available (unoccupied) points
-            available_points = []
-            occupied_points = []
-            
-            for point_data in self.environment_attachment_points:
-                if point_data['occupied']:
-                    occupied_points.append(point_data['position'])
-                else:
-                    available_points.append(point_data['position'])
+            available_array = self.environment_attachment_points.positions_where(occupied=False)
             
             # Show available points as black dots
-            if available_points:
-                available_array = np.array(available_points)
+            if len(available_array):
                 available_cloud = pv.PolyData(available_array)
 
                 self.attachment_points_actor = self.plotter.add_mesh(
@@ -456,20 +443,11 @@ class EnvironmentManager:
 
     def _handle_placement_at_position(self, world_pos):
         """Find the nearest unoccupied dot to world_pos and place the object."""
-        best_idx = None
-        best_dist = float('inf')
-        for i, pt_data in enumerate(self.environment_attachment_points):
-            if pt_data['occupied']:
-                continue
-            pos = pt_data['position']
-            # Compare in XY only — dots all sit at ground level
-            dist = np.sqrt((pos[0] - world_pos[0]) ** 2 +
-                           (pos[1] - world_pos[1]) ** 2)
-            if dist < best_dist:
-                best_dist = dist
-                best_idx = i
+        # Compare in XY only — dots all sit at ground level
+        best_idx, _ = self.environment_attachment_points.nearest(
+            world_pos, max_distance=6.0, free_only=True, xy_only=True)
 
-        if best_idx is None or best_dist > 6.0:
+        if best_idx is None:
             return  # No nearby free point
 
         mode = self.environment_placement_mode
@@ -887,8 +865,8 @@ class EnvironmentManager:
             tree_types = ['deciduous', 'pine', 'oak']
             added = 0
             
-            for i, point_data in enumerate(self.environment_attachment_points):
-                if not point_data['occupied'] and added < count:
+            for i in self.environment_attachment_points.free_indices():
+                if added < count:
                     tree_type = tree_types[added % len(tree_types)]
                     self.selected_tree_type = tree_type
                     self.tree_size_multiplier = size_multiplier
@@ -907,8 +885,8 @@ class EnvironmentManager:
             height_multiplier = parameters.get('height_multiplier', 1.0)
             
             added = 0
-            for i, point_data in enumerate(self.environment_attachment_points):
-                if not point_data['occupied'] and added < count:
+            for i in self.environment_attachment_points.free_indices():
+                if added < count:
                     self.pole_height_multiplier = height_multiplier
                     if self._place_pole_at_index(i):
                         added += 1
@@ -937,13 +915,12 @@ class EnvironmentManager:
         """Add environment obstacle at random available point and hide attachment points after placement"""
         try:
             if point_index is None:
-                available_points = [i for i, p in enumerate(self.environment_attachment_points) 
-                                if not p['occupied']]
-                if not available_points:
+                available_points = self.environment_attachment_points.free_indices()
+                if not len(available_points):
                     return False
                 
                 import random
-                point_index = random.choice(available_points)
+                point_index = int(random.choice(available_points))
             
             if point_index >= len(self.environment_attachment_points):
                 return False
@@ -1059,9 +1036,7 @@ class EnvironmentManager:
             self.environment_meshes.clear()
             
             # Reset attachment points
-            for point in self.environment_attachment_points:
-                point['occupied'] = False
-                point['obstacle'] = None
+            self.environment_attachment_points.release_all()
             
             self.tree_type_index = 0
             
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+roofs/base/level_of_detail.py
+Low-polygon proxies swapped in while the camera is being dragged
+
+Trees, poles, the foundation and panel batches get a decimated, untextured
+proxy mesh that is built once and cached. On interaction start the proxy is
+set as the actor's mapper input and the render passes (shadow map, ray
+tracing) are detached from the renderer; on interaction end the original
+mesh, texture, colour and passes are put back.
+"""
+import numpy as np
+
+# Actor name fragments that get a proxy, with the flat colour shown in place
+# of the texture while the camera moves
+PROXY_COLORS = (
+    ('_trunk_', '#8B5A2B'),
+    ('_crown_', '#4F7F3A'),
+    ('pine_crown_', '#3F6F3F'),
+    ('pole_beam_', '#B85432'),
+    ('pole_', '#A0A0A0'),
+    ('foundation', '#808080'),
+)
+PANEL_PROXY_COLOR = '#1A2A4A'
+
+
+class LevelOfDetail:
+    """Swaps cached low-polygon proxies into heavy actors during camera interaction"""
+
+    def __init__(self, plotter, reduction=0.85, min_cells=300):
+        self.plotter = plotter
+        self.reduction = reduction      # fraction of triangles removed by decimation
+        self.min_cells = min_cells      # smaller meshes only lose their texture
+        self.active = False
+        self._proxies = {}              # id(dataset) -> (dataset, proxy)
+        self._swapped = []              # (actor, mapper, dataset, texture, color)
+        self._suspended_pass = None
+
+    # ==================== CANDIDATES ====================
+
+    def _candidates(self, roof=None):
+        """(actor, proxy colour) pairs for the actors that get a proxy"""
+        candidates = []
+        try:
+            actors = self.plotter.renderer.actors
+        except Exception:
+            return candidates
+
+        for name, actor in list(actors.items()):
+            name = str(name)
+            for fragment, color in PROXY_COLORS:
+                if fragment in name:
+                    candidates.append((actor, color))
+                    break
+
+        handler = getattr(roof, 'solar_panel_handler', None)
+        for actor in getattr(handler, 'panel_actors', None) or []:
+            if actor is not None:
+                candidates.append((actor, PANEL_PROXY_COLOR))
+        return candidates
+
+    def _proxy(self, dataset):
+        """Cached decimated copy of a mapper input (the input itself if small)"""
+        entry = self._proxies.get(id(dataset))
+        if entry is not None and entry[0] is dataset:
+            return entry[1]
+
+        proxy = dataset
+        try:
+            import pyvista as pv
+            mesh = pv.wrap(dataset)
+            if mesh.n_cells > self.min_cells:
+                surface = mesh.extract_surface().triangulate()
+                proxy = surface.decimate(self.reduction)
+                if proxy.n_points == 0:
+                    proxy = dataset
+        except Exception:
+            proxy = dataset
+
+        self._proxies[id(dataset)] = (dataset, proxy)
+        return proxy
+
+    def prepare(self, roof=None):
+        """Build proxies for the current scene ahead of the first drag"""
+        datasets = set()
+        for actor, _ in self._candidates(roof):
+            try:
+                dataset = actor.GetMapper().GetInput()
+            except Exception:
+                continue
+            if dataset is not None:
+                self._proxy(dataset)
+                datasets.add(id(dataset))
+
+        # Drop proxies of meshes that left the scene
+        for key in [k for k in self._proxies if k not in datasets]:
+            del self._proxies[key]
+
+    # ==================== INTERACTION ====================
+
+    def _suspend_render_passes(self):
+        """Detach the shadow map / ray tracing pass from the renderer"""
+        try:
+            renderer = self.plotter.renderer
+            render_pass = renderer.GetPass()
+            if render_pass is not None:
+                self._suspended_pass = render_pass
+                renderer.SetPass(None)
+        except Exception:
+            self._suspended_pass = None
+
+    def _restore_render_passes(self):
+        if self._suspended_pass is None:
+            return
+        try:
+            self.plotter.renderer.SetPass(self._suspended_pass)
+        except Exception:
+            pass
+        self._suspended_pass = None
+
+    def enter(self, roof=None):
+        """Swap proxies in and suspend shadows (camera interaction started)"""
+        if self.active or self.plotter is None:
+            return
+        self.active = True
+        self._suspend_render_passes()
+
+        for actor, color in self._candidates(roof):
+            try:
+                mapper = actor.GetMapper()
+                dataset = mapper.GetInput()
+                if dataset is None:
+                    continue
+                prop = actor.GetProperty()
+                self._swapped.append((actor, mapper, dataset, actor.GetTexture(), prop.GetColor()))
+
+                proxy = self._proxy(dataset)
+                if proxy is not dataset:
+                    mapper.SetInputData(proxy)
+                actor.SetTexture(None)
+                prop.SetColor(*_rgb(color))
+            except Exception:
+                continue
+
+    def exit(self):
+        """Restore full quality meshes, textures and shadows (interaction ended)"""
+        if not self.active:
+            return
+        for actor, mapper, dataset, texture, color in self._swapped:
+            try:
+                mapper.SetInputData(dataset)
+                actor.SetTexture(texture)
+                actor.GetProperty().SetColor(*color)
+            except Exception:
+                continue
+        self._swapped = []
+        self._restore_render_passes()
+        self.active = False
+
+    def clear(self):
+        """Restore the scene and forget all proxies (e.g. on roof switch)"""
+        self.exit()
+        self._proxies.clear()
+
+
+def _rgb(color):
+    """'#RRGGBB' -> (r, g, b) floats in 0..1"""
+    color = color.lstrip('#')
+    return tuple(np.array([int(color[i:i + 2], 16) for i in (0, 2, 4)]) / 255.0)
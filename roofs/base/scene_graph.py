@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+roofs/base/scene_graph.py
+Layered scene graph that keeps the environment alive across roof switches
+"""
+from contextlib import contextmanager
+
+
+class SceneGraph:
+    """Tracks plotter actors by layer so a roof switch only replaces what changed.
+
+    Layers: environment (ground, attachment points, trees and poles), building,
+    panels, obstacles and overlays. The environment layer, the lights and the
+    shared sun system are kept when the roof type changes; the environment
+    manager is handed over to the next roof and re-fitted to its dimensions.
+
+    Panels are captured by the placement queue, obstacles when they are
+    placed, and overlays (attachment points, highlights) by the roof that
+    shows them. Layers are pruned of actors that were removed meanwhile.
+    """
+
+    LAYERS = ('environment', 'building', 'panels', 'obstacles', 'overlays')
+
+    # Actor names owned by the sun system (never assigned to a layer)
+    SUN_ACTOR_PREFIXES = ('sun_', 'debug_')
+
+    def __init__(self, plotter):
+        self.plotter = plotter
+        self.layers = {name: [] for name in self.LAYERS}
+        self.environment = None     # EnvironmentManager retained between roofs
+        self.sun_system = None      # Shared EnhancedRealisticSunSystem
+        self._baseline = set()
+
+    @classmethod
+    def for_plotter(cls, plotter):
+        """Return the plotter's scene graph, creating it on first use"""
+        if plotter is None:
+            return None
+        scene = getattr(plotter, 'scene_graph', None)
+        if scene is None:
+            scene = cls(plotter)
+            try:
+                plotter.scene_graph = scene
+            except Exception:
+                pass
+        return scene
+
+    # ==================== ACTOR TRACKING ====================
+
+    def actor_keys(self):
+        """Names of all actors currently in the renderer"""
+        try:
+            return set(self.plotter.renderer.actors.keys())
+        except Exception:
+            return set()
+
+    def _sun_owned(self, keys):
+        """Subset of keys belonging to the sun system (sun sphere, glow, shadows)"""
+        owned = {k for k in keys if str(k).startswith(self.SUN_ACTOR_PREFIXES)}
+        shadow_actors = getattr(self.sun_system, 'shadow_actors', None) or []
+        if shadow_actors:
+            try:
+                actors = self.plotter.renderer.actors
+                owned |= {k for k in keys if actors.get(k) in shadow_actors}
+            except Exception:
+                pass
+        return owned
+
+    @contextmanager
+    def capture(self, layer):
+        """Assign every actor added inside the block to `layer`"""
+        before = self.actor_keys()
+        try:
+            yield
+        finally:
+            keys = self.actor_keys()
+            added = keys - before
+            # Drop actors removed inside the block (e.g. a side's old panels)
+            self.layers[layer] = [name for name in self.layers[layer] if name in keys]
+            self.layers[layer].extend(sorted(added - self._sun_owned(added), key=str))
+
+    def add(self, layer, actor_name):
+        """Track an actor name in a layer"""
+        if actor_name is not None and actor_name not in self.layers[layer]:
+            self.layers[layer].append(actor_name)
+
+    def add_actor(self, layer, actor):
+        """Track a plotter actor in a layer under its renderer name"""
+        try:
+            actors = self.plotter.renderer.actors
+        except Exception:
+            return
+        self.add(layer, next((name for name, a in actors.items() if a is actor), None))
+
+    def prune(self, layer):
+        """Forget actors of a layer that are no longer in the renderer"""
+        keys = self.actor_keys()
+        self.layers[layer] = [name for name in self.layers[layer] if name in keys]
+
+    def layer(self, layer):
+        return list(self.layers[layer])
+
+    def clear_layer(self, layer):
+        """Remove all actors tracked in a layer from the plotter"""
+        for name in self.layers[layer]:
+            try:
+                self.plotter.remove_actor(name, reset_camera=False)
+            except Exception:
+                pass
+        self.layers[layer] = []
+
+    # ==================== ROOF LIFECYCLE ====================
+
+    def mark_building_start(self):
+        """Remember the actors present before roof geometry is created"""
+        self._baseline = self.actor_keys()
+
+    def register_roof(self, roof):
+        """Assign actors added since mark_building_start to the building layer.
+
+        Called after a roof is fully constructed; returns the building actors.
+        """
+        environment = set(self.layers['environment'])
+        added = self.actor_keys() - self._baseline - environment
+        self.layers['building'] = sorted(added - self._sun_owned(added), key=str)
+        self.environment = getattr(roof, 'environment_manager', None) or self.environment
+        self.sun_system = getattr(roof, 'sun_system', None) or self.sun_system
+        return self.layer('building')
+
+    def can_retain_environment(self):
+        """True when the retained ground is still part of the scene"""
+        environment = self.environment
+        if environment is None or getattr(environment, 'ground_actor', None) is None:
+            return False
+        try:
+            return any(actor is environment.ground_actor
+                       for actor in self.plotter.renderer.actors.values())
+        except Exception:
+            return False
+
+    def take_environment(self):
+        """Hand the retained environment manager to a new roof (or None)"""
+        if not self.can_retain_environment():
+            self.environment = None
+            self.layers['environment'] = []
+            return None
+        return self.environment
+
+    def detach_roof(self, roof):
+        """Remove a roof's panels, obstacles, overlays and building actors.
+
+        Ground, lights, sun, trees and poles stay in the scene for the next roof.
+        """
+        if roof is not None:
+            handler = getattr(roof, 'solar_panel_handler', None)
+            if handler is not None and hasattr(handler, 'clear_panels'):
+                try:
+                    handler.clear_panels()
+                except Exception:
+                    pass
+
+            if hasattr(roof, 'clear_obstacles'):
+                try:
+                    roof.clear_obstacles()
+                except Exception:
+                    pass
+
+            for attr in ('placement_instruction', 'attachment_point_actor'):
+                actor = getattr(roof, attr, None)
+                if actor is not None:
+                    try:
+                        self.plotter.remove_actor(actor, reset_camera=False)
+                    except Exception:
+                        pass
+                    setattr(roof, attr, None)
+
+            environment = getattr(roof, 'environment_manager', None)
+            if environment is not None and environment is self.environment:
+                environment.release_roof()
+
+        for layer in ('overlays', 'obstacles', 'panels', 'building'):
+            self.clear_layer(layer)
+
+    def reset(self):
+        """Forget all layers (the plotter is about to be cleared completely)"""
+        self.layers = {name: [] for name in self.LAYERS}
+        self.environment = None
+        self.sun_system = None
+        self._baseline = set()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+roofs/base/static_batch.py
+Merges static building parts into one actor per material
+
+While a batch is open, walls, foundation, gable triangles, slopes and
+parapets are queued instead of added to the plotter. On flush the parts that
+share a texture/colour and surface properties are appended into a single
+PolyData with a 'face_group' cell array naming the part each cell came from,
+so one face can still be picked and highlighted.
+"""
+import numpy as np
+
+FACE_GROUP_ARRAY = 'face_group'
+HIGHLIGHT_ACTOR_NAME = 'face_group_highlight'
+
+# add_mesh keywords that make up a material
+_MATERIAL_KEYS = ('color', 'opacity', 'ambient', 'diffuse', 'specular', 'specular_power',
+                  'smooth_shading', 'lighting', 'show_edges')
+
+
+def material_key(kwargs):
+    """Hashable material of an add_mesh call (textures compare by identity)"""
+    texture = kwargs.get('texture')
+    props = tuple((key, str(kwargs.get(key))) for key in _MATERIAL_KEYS)
+    return (id(texture) if texture is not None else None,) + props
+
+
+class StaticMeshBatch:
+    """Queued static parts of one roof build, flushed as one actor per material"""
+
+    def __init__(self, plotter, prefix='building_batch'):
+        self.plotter = plotter
+        self.prefix = prefix
+        self.parts = []             # (name, mesh, kwargs)
+        self.batches = []           # {'name', 'actor', 'mesh', 'groups', 'parts'}
+
+    def add(self, mesh, **kwargs):
+        """Queue a part; the actor is assigned on flush"""
+        name = kwargs.get('name') or f"part_{len(self.parts)}"
+        self.parts.append((name, mesh, dict(kwargs)))
+        return None
+
+    def _merge(self, parts):
+        """Append part meshes into one PolyData tagged with face groups"""
+        import pyvista as pv
+        meshes = []
+        has_tcoords = any(mesh.active_texture_coordinates is not None for _, mesh, _ in parts)
+        for group, (_, mesh, _) in enumerate(parts):
+            part = mesh.extract_surface() if not isinstance(mesh, pv.PolyData) else mesh.copy()
+            if has_tcoords and part.active_texture_coordinates is None:
+                part.active_texture_coordinates = np.zeros((part.n_points, 2))
+            part.cell_data[FACE_GROUP_ARRAY] = np.full(part.n_cells, group, dtype=np.int32)
+            meshes.append(part)
+
+        merged = meshes[0].merge(meshes[1:], merge_points=False)
+        if not isinstance(merged, pv.PolyData):
+            merged = merged.extract_surface()
+        # Keep the face groups as plain data, not as colour scalars
+        merged.GetCellData().SetActiveScalars(None)
+        return merged
+
+    def flush(self):
+        """Add one actor per material; returns {part name: actor}"""
+        by_material = {}
+        for part in self.parts:
+            by_material.setdefault(material_key(part[2]), []).append(part)
+
+        actors = {}
+        for parts in by_material.values():
+            kwargs = dict(parts[0][2])
+            if len(parts) == 1:
+                # Nothing to merge: keep the part's own actor name
+                actor = self.plotter.add_mesh(parts[0][1], **kwargs)
+                actors[parts[0][0]] = actor
+                continue
+
+            name = f"{self.prefix}_{len(self.batches)}"
+            kwargs['name'] = name
+            mesh = self._merge(parts)
+            actor = self.plotter.add_mesh(mesh, **kwargs)
+            self.batches.append({
+                'name': name,
+                'actor': actor,
+                'mesh': mesh,
+                'groups': [part_name for part_name, _, _ in parts],
+                'parts': {part_name: part_mesh for part_name, part_mesh, _ in parts},
+                'kwargs': kwargs,
+            })
+            for part_name, _, _ in parts:
+                actors[part_name] = actor
+        self.parts = []
+        return actors
+
+    # ==================== PICKING ====================
+
+    def face_group_at(self, actor, cell_id):
+        """Part name of a picked cell of a batch actor, or None"""
+        for batch in self.batches:
+            if batch['actor'] is actor and 0 <= cell_id < batch['mesh'].n_cells:
+                group = int(batch['mesh'].cell_data[FACE_GROUP_ARRAY][cell_id])
+                return batch['groups'][group]
+        return None
+
+    def face_group_mesh(self, part_name):
+        """Cells of a merged batch that came from one part, or None"""
+        for batch in self.batches:
+            if part_name in batch['groups']:
+                group = batch['groups'].index(part_name)
+                ids = np.flatnonzero(batch['mesh'].cell_data[FACE_GROUP_ARRAY] == group)
+                return batch['mesh'].extract_cells(ids).extract_surface()
+        return None
+
+    def remove(self):
+        """Remove the merged actors from the plotter"""
+        for batch in self.batches:
+            try:
+                self.plotter.remove_actor(batch['name'], reset_camera=False)
+            except Exception:
+                pass
+        self.batches = []
@@ -4,6 +4,9 @@ roofs/base/sun_system_manager.py
 Manages sun system integration and shadow rendering
 """
 import numpy as np
+from utils.log import get_logger
+
+log = get_logger('sun')
 
 class SunSystemManager:
     """Manages sun system and shadow integration"""
@@ -19,20 +22,27 @@ class SunSystemManager:
         self.shadow_level = -0.01  # Shadows at -0.01, ground at -0.05
         
         self._find_and_configure_sun_system()
-        print("✅ SunSystemManager initialized")
+        log.debug("✅ SunSystemManager initialized")
     
     def _find_and_configure_sun_system(self):
         """Find and configure sun system - COMPREHENSIVE SEARCH"""
         try:
-            print("🔍 Searching for sun system...")
+            log.debug("🔍 Searching for sun system...")
+
+            # Method 0: Sun system kept by the layered scene graph
+            scene_graph = getattr(self.plotter, 'scene_graph', None)
+            if scene_graph and scene_graph.sun_system:
+                self.sun_system = scene_graph.sun_system
+                log.debug("✅ Found sun system via scene graph")
             
-            # Method 1: Direct plotter attributes
-            if hasattr(self.plotter, 'enhanced_sun_system'):
+            if self.sun_system:
+                pass
+            elif hasattr(self.plotter, 'enhanced_sun_system'):
                 self.sun_system = self.plotter.enhanced_sun_system
-                print("✅ Found sun system via plotter.enhanced_sun_system")
+                log.debug("✅ Found sun system via plotter.enhanced_sun_system")
             elif hasattr(self.plotter, 'sun_system'):
                 self.sun_system = self.plotter.sun_system
-                print("✅ Found sun system via plotter.sun_system")
+                log.debug("✅ Found sun system via plotter.sun_system")
             
             # Method 2: Check plotter's app reference (QtInteractor pattern)
             if not self.sun_system and hasattr(self.plotter, 'app'):
@@ -45,19 +55,19 @@ class SunSystemManager:
                         model_tab = main_window.model_tab
                         if hasattr(model_tab, 'enhanced_sun_system'):
                             self.sun_system = model_tab.enhanced_sun_system
-                            print("✅ Found sun system via app.main_window.model_tab.enhanced_sun_system")
+                            log.debug("✅ Found sun system via app.main_window.model_tab.enhanced_sun_system")
                         elif hasattr(model_tab, 'sun_system'):
                             self.sun_system = model_tab.sun_system
-                            print("✅ Found sun system via app.main_window.model_tab.sun_system")
+                            log.debug("✅ Found sun system via app.main_window.model_tab.sun_system")
                     
                     # Check main_window directly
                     if not self.sun_system:
                         if hasattr(main_window, 'enhanced_sun_system'):
                             self.sun_system = main_window.enhanced_sun_system
-                            print("✅ Found sun system via app.main_window.enhanced_sun_system")
+                            log.debug("✅ Found sun system via app.main_window.enhanced_sun_system")
                         elif hasattr(main_window, 'sun_system'):
                             self.sun_system = main_window.sun_system
-                            print("✅ Found sun system via app.main_window.sun_system")
+                            log.debug("✅ Found sun system via app.main_window.sun_system")
             
             # Method 3: Check parent hierarchy (Qt widget pattern)
             if not self.sun_system and hasattr(self.plotter, 'parent'):
@@ -67,11 +77,11 @@ class SunSystemManager:
                     # Check current parent
                     if hasattr(parent, 'enhanced_sun_system'):
                         self.sun_system = parent.enhanced_sun_system
-                        print(f"✅ Found sun system via parent hierarchy (depth {search_depth})")
+                        log.debug("✅ Found sun system via parent hierarchy (depth %s)", search_depth)
                         break
                     elif hasattr(parent, 'sun_system'):
                         self.sun_system = parent.sun_system
-                        print(f"✅ Found sun system via parent hierarchy (depth {search_depth})")
+                        log.debug("✅ Found sun system via parent hierarchy (depth %s)", search_depth)
                         break
                     
                     # Check if parent has model_tab
@@ -79,11 +89,11 @@ class SunSystemManager:
                         model_tab = parent.model_tab
                         if hasattr(model_tab, 'enhanced_sun_system'):
                             self.sun_system = model_tab.enhanced_sun_system
-                            print(f"✅ Found sun system via parent.model_tab (depth {search_depth})")
+                            log.debug("✅ Found sun system via parent.model_tab (depth %s)", search_depth)
                             break
                         elif hasattr(model_tab, 'sun_system'):
                             self.sun_system = model_tab.sun_system
-                            print(f"✅ Found sun system via parent.model_tab (depth {search_depth})")
+                            log.debug("✅ Found sun system via parent.model_tab (depth %s)", search_depth)
                             break
                     
                     # Move up the hierarchy
@@ -100,10 +110,10 @@ class SunSystemManager:
                     render_window = iren.GetRenderWindow()
                     if hasattr(render_window, 'enhanced_sun_system'):
                         self.sun_system = render_window.enhanced_sun_system
-                        print("✅ Found sun system via render window")
+                        log.debug("✅ Found sun system via render window")
                     elif hasattr(render_window, 'sun_system'):
                         self.sun_system = render_window.sun_system
-                        print("✅ Found sun system via render window")
+                        log.debug("✅ Found sun system via render window")
             
             # Method 5: Global search through model_tab module
             if not self.sun_system:
@@ -114,44 +124,44 @@ class SunSystemManager:
                         if 'model_tab' in module_name.lower():
                             if hasattr(module, '_global_sun_system'):
                                 self.sun_system = module._global_sun_system
-                                print(f"✅ Found sun system via {module_name}._global_sun_system")
+                                log.debug("✅ Found sun system via %s._global_sun_system", module_name)
                                 break
                             if hasattr(module, 'enhanced_sun_system'):
                                 self.sun_system = module.enhanced_sun_system
-                                print(f"✅ Found sun system via {module_name}.enhanced_sun_system")
+                                log.debug("✅ Found sun system via %s.enhanced_sun_system", module_name)
                                 break
                 except Exception as e:
-                    print(f"⚠️ Global search failed: {e}")
+                    log.warning("⚠️ Global search failed: %s", e)
             
             # Method 6: Check plotter's renderer for lights (indirect check)
             if not self.sun_system and hasattr(self.plotter, 'renderer'):
                 renderer = self.plotter.renderer
                 if hasattr(renderer, 'enhanced_sun_system'):
                     self.sun_system = renderer.enhanced_sun_system
-                    print("✅ Found sun system via renderer")
+                    log.debug("✅ Found sun system via renderer")
                 elif hasattr(renderer, 'sun_system'):
                     self.sun_system = renderer.sun_system
-                    print("✅ Found sun system via renderer")
+                    log.debug("✅ Found sun system via renderer")
             
             # Configure if found
             if self.sun_system:
-                print(f"✅ Sun system found: {type(self.sun_system)}")
+                log.debug("✅ Sun system found: %s", type(self.sun_system))
                 self._configure_sun_system()
                 # Register ground for shadows
                 self._register_ground_for_shadows()
                 return True
             else:
-                print("⚠️ No sun system found - shadows will not work")
-                print("   Searched locations:")
-                print("   - plotter.enhanced_sun_system / plotter.sun_system")
-                print("   - plotter.app.main_window.model_tab")
-                print("   - plotter parent hierarchy")
-                print("   - render window")
-                print("   - global module references")
+                log.warning("⚠️ No sun system found - shadows will not work")
+                log.debug("   Searched locations:")
+                log.debug("   - plotter.enhanced_sun_system / plotter.sun_system")
+                log.debug("   - plotter.app.main_window.model_tab")
+                log.debug("   - plotter parent hierarchy")
+                log.debug("   - render window")
+                log.debug("   - global module references")
                 return False
                 
         except Exception as e:
-            print(f"❌ Error finding sun system: {e}")
+            log.error("❌ Error finding sun system: %s", e)
             import traceback
             traceback.print_exc()
             return False
@@ -162,9 +172,9 @@ class SunSystemManager:
             if not self.sun_system:
                 return
             
-            print("⚙️ Configuring sun system...")
-            print(f"   Sun system type: {type(self.sun_system)}")
-            print(f"   Available methods: {[m for m in dir(self.sun_system) if not m.startswith('_')][:10]}...")
+            log.debug("⚙️ Configuring sun system...")
+            log.debug("   Sun system type: %s", type(self.sun_system))
+            log.debug("   Available methods: %s...", [m for m in dir(self.sun_system) if not m.startswith('_')][:10])
             
             building_center = self._calculate_building_center()
             building_dims = self._calculate_building_dimensions()
@@ -173,60 +183,60 @@ class SunSystemManager:
             if building_center:
                 if hasattr(self.sun_system, 'set_building_center'):
                     self.sun_system.set_building_center(building_center)
-                    print(f"✅ Set building center: {building_center}")
+                    log.debug("✅ Set building center: %s", building_center)
                 elif hasattr(self.sun_system, 'building_center'):
                     self.sun_system.building_center = building_center
-                    print(f"✅ Set building_center attribute: {building_center}")
+                    log.debug("✅ Set building_center attribute: %s", building_center)
             
             # Set building dimensions
             if building_dims:
                 width, length, height, roof_height = building_dims
                 if hasattr(self.sun_system, 'set_building_dimensions'):
                     self.sun_system.set_building_dimensions(width, length, height, roof_height)
-                    print(f"✅ Set building dimensions: {width}x{length}x{height} (roof: {roof_height})")
+                    log.debug("✅ Set building dimensions: %sx%sx%s (roof: %s)", width, length, height, roof_height)
                 elif hasattr(self.sun_system, 'building_width'):
                     self.sun_system.building_width = width
                     self.sun_system.building_length = length
                     self.sun_system.building_height = height
                     self.sun_system.roof_height = roof_height
-                    print(f"✅ Set dimension attributes")
+                    log.debug("✅ Set dimension attributes")
             
             # CRITICAL: Set shadow level ABOVE ground
             if hasattr(self.sun_system, 'shadow_level'):
                 self.sun_system.shadow_level = self.shadow_level  # -0.01 (above -0.05 ground)
-                print(f"✅ Set shadow_level: {self.sun_system.shadow_level}")
+                log.debug("✅ Set shadow_level: %s", self.sun_system.shadow_level)
             
             if hasattr(self.sun_system, 'set_shadow_height'):
                 self.sun_system.set_shadow_height(self.shadow_level)
-                print(f"✅ Called set_shadow_height({self.shadow_level})")
+                log.debug("✅ Called set_shadow_height(%s)", self.shadow_level)
             
             if hasattr(self.sun_system, 'shadow_height'):
                 self.sun_system.shadow_height = self.shadow_level
-                print(f"✅ Set shadow_height attribute: {self.shadow_level}")
+                log.debug("✅ Set shadow_height attribute: %s", self.shadow_level)
             
             # Enable shadows if not already enabled
             if hasattr(self.sun_system, 'enable_shadows'):
                 self.sun_system.enable_shadows(True)
-                print("✅ Called enable_shadows(True)")
+                log.debug("✅ Called enable_shadows(True)")
             elif hasattr(self.sun_system, 'shadows_enabled'):
                 self.sun_system.shadows_enabled = True
-                print("✅ Set shadows_enabled = True")
+                log.debug("✅ Set shadows_enabled = True")
             
             # Try to update/refresh the sun system
             if hasattr(self.sun_system, 'update'):
                 self.sun_system.update()
-                print("✅ Called sun_system.update()")
+                log.debug("✅ Called sun_system.update()")
             elif hasattr(self.sun_system, 'update_lighting'):
                 self.sun_system.update_lighting()
-                print("✅ Called sun_system.update_lighting()")
+                log.debug("✅ Called sun_system.update_lighting()")
             elif hasattr(self.sun_system, '_update_shadows_only'):
                 self.sun_system._update_shadows_only()
-                print("✅ Called sun_system._update_shadows_only()")
+                log.debug("✅ Called sun_system._update_shadows_only()")
             
-            print("✅ Sun system configured")
+            log.debug("✅ Sun system configured")
             
         except Exception as e:
-            print(f"❌ Error configuring sun system: {e}")
+            log.error("❌ Error configuring sun system: %s", e)
             import traceback
             traceback.print_exc()
     
@@ -234,26 +244,26 @@ class SunSystemManager:
         """Register ground mesh to receive shadows"""
         try:
             if not self.sun_system:
-                print("⚠️ No sun system - cannot register ground")
+                log.warning("⚠️ No sun system - cannot register ground")
                 return
             
             if self.shadow_ground_registered:
-                print("⚠️ Ground already registered")
+                log.warning("⚠️ Ground already registered")
                 return
             
             # Wait for ground mesh to be available
             if not hasattr(self.roof, 'environment_manager'):
-                print("⚠️ No environment manager yet")
+                log.warning("⚠️ No environment manager yet")
                 return
             
             if not self.roof.environment_manager.ground_mesh:
-                print("⚠️ No ground mesh yet")
+                log.warning("⚠️ No ground mesh yet")
                 return
             
             ground_mesh = self.roof.environment_manager.ground_mesh
             shadow_receive_level = self.shadow_level  # -0.01
             
-            print(f"📋 Registering ground for shadows at level {shadow_receive_level}")
+            log.debug("📋 Registering ground for shadows at level %s", shadow_receive_level)
             
             # Try multiple registration methods
             registration_successful = False
@@ -262,7 +272,7 @@ class SunSystemManager:
             if hasattr(self.sun_system, 'register_shadow_receiver'):
                 self.sun_system.register_shadow_receiver(ground_mesh, shadow_receive_level)
                 registration_successful = True
-                print(f"✅ Called register_shadow_receiver(ground_mesh, {shadow_receive_level})")
+                log.debug("✅ Called register_shadow_receiver(ground_mesh, %s)", shadow_receive_level)
             
             # Method 2: set_ground_mesh
             if hasattr(self.sun_system, 'set_ground_mesh'):
@@ -270,13 +280,13 @@ class SunSystemManager:
                 if hasattr(self.sun_system, 'set_shadow_height'):
                     self.sun_system.set_shadow_height(shadow_receive_level)
                 registration_successful = True
-                print(f"✅ Called set_ground_mesh() and set_shadow_height({shadow_receive_level})")
+                log.debug("✅ Called set_ground_mesh() and set_shadow_height(%s)", shadow_receive_level)
             
             # Method 3: register_ground_plane
             if hasattr(self.sun_system, 'register_ground_plane'):
                 self.sun_system.register_ground_plane(ground_mesh, shadow_receive_level)
                 registration_successful = True
-                print(f"✅ Called register_ground_plane(ground_mesh, {shadow_receive_level})")
+                log.debug("✅ Called register_ground_plane(ground_mesh, %s)", shadow_receive_level)
             
             # Method 4: register_scene_object (no shadow casting)
             if hasattr(self.sun_system, 'register_scene_object'):
@@ -287,21 +297,21 @@ class SunSystemManager:
                     receive_shadow=True
                 )
                 registration_successful = True
-                print("✅ Called register_scene_object(ground_mesh, receive_shadow=True)")
+                log.debug("✅ Called register_scene_object(ground_mesh, receive_shadow=True)")
             
             # Method 5: Direct attribute setting
             if hasattr(self.sun_system, 'ground_mesh'):
                 self.sun_system.ground_mesh = ground_mesh
                 registration_successful = True
-                print("✅ Set sun_system.ground_mesh attribute")
+                log.debug("✅ Set sun_system.ground_mesh attribute")
             
             if hasattr(self.sun_system, 'ground_level'):
                 self.sun_system.ground_level = self.roof.grass_ground_level
-                print(f"✅ Set sun_system.ground_level = {self.roof.grass_ground_level}")
+                log.debug("✅ Set sun_system.ground_level = %s", self.roof.grass_ground_level)
             
             if registration_successful:
                 self.shadow_ground_registered = True
-                print("✅ Ground registered for shadows")
+                log.debug("✅ Ground registered for shadows")
                 
                 # Force update after registration
                 if hasattr(self.sun_system, '_update_shadows_only'):
@@ -309,10 +319,10 @@ class SunSystemManager:
                 elif hasattr(self.sun_system, 'update_lighting'):
                     self.sun_system.update_lighting()
             else:
-                print("⚠️ Could not register ground - no compatible methods found")
+                log.warning("⚠️ Could not register ground - no compatible methods found")
             
         except Exception as e:
-            print(f"⚠️ Could not register ground for shadows: {e}")
+            log.warning("⚠️ Could not register ground for shadows: %s", e)
             import traceback
             traceback.print_exc()
     
@@ -336,7 +346,7 @@ class SunSystemManager:
             return default_center
             
         except Exception as e:
-            print(f"⚠️ Error calculating building center: {e}")
+            log.warning("⚠️ Error calculating building center: %s", e)
             return [0, 0, self.roof.base_height / 2]
     
     def _calculate_building_dimensions(self):
@@ -352,7 +362,7 @@ class SunSystemManager:
             return default_dims
             
         except Exception as e:
-            print(f"⚠️ Error calculating dimensions: {e}")
+            log.warning("⚠️ Error calculating dimensions: %s", e)
             return (8.0, 10.0, self.roof.base_height, 4.0)
     
     def add_sun_compatible_mesh(self, mesh, **kwargs):
@@ -420,13 +430,13 @@ class SunSystemManager:
             
             if hasattr(self.sun_system, 'register_scene_object'):
                 self.sun_system.register_scene_object(mesh, name, cast_shadow=True)
-                print(f"✅ Registered '{name}' for shadow casting")
+                log.debug("✅ Registered '%s' for shadow casting", name)
             elif hasattr(self.sun_system, 'add_shadow_caster'):
                 self.sun_system.add_shadow_caster(mesh, name)
-                print(f"✅ Added '{name}' as shadow caster")
+                log.debug("✅ Added '%s' as shadow caster", name)
             elif hasattr(self.sun_system, 'register_mesh'):
                 self.sun_system.register_mesh(mesh, name)
-                print(f"✅ Registered mesh '{name}'")
+                log.debug("✅ Registered mesh '%s'", name)
         
         return actor
     
@@ -464,21 +474,21 @@ class SunSystemManager:
                 self._register_ground_for_shadows()
             
         except Exception as e:
-            print(f"❌ Error updating sun system: {e}")
+            log.error("❌ Error updating sun system: %s", e)
     
     def force_shadow_update(self):
         """Force an immediate shadow update"""
         try:
             if not self.sun_system:
-                print("⚠️ No sun system for shadow update")
+                log.warning("⚠️ No sun system for shadow update")
                 return
             
-            print("🔄 Forcing shadow update...")
+            log.debug("🔄 Forcing shadow update...")
             
             # Ensure shadow level is set
             if hasattr(self.sun_system, 'shadow_level'):
                 self.sun_system.shadow_level = self.shadow_level
-                print(f"   Shadow level: {self.shadow_level}")
+                log.debug("   Shadow level: %s", self.shadow_level)
             
             if hasattr(self.sun_system, 'set_shadow_height'):
                 self.sun_system.set_shadow_height(self.shadow_level)
@@ -489,33 +499,33 @@ class SunSystemManager:
             if hasattr(self.sun_system, '_update_shadows_only'):
                 self.sun_system._update_shadows_only()
                 update_called = True
-                print("✅ Called _update_shadows_only()")
+                log.debug("✅ Called _update_shadows_only()")
             
             if hasattr(self.sun_system, 'update_shadows'):
                 self.sun_system.update_shadows()
                 update_called = True
-                print("✅ Called update_shadows()")
+                log.debug("✅ Called update_shadows()")
             
             if hasattr(self.sun_system, 'update_lighting'):
                 self.sun_system.update_lighting()
                 update_called = True
-                print("✅ Called update_lighting()")
+                log.debug("✅ Called update_lighting()")
             
             if hasattr(self.sun_system, 'update'):
                 self.sun_system.update()
                 update_called = True
-                print("✅ Called update()")
+                log.debug("✅ Called update()")
             
             if hasattr(self.sun_system, 'render'):
                 self.sun_system.render()
                 update_called = True
-                print("✅ Called render()")
+                log.debug("✅ Called render()")
             
             if not update_called:
-                print("⚠️ No update method found on sun system")
+                log.warning("⚠️ No update method found on sun system")
             
         except Exception as e:
-            print(f"⚠️ Could not force shadow update: {e}")
+            log.warning("⚠️ Could not force shadow update: %s", e)
             import traceback
             traceback.print_exc()
     
@@ -523,4 +533,4 @@ class SunSystemManager:
         """Cleanup sun system manager"""
         self.sun_system = None
         self.shadow_ground_registered = False
-        print("✅ SunSystemManager cleanup completed")
+        log.debug("✅ SunSystemManager cleanup completed")
@@ -8,6 +8,9 @@ import pyvista as pv
 import numpy as np
 from .resource_utils import resource_path
 
+# Textures shared by all roofs (kept across roof type switches)
+_TEXTURE_CACHE = {}
+
 class TextureManager:
     """Manages all texture loading and material properties"""
     
@@ -69,6 +72,16 @@ class TextureManager:
         if not filename:
             return default_color, False
         
+        if filename in _TEXTURE_CACHE:
+            return _TEXTURE_CACHE[filename], True
+        
+        texture, loaded = self._load_texture_uncached(filename, default_color)
+        if loaded:
+            _TEXTURE_CACHE[filename] = texture
+        return texture, loaded
+    
+    def _load_texture_uncached(self, filename, default_color):
+        """Load a texture from disk, trying alternative extensions and locations"""
         base_filename = os.path.basename(filename)
         
         # Try the direct path first
@@ -4,7 +4,9 @@ roofs/concrete/flat_roof.py
 Fixed FlatRoof - annotations properly centered with the building
 """
 from roofs.base.base_roof import BaseRoof
+from roofs.base.attachment_points import AttachmentPointStore
 from roofs.base.resource_utils import resource_path
+from utils.tracing import traced
 from roofs.roof_annotation import RoofAnnotation
 from translations import _
 import pyvista as pv
@@ -138,6 +140,7 @@ class FlatRoof(BaseRoof):
         except Exception as e:
             pass
     
+    @traced('roof.geometry.flat', 'roof')
     def create_roof_geometry(self):
         """Create flat roof CENTERED on the grass plane"""
         # Calculate half dimensions for centering
@@ -163,17 +166,18 @@ class FlatRoof(BaseRoof):
             'top_left': np.array([self.parapet_width, self.width - self.parapet_width, roof_z])
         }
         
-        # Create roof mesh
-        self._create_roof_surface(roof_vertices)
-        
-        # Create building walls (centered)
-        self._create_building_walls_centered()
-        
-        # Create parapet walls (centered) - FIXED VERSION
-        self._create_parapet_walls_centered()
-        
-        # Add foundation (centered)
-        self._add_foundation_centered()
+        with self.batch_static_meshes():
+            # Create roof mesh
+            self._create_roof_surface(roof_vertices)
+            
+            # Create building walls (centered)
+            self._create_building_walls_centered()
+            
+            # Create parapet walls (centered) - FIXED VERSION
+            self._create_parapet_walls_centered()
+            
+            # Add foundation (centered)
+            self._add_foundation_centered()
         
     def _create_roof_surface(self, vertices):
         """Create the flat roof surface with wall.jpg texture"""
@@ -196,7 +200,7 @@ class FlatRoof(BaseRoof):
         )
         
         if texture_loaded:
-            self.plotter.add_mesh(
+            self.add_static_mesh(
                 self.roof_mesh,
                 texture=roof_texture,
                 name="roof",
@@ -206,7 +210,7 @@ class FlatRoof(BaseRoof):
                 specular=0.05
             )
         else:
-            self.plotter.add_mesh(
+            self.add_static_mesh(
                 self.roof_mesh,
                 color=self.roof_color,
                 name="roof",
@@ -264,7 +268,7 @@ class FlatRoof(BaseRoof):
         )
         
         if texture_loaded:
-            self.plotter.add_mesh(
+            self.add_static_mesh(
                 wall_mesh,
                 texture=wall_texture,
                 name="building_walls",
@@ -274,7 +278,7 @@ class FlatRoof(BaseRoof):
                 specular=0.05
             )
         else:
-            self.plotter.add_mesh(
+            self.add_static_mesh(
                 wall_mesh,
                 color=self.wall_color,
                 name="building_walls",
@@ -343,7 +347,7 @@ class FlatRoof(BaseRoof):
                 parapet.active_texture_coordinates = texture_coords
                 
                 # Add mesh with texture
-                self.plotter.add_mesh(
+                self.add_static_mesh(
                     parapet,
                     texture=parapet_texture,
                     name=name,
@@ -354,7 +358,7 @@ class FlatRoof(BaseRoof):
                 )
             else:
                 # Add mesh without texture (fallback to color)
-                self.plotter.add_mesh(
+                self.add_static_mesh(
                     parapet,
                     color=self.parapet_color,
                     name=name,
@@ -376,7 +380,7 @@ class FlatRoof(BaseRoof):
             -foundation_height, 0
         ))
         
-        self.plotter.add_mesh(
+        self.add_static_mesh(
             foundation,
             color=self.concrete_color,
             name="foundation",
@@ -436,7 +440,7 @@ class FlatRoof(BaseRoof):
                 self.attachment_point_actor = None
             
             self.attachment_points = []
-            self.attachment_points_occupied = {}
+            self.attachment_points_occupied = AttachmentPointStore()
             self.face_normals = {}
             self.obstacle_placed_this_session = False
             
@@ -463,15 +467,8 @@ class FlatRoof(BaseRoof):
                     point_index += 1
             
             # Initialize tracking
-            for i, point in enumerate(self.attachment_points):
-                self.attachment_points_occupied[i] = {
-                    'position': point,
-                    'occupied': False,
-                    'obstacle': None,
-                    'normal': self.face_normals[i]['normal'],
-                    'face': self.face_normals[i]['face'],
-                    'roof_point': self.face_normals[i]['roof_point']
-                }
+            self.attachment_points_occupied = AttachmentPointStore.from_face_points(
+                self.attachment_points, self.face_normals)
             
             # Create visualization
             if self.attachment_points:
@@ -485,6 +482,7 @@ class FlatRoof(BaseRoof):
                     pickable=False,
                     lighting=False  # No lighting = no shadow casting
                 )
+                self.track_actor('overlays', self.attachment_point_actor)
                 
                 self._setup_roof_obstacle_click()
                 
@@ -3,7 +3,9 @@
 roofs/concrete/gable_roof.py - With automatic shadow updates on rotation
 """
 from roofs.base.base_roof import BaseRoof
+from roofs.base.attachment_points import AttachmentPointStore
 from roofs.base.resource_utils import resource_path
+from utils.tracing import traced
 import pyvista as pv
 import numpy as np
 import os
@@ -152,6 +154,7 @@ class GableRoof(BaseRoof):
         """Get the current north direction after rotation"""
         return self._rotate_vector(self.original_north_vector)
     
+    @traced('roof.geometry.gable', 'roof')
     def create_roof_geometry(self):
         """Create gable roof geometry"""
         half_length = self.length / 2
@@ -189,7 +192,7 @@ class GableRoof(BaseRoof):
         
         try:
             # Register all building components
-            for name, mesh in self.mesh_cache.items():
+            for name, mesh in self.static_shadow_meshes(self.mesh_cache).items():
                 if mesh and hasattr(self.sun_system, 'register_scene_object'):
                     # Don't register foundation for shadow casting
                     cast_shadow = 'foundation' not in name.lower()
@@ -246,11 +249,12 @@ class GableRoof(BaseRoof):
         self._update_rotated_surface_normals()
     
     def _create_all_meshes(self):
-        """Create all meshes and add them to the scene"""
-        self._create_smooth_roof_slopes()
-        self._create_walls()
-        self._create_gable_triangles()
-        self._add_foundation()
+        """Create all meshes and add them to the scene (one actor per material)"""
+        with self.batch_static_meshes():
+            self._create_smooth_roof_slopes()
+            self._create_walls()
+            self._create_gable_triangles()
+            self._add_foundation()
     
     def _safe_compute_normals(self, mesh):
         """Safely compute normals with PyVista version compatibility"""
@@ -380,7 +384,7 @@ class GableRoof(BaseRoof):
             wall_mesh.faces = np.hstack(wall_faces)
             self._safe_compute_normals(wall_mesh)
             
-            self.mesh_cache['walls'] = wall_mesh
+            self.mesh_cache['building_walls'] = wall_mesh
             
             # Texture coordinates
             texture_coords = []
@@ -432,8 +436,8 @@ class GableRoof(BaseRoof):
             back_gable = pv.PolyData(back_tri_verts, back_tri_faces)
             self._safe_compute_normals(back_gable)
             
-            self.mesh_cache['front_gable'] = front_gable
-            self.mesh_cache['back_gable'] = back_gable
+            self.mesh_cache['front_gable_triangle'] = front_gable
+            self.mesh_cache['back_gable_triangle'] = back_gable
             
             triangle_tcoords = np.array([[0, 0], [1, 0], [0.5, 1]])
             front_gable.active_texture_coordinates = triangle_tcoords
@@ -683,7 +687,7 @@ class GableRoof(BaseRoof):
                 self.attachment_point_actor = None
             
             self.attachment_points = []
-            self.attachment_points_occupied = {}
+            self.attachment_points_occupied = AttachmentPointStore()
             self.face_normals = {}
             self.obstacle_placed_this_session = False
             
@@ -753,16 +757,9 @@ class GableRoof(BaseRoof):
                     }
                     point_index += 1
             
-            # Create occupied points dictionary
-            for i, point in enumerate(self.attachment_points):
-                self.attachment_points_occupied[i] = {
-                    'position': point,
-                    'occupied': False,
-                    'obstacle': None,
-                    'normal': self.face_normals[i]['normal'],
-                    'face': self.face_normals[i]['face'],
-                    'roof_point': self.face_normals[i]['roof_point']
-                }
+            # Initialize tracking
+            self.attachment_points_occupied = AttachmentPointStore.from_face_points(
+                self.attachment_points, self.face_normals)
             
             # Visualize attachment points
             if self.attachment_points:
@@ -776,6 +773,7 @@ class GableRoof(BaseRoof):
                     pickable=False,
                     lighting=False  # No lighting = no shadow casting
                 )
+                self.track_actor('overlays', self.attachment_point_actor)
                 
                 # Enable click-to-place via VTK observers (shadow-safe)
                 self._setup_roof_obstacle_click()
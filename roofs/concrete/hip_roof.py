@@ -4,7 +4,9 @@ roofs/concrete/hip_roof.py
 Complete HipRoof with building structure, textures, and environment like PyramidRoof
 """
 from roofs.base.base_roof import BaseRoof
+from roofs.base.attachment_points import AttachmentPointStore
 from roofs.base.resource_utils import resource_path
+from utils.tracing import traced
 from roofs.roof_annotation import RoofAnnotation
 from translations import _
 import pyvista as pv
@@ -88,6 +90,7 @@ class HipRoof(BaseRoof):
         except Exception as e:
             pass
     
+    @traced('roof.geometry.hip', 'roof')
     def create_roof_geometry(self):
         """Create hip roof at the top of the building"""
         half_length = self.length / 2
@@ -391,14 +394,6 @@ class HipRoof(BaseRoof):
             self.plotter.add_key_event("3", lambda: self.safe_add_panels("back"))
             self.plotter.add_key_event("4", lambda: self.safe_add_panels("left"))
     
-    def safe_add_panels(self, side):
-        """Safely add panels"""
-        try:
-            if hasattr(self, 'solar_panel_handler') and self.solar_panel_handler:
-                self.solar_panel_handler.add_panels(side)
-        except Exception as e:
-            pass
-    
     def get_solar_panel_areas(self):
         """Get valid panel areas"""
         return ["front", "right", "back", "left"]
@@ -430,7 +425,7 @@ class HipRoof(BaseRoof):
                 self.attachment_point_actor = None
             
             self.attachment_points = []
-            self.attachment_points_occupied = {}
+            self.attachment_points_occupied = AttachmentPointStore()
             self.face_normals = {}
             self.obstacle_placed_this_session = False
             
@@ -530,16 +525,9 @@ class HipRoof(BaseRoof):
                             }
                             point_index += 1
             
-            # Initialize tracking dictionary
-            for i, point in enumerate(self.attachment_points):
-                self.attachment_points_occupied[i] = {
-                    'position': point,
-                    'occupied': False,
-                    'obstacle': None,
-                    'normal': self.face_normals[i]['normal'] if i in self.face_normals else None,
-                    'face': self.face_normals[i]['face'] if i in self.face_normals else None,
-                    'roof_point': self.face_normals[i]['roof_point'] if i in self.face_normals else None
-                }
+            # Initialize tracking
+            self.attachment_points_occupied = AttachmentPointStore.from_face_points(
+                self.attachment_points, self.face_normals)
             
             # Create point cloud for visualization
             if self.attachment_points:
@@ -553,6 +541,7 @@ class HipRoof(BaseRoof):
                     pickable=False,
                     lighting=False  # No lighting = no shadow casting
                 )
+                self.track_actor('overlays', self.attachment_point_actor)
                 
                 self._setup_roof_obstacle_click()
                 
@@ -644,11 +633,8 @@ class HipRoof(BaseRoof):
                     self.update_instruction(_('obstacle_max_reached') + " (6/6)")
                 
                 if hasattr(self, 'solar_panel_handler') and self.solar_panel_handler:
-                    if hasattr(self.solar_panel_handler, 'active_sides'):
-                        active_sides = list(self.solar_panel_handler.active_sides)
-                        for side in active_sides:
-                            self.solar_panel_handler.remove_panels_from_side(side)
-                            self.solar_panel_handler.add_panels(side)
+                    # Re-place the active sides once, after the click handler returns
+                    self.solar_panel_handler.request_refresh()
             else:
                 self.update_instruction(_("Failed to add obstacle. Try a different location."))
                 
@@ -662,17 +648,7 @@ class HipRoof(BaseRoof):
             if not hasattr(self, 'attachment_points_occupied') or not self.attachment_points_occupied:
                 return None
             
-            min_distance = float('inf')
-            closest_index = None
-            
-            for idx, point_data in self.attachment_points_occupied.items():
-                point = point_data['position']
-                distance = np.linalg.norm(point - clicked_position)
-                
-                if distance < min_distance:
-                    min_distance = distance
-                    closest_index = idx
-            
+            closest_index, _ = self.attachment_points_occupied.nearest(clicked_position)
             return closest_index
         except Exception as e:
             return None
@@ -4,7 +4,9 @@ roofs/concrete/pyramid_roof.py
 Complete PyramidRoof matching GableRoof structure and functionality
 """
 from roofs.base.base_roof import BaseRoof
+from roofs.base.attachment_points import AttachmentPointStore
 from roofs.base.resource_utils import resource_path
+from utils.tracing import traced
 from roofs.roof_annotation import RoofAnnotation
 from translations import _
 import pyvista as pv
@@ -156,6 +158,7 @@ class PyramidRoof(BaseRoof):
         """Get the current north direction after rotation - MATCH GABLE ROOF"""
         return self._rotate_vector(self.original_north_vector)
     
+    @traced('roof.geometry.pyramid', 'roof')
     def create_roof_geometry(self):
         """Create pyramid roof with building base - MATCH GABLE ROOF STRUCTURE"""
         half_length = self.length / 2
@@ -251,14 +254,15 @@ class PyramidRoof(BaseRoof):
     
     def _create_all_meshes(self):
         """Create all building meshes - MATCH GABLE ROOF"""
-        # Create pyramid roof faces
-        self._create_pyramid_faces()
-        
-        # Create building walls
-        self._create_building_walls()
-        
-        # Create foundation
-        self._create_foundation()
+        with self.batch_static_meshes():
+            # Create pyramid roof faces
+            self._create_pyramid_faces()
+            
+            # Create building walls
+            self._create_building_walls()
+            
+            # Create foundation
+            self._create_foundation()
     
     def _create_pyramid_faces(self):
         """Create pyramid roof faces - MATCH GABLE ROOF PATTERN"""
@@ -453,7 +457,7 @@ class PyramidRoof(BaseRoof):
             return
         
         try:
-            for name, mesh in self.mesh_cache.items():
+            for name, mesh in self.static_shadow_meshes(self.mesh_cache).items():
                 if mesh and hasattr(self.sun_system, 'register_scene_object'):
                     cast_shadow = 'foundation' not in name.lower()
                     self.sun_system.register_scene_object(mesh, name, cast_shadow)
@@ -616,22 +620,6 @@ class PyramidRoof(BaseRoof):
         except Exception as e:
             pass
     
-    def safe_add_panels(self, side):
-        """Safely add panels"""
-        try:
-            if hasattr(self, 'solar_panel_handler') and self.solar_panel_handler:
-                self.solar_panel_handler.add_panels(side)
-        except Exception as e:
-            pass
-    
-    def safe_clear_panels(self):
-        """Safely clear panels"""
-        try:
-            if hasattr(self, 'solar_panel_handler') and self.solar_panel_handler:
-                self.solar_panel_handler.clear_panels()
-        except Exception as e:
-            pass
-    
     def get_solar_panel_areas(self):
         """Get panel areas"""
         return ["front", "right", "back", "left"]
@@ -663,7 +651,7 @@ class PyramidRoof(BaseRoof):
                 self.attachment_point_actor = None
             
             self.attachment_points = []
-            self.attachment_points_occupied = {}
+            self.attachment_points_occupied = AttachmentPointStore()
             self.face_normals = {}
             self.obstacle_placed_this_session = False
             
@@ -784,16 +772,9 @@ class PyramidRoof(BaseRoof):
                             }
                             point_index += 1
             
-            # Create occupied points dict
-            for i, point in enumerate(self.attachment_points):
-                self.attachment_points_occupied[i] = {
-                    'position': point,
-                    'occupied': False,
-                    'obstacle': None,
-                    'normal': self.face_normals[i]['normal'] if i in self.face_normals else None,
-                    'face': self.face_normals[i]['face'] if i in self.face_normals else None,
-                    'roof_point': self.face_normals[i]['roof_point'] if i in self.face_normals else None
-                }
+            # Initialize tracking
+            self.attachment_points_occupied = AttachmentPointStore.from_face_points(
+                self.attachment_points, self.face_normals)
             
             # Add points to scene
             if self.attachment_points:
@@ -807,6 +788,7 @@ class PyramidRoof(BaseRoof):
                     pickable=False,
                     lighting=False  # No lighting = no shadow casting
                 )
+                self.track_actor('overlays', self.attachment_point_actor)
                 
                 self._setup_roof_obstacle_click()
                 
@@ -896,11 +878,8 @@ class PyramidRoof(BaseRoof):
                 
                 # Update solar panels
                 if hasattr(self, 'solar_panel_handler') and self.solar_panel_handler:
-                    if hasattr(self.solar_panel_handler, 'active_sides'):
-                        active_sides = list(self.solar_panel_handler.active_sides)
-                        for side in active_sides:
-                            self.solar_panel_handler.remove_panels_from_side(side)
-                            self.solar_panel_handler.add_panels(side)
+                    # Re-place the active sides once, after the click handler returns
+                    self.solar_panel_handler.request_refresh()
             else:
                 self.update_instruction(_("Failed to add obstacle. Try a different location."))
                 
@@ -914,17 +893,7 @@ class PyramidRoof(BaseRoof):
             if not hasattr(self, 'attachment_points_occupied') or not self.attachment_points_occupied:
                 return None
             
-            min_distance = float('inf')
-            closest_index = None
-            
-            for idx, point_data in self.attachment_points_occupied.items():
-                point = point_data['position']
-                distance = np.linalg.norm(point - clicked_position)
-                
-                if distance < min_distance:
-                    min_distance = distance
-                    closest_index = idx
-            
+            closest_index, _ = self.attachment_points_occupied.nearest(clicked_position)
             return closest_index
         except Exception as e:
             return None
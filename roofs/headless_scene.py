@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+roofs/headless_scene.py
+Build roofs and panel layouts on an off-screen plotter (no Qt window)
+"""
+import numpy as np
+import pyvista as pv
+
+from roofs.solar_panel_handlers.config import SIDE_AZIMUTH, get_default_config
+from utils.log import get_logger
+
+log = get_logger('roof')
+
+ROOF_TYPES = ('flat', 'gable', 'hip', 'pyramid')
+
+
+def _roof_class(roof_type):
+    """Import the concrete roof class lazily (each pulls in Qt and textures)"""
+    roof_type = roof_type.lower()
+    if roof_type == 'flat':
+        from roofs.concrete.flat_roof import FlatRoof
+        return FlatRoof
+    if roof_type == 'gable':
+        from roofs.concrete.gable_roof import GableRoof
+        return GableRoof
+    if roof_type == 'hip':
+        from roofs.concrete.hip_roof import HipRoof
+        return HipRoof
+    if roof_type == 'pyramid':
+        from roofs.concrete.pyramid_roof import PyramidRoof
+        return PyramidRoof
+    raise ValueError(f"Unknown roof type: {roof_type}. Available: {list(ROOF_TYPES)}")
+
+
+def roof_type_of(roof):
+    """Roof type name ('flat', 'gable', 'hip', 'pyramid') for a roof instance"""
+    name = type(roof).__name__.lower()
+    for roof_type in ROOF_TYPES:
+        if name.startswith(roof_type):
+            return roof_type
+    return None
+
+
+def create_headless_roof(roof_type, dimensions, plotter=None):
+    """Create a roof of `roof_type` on an off-screen plotter.
+
+    dimensions is (length, width, height) like RoofGenerationManager passes.
+    """
+    if plotter is None:
+        plotter = pv.Plotter(off_screen=True)
+    roof_class = _roof_class(roof_type)
+    return roof_class(plotter=plotter, dimensions=tuple(float(d) for d in dimensions),
+                      theme="light")
+
+
+def roof_sides(roof_type):
+    """Panel sides available for a roof type"""
+    if roof_type.lower() == 'flat':
+        return ['center', 'north', 'south', 'east', 'west']
+    if roof_type.lower() == 'gable':
+        return ['left', 'right']
+    return ['front', 'right', 'back', 'left']
+
+
+def max_active_sides(roof_type):
+    """Side limit from ROOF_SPECIFIC_CONFIG (None when unlimited)"""
+    return get_default_config(roof_type).get('max_active_sides')
+
+
+def roof_obstacle_specs(roof):
+    """Plain-data (JSON-safe) description of a roof's placed obstacles"""
+    specs = []
+    for obstacle in getattr(roof, 'obstacles', None) or []:
+        try:
+            specs.append({
+                'type': obstacle.type,
+                'position': [float(v) for v in obstacle.position],
+                'dimensions': [float(v) for v in obstacle.dimensions],
+                'normal_vector': (None if obstacle.normal_vector is None
+                                  else [float(v) for v in obstacle.normal_vector]),
+                'face': obstacle.face,
+            })
+        except Exception:
+            continue
+    return specs
+
+
+def place_roof_obstacles(roof, specs):
+    """Re-create obstacles from roof_obstacle_specs on another roof.
+
+    Call before placing panels: add_panels only avoids obstacles already in
+    roof.obstacles. Returns the number of obstacles placed.
+    """
+    placed = 0
+    for item in specs or []:
+        try:
+            roof.obstacle_dimensions = tuple(item['dimensions'])
+            obstacle = roof.place_obstacle_at_point(
+                np.array(item['position']), item['type'],
+                normal_vector=None if item.get('normal_vector') is None else np.array(item['normal_vector']),
+                face=item.get('face'))
+            roof.obstacles.append(obstacle)
+            placed += 1
+        except Exception as e:
+            log.warning("⚠️ Headless scene: obstacle %s skipped: %s", item.get('type'), e)
+    return placed
+
+
+def panel_layout(roof, panel_config, sides):
+    """Place panels on each side independently and return their centres.
+
+    Returns {side: np.ndarray (n, 3)} in the unrotated building frame.
+    The roof's panels are cleared afterwards.
+    """
+    handler = getattr(roof, 'solar_panel_handler', None)
+    if handler is None:
+        return {}
+
+    handler.update_panel_config(panel_config)
+
+    layout = {}
+    for side in sides:
+        handler.add_panels(side)
+        positions = handler.panel_positions_by_side.get(side, [])
+        layout[side] = np.array(positions, dtype=float).reshape(-1, 3)
+        # Free the side again so the next one is not hit by the side limit
+        if side in handler.active_sides and hasattr(handler, 'remove_panels_from_side'):
+            handler.remove_panels_from_side(side)
+
+    handler.clear_panels()
+    return layout
+
+
+def face_orientation(roof, side, rotation_deg=0.0):
+    """(tilt radians, azimuth degrees) of a roof side after rotating the
+    building by rotation_deg counter-clockwise about the vertical axis"""
+    tilt = float(getattr(roof, 'slope_angle', 0.0))
+    if tilt < 0.05 or side not in ('front', 'back', 'left', 'right'):
+        tilt = 0.0
+    azimuth = (SIDE_AZIMUTH.get(side, 180.0) - rotation_deg) % 360.0
+    return tilt, azimuth
+
+
+def rotate_positions(positions, rotation_deg):
+    """Rotate (n, 3) positions about the vertical axis through the origin"""
+    positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+    if rotation_deg % 360.0 == 0.0:
+        return positions
+    rad = np.radians(rotation_deg)
+    c, s = np.cos(rad), np.sin(rad)
+    rotation = np.array([[c, -s, 0.0], [s, c, 0.0], [0.0, 0.0, 1.0]])
+    return positions @ rotation.T
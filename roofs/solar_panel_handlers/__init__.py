@@ -3,62 +3,62 @@ Solar Panel Handlers Package
 
 This package provides solar panel placement handlers for different roof types.
 All handlers inherit from BasePanelHandler and share common functionality.
+
+Handlers are imported on first use (they pull in PyVista/VTK), so importing
+roofs.solar_panel_handlers.config stays cheap at application startup.
 """
+import importlib
+from utils.log import get_logger
 
-print("🔧 Loading solar panel handlers package...")
-
-# Safe imports - each handler is imported independently
-SolarPanelPlacementFlat = None
-SolarPanelPlacementGable = None
-SolarPanelPlacementHip = None
-SolarPanelPlacementPyramid = None
-
-# Import Flat handler
-try:
-    from .solar_panel_placement_flat import SolarPanelPlacementFlat
-    print("✅ SolarPanelPlacementFlat imported")
-except Exception as e:
-    print(f"⚠️ SolarPanelPlacementFlat import failed: {e}")
-
-# Import Gable handler
-try:
-    from .solar_panel_placement_gable import SolarPanelPlacementGable
-    print("✅ SolarPanelPlacementGable imported")
-except Exception as e:
-    print(f"⚠️ SolarPanelPlacementGable import failed: {e}")
-    import traceback
-    traceback.print_exc()
-
-# Import Hip handler
-try:
-    from .solar_panel_placement_hip import SolarPanelPlacementHip
-    print("✅ SolarPanelPlacementHip imported")
-except Exception as e:
-    print(f"⚠️ SolarPanelPlacementHip import failed: {e}")
-
-# Import Pyramid handler
-try:
-    from .solar_panel_placement_pyramid import SolarPanelPlacementPyramid
-    print("✅ SolarPanelPlacementPyramid imported")
-except Exception as e:
-    print(f"⚠️ SolarPanelPlacementPyramid import failed: {e}")
+log = get_logger('panels')
 
 # Version info
 __version__ = "2.0.0"
 __author__ = "Your Name"
 
-# Export only successfully imported handlers
-__all__ = []
-if SolarPanelPlacementFlat:
-    __all__.append('SolarPanelPlacementFlat')
-if SolarPanelPlacementGable:
-    __all__.append('SolarPanelPlacementGable')
-if SolarPanelPlacementHip:
-    __all__.append('SolarPanelPlacementHip')
-if SolarPanelPlacementPyramid:
-    __all__.append('SolarPanelPlacementPyramid')
+_HANDLER_MODULES = {
+    'flat': ('.solar_panel_placement_flat', 'SolarPanelPlacementFlat'),
+    'gable': ('.solar_panel_placement_gable', 'SolarPanelPlacementGable'),
+    'hip': ('.solar_panel_placement_hip', 'SolarPanelPlacementHip'),
+    'pyramid': ('.solar_panel_placement_pyramid', 'SolarPanelPlacementPyramid'),
+}
+
+__all__ = [class_name for _, class_name in _HANDLER_MODULES.values()]
+
+_HANDLER_REGISTRY = None
+
+
+def _load_handlers():
+    """Import every handler once (safe imports - a failing handler is skipped)"""
+    global _HANDLER_REGISTRY
+    if _HANDLER_REGISTRY is not None:
+        return _HANDLER_REGISTRY
+
+    log.debug("🔧 Loading solar panel handlers package...")
+    _HANDLER_REGISTRY = {}
+    for roof_type, (module_name, class_name) in _HANDLER_MODULES.items():
+        handler = None
+        try:
+            handler = getattr(importlib.import_module(module_name, __name__), class_name)
+            log.debug("✅ %s imported", class_name)
+        except Exception as e:
+            log.warning("⚠️ %s import failed: %s", class_name, e)
+        globals()[class_name] = handler
+        if handler:
+            _HANDLER_REGISTRY[roof_type] = handler
+
+    log.debug("📦 Available handlers: %s", [h.__name__ for h in _HANDLER_REGISTRY.values()])
+    return _HANDLER_REGISTRY
+
+
+def __getattr__(name):
+    if name in __all__:
+        _load_handlers()
+        return globals()[name]
+    if name == 'HANDLER_REGISTRY':
+        return _load_handlers()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-print(f"📦 Available handlers: {__all__}")
 
 # Safe factory function
 def get_handler_for_roof(roof):
@@ -67,15 +67,7 @@ def get_handler_for_roof(roof):
     """
     roof_type = type(roof).__name__.lower()
     
-    handler_map = {}
-    if SolarPanelPlacementFlat:
-        handler_map['flatroof'] = SolarPanelPlacementFlat
-    if SolarPanelPlacementGable:
-        handler_map['gableroof'] = SolarPanelPlacementGable
-    if SolarPanelPlacementHip:
-        handler_map['hiproof'] = SolarPanelPlacementHip
-    if SolarPanelPlacementPyramid:
-        handler_map['pyramidroof'] = SolarPanelPlacementPyramid
+    handler_map = {f'{key}roof': handler for key, handler in _load_handlers().items()}
     
     if roof_type in handler_map:
         return handler_map[roof_type](roof)
@@ -83,27 +75,15 @@ def get_handler_for_roof(roof):
         available = list(handler_map.keys())
         raise ValueError(f"No handler available for roof type: {roof_type}. Available: {available}")
 
-# Safe handler registry
-HANDLER_REGISTRY = {}
-if SolarPanelPlacementFlat:
-    HANDLER_REGISTRY['flat'] = SolarPanelPlacementFlat
-if SolarPanelPlacementGable:
-    HANDLER_REGISTRY['gable'] = SolarPanelPlacementGable
-if SolarPanelPlacementHip:
-    HANDLER_REGISTRY['hip'] = SolarPanelPlacementHip
-if SolarPanelPlacementPyramid:
-    HANDLER_REGISTRY['pyramid'] = SolarPanelPlacementPyramid
-
 def list_available_handlers():
     """Return list of available handler types"""
-    return list(HANDLER_REGISTRY.keys())
+    return list(_load_handlers().keys())
 
 def create_handler(roof_type, roof):
     """Create handler by string type name"""
-    if roof_type.lower() in HANDLER_REGISTRY:
-        return HANDLER_REGISTRY[roof_type.lower()](roof)
+    registry = _load_handlers()
+    if roof_type.lower() in registry:
+        return registry[roof_type.lower()](roof)
     else:
-        available = list(HANDLER_REGISTRY.keys())
+        available = list(registry.keys())
         raise ValueError(f"Unknown roof type: {roof_type}. Available: {available}")
-
-print("🔧 Solar panel handlers package initialization complete")
@@ -6,5 +6,6 @@ for all roof-specific panel placement handlers.
 """
 
 from .base_panel_handler import BasePanelHandler
+from .placement_queue import PlacementQueue, placement_queue
 
-__all__ = ['BasePanelHandler']
\ No newline at end of file
+__all__ = ['BasePanelHandler', 'PlacementQueue', 'placement_queue']
\ No newline at end of file
@@ -3,10 +3,19 @@ import numpy as np
 from ..utils.solar_panel_utils import load_panel_texture, PanelGeometry
 from ..utils.panel_performance import PerformanceCalculator
 from ..utils.obstacle_detection import ObstacleDetector
+from ..config import get_default_config
+from .placement_queue import placement_queue
+from utils.tracing import traced
+from utils.log import get_logger
+
+log = get_logger('panels')
 
 class BasePanelHandler:
     """Base class for all solar panel placement handlers"""
     
+    # 'toggle': add_panels toggles one side; 'replace': each placement replaces the layout
+    placement_mode = 'toggle'
+    
     def __init__(self, roof, roof_type="generic"):
         self.roof = roof
         self.plotter = roof.plotter
@@ -39,9 +48,13 @@ class BasePanelHandler:
         self.performance_actor = None
         self.current_side = None
         self.active_sides = set()
+        # Sides with panels at once (ROOF_SPECIFIC_CONFIG; None = unlimited)
+        self.max_active_sides = get_default_config(roof_type).get('max_active_sides')
         self.enable_debug_display = False
         self.show_debug = False
         self.panel_positions_by_side = {}  # {side_name: [np.array([x,y,z]), ...]}
+        self.panel_axes_by_side = {}       # {side_name: (width vector, length vector)} in metres
+        self._render_deferred = False      # set while the placement queue runs commands
         
         # Load texture
         self.panel_texture = load_panel_texture()
@@ -234,9 +247,18 @@ class BasePanelHandler:
             return count
 
         except Exception as e:
-            print(f"Error placing panels on triangle: {e}")
+            log.error("❌ Error placing panels on triangle: %s", e)
             return 0
     
+    def _panel_axes(self, panel_data):
+        """Full width and length edge vectors (m) of a placed panel, used for
+        sub-panel shading samples"""
+        width_dir = np.asarray(panel_data['width_dir'], dtype=float)
+        length_dir = np.asarray(panel_data['length_dir'], dtype=float)
+        return (width_dir / np.linalg.norm(width_dir) * self.panel_width * self.mm_to_m,
+                length_dir / np.linalg.norm(length_dir) * self.panel_length * self.mm_to_m)
+
+    @traced('panels.create_batch', 'panels')
     def _create_panel_batch(self, valid_panels):
         """Create batched mesh for efficient rendering"""
         try:
@@ -248,6 +270,7 @@ class BasePanelHandler:
                 self.panel_positions_by_side[self.current_side] = [
                     np.array(p['center'], dtype=float) for p in valid_panels
                 ]
+                self.panel_axes_by_side[self.current_side] = self._panel_axes(valid_panels[0])
                 
             panel_width_m = self.panel_width * self.mm_to_m
             panel_length_m = self.panel_length * self.mm_to_m
@@ -298,7 +321,7 @@ class BasePanelHandler:
             self.add_mesh_with_texture(combined_mesh)
             
         except Exception as e:
-            print(f"Error creating panel batch: {e}")
+            log.error("❌ Error creating panel batch: %s", e)
     
     def update_debug_display_common(self, roof_type_specific_text=""):
         """Clean view — no debug overlay in 3D view"""
@@ -427,7 +450,7 @@ class BasePanelHandler:
             return actor
             
         except Exception as e:
-            print(f"Error adding mesh: {e}")
+            log.error("❌ Error adding mesh: %s", e)
             return None
     
     def check_obstacle_intersection(self, panel_center, panel_width, panel_length, 
@@ -449,6 +472,25 @@ class BasePanelHandler:
             **kwargs
         )
     
+    # ==================== QUEUED PLACEMENT ====================
+    
+    def request_panels(self, side):
+        """Queue a placement toggle of a side (key bindings and UI use this)"""
+        placement_queue.submit(self, 'toggle', side)
+    
+    def request_clear(self):
+        """Queue removal of all panels"""
+        placement_queue.submit(self, 'clear')
+    
+    def request_refresh(self):
+        """Queue re-placement of the active sides (e.g. after an obstacle was added)"""
+        placement_queue.submit(self, 'refresh')
+    
+    def _render(self):
+        """Render now, unless the placement queue renders once after its batch"""
+        if not self._render_deferred:
+            self.plotter.render()
+    
     def clear_panels(self):
         """Clear all panels and reset tracking"""
         # Remove all actors
@@ -510,7 +552,7 @@ class BasePanelHandler:
             return True
             
         except Exception as e:
-            print(f"Error updating config: {e}")
+            log.warning("⚠️ Error updating config: %s", e)
             return False
     
     def update_text(self, message):
@@ -520,9 +562,10 @@ class BasePanelHandler:
                 self.plotter.remove_actor(self.text_actor)
                 self.text_actor = None
         except Exception as e:
-            print(f"Error updating text: {e}")
+            log.warning("⚠️ Error updating text: %s", e)
     
     # Abstract methods
+    @traced('panels.add', 'panels')
     def add_panels(self, side):
         """Add panels to specified side - must be implemented by subclasses"""
         raise NotImplementedError("Subclasses must implement add_panels method")
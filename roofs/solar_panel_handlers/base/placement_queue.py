@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+roofs/solar_panel_handlers/base/placement_queue.py
+Debounced panel placement command queue shared by all panel handlers
+
+Key bindings, roof shortcuts and UI signals submit placement commands here
+instead of calling add_panels directly. Pending commands are merged per
+handler before anything is placed:
+
+    toggle  two pending toggles of a side cancel out; a toggle after an
+            add/remove of the same side turns into the opposite command
+    add     idempotent - replaces any pending command for the side
+    remove  idempotent - replaces any pending command for the side
+    clear   drops every earlier pending command of the handler
+    refresh re-places the active sides (pending once at most)
+
+On handlers that replace their layout on every placement (flat roofs) only
+the last placement request survives. The merged commands run from a short
+single-shot Qt timer after the key/signal handler has returned, with the
+handler's renders deferred to a single render at the end. Without a running
+Qt application (headless use) commands run immediately.
+"""
+from contextlib import nullcontext
+
+try:
+    from PyQt5.QtCore import QTimer
+    from PyQt5.QtWidgets import QApplication
+    QT_AVAILABLE = True
+except ImportError:
+    QT_AVAILABLE = False
+
+from utils.log import get_logger
+
+log = get_logger('panels')
+
+# Commands that name a side, and what a following toggle turns them into
+_TOGGLE_AFTER = {'toggle': None, 'add': 'remove', 'remove': 'add'}
+COMMANDS = ('toggle', 'add', 'remove', 'clear', 'refresh')
+
+
+class PlacementQueue:
+    """Per-handler pending placement commands, merged and run off the event path"""
+
+    def __init__(self, debounce_ms=30):
+        self.debounce_ms = debounce_ms
+        self._pending = {}          # id(handler) -> (handler, [(command, side), ...])
+        self._scheduled = False
+        self._running = False
+        self.stats = {'submitted': 0, 'merged': 0, 'executed': 0}
+
+    # ==================== SUBMIT ====================
+
+    def submit(self, handler, command, side=None):
+        """Queue a command for a handler and schedule a flush"""
+        if command not in COMMANDS:
+            raise ValueError(f"Unknown placement command: {command}. Available: {list(COMMANDS)}")
+        self.stats['submitted'] += 1
+
+        _, commands = self._pending.setdefault(id(handler), (handler, []))
+        before = len(commands)
+        self._merge(handler, commands, command, side)
+        self.stats['merged'] += before + 1 - len(commands)
+        if not commands:
+            del self._pending[id(handler)]
+        self._schedule()
+
+    def _merge(self, handler, commands, command, side=None):
+        if command == 'clear':
+            commands[:] = [('clear', None)]
+            return
+        if command == 'refresh':
+            if ('refresh', None) not in commands:
+                commands.append(('refresh', None))
+            return
+
+        if getattr(handler, 'placement_mode', 'toggle') == 'replace':
+            # Each placement replaces the previous layout: only the last one matters
+            commands[:] = [c for c in commands if c[1] is None]
+            commands.append(('add', side))
+            return
+
+        # The newest pending command of this side (a clear ends the search)
+        for i in range(len(commands) - 1, -1, -1):
+            previous, previous_side = commands[i]
+            if previous == 'clear':
+                break
+            if previous_side != side:
+                continue
+            if command == 'toggle':
+                opposite = _TOGGLE_AFTER[previous]
+                del commands[i]
+                if opposite:
+                    commands.append((opposite, side))
+                return
+            del commands[i]
+            break
+        commands.append((command, side))
+
+    def _schedule(self):
+        if self._scheduled or self._running:
+            # A running flush picks up new commands before it returns
+            return
+        if QT_AVAILABLE and QApplication.instance() is not None:
+            self._scheduled = True
+            QTimer.singleShot(self.debounce_ms, self.flush)
+        else:
+            self.flush()
+
+    # ==================== EXECUTE ====================
+
+    def flush(self):
+        """Run all pending commands (one render per handler)"""
+        self._scheduled = False
+        if self._running:
+            return
+        self._running = True
+        try:
+            while self._pending:
+                batch, self._pending = self._pending, {}
+                for handler, commands in batch.values():
+                    self._execute(handler, commands)
+        finally:
+            self._running = False
+
+    def discard(self, handler):
+        """Forget pending commands of a handler (e.g. its roof is removed)"""
+        self._pending.pop(id(handler), None)
+
+    def pending(self, handler):
+        """Pending (command, side) list of a handler"""
+        return list(self._pending.get(id(handler), (None, []))[1])
+
+    def _execute(self, handler, commands):
+        handler._render_deferred = True
+        scene_graph = getattr(getattr(handler, 'roof', None), 'scene_graph', None)
+        try:
+            # Panel, boundary and label actors land in the scene graph's panels layer
+            with scene_graph.capture('panels') if scene_graph is not None else nullcontext():
+                for command, side in commands:
+                    try:
+                        self._run_command(handler, command, side)
+                        self.stats['executed'] += 1
+                    except Exception as e:
+                        log.error("❌ Panel placement '%s' %s failed: %s", command, side or '', e)
+        finally:
+            handler._render_deferred = False
+            try:
+                handler.plotter.render()
+            except Exception:
+                pass
+
+    def _run_command(self, handler, command, side):
+        active = handler.active_sides
+        if command == 'toggle':
+            handler.add_panels(side)
+        elif command == 'add':
+            if side not in active or getattr(handler, 'placement_mode', 'toggle') == 'replace':
+                handler.add_panels(side)
+        elif command == 'remove':
+            if side in active:
+                handler.remove_panels_from_side(side)
+        elif command == 'clear':
+            handler.clear_panels()
+        elif command == 'refresh':
+            sides = list(active)
+            for active_side in sides:
+                handler.remove_panels_from_side(active_side)
+            for active_side in sides:
+                handler.add_panels(active_side)
+
+
+# Shared by every panel handler
+placement_queue = PlacementQueue()
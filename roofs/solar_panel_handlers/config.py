@@ -22,6 +22,7 @@ ROOF_SPECIFIC_CONFIG = {
         'row_spacing_factor': 1.0
     },
     'gable': {
+        'max_active_sides': 1,
         'min_slope_angle': 15,  # degrees
         'max_slope_angle': 60,  # degrees
         'panel_height': 0,      # ✅ ADDED: Smaller offset for gable roofs
@@ -38,6 +39,20 @@ ROOF_SPECIFIC_CONFIG = {
     }
 }
 
+# Side name → facing azimuth of the unrotated building
+# (degrees, 0=N, 90=E, 180=S, 270=W)
+SIDE_AZIMUTH = {
+    # Gable roof sides (ridge runs along Y-axis)
+    'left': 270.0,   # faces west
+    'right': 90.0,   # faces east
+    # Hip / Pyramid roof sides
+    'front': 180.0,  # faces south
+    'back': 0.0,     # faces north
+    # Flat roof zones — all face up (tilt overrides to 0)
+    'center': 180.0, 'north': 180.0, 'south': 180.0,
+    'east': 180.0, 'west': 180.0,
+}
+
 # Performance calculation settings
 PERFORMANCE_CONFIG = {
     'annual_yield_base': 1200,  # kWh per kWp per year
@@ -1,12 +1,19 @@
 from .base.base_panel_handler import BasePanelHandler
 from .utils.solar_panel_utils import PanelGeometry
 from .utils.panel_performance import PerformanceCalculator
+from utils.tracing import traced
+from utils.log import get_logger
 import numpy as np
 import pyvista as pv
 
+log = get_logger('panels')
+
 class SolarPanelPlacementFlat(BasePanelHandler):
     """Handler for placing solar panels on flat roofs - FIXED FOR CENTERED COORDINATES"""
     
+    # Each placement replaces the previous layout
+    placement_mode = 'replace'
+    
     def __init__(self, roof):
         super().__init__(roof, "flat")
         
@@ -21,7 +28,7 @@ class SolarPanelPlacementFlat(BasePanelHandler):
         # Calculate initial row spacing
         self.calculate_row_spacing()
         
-        print(f"✅ Flat roof solar panel handler initialized with centered coordinates")
+        log.debug("✅ Flat roof solar panel handler initialized with centered coordinates")
     
     def calculate_row_spacing(self):
         """Calculate optimal row spacing based on tilt angle"""
@@ -38,6 +45,7 @@ class SolarPanelPlacementFlat(BasePanelHandler):
         else:
             self.row_spacing_factor = 2.5
     
+    @traced('panels.add.flat', 'panels')
     def add_panels(self, area="center"):
         """Place panels on flat roof area"""
         return self.place_panels(area)
@@ -95,9 +103,9 @@ class SolarPanelPlacementFlat(BasePanelHandler):
                     except:
                         pass
             self.panel_actors.clear()
-            print("🧹 Cleared panel actors only")
+            log.debug("🧹 Cleared panel actors only")
         except Exception as e:
-            print(f"⚠️ Error clearing panels only: {e}")
+            log.warning("⚠️ Error clearing panels only: %s", e)
 
     def _clear_boundaries_only(self):
         """Clear only boundary actors, leave panels intact"""
@@ -110,9 +118,9 @@ class SolarPanelPlacementFlat(BasePanelHandler):
                     except:
                         pass
             self.boundary_actors.clear()
-            print("🧹 Cleared boundary actors only")
+            log.debug("🧹 Cleared boundary actors only")
         except Exception as e:
-            print(f"⚠️ Error clearing boundaries only: {e}")
+            log.warning("⚠️ Error clearing boundaries only: %s", e)
 
     def _create_boundary_visualization(self, start_x, start_y, length, width):
         """Create boundary lines with smart updates - ULTRA SMOOTH"""
@@ -138,7 +146,7 @@ class SolarPanelPlacementFlat(BasePanelHandler):
                         break
             
             if not corners_changed:
-                print(f"🔶 Boundary unchanged for {self.current_area}, keeping existing")
+                log.debug("🔶 Boundary unchanged for %s, keeping existing", self.current_area)
                 return
         
         # Clear existing boundaries only if we need to update
@@ -167,11 +175,11 @@ class SolarPanelPlacementFlat(BasePanelHandler):
         # Store corners for next comparison
         self._last_boundary_corners = new_corners
         
-        print(f"🔶 Updated {boundary_actors_created} boundary actors for {self.current_area}")
+        log.debug("🔶 Updated %s boundary actors for %s", boundary_actors_created, self.current_area)
 
     def clear_panels(self):
         """Clear all panels and reset tracking - ENHANCED"""
-        print("🧹 Clearing all flat roof panels...")
+        log.debug("🧹 Clearing all flat roof panels...")
         
         # Clear panel actors
         self._clear_panels_only()
@@ -204,6 +212,7 @@ class SolarPanelPlacementFlat(BasePanelHandler):
             self.panels_count_by_side[area] = 0
             self.panels_skipped_by_side[area] = 0
         self.panel_positions_by_side = {}
+        self.panel_axes_by_side = {}
         
         # Reset area tracking
         if hasattr(self, '_last_area'):
@@ -212,7 +221,7 @@ class SolarPanelPlacementFlat(BasePanelHandler):
         self.current_area = None
         self.plotter.update()
         
-        print("✅ All flat roof panels and boundaries cleared")
+        log.debug("✅ All flat roof panels and boundaries cleared")
     
     def _get_area_bounds(self, area, roof_length, roof_width, safe_edge_offset):
         """Calculate area boundaries based on selection - 0-BASED COORDINATES FOR CALCULATION"""
@@ -321,14 +330,25 @@ class SolarPanelPlacementFlat(BasePanelHandler):
             self.panel_positions_by_side[self.current_area] = [
                 np.array(pos, dtype=float) for pos in panel_positions
             ]
+            self.panel_axes_by_side[self.current_area] = self._flat_panel_axes()
 
         # Create instanced panels
         if panel_positions:
             self._create_instanced_panels(panel_positions)
 
-        print(f"✅ Placed {panels_placed} panels in {self.current_area} area using centered coordinates")
+        log.debug("✅ Placed %s panels in %s area using centered coordinates", panels_placed, self.current_area)
         return panels_placed
     
+    def _flat_panel_axes(self):
+        """Width and length edge vectors (m) of the tilted, oriented template panel"""
+        tilt = np.radians(self.panel_tilt) if self.panel_tilt > 0.1 else 0.0
+        orientation = np.radians(self.panel_orientation)
+        c, s = np.cos(orientation), np.sin(orientation)
+        rotate_z = np.array([[c, -s, 0.0], [s, c, 0.0], [0.0, 0.0, 1.0]])
+        length_vec = np.array([self.panel_length / 1000.0, 0.0, 0.0])
+        width_vec = np.array([0.0, np.cos(tilt), np.sin(tilt)]) * self.panel_width / 1000.0
+        return rotate_z @ width_vec, rotate_z @ length_vec
+
     def _create_instanced_panels(self, positions):
         """Create instanced panels at all positions"""
         # Create template panel
@@ -371,10 +391,10 @@ class SolarPanelPlacementFlat(BasePanelHandler):
             if hasattr(self.roof, 'update_panels_debug_info'):
                 self.roof.update_panels_debug_info(area)
             
-            print(f"✅ Updated roof info for {area} area with {panel_count} panels")
+            log.debug("✅ Updated roof info for %s area with %s panels", area, panel_count)
             
         except Exception as e:
-            print(f"⚠️ Error updating roof info: {e}")
+            log.warning("⚠️ Error updating roof info: %s", e)
     
     def update_panel_config(self, config):
         """Update panel configuration with re-placement"""
@@ -403,5 +423,5 @@ class SolarPanelPlacementFlat(BasePanelHandler):
             return True
             
         except Exception as e:
-            print(f"Error updating panel config: {e}")
+            log.warning("⚠️ Error updating panel config: %s", e)
             return False
@@ -1,9 +1,13 @@
 from .base.base_panel_handler import BasePanelHandler
 from .utils.solar_panel_utils import PanelGeometry
 from .utils.panel_performance import PerformanceCalculator
+from utils.tracing import traced
+from utils.log import get_logger
 import numpy as np
 import pyvista as pv
 
+log = get_logger('panels')
+
 class SolarPanelPlacementGable(BasePanelHandler):
     """Handler for placing solar panels on gable roofs"""
     
@@ -14,65 +18,66 @@ class SolarPanelPlacementGable(BasePanelHandler):
         self.panels_by_side = {'left': [], 'right': []}
         self.boundaries_by_side = {'left': [], 'right': []}
     
+    @traced('panels.add.gable', 'panels')
     def add_panels(self, side):
         """Add panels to gable roof side with clean placement (no flickering)"""
-        print(f"\n🔧 === GABLE ADD_PANELS CALLED ===")
-        print(f"🔧 Requested side: {side}")
-        print(f"🔧 Current active_sides: {list(self.active_sides)}")
+        log.debug("\n🔧 === GABLE ADD_PANELS CALLED ===")
+        log.debug("🔧 Requested side: %s", side)
+        log.debug("🔧 Current active_sides: %s", list(self.active_sides))
         
         # Validate side
         if side not in ["left", "right"]:
-            print(f"❌ Invalid side for gable roof: {side}")
+            log.error("❌ Invalid side for gable roof: %s", side)
             return
         
         # Check if this side is already active (TOGGLE functionality)
         is_currently_active = side in self.active_sides
-        print(f"🔧 Is {side} currently active? {is_currently_active}")
+        log.debug("🔧 Is %s currently active? %s", side, is_currently_active)
         
         if is_currently_active:
-            print(f"🔧 TOGGLE OFF: Removing panels from {side} side")
+            log.debug("🔧 TOGGLE OFF: Removing panels from %s side", side)
             self.remove_panels_from_side(side)
-            print(f"🔧 After toggle off, active_sides: {list(self.active_sides)}")
+            log.debug("🔧 After toggle off, active_sides: %s", list(self.active_sides))
             return
         
-        # ✅ GABLE SPECIFIC: Only allow one side at a time (or modify as needed)
-        if len(self.active_sides) >= 1:  # Adjust this number based on your requirements
+        # Side limit from ROOF_SPECIFIC_CONFIG (one side at a time on gable roofs)
+        if self.max_active_sides and len(self.active_sides) >= self.max_active_sides:
             oldest_side = next(iter(self.active_sides))
-            print(f"🔧 Max sides reached. Removing oldest: {oldest_side}")
+            log.debug("🔧 Max sides reached. Removing oldest: %s", oldest_side)
             self.remove_panels_from_side(oldest_side)
-            print(f"🔧 After removing oldest, active_sides: {list(self.active_sides)}")
+            log.debug("🔧 After removing oldest, active_sides: %s", list(self.active_sides))
         
         # Place panels on the requested side ONLY
-        print(f"🔧 Placing panels on {side} side...")
+        log.debug("🔧 Placing panels on %s side...", side)
         self.current_side = side
         
         # ✅ CLEAN PLACEMENT: Don't clear existing panels, just place new ones
         try:
             panel_count = self.place_solar_panels(side)
-            print(f"🔧 Placement completed. Panels placed: {panel_count}")
+            log.debug("🔧 Placement completed. Panels placed: %s", panel_count)
             
             if panel_count > 0:
                 # Add to active sides
                 self.active_sides.add(side)
-                print(f"✅ Added {side} to active_sides")
-                print(f"✅ Final active_sides: {list(self.active_sides)}")
+                log.debug("✅ Added %s to active_sides", side)
+                log.debug("✅ Final active_sides: %s", list(self.active_sides))
             else:
-                print(f"⚠️ No panels placed on {side} - not adding to active_sides")
+                log.warning("⚠️ No panels placed on %s - not adding to active_sides", side)
             
         except Exception as e:
-            print(f"❌ Error in placement method: {e}")
+            log.error("❌ Error in placement method: %s", e)
             import traceback
             traceback.print_exc()
             return
         
         # Update display
-        self.plotter.render()
-        print(f"🔧 === GABLE ADD_PANELS COMPLETED ===\n")
+        self._render()
+        log.debug("🔧 === GABLE ADD_PANELS COMPLETED ===\n")
     
     def place_solar_panels(self, side):
         """Place solar panels on the selected roof slope - CLEAN VERSION"""
         try:
-            print(f"🏠 === PLACE_SOLAR_PANELS ON {side.upper()} ===")
+            log.debug("🏠 === PLACE_SOLAR_PANELS ON %s ===", side.upper())
             
             # ✅ NO CLEARING: Don't call self.clear_panels() here
             # The clearing is handled in add_panels() method for toggle functionality
@@ -158,11 +163,11 @@ class SolarPanelPlacementGable(BasePanelHandler):
             # Store count
             self.panels_count_by_side[side] = panels_placed
             
-            print(f"✅ Placed {panels_placed} panels on {side.upper()} side")
+            log.debug("✅ Placed %s panels on %s side", panels_placed, side.upper())
             return panels_placed
             
         except Exception as e:
-            print(f"❌ Error placing solar panels: {e}")
+            log.error("❌ Error placing solar panels: %s", e)
             import traceback
             traceback.print_exc()
             return 0
@@ -284,7 +289,7 @@ class SolarPanelPlacementGable(BasePanelHandler):
                     except:
                         pass
             self.panels_by_side[side] = []
-            print(f"🧹 Cleared existing panels for {side} side")
+            log.debug("🧹 Cleared existing panels for %s side", side)
 
     def _clear_boundaries_for_side(self, side):
         """Clear boundaries for specific side only"""
@@ -296,17 +301,17 @@ class SolarPanelPlacementGable(BasePanelHandler):
                     except:
                         pass
             self.boundaries_by_side[side] = []
-            print(f"🧹 Cleared existing boundaries for {side} side")
+            log.debug("🧹 Cleared existing boundaries for %s side", side)
 
     def remove_panels_from_side(self, side):
         """Remove panels from specific side ONLY - Enhanced version"""
-        print(f"\n🗑️ === REMOVE_PANELS_FROM_SIDE ===")
-        print(f"🗑️ Removing panels from: {side}")
+        log.debug("\n🗑️ === REMOVE_PANELS_FROM_SIDE ===")
+        log.debug("🗑️ Removing panels from: %s", side)
         
         # Remove from active sides
         if side in self.active_sides:
             self.active_sides.remove(side)
-            print(f"✅ Removed {side} from active_sides")
+            log.debug("✅ Removed %s from active_sides", side)
         
         # Clear panels for this side
         self._clear_panels_for_side(side)
@@ -318,8 +323,9 @@ class SolarPanelPlacementGable(BasePanelHandler):
         self.panels_count_by_side[side] = 0
         self.panels_skipped_by_side[side] = 0
         self.panel_positions_by_side.pop(side, None)
+        self.panel_axes_by_side.pop(side, None)
 
-        print(f"✅ Reset panel count for {side}")
-        print(f"🗑️ After removal - active_sides: {list(self.active_sides)}")
-        print(f"🗑️ === REMOVE_PANELS_FROM_SIDE COMPLETED ===\n")
+        log.debug("✅ Reset panel count for %s", side)
+        log.debug("🗑️ After removal - active_sides: %s", list(self.active_sides))
+        log.debug("🗑️ === REMOVE_PANELS_FROM_SIDE COMPLETED ===\n")
         
\ No newline at end of file
@@ -1,9 +1,12 @@
 from .base.base_panel_handler import BasePanelHandler
 from .utils.solar_panel_utils import PanelGeometry
 from .utils.panel_performance import PerformanceCalculator
+from utils.tracing import traced
+from utils.log import get_logger
 import numpy as np
 import pyvista as pv
-import time
+
+log = get_logger('panels')
 
 class SolarPanelPlacementHip(BasePanelHandler):
     """Handler for placing solar panels on hip roofs - FIXED VERSION"""
@@ -19,50 +22,40 @@ class SolarPanelPlacementHip(BasePanelHandler):
             "front": [], "right": [], "back": [], "left": []
         }
         
-        # Add cooldown tracking to prevent rapid calls
-        self._last_call_time = {}
-        
-        print(f"✅ Hip solar panel handler initialized")
-        print(f"✅ Initial active_sides: {list(self.active_sides)}")
+        log.debug("✅ Hip solar panel handler initialized")
+        log.debug("✅ Initial active_sides: %s", list(self.active_sides))
     
+    @traced('panels.add.hip', 'panels')
     def add_panels(self, side):
         """Add panels to hip roof side with proper single-side handling"""
-        print(f"\n🔧 === HIP ADD_PANELS CALLED ===")
-        print(f"🔧 Requested side: {side}")
-        print(f"🔧 Current active_sides: {list(self.active_sides)}")
+        log.debug("\n🔧 === HIP ADD_PANELS CALLED ===")
+        log.debug("🔧 Requested side: %s", side)
+        log.debug("🔧 Current active_sides: %s", list(self.active_sides))
         
         # Validate side
         if side not in ["front", "right", "back", "left"]:
-            print(f"❌ Invalid side: {side}")
+            log.error("❌ Invalid side: %s", side)
             return
         
-        # Cooldown check to prevent rapid calls
-        current_time = time.time()
-        if side in self._last_call_time:
-            if current_time - self._last_call_time[side] < 0.5:  # 500ms cooldown
-                print(f"⏰ Cooldown active for {side}, ignoring call")
-                return
-        self._last_call_time[side] = current_time
-        
         # Check if this side is already active (TOGGLE functionality)
         is_currently_active = side in self.active_sides
-        print(f"🔧 Is {side} currently active? {is_currently_active}")
+        log.debug("🔧 Is %s currently active? %s", side, is_currently_active)
         
         if is_currently_active:
-            print(f"🔧 TOGGLE OFF: Removing panels from {side} side")
+            log.debug("🔧 TOGGLE OFF: Removing panels from %s side", side)
             self.remove_panels_from_side(side)
-            print(f"🔧 After toggle off, active_sides: {list(self.active_sides)}")
+            log.debug("🔧 After toggle off, active_sides: %s", list(self.active_sides))
             return
         
-        # Check 2-side limit
-        if len(self.active_sides) >= 2:
+        # Side limit from ROOF_SPECIFIC_CONFIG
+        if self.max_active_sides and len(self.active_sides) >= self.max_active_sides:
             oldest_side = next(iter(self.active_sides))
-            print(f"🔧 Max 2 sides reached. Removing oldest: {oldest_side}")
+            log.debug("🔧 Max %s sides reached. Removing oldest: %s", self.max_active_sides, oldest_side)
             self.remove_panels_from_side(oldest_side)
-            print(f"🔧 After removing oldest, active_sides: {list(self.active_sides)}")
+            log.debug("🔧 After removing oldest, active_sides: %s", list(self.active_sides))
         
         # Place panels on the requested side ONLY
-        print(f"🔧 Placing panels on {side} side...")
+        log.debug("🔧 Placing panels on %s side...", side)
         self.current_side = side
         
         # Call the specific placement method
@@ -77,44 +70,44 @@ class SolarPanelPlacementHip(BasePanelHandler):
             elif side == "left":
                 placement_success = self.place_left_panels()
             
-            print(f"🔧 Placement method completed. Success: {placement_success}")
+            log.debug("🔧 Placement method completed. Success: %s", placement_success)
             
         except Exception as e:
-            print(f"❌ Error in placement method: {e}")
+            log.error("❌ Error in placement method: %s", e)
             import traceback
             traceback.print_exc()
             return
         
         # Check if panels were actually placed
         panels_placed = self.panels_count_by_side.get(side, 0)
-        print(f"🔧 Panels placed on {side}: {panels_placed}")
+        log.debug("🔧 Panels placed on %s: %s", side, panels_placed)
         
         if panels_placed > 0:
             # Add to active sides
             self.active_sides.add(side)
-            print(f"✅ Added {side} to active_sides")
-            print(f"✅ Final active_sides: {list(self.active_sides)}")
+            log.debug("✅ Added %s to active_sides", side)
+            log.debug("✅ Final active_sides: %s", list(self.active_sides))
         else:
-            print(f"⚠️ No panels placed on {side} - not adding to active_sides")
+            log.warning("⚠️ No panels placed on %s - not adding to active_sides", side)
         
         # Update display
-        self.plotter.render()
-        print(f"🔧 === HIP ADD_PANELS COMPLETED ===\n")
+        self._render()
+        log.debug("🔧 === HIP ADD_PANELS COMPLETED ===\n")
     
     def remove_panels_from_side(self, side):
         """Remove panels from specific side ONLY"""
-        print(f"\n🗑️ === REMOVE_PANELS_FROM_SIDE ===")
-        print(f"🗑️ Removing panels from: {side}")
-        print(f"🗑️ Before removal - active_sides: {list(self.active_sides)}")
-        print(f"🗑️ Panel actors to remove: {len(self.panels_by_side.get(side, []))}")
-        print(f"🗑️ Boundary actors to remove: {len(self.boundaries_by_side.get(side, []))}")
+        log.debug("\n🗑️ === REMOVE_PANELS_FROM_SIDE ===")
+        log.debug("🗑️ Removing panels from: %s", side)
+        log.debug("🗑️ Before removal - active_sides: %s", list(self.active_sides))
+        log.debug("🗑️ Panel actors to remove: %s", len(self.panels_by_side.get(side, [])))
+        log.debug("🗑️ Boundary actors to remove: %s", len(self.boundaries_by_side.get(side, [])))
         
         # Remove from active sides
         if side in self.active_sides:
             self.active_sides.remove(side)
-            print(f"✅ Removed {side} from active_sides")
+            log.debug("✅ Removed %s from active_sides", side)
         else:
-            print(f"⚠️ {side} was not in active_sides")
+            log.warning("⚠️ %s was not in active_sides", side)
         
         # Remove panel actors for this side
         panels_removed = 0
@@ -125,11 +118,11 @@ class SolarPanelPlacementHip(BasePanelHandler):
                         self.plotter.remove_actor(actor)
                         panels_removed += 1
                     except Exception as e:
-                        print(f"⚠️ Error removing panel actor: {e}")
+                        log.warning("⚠️ Error removing panel actor: %s", e)
             
             # Clear the list
             self.panels_by_side[side] = []
-            print(f"✅ Removed {panels_removed} panel actors from {side}")
+            log.debug("✅ Removed %s panel actors from %s", panels_removed, side)
         
         # Remove boundary actors for this side
         boundaries_removed = 0
@@ -140,27 +133,26 @@ class SolarPanelPlacementHip(BasePanelHandler):
                         self.plotter.remove_actor(actor)
                         boundaries_removed += 1
                     except Exception as e:
-                        print(f"⚠️ Error removing boundary actor: {e}")
+                        log.warning("⚠️ Error removing boundary actor: %s", e)
             
             # Clear the list
             self.boundaries_by_side[side] = []
-            print(f"✅ Removed {boundaries_removed} boundary actors from {side}")
+            log.debug("✅ Removed %s boundary actors from %s", boundaries_removed, side)
         
         # Reset counts and stored positions for this side
         old_count = self.panels_count_by_side.get(side, 0)
         self.panels_count_by_side[side] = 0
         self.panels_skipped_by_side[side] = 0
         self.panel_positions_by_side.pop(side, None)
-        print(f"✅ Reset panel count for {side} (was {old_count}, now 0)")
+        self.panel_axes_by_side.pop(side, None)
+        log.debug("✅ Reset panel count for %s (was %s, now 0)", side, old_count)
 
-        print(f"🗑️ After removal - active_sides: {list(self.active_sides)}")
-        print(f"🗑️ === REMOVE_PANELS_FROM_SIDE COMPLETED ===\n")
+        log.debug("🗑️ After removal - active_sides: %s", list(self.active_sides))
+        log.debug("🗑️ === REMOVE_PANELS_FROM_SIDE COMPLETED ===\n")
     
-    # Keep all your original methods but add debug calls
     def place_front_panels(self):
         """Place panels ONLY on front triangular slope"""
-        print(f"🏠 === PLACE_FRONT_PANELS ===")
-        self.debug_call_origin()  # ✅ ADD THIS
+        log.debug("🏠 === PLACE_FRONT_PANELS ===")
         
         try:
             # Clear existing panels/boundaries for front side only
@@ -171,7 +163,7 @@ class SolarPanelPlacementHip(BasePanelHandler):
             eave_right = points['front_right']
             ridge = points['ridge_front']
             
-            print(f"🏠 Front geometry: left={eave_left}, right={eave_right}, ridge={ridge}")
+            log.debug("🏠 Front geometry: left=%s, right=%s, ridge=%s", eave_left, eave_right, ridge)
             
             # Create boundary and place panels
             bottom_left, bottom_right, top, normal = self.create_triangular_boundary(
@@ -183,11 +175,11 @@ class SolarPanelPlacementHip(BasePanelHandler):
             )
             
             self.panels_count_by_side["front"] = panel_count
-            print(f"✅ Placed {panel_count} panels on FRONT side")
+            log.debug("✅ Placed %s panels on FRONT side", panel_count)
             return True
             
         except Exception as e:
-            print(f"❌ Error in place_front_panels: {e}")
+            log.error("❌ Error in place_front_panels: %s", e)
             import traceback
             traceback.print_exc()
             return False
@@ -195,8 +187,7 @@ class SolarPanelPlacementHip(BasePanelHandler):
     # ✅ ADD THE SAME DEBUG TO OTHER PLACEMENT METHODS
     def place_left_panels(self):
         """Place panels ONLY on left trapezoidal slope"""
-        print(f"🏠 === PLACE_LEFT_PANELS ===")
-        self.debug_call_origin()  # ✅ ADD THIS
+        log.debug("🏠 === PLACE_LEFT_PANELS ===")
         
         try:
             # Clear existing panels/boundaries for left side only
@@ -208,7 +199,7 @@ class SolarPanelPlacementHip(BasePanelHandler):
             ridge_front = points['ridge_front']
             ridge_back = points['ridge_back']
             
-            print(f"🏠 Left geometry: eave_front={eave_front}, eave_back={eave_back}")
+            log.debug("🏠 Left geometry: eave_front=%s, eave_back=%s", eave_front, eave_back)
             
             # Create trapezoidal boundary
             bottom_front, bottom_back, top_back, top_front = self.create_trapezoidal_boundary(
@@ -221,11 +212,11 @@ class SolarPanelPlacementHip(BasePanelHandler):
             )
             
             self.panels_count_by_side["left"] = panel_count
-            print(f"✅ Placed {panel_count} panels on LEFT side")
+            log.debug("✅ Placed %s panels on LEFT side", panel_count)
             return True
             
         except Exception as e:
-            print(f"❌ Error in place_left_panels: {e}")
+            log.error("❌ Error in place_left_panels: %s", e)
             import traceback
             traceback.print_exc()
             return False
@@ -233,7 +224,7 @@ class SolarPanelPlacementHip(BasePanelHandler):
 
     def place_right_panels(self):
         """Place panels ONLY on right trapezoidal slope"""
-        print(f"🏠 === PLACE_RIGHT_PANELS ===")
+        log.debug("🏠 === PLACE_RIGHT_PANELS ===")
         try:
             # ❌ REMOVE THIS LINE:
             # self.remove_panels_from_side("right")
@@ -244,7 +235,7 @@ class SolarPanelPlacementHip(BasePanelHandler):
             ridge_front = points['ridge_front']
             ridge_back = points['ridge_back']
             
-            print(f"🏠 Right geometry: eave_front={eave_front}, eave_back={eave_back}")
+            log.debug("🏠 Right geometry: eave_front=%s, eave_back=%s", eave_front, eave_back)
             
             # Create trapezoidal boundary
             bottom_front, bottom_back, top_back, top_front = self.create_trapezoidal_boundary(
@@ -257,18 +248,18 @@ class SolarPanelPlacementHip(BasePanelHandler):
             )
             
             self.panels_count_by_side["right"] = panel_count
-            print(f"✅ Placed {panel_count} panels on RIGHT side")
+            log.debug("✅ Placed %s panels on RIGHT side", panel_count)
             return True
             
         except Exception as e:
-            print(f"❌ Error in place_right_panels: {e}")
+            log.error("❌ Error in place_right_panels: %s", e)
             import traceback
             traceback.print_exc()
             return False
 
     def place_back_panels(self):
         """Place panels ONLY on back triangular slope"""
-        print(f"🏠 === PLACE_BACK_PANELS ===")
+        log.debug("🏠 === PLACE_BACK_PANELS ===")
         try:
             # ❌ REMOVE THIS LINE:
             # self.remove_panels_from_side("back")
@@ -278,7 +269,7 @@ class SolarPanelPlacementHip(BasePanelHandler):
             eave_right = points['back_right']
             ridge = points['ridge_back']
             
-            print(f"🏠 Back geometry: left={eave_left}, right={eave_right}, ridge={ridge}")
+            log.debug("🏠 Back geometry: left=%s, right=%s, ridge=%s", eave_left, eave_right, ridge)
             
             # Create boundary and place panels
             bottom_left, bottom_right, top, normal = self.create_triangular_boundary(
@@ -290,38 +281,29 @@ class SolarPanelPlacementHip(BasePanelHandler):
             )
             
             self.panels_count_by_side["back"] = panel_count
-            print(f"✅ Placed {panel_count} panels on BACK side")
+            log.debug("✅ Placed %s panels on BACK side", panel_count)
             return True
             
         except Exception as e:
-            print(f"❌ Error in place_back_panels: {e}")
+            log.error("❌ Error in place_back_panels: %s", e)
             import traceback
             traceback.print_exc()
             return False
     
-    def debug_call_origin(self):
-        """Debug where the call is coming from"""
-        import traceback
-        import inspect
-        
-        print(f"\n🔍 === CALL ORIGIN DEBUG ===")
-        
-        # Get current stack
-        stack = inspect.stack()
-        
-        print(f"🔍 Call stack ({len(stack)} frames):")
-        for i, frame in enumerate(stack[:10]):  # Show first 10 frames
-            filename = frame.filename.split('/')[-1]  # Just filename
-            print(f"  {i}: {filename}:{frame.lineno} in {frame.function}")
-        
-        print(f"🔍 === CALL ORIGIN DEBUG END ===\n")
-
+    @traced('panels.create_batch.hip', 'panels')
     def _create_panel_batch(self, valid_panels):
         """Create batched mesh and STORE ACTORS properly"""
         if not valid_panels:
             return
+
+        # Store panel center positions for shadow ray-casting (per side)
+        if self.current_side:
+            self.panel_positions_by_side[self.current_side] = [
+                np.array(p['center'], dtype=float) for p in valid_panels
+            ]
+            self.panel_axes_by_side[self.current_side] = self._panel_axes(valid_panels[0])
         
-        print(f"🔧 Creating {len(valid_panels)} panels for {self.current_side} side")
+        log.debug("🔧 Creating %s panels for %s side", len(valid_panels), self.current_side)
         
         # Create combined mesh (your existing panel creation logic)
         combined_points = []
@@ -374,10 +356,10 @@ class SolarPanelPlacementHip(BasePanelHandler):
                 self.panels_by_side[self.current_side] = []
             
             self.panels_by_side[self.current_side].append(panel_actor)
-            print(f"✅ Stored panel actor for {self.current_side} side")
-            print(f"✅ Total actors for {self.current_side}: {len(self.panels_by_side[self.current_side])}")
+            log.debug("✅ Stored panel actor for %s side", self.current_side)
+            log.debug("✅ Total actors for %s: %s", self.current_side, len(self.panels_by_side[self.current_side]))
         else:
-            print(f"❌ No current_side set - cannot store panel actors!")
+            log.error("❌ No current_side set - cannot store panel actors!")
 
     def create_trapezoidal_boundary(self, eave_front, eave_back, ridge_front, ridge_back, is_right):
         """Create trapezoidal boundary for hip roof sides"""
@@ -555,7 +537,7 @@ class SolarPanelPlacementHip(BasePanelHandler):
             return count
             
         except Exception as e:
-            print(f"Error placing panels on trapezoid: {e}")
+            log.error("❌ Error placing panels on trapezoid: %s", e)
             return 0
     
     def update_panel_config(self, config):
@@ -589,12 +571,12 @@ class SolarPanelPlacementHip(BasePanelHandler):
             return True
             
         except Exception as e:
-            print(f"Error updating panel config: {e}")
+            log.warning("⚠️ Error updating panel config: %s", e)
             return False
 
     def create_triangular_boundary(self, eave_left, eave_right, apex, is_front=True, min_offset=300):
         """Override base class method to use per-side boundary tracking"""
-        print(f"🔶 === HIP: CREATING TRIANGULAR BOUNDARY FOR {self.current_side.upper()} ===")
+        log.debug("🔶 === HIP: CREATING TRIANGULAR BOUNDARY FOR %s ===", self.current_side.upper())
         
         # Calculate vectors (same as base class)
         base_vector = eave_right - eave_left
@@ -659,8 +641,8 @@ class SolarPanelPlacementHip(BasePanelHandler):
             self.boundaries_by_side[self.current_side] = []
         self.boundaries_by_side[self.current_side].extend(boundary_actors)
         
-        print(f"🔶 Stored {len(boundary_actors)} boundary actors for {self.current_side}")
-        print(f"🔶 Total boundary actors for {self.current_side}: {len(self.boundaries_by_side[self.current_side])}")
+        log.debug("🔶 Stored %s boundary actors for %s", len(boundary_actors), self.current_side)
+        log.debug("🔶 Total boundary actors for %s: %s", self.current_side, len(self.boundaries_by_side[self.current_side]))
         
         return bottom_left, bottom_right, top, normal
     
@@ -675,16 +657,16 @@ class SolarPanelPlacementHip(BasePanelHandler):
             line = pv.Line(start, end)
             actor = self.plotter.add_mesh(line, color=color, line_width=line_width)
             boundary_actors.append(actor)
-            print(f"🔶 Created boundary line {i+1} for {self.current_side}")
+            log.debug("🔶 Created boundary line %s for %s", i+1, self.current_side)
         
         # Add corner markers (same as base class)
         for i, point in enumerate(points):
             marker = pv.Sphere(radius=0.08, center=point)
             actor = self.plotter.add_mesh(marker, color=color, render_points_as_spheres=True)
             boundary_actors.append(actor)
-            print(f"🔶 Created boundary marker {i+1} for {self.current_side}")
+            log.debug("🔶 Created boundary marker %s for %s", i+1, self.current_side)
         
         # ✅ DON'T add to base class tracking - return for caller to handle
-        print(f"🔶 Created {len(boundary_actors)} boundary actors (returning for per-side tracking)")
+        log.debug("🔶 Created %s boundary actors (returning for per-side tracking)", len(boundary_actors))
         
         return boundary_actors
\ No newline at end of file
@@ -1,9 +1,12 @@
 from .base.base_panel_handler import BasePanelHandler
 from .utils.solar_panel_utils import PanelGeometry
 from .utils.panel_performance import PerformanceCalculator
+from utils.tracing import traced
+from utils.log import get_logger
 import numpy as np
 import pyvista as pv
-import time
+
+log = get_logger('panels')
 
 class SolarPanelPlacementPyramid(BasePanelHandler):
     """Handler for placing solar panels on pyramid roofs - COMPLETE FIXED VERSION"""
@@ -25,18 +28,10 @@ class SolarPanelPlacementPyramid(BasePanelHandler):
             "front": [], "right": [], "back": [], "left": []
         }
         
-        # ✅ COMPLETE CALL PROTECTION SYSTEM
-        self._last_call_time = {}
-        self._call_stack = []
-        self._processing = False
-        self._call_counter = 0
-        self._blocked_calls = 0
-        
         # Create panel template
         self.create_panel_template()
         
-        print(f"✅ Pyramid solar panel handler initialized with complete call protection")
-        print(f"✅ Handler ID: {id(self)}")
+        log.debug("✅ Pyramid solar panel handler initialized")
     
     def create_panel_template(self):
         """Create template panel for instancing"""
@@ -58,210 +53,92 @@ class SolarPanelPlacementPyramid(BasePanelHandler):
                 [0, 0], [1, 0], [1, 1], [0, 1]
             ])
             
-            print("✅ Panel template created successfully")
+            log.debug("✅ Panel template created successfully")
             
         except Exception as e:
-            print(f"❌ Error creating panel template: {e}")
+            log.error("❌ Error creating panel template: %s", e)
     
+    @traced('panels.add.pyramid', 'panels')
     def add_panels(self, side):
-        """Add panels to specific side with COMPLETE call protection"""
-        
-        # ✅ ENHANCED CALL PROTECTION
-        current_time = time.time()
-        call_id = f"pyramid_add_panels_{side}_{current_time}_{self._call_counter}"
-        self._call_counter += 1
-        
-        print(f"\n🔧 === PYRAMID ADD_PANELS CALLED ===")
-        print(f"🔧 Call ID: {call_id}")
-        print(f"🔧 Requested side: {side}")
-        print(f"🔧 Handler ID: {id(self)}")
-        print(f"🔧 Call stack depth: {len(self._call_stack)}")
-        print(f"🔧 Currently processing: {self._processing}")
-        print(f"🔧 Blocked calls so far: {self._blocked_calls}")
-        
-        # ✅ PROTECTION 1: Check if already processing
-        if self._processing:
-            self._blocked_calls += 1
-            print(f"🚨 BLOCKED #{self._blocked_calls}: Already processing another call")
-            return
+        """Toggle panels on a side (max 2 sides; the oldest side is replaced).
         
-        # ✅ PROTECTION 2: Check call cooldown (500ms)
-        if side in self._last_call_time:
-            time_since_last = current_time - self._last_call_time[side]
-            if time_since_last < 0.5:  # 500ms cooldown
-                self._blocked_calls += 1
-                print(f"🚨 BLOCKED #{self._blocked_calls}: Call too soon ({time_since_last:.3f}s < 0.5s)")
-                return
-        
-        # ✅ PROTECTION 3: Check if exact call already in stack
-        if call_id in self._call_stack:
-            self._blocked_calls += 1
-            print(f"🚨 BLOCKED #{self._blocked_calls}: Duplicate call ID in stack")
-            return
-        
-        # ✅ PROTECTION 4: Limit call stack depth
-        if len(self._call_stack) >= 3:
-            self._blocked_calls += 1
-            print(f"🚨 BLOCKED #{self._blocked_calls}: Call stack too deep ({len(self._call_stack)} calls)")
-            return
-        
-        # ✅ PROTECTION 5: Validate side
+        Repeated key presses and signals are merged by the placement queue
+        (see request_panels), so this runs once per effective command.
+        """
         if side not in ["front", "right", "back", "left"]:
-            print(f"❌ Invalid side: {side}")
+            log.error("❌ Invalid side: %s", side)
             return
         
-        # ✅ SET PROTECTION FLAGS
-        self._processing = True
-        self._call_stack.append(call_id)
-        self._last_call_time[side] = current_time
-        
         try:
-            print(f"🔧 PROCEEDING with call {call_id}")
-            print(f"🔧 Current active_sides: {list(self.active_sides)}")
-            
-            # ✅ TOGGLE FUNCTIONALITY
-            is_currently_active = side in self.active_sides
-            print(f"🔧 Is {side} currently active? {is_currently_active}")
-            
-            if is_currently_active:
-                print(f"🔧 TOGGLE OFF: Removing panels from {side} side")
+            if side in self.active_sides:
                 self.remove_panels_from_side(side)
-                print(f"🔧 After toggle off, active_sides: {list(self.active_sides)}")
                 return
-                
-            # Max 2 sides limit
-            if len(self.active_sides) >= 2:
-                oldest_side = next(iter(self.active_sides))
-                print(f"🔧 Max 2 sides reached. Removing oldest: {oldest_side}")
-                self.remove_panels_from_side(oldest_side)
-                print(f"🔧 After removing oldest, active_sides: {list(self.active_sides)}")
-            
-            # Set current side
-            self.current_side = side
             
-            # ✅ PLACE PANELS (single call only)
+            # Side limit from ROOF_SPECIFIC_CONFIG
+            if self.max_active_sides and len(self.active_sides) >= self.max_active_sides:
+                self.remove_panels_from_side(next(iter(self.active_sides)))
+            
+            self.current_side = side
             placement_methods = {
                 "front": self.place_front_panels,
                 "right": self.place_right_panels,
                 "back": self.place_back_panels,
                 "left": self.place_left_panels
             }
+            placement_methods[side]()
             
-            if side in placement_methods:
-                print(f"🔧 Calling placement method for {side}")
-                placement_methods[side]()
-                
-                # Check if panels were placed
-                panels_placed = self.panels_count_by_side.get(side, 0)
-                if panels_placed > 0:
-                    self.active_sides.add(side)
-                    print(f"✅ Added {panels_placed} panels to {side} side")
-                else:
-                    print(f"⚠️ No panels placed on {side} side")
-            
-            # Single render call
-            self.plotter.render()
-            print(f"🔧 === PYRAMID ADD_PANELS COMPLETED ===")
+            panels_placed = self.panels_count_by_side.get(side, 0)
+            if panels_placed > 0:
+                self.active_sides.add(side)
+                log.debug("✅ Added %s panels to %s side", panels_placed, side)
+            else:
+                log.warning("⚠️ No panels placed on %s side", side)
+            
+            self._render()
             
         except Exception as e:
-            print(f"❌ Error in add_panels: {e}")
+            log.error("❌ Error in add_panels: %s", e)
             import traceback
             traceback.print_exc()
-            
-        finally:
-            # ✅ ALWAYS CLEAN UP PROTECTION FLAGS
-            if call_id in self._call_stack:
-                self._call_stack.remove(call_id)
-            self._processing = False
-            print(f"🔧 Cleaned up call protection for {call_id}")
-            print(f"🔧 Final call stack depth: {len(self._call_stack)}")
     
     def remove_panels_from_side(self, side):
-        """Remove panels from specific side - ENHANCED VERSION"""
-        print(f"\n🗑️ === REMOVE_PANELS_FROM_SIDE ===")
-        print(f"🗑️ Removing panels from: {side}")
-        print(f"🗑️ Before removal - active_sides: {list(self.active_sides)}")
-        
-        # Debug: Check what we have to remove
-        panel_actors_count = len(self.panels_by_side.get(side, []))
-        boundary_actors_count = len(self.boundaries_by_side.get(side, []))
-        print(f"🗑️ Panel actors to remove: {panel_actors_count}")
-        print(f"🗑️ Boundary actors to remove: {boundary_actors_count}")
-        
-        # Remove from active sides
-        if side in self.active_sides:
-            self.active_sides.remove(side)
-            print(f"✅ Removed {side} from active_sides")
-        else:
-            print(f"⚠️ {side} was not in active_sides")
-        
-        # ✅ ENHANCED: Remove panel actors for this side
-        panels_removed = 0
-        if side in self.panels_by_side:
-            for actor in self.panels_by_side[side]:
-                if actor is not None:
-                    try:
-                        self.plotter.remove_actor(actor)
-                        panels_removed += 1
-                        print(f"✅ Removed panel actor {panels_removed}")
-                    except Exception as e:
-                        print(f"⚠️ Error removing panel actor: {e}")
-            
-            # Clear the list
-            self.panels_by_side[side] = []
-            print(f"✅ Removed {panels_removed} panel actors from {side}")
+        """Remove panels and boundaries of one side"""
+        self.active_sides.discard(side)
         
-        # ✅ ENHANCED: Remove boundary actors for this side
-        boundaries_removed = 0
-        if side in self.boundaries_by_side:
-            for i, actor in enumerate(self.boundaries_by_side[side]):
+        for actors in (self.panels_by_side, self.boundaries_by_side):
+            for actor in actors.get(side, []):
                 if actor is not None:
                     try:
                         self.plotter.remove_actor(actor)
-                        boundaries_removed += 1
-                        print(f"✅ Removed boundary actor {boundaries_removed} (was index {i})")
                     except Exception as e:
-                        print(f"⚠️ Error removing boundary actor {i}: {e}")
-            
-            # Clear the list
-            self.boundaries_by_side[side] = []
-            print(f"✅ Removed {boundaries_removed} boundary actors from {side}")
+                        log.warning("⚠️ Error removing actor on %s: %s", side, e)
+            if side in actors:
+                actors[side] = []
         
         # Clear pending meshes
         if side in self.panel_meshes_by_side:
             self.panel_meshes_by_side[side] = []
         
         # Reset counts and stored positions for this side
-        old_count = self.panels_count_by_side.get(side, 0)
         self.panels_count_by_side[side] = 0
         self.panels_skipped_by_side[side] = 0
         self.panel_positions_by_side.pop(side, None)
-        print(f"✅ Reset panel count for {side} (was {old_count}, now 0)")
+        self.panel_axes_by_side.pop(side, None)
         
-        # ✅ FORCE RENDER UPDATE
         try:
-            self.plotter.render()
-            print(f"✅ Forced plotter render after removal")
+            self._render()
         except Exception as e:
-            print(f"⚠️ Error rendering after removal: {e}")
-        
-        print(f"🗑️ After removal - active_sides: {list(self.active_sides)}")
-        print(f"🗑️ === REMOVE_PANELS_FROM_SIDE COMPLETED ===\n")
+            log.warning("⚠️ Error rendering after removal: %s", e)
     
     def place_front_panels(self):
-        """Place panels on front triangular face - PROTECTED"""
-        if self._processing and len(self._call_stack) > 1:
-            print(f"🚨 BLOCKED: place_front_panels called during processing")
-            return
-            
+        """Place panels on front triangular face """
         try:
-            print(f"🏠 === PLACE_FRONT_PANELS ===")
             points = self.roof.roof_points
             bottom_left = points['front_left']
             bottom_right = points['front_right']
             top = points['peak']
             
-            print(f"🏠 Front geometry: left={bottom_left}, right={bottom_right}, peak={top}")
+            log.debug("🏠 Front geometry: left=%s, right=%s, peak=%s", bottom_left, bottom_right, top)
             
             # Use common triangular boundary creation
             adjusted_bottom_left, adjusted_bottom_right, adjusted_top, normal = self.create_triangular_boundary(
@@ -274,27 +151,22 @@ class SolarPanelPlacementPyramid(BasePanelHandler):
             )
             
             self.panels_count_by_side["front"] = panel_count
-            print(f"✅ Placed {panel_count} panels on FRONT side")
+            log.debug("✅ Placed %s panels on FRONT side", panel_count)
             
         except Exception as e:
-            print(f"❌ Error placing front panels: {e}")
+            log.error("❌ Error placing front panels: %s", e)
             import traceback
             traceback.print_exc()
     
     def place_right_panels(self):
-        """Place panels on right triangular face - PROTECTED"""
-        if self._processing and len(self._call_stack) > 1:
-            print(f"🚨 BLOCKED: place_right_panels called during processing")
-            return
-            
+        """Place panels on right triangular face """
         try:
-            print(f"🏠 === PLACE_RIGHT_PANELS ===")
             points = self.roof.roof_points
             bottom_left = points['front_right']
             bottom_right = points['back_right']
             top = points['peak']
             
-            print(f"🏠 Right geometry: left={bottom_left}, right={bottom_right}, peak={top}")
+            log.debug("🏠 Right geometry: left=%s, right=%s, peak=%s", bottom_left, bottom_right, top)
             
             adjusted_bottom_left, adjusted_bottom_right, adjusted_top, normal = self.create_triangular_boundary(
                 bottom_left, bottom_right, top, is_front=False
@@ -305,27 +177,22 @@ class SolarPanelPlacementPyramid(BasePanelHandler):
             )
             
             self.panels_count_by_side["right"] = panel_count
-            print(f"✅ Placed {panel_count} panels on RIGHT side")
+            log.debug("✅ Placed %s panels on RIGHT side", panel_count)
             
         except Exception as e:
-            print(f"❌ Error placing right panels: {e}")
+            log.error("❌ Error placing right panels: %s", e)
             import traceback
             traceback.print_exc()
     
     def place_back_panels(self):
-        """Place panels on back triangular face - PROTECTED"""
-        if self._processing and len(self._call_stack) > 1:
-            print(f"🚨 BLOCKED: place_back_panels called during processing")
-            return
-            
+        """Place panels on back triangular face """
         try:
-            print(f"🏠 === PLACE_BACK_PANELS ===")
             points = self.roof.roof_points
             bottom_left = points['back_right']
             bottom_right = points['back_left']
             top = points['peak']
             
-            print(f"🏠 Back geometry: left={bottom_left}, right={bottom_right}, peak={top}")
+            log.debug("🏠 Back geometry: left=%s, right=%s, peak=%s", bottom_left, bottom_right, top)
             
             adjusted_bottom_left, adjusted_bottom_right, adjusted_top, normal = self.create_triangular_boundary(
                 bottom_left, bottom_right, top, is_front=False
@@ -336,27 +203,22 @@ class SolarPanelPlacementPyramid(BasePanelHandler):
             )
             
             self.panels_count_by_side["back"] = panel_count
-            print(f"✅ Placed {panel_count} panels on BACK side")
+            log.debug("✅ Placed %s panels on BACK side", panel_count)
             
         except Exception as e:
-            print(f"❌ Error placing back panels: {e}")
+            log.error("❌ Error placing back panels: %s", e)
             import traceback
             traceback.print_exc()
     
     def place_left_panels(self):
-        """Place panels on left triangular face - PROTECTED"""
-        if self._processing and len(self._call_stack) > 1:
-            print(f"🚨 BLOCKED: place_left_panels called during processing")
-            return
-            
+        """Place panels on left triangular face """
         try:
-            print(f"🏠 === PLACE_LEFT_PANELS ===")
             points = self.roof.roof_points
             bottom_left = points['back_left']
             bottom_right = points['front_left']
             top = points['peak']
             
-            print(f"🏠 Left geometry: left={bottom_left}, right={bottom_right}, peak={top}")
+            log.debug("🏠 Left geometry: left=%s, right=%s, peak=%s", bottom_left, bottom_right, top)
             
             adjusted_bottom_left, adjusted_bottom_right, adjusted_top, normal = self.create_triangular_boundary(
                 bottom_left, bottom_right, top, is_front=False
@@ -367,16 +229,16 @@ class SolarPanelPlacementPyramid(BasePanelHandler):
             )
             
             self.panels_count_by_side["left"] = panel_count
-            print(f"✅ Placed {panel_count} panels on LEFT side")
+            log.debug("✅ Placed %s panels on LEFT side", panel_count)
             
         except Exception as e:
-            print(f"❌ Error placing left panels: {e}")
+            log.error("❌ Error placing left panels: %s", e)
             import traceback
             traceback.print_exc()
     
     def create_triangular_boundary(self, eave_left, eave_right, apex, is_front=True, min_offset=300):
         """Override base class method to use per-side boundary tracking"""
-        print(f"🔶 === PYRAMID: CREATING TRIANGULAR BOUNDARY FOR {self.current_side.upper()} ===")
+        log.debug("🔶 === PYRAMID: CREATING TRIANGULAR BOUNDARY FOR %s ===", self.current_side.upper())
         
         # Calculate vectors (same as base class)
         base_vector = eave_right - eave_left
@@ -441,8 +303,8 @@ class SolarPanelPlacementPyramid(BasePanelHandler):
             self.boundaries_by_side[self.current_side] = []
         self.boundaries_by_side[self.current_side].extend(boundary_actors)
         
-        print(f"🔶 Stored {len(boundary_actors)} boundary actors for {self.current_side}")
-        print(f"🔶 Total boundary actors for {self.current_side}: {len(self.boundaries_by_side[self.current_side])}")
+        log.debug("🔶 Stored %s boundary actors for %s", len(boundary_actors), self.current_side)
+        log.debug("🔶 Total boundary actors for %s: %s", self.current_side, len(self.boundaries_by_side[self.current_side]))
         
         return bottom_left, bottom_right, top, normal
     
@@ -457,26 +319,34 @@ class SolarPanelPlacementPyramid(BasePanelHandler):
             line = pv.Line(start, end)
             actor = self.plotter.add_mesh(line, color=color, line_width=line_width)
             boundary_actors.append(actor)
-            print(f"🔶 Created boundary line {i+1} for {self.current_side}")
+            log.debug("🔶 Created boundary line %s for %s", i+1, self.current_side)
         
         # Add corner markers (same as base class)
         for i, point in enumerate(points):
             marker = pv.Sphere(radius=0.08, center=point)
             actor = self.plotter.add_mesh(marker, color=color, render_points_as_spheres=True)
             boundary_actors.append(actor)
-            print(f"🔶 Created boundary marker {i+1} for {self.current_side}")
+            log.debug("🔶 Created boundary marker %s for %s", i+1, self.current_side)
         
         # ✅ DON'T add to base class tracking - return for caller to handle
-        print(f"🔶 Created {len(boundary_actors)} boundary actors (returning for per-side tracking)")
+        log.debug("🔶 Created %s boundary actors (returning for per-side tracking)", len(boundary_actors))
         
         return boundary_actors
     
+    @traced('panels.create_batch.pyramid', 'panels')
     def _create_panel_batch(self, valid_panels):
         """Override base class method to store actors in per-side tracking"""
         if not valid_panels:
             return
+
+        # Store panel center positions for shadow ray-casting (per side)
+        if self.current_side:
+            self.panel_positions_by_side[self.current_side] = [
+                np.array(p['center'], dtype=float) for p in valid_panels
+            ]
+            self.panel_axes_by_side[self.current_side] = self._panel_axes(valid_panels[0])
         
-        print(f"🔧 Creating {len(valid_panels)} panels for {self.current_side} side")
+        log.debug("🔧 Creating %s panels for %s side", len(valid_panels), self.current_side)
         
         # Create combined mesh (same as base class logic)
         combined_points = []
@@ -529,14 +399,14 @@ class SolarPanelPlacementPyramid(BasePanelHandler):
                 self.panels_by_side[self.current_side] = []
             
             self.panels_by_side[self.current_side].append(panel_actor)
-            print(f"✅ Stored panel actor for {self.current_side} side")
-            print(f"✅ Total actors for {self.current_side}: {len(self.panels_by_side[self.current_side])}")
+            log.debug("✅ Stored panel actor for %s side", self.current_side)
+            log.debug("✅ Total actors for %s: %s", self.current_side, len(self.panels_by_side[self.current_side]))
         else:
-            print(f"❌ No current_side set - cannot store panel actors!")
+            log.error("❌ No current_side set - cannot store panel actors!")
     
     def clear_panels(self):
         """Clear all panels and reset tracking"""
-        print("🧹 Clearing all pyramid panels...")
+        log.debug("🧹 Clearing all pyramid panels...")
         
         # Clear all sides
         for side in ["front", "right", "back", "left"]:
@@ -547,19 +417,13 @@ class SolarPanelPlacementPyramid(BasePanelHandler):
         self.active_sides.clear()
         self.current_side = None
         
-        # Reset call protection
-        self._last_call_time = {}
-        self._call_stack = []
-        self._processing = False
-        self._blocked_calls = 0
-        
         # Clear base class actors as well (just in case)
         try:
             super().clear_panels()
         except:
             pass
         
-        print("✅ All pyramid panels cleared")
+        log.debug("✅ All pyramid panels cleared")
     
     def update_panel_config(self, config):
         """Update panel configuration with re-placement"""
@@ -590,7 +454,7 @@ class SolarPanelPlacementPyramid(BasePanelHandler):
             return True
             
         except Exception as e:
-            print(f"Error updating panel config: {e}")
+            log.warning("⚠️ Error updating panel config: %s", e)
             return False
     
     def refresh_language(self):
@@ -603,19 +467,19 @@ class SolarPanelPlacementPyramid(BasePanelHandler):
                 self.clear_panels()
                 for side in active_sides:
                     self.add_panels(side)
-                print(f"Language updated, refreshed panels on {', '.join(active_sides)}")
+                log.debug("Language updated, refreshed panels on %s", ', '.join(active_sides))
             else:
-                print("Language updated, will apply to next panel placement")
+                log.debug("Language updated, will apply to next panel placement")
                 
         except Exception as e:
-            print(f"Error refreshing language: {e}")
+            log.warning("⚠️ Error refreshing language: %s", e)
     
     def setup_key_bindings(self, *args, **kwargs):
         """Override to prevent duplicate key bindings"""
-        print("⚠️ PyramidRoof key binding setup blocked - using Roof Generation Manager bindings")
+        log.warning("⚠️ PyramidRoof key binding setup blocked - using Roof Generation Manager bindings")
         pass
     
     def _setup_key_bindings(self, *args, **kwargs):
         """Override to prevent duplicate key bindings"""
-        print("⚠️ PyramidRoof _setup_key_bindings blocked")
+        log.warning("⚠️ PyramidRoof _setup_key_bindings blocked")
         pass
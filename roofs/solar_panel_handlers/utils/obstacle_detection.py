@@ -1,9 +1,14 @@
 import numpy as np
+from utils.tracing import traced
+from utils.log import get_logger
+
+log = get_logger('obstacles')
 
 class ObstacleDetector:
     """Handles obstacle detection and collision checking"""
     
     @staticmethod
+    @traced('obstacles.check', 'panels')
     def check_panel_obstacle_intersection(panel_center, panel_width, panel_length, 
                                         orientation_vectors, obstacle):
         """Universal obstacle intersection checker"""
@@ -22,7 +27,7 @@ class ObstacleDetector:
                     panel_center, panel_width, panel_length, orientation_vectors, obstacle
                 )
         except Exception as e:
-            print(f"Error checking obstacle intersection: {e}")
+            log.warning("⚠️ Error checking obstacle intersection: %s", e)
             return True  # Be conservative
     
     @staticmethod
@@ -99,7 +104,7 @@ class ObstacleDetector:
             return False
             
         except Exception as e:
-            print(f"Error in window intersection check: {e}")
+            log.warning("⚠️ Error in window intersection check: %s", e)
             return True
     
     @staticmethod
@@ -124,7 +129,7 @@ class ObstacleDetector:
             return distance < (panel_radius + chimney_radius + safety_margin)
             
         except Exception as e:
-            print(f"Error in chimney intersection check: {e}")
+            log.warning("⚠️ Error in chimney intersection check: %s", e)
             return True
     
     @staticmethod
@@ -162,5 +167,5 @@ class ObstacleDetector:
                        panel_bounds[4] > obstacle_bounds[5])
             
         except Exception as e:
-            print(f"Error in generic intersection check: {e}")
+            log.warning("⚠️ Error in generic intersection check: %s", e)
             return True
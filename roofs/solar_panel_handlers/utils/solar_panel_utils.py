@@ -3,6 +3,9 @@ import numpy as np
 import os
 import sys
 from pathlib import Path
+from utils.log import get_logger
+
+log = get_logger('textures')
 
 def resource_path(relative_path):
     """Get absolute path to resource, works for dev and for PyInstaller"""
@@ -27,12 +30,12 @@ def resource_path(relative_path):
     for base_path in base_paths:
         full_path = os.path.join(base_path, relative_path)
         if os.path.exists(full_path):
-            print(f"Found resource at: {full_path}")
+            log.debug("Found resource at: %s", full_path)
             return full_path
             
     # If we get here, log what we checked
-    print(f"Resource not found: {relative_path}")
-    print(f"Searched paths: {[os.path.join(bp, relative_path) for bp in base_paths]}")
+    log.debug("Resource not found: %s", relative_path)
+    log.debug("Searched paths: %s", [os.path.join(bp, relative_path) for bp in base_paths])
     
     # Return the original path in the executable directory
     return os.path.join(os.path.dirname(sys.executable), relative_path)
@@ -54,10 +57,10 @@ def load_panel_texture():
                 full_path = resource_path(texture_path)
                 if os.path.exists(full_path):
                     panel_texture = pv.read_texture(full_path)
-                    print(f"Loaded solar panel texture from: {full_path}")
+                    log.debug("Loaded solar panel texture from: %s", full_path)
                     return panel_texture
             except Exception as e:
-                print(f"Failed to load texture from {texture_path}: {e}")
+                log.warning("⚠️ Failed to load texture from %s: %s", texture_path, e)
         
         # If we get here, try legacy paths as a fallback
         legacy_paths = [
@@ -71,17 +74,17 @@ def load_panel_texture():
             if os.path.exists(path):
                 try:
                     panel_texture = pv.read_texture(path)
-                    print(f"Loaded solar panel texture from legacy path: {path}")
+                    log.debug("Loaded solar panel texture from legacy path: %s", path)
                     return panel_texture
                 except Exception as e:
-                    print(f"Failed to load texture from legacy path {path}: {e}")
+                    log.warning("⚠️ Failed to load texture from legacy path %s: %s", path, e)
         
         # If we reach here, no texture was loaded
-        print("No solar panel texture could be loaded. Using solid color instead.")
+        log.warning("⚠️ No solar panel texture could be loaded. Using solid color instead.")
         return None
         
     except Exception as e:
-        print(f"Error in texture loading process: {e}")
+        log.error("❌ Error in texture loading process: %s", e)
         import traceback
         traceback.print_exc()
         return None
@@ -0,0 +1,552 @@
+#!/usr/bin/env python3
+"""
+solar_system/energy_model.py
+Vectorized clear-sky energy model with incremental per-side caching
+"""
+import math
+import numpy as np
+from solar_system.sun_depth_map import SunDepthMap
+from utils.tracing import traced
+
+
+# ==================== SUN PATH ====================
+
+def clear_sky_irradiance(sin_elev):
+    """Vectorized clear-sky DNI and DHI (W/m²) for an array of sin(elevation)"""
+    sin_elev = np.asarray(sin_elev, dtype=float)
+    air_mass = np.minimum(1.0 / np.maximum(sin_elev, 0.01), 38.0)
+    dni = 1353.0 * 0.7 ** (air_mass ** 0.678)
+    dhi = np.maximum(0.0, 120.0 * sin_elev)
+    return np.maximum(0.0, dni), dhi
+
+
+def daily_sun_path(latitude, day_of_year, step_hours=0.5):
+    """Sun path for one day in `step_hours` steps, as arrays.
+
+    Keys: hours, sin_elev, cos_elev, azimuth (deg, 0=N, 90=E), directions
+    (n, 3) unit vectors toward the sun, dni, dhi, weight (hours per sample).
+    Only steps with the sun above ~0.6° are kept.
+    """
+    lat_rad = math.radians(latitude)
+    dec = math.radians(23.45 * math.sin(math.radians(360.0 * (284 + day_of_year) / 365.0)))
+
+    cos_ws = max(-1.0, min(1.0, -math.tan(lat_rad) * math.tan(dec)))
+    half_day = math.degrees(math.acos(cos_ws)) / 15.0
+    hours = np.arange(12.0 - half_day, 12.0 + half_day, step_hours)
+
+    ha = np.radians(15.0 * (hours - 12.0))
+    sin_elev = (math.sin(lat_rad) * math.sin(dec) +
+                math.cos(lat_rad) * math.cos(dec) * np.cos(ha))
+    above = sin_elev > 0.01
+    hours, sin_elev = hours[above], sin_elev[above]
+
+    cos_elev = np.cos(np.arcsin(sin_elev))
+    safe_cos = np.where(cos_elev > 0.001, cos_elev, 1.0)
+    cos_az = np.where(cos_elev > 0.001,
+                      (math.sin(dec) - math.sin(lat_rad) * sin_elev) /
+                      (math.cos(lat_rad) * safe_cos),
+                      0.0)
+    azimuth = np.degrees(np.arccos(np.clip(cos_az, -1.0, 1.0)))
+    azimuth = np.where(hours > 12.0, 360.0 - azimuth, azimuth)
+
+    az_rad = np.radians(azimuth)
+    directions = np.column_stack((cos_elev * np.sin(az_rad),
+                                  cos_elev * np.cos(az_rad),
+                                  sin_elev))
+    dni, dhi = clear_sky_irradiance(sin_elev)
+
+    return {
+        'hours': hours, 'sin_elev': sin_elev, 'cos_elev': cos_elev,
+        'azimuth': azimuth, 'directions': directions, 'dni': dni, 'dhi': dhi,
+        'weight': np.full(len(hours), float(step_hours)),
+    }
+
+
+@traced('energy.annual_sun_table', 'energy')
+def annual_sun_table(latitude, step_hours=1.0, day_step=7):
+    """Concatenated sun paths sampled every `day_step` days over a year.
+
+    Same keys as daily_sun_path plus 'day'. Each sample's weight is
+    step_hours * day_step so that summing weighted energy gives a yearly total.
+    """
+    days = list(range(1, 366, day_step))
+    paths = [daily_sun_path(latitude, day, step_hours) for day in days]
+
+    table = {key: np.concatenate([p[key] for p in paths]) for key in paths[0]}
+    table['day'] = np.concatenate([np.full(len(p['hours']), day) for day, p in zip(days, paths)])
+    table['weight'] = table['weight'] * day_step
+    return table
+
+
+def hourly_sun_table(latitude, year_days=365):
+    """Sun table for every hour of a year (8760 samples, night included).
+
+    Same keys as daily_sun_path plus 'day'. Hours are mid-hour solar time;
+    samples with the sun below the horizon have zero irradiance so the
+    resulting energy series lines up with an hourly load profile.
+    """
+    days = np.repeat(np.arange(1, year_days + 1), 24)
+    hours = np.tile(np.arange(24) + 0.5, year_days)
+
+    lat_rad = math.radians(latitude)
+    dec = np.radians(23.45 * np.sin(np.radians(360.0 * (284 + days) / 365.0)))
+    ha = np.radians(15.0 * (hours - 12.0))
+    sin_elev = np.sin(lat_rad) * np.sin(dec) + np.cos(lat_rad) * np.cos(dec) * np.cos(ha)
+    up = sin_elev > 0.01
+
+    cos_elev = np.cos(np.arcsin(np.clip(sin_elev, -1.0, 1.0)))
+    safe_cos = np.where(cos_elev > 0.001, cos_elev, 1.0)
+    cos_az = np.where(cos_elev > 0.001,
+                      (np.sin(dec) - np.sin(lat_rad) * sin_elev) / (np.cos(lat_rad) * safe_cos),
+                      0.0)
+    azimuth = np.degrees(np.arccos(np.clip(cos_az, -1.0, 1.0)))
+    azimuth = np.where(hours > 12.0, 360.0 - azimuth, azimuth)
+
+    az_rad = np.radians(azimuth)
+    directions = np.column_stack((cos_elev * np.sin(az_rad),
+                                  cos_elev * np.cos(az_rad),
+                                  sin_elev))
+    dni, dhi = clear_sky_irradiance(np.where(up, sin_elev, 1.0))
+
+    return {
+        'hours': hours, 'day': days, 'sin_elev': np.where(up, sin_elev, 0.0),
+        'cos_elev': cos_elev, 'azimuth': azimuth, 'directions': directions,
+        'dni': np.where(up, dni, 0.0), 'dhi': np.where(up, dhi, 0.0),
+        'weight': np.ones(len(hours)),
+    }
+
+
+# ==================== SHADING ====================
+
+def rays_blocked(points, directions, crowns):
+    """Vectorized ray/sphere test.
+
+    points (n, 3), directions (t, 3) unit vectors toward the sun,
+    crowns iterable of (cx, cy, cz, r). Returns bool array (n, t) that is
+    True where any crown blocks the ray from the point toward the sun.
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 3)
+    directions = np.asarray(directions, dtype=float).reshape(-1, 3)
+    blocked = np.zeros((len(points), len(directions)), dtype=bool)
+    if len(points) == 0 or len(directions) == 0:
+        return blocked
+
+    for cx, cy, cz, r in crowns:
+        oc = points - np.array([cx, cy, cz])
+        half_b = oc @ directions.T                      # (n, t)
+        c = np.einsum('ij,ij->i', oc, oc) - r * r        # (n,)
+        disc = half_b * half_b - c[:, None]
+        far_t = -half_b + np.sqrt(np.maximum(disc, 0.0))
+        blocked |= (disc >= 0.0) & (far_t > 0.0)
+    return blocked
+
+
+def rays_blocked_pairs(points, directions, crowns):
+    """Ray/sphere test for paired rays: points (m, 3) each with its own
+    direction (m, 3). Returns bool array (m,)."""
+    points = np.asarray(points, dtype=float).reshape(-1, 3)
+    directions = np.asarray(directions, dtype=float).reshape(-1, 3)
+    blocked = np.zeros(len(points), dtype=bool)
+    for cx, cy, cz, r in crowns:
+        oc = points - np.array([cx, cy, cz])
+        half_b = np.einsum('ij,ij->i', oc, directions)
+        c = np.einsum('ij,ij->i', oc, oc) - r * r
+        disc = half_b * half_b - c
+        far_t = -half_b + np.sqrt(np.maximum(disc, 0.0))
+        blocked |= (disc >= 0.0) & (far_t > 0.0)
+    return blocked
+
+
+# Cell sample points in cell units: four corners and the centre
+_CELL_SAMPLES = np.array([[-0.5, -0.5], [0.5, -0.5], [0.5, 0.5], [-0.5, 0.5], [0.0, 0.0]])
+_CHILD_OFFSETS = np.array([[-0.25, -0.25], [0.25, -0.25], [0.25, 0.25], [-0.25, 0.25]])
+
+
+def adaptive_lit_fractions(centers, width_vecs, length_vecs, panel, direction, blocked,
+                           max_level=2):
+    """Fraction of panel area that sees the sun, refined only at shadow edges.
+
+    Each (panel, direction) pair starts as one cell sampled at its corners
+    and centre. Cells whose samples agree are settled as fully lit or fully
+    shaded; the others are split into four and re-sampled, down to
+    max_level. Cells still mixed at the last level count their lit share.
+
+    centers, width_vecs, length_vecs (n, 3) - panel centres and full edge
+    vectors; panel, direction (m,) - the pairs to evaluate.
+    blocked(points (k, 3), direction_index (k,)) -> bool (k,).
+    Returns float array (m,).
+    """
+    centers = np.asarray(centers, dtype=float).reshape(-1, 3)
+    width_vecs = np.broadcast_to(np.asarray(width_vecs, dtype=float), centers.shape)
+    length_vecs = np.broadcast_to(np.asarray(length_vecs, dtype=float), centers.shape)
+    pair = np.arange(len(panel))
+    fraction = np.zeros(len(panel))
+    offset = np.zeros((len(panel), 2))      # cell centre in panel units
+    size = np.ones(len(panel))              # cell edge in panel units
+    samples = len(_CELL_SAMPLES)
+
+    for level in range(max_level + 1):
+        if len(pair) == 0:
+            break
+        cell_panel = panel[pair]
+        uv = offset[:, None, :] + _CELL_SAMPLES[None, :, :] * size[:, None, None]
+        points = (centers[cell_panel][:, None, :] +
+                  uv[:, :, :1] * width_vecs[cell_panel][:, None, :] +
+                  uv[:, :, 1:] * length_vecs[cell_panel][:, None, :])
+        lit = ~np.asarray(blocked(points.reshape(-1, 3), np.repeat(direction[pair], samples)))
+        share = lit.reshape(-1, samples).mean(axis=1)
+
+        settled = (share == 0.0) | (share == 1.0) | (level == max_level)
+        np.add.at(fraction, pair[settled], share[settled] * size[settled] ** 2)
+
+        split = ~settled
+        k = len(_CHILD_OFFSETS)
+        parent_size = np.repeat(size[split], k)
+        offset = (np.repeat(offset[split], k, axis=0) +
+                  np.tile(_CHILD_OFFSETS, (int(split.sum()), 1)) * parent_size[:, None])
+        pair = np.repeat(pair[split], k)
+        size = parent_size / 2.0
+    return fraction
+
+
+def panel_lit_fractions(centers, width_vecs, length_vecs, directions, crowns, max_level=2):
+    """(n, t) lit area fractions of panels for sun directions (t, 3) under tree crowns.
+
+    The centre ray is tested for every pair as usual; only pairs whose ray
+    passes within half a panel diagonal of a crown silhouette can be partly
+    shaded, and only those are sampled adaptively.
+    """
+    centers = np.asarray(centers, dtype=float).reshape(-1, 3)
+    directions = np.asarray(directions, dtype=float).reshape(-1, 3)
+    n, t = len(centers), len(directions)
+    if n == 0 or t == 0:
+        return np.zeros((n, t))
+
+    margin = 0.5 * np.linalg.norm(np.asarray(width_vecs, dtype=float) +
+                                  np.asarray(length_vecs, dtype=float), axis=-1)
+    margin = np.broadcast_to(margin, (n,))[:, None]
+    blocked = np.zeros((n, t), dtype=bool)
+    near_edge = np.zeros((n, t), dtype=bool)
+    for cx, cy, cz, r in crowns:
+        oc = centers - np.array([cx, cy, cz])
+        half_b = oc @ directions.T
+        c = np.einsum('ij,ij->i', oc, oc) - r * r
+        disc = half_b * half_b - c[:, None]
+        far_t = -half_b + np.sqrt(np.maximum(disc, 0.0))
+        blocked |= (disc >= 0.0) & (far_t > 0.0)
+        # Distance of the crown centre from the centre ray vs its radius
+        distance = np.sqrt(np.maximum(r * r - disc, 0.0))
+        near_edge |= (np.abs(distance - r) <= margin) & (r - half_b + margin > 0.0)
+
+    fractions = (~blocked).astype(float)
+    panel, direction = np.nonzero(near_edge)
+    if len(panel):
+        fractions[panel, direction] = adaptive_lit_fractions(
+            centers, width_vecs, length_vecs, panel, direction,
+            lambda points, index: rays_blocked_pairs(points, directions[index], crowns),
+            max_level)
+    return fractions
+
+
+def depth_map_lit_groups(groups, directions, triangles=None, spheres=None, max_level=2):
+    """Lit masks of several panel groups from one sun-view depth map per direction.
+
+    groups is a list of (centers (n, 3), axes or None) - e.g. one per roof
+    side. Each depth map covers the receivers of all groups, so the scene
+    occluders are rasterized once per direction rather than once per group.
+    Returns a list of (n, t) masks in group order (see depth_map_lit_masks).
+    """
+    directions = np.asarray(directions, dtype=float).reshape(-1, 3)
+    groups = [(np.asarray(centers, dtype=float).reshape(-1, 3), axes) for centers, axes in groups]
+    masks = [np.zeros((len(centers), len(directions)), dtype=bool if axes is None else float)
+             for centers, axes in groups]
+    receivers = [centers for centers, _ in groups if len(centers)]
+    if not receivers:
+        return masks
+
+    all_centers = np.concatenate(receivers)
+    for k, direction in enumerate(directions):
+        if direction[2] <= 0.0:
+            continue
+        depth = SunDepthMap.for_receivers(direction, all_centers, margin=2.0)
+        if triangles is not None:
+            depth.add_triangles(triangles)
+        if spheres:
+            depth.add_spheres(spheres)
+        for (centers, axes), lit in zip(groups, masks):
+            if len(centers) == 0:
+                continue
+            if axes is None:
+                lit[:, k] = depth.lit(centers)
+            else:
+                panels = np.arange(len(centers))
+                lit[:, k] = adaptive_lit_fractions(
+                    centers, axes[0], axes[1], panels, np.zeros(len(panels), dtype=int),
+                    lambda points, index: ~depth.lit(points), max_level)
+    return masks
+
+
+def depth_map_lit_masks(centers, directions, triangles=None, spheres=None, axes=None,
+                        max_level=2):
+    """(n, t) lit masks of panels from one sun-view depth map per direction.
+
+    Occluders are scene triangles (building, obstacles, trunks) and spheres
+    (tree crowns). With panel axes the masks are lit area fractions from
+    adaptive sub-panel sampling, otherwise centre-point lit flags.
+    """
+    return depth_map_lit_groups([(centers, axes)], directions, triangles, spheres,
+                                max_level)[0]
+
+
+def triangles_key(triangles):
+    """Hashable fingerprint of occluder triangles (None stays None)"""
+    if triangles is None:
+        return None
+    triangles = np.round(np.asarray(triangles, dtype=float), 4)
+    return (len(triangles), hash(triangles.tobytes()))
+
+
+# ==================== ENERGY ====================
+
+def plane_of_array(tilt, azimuth, sun):
+    """Beam and diffuse plane-of-array irradiance (W/m²) per sun sample.
+    tilt in radians, azimuth in degrees (0=N)."""
+    az_diff = np.radians(sun['azimuth'] - azimuth)
+    cos_aoi = np.maximum(0.0, sun['sin_elev'] * math.cos(tilt) +
+                         sun['cos_elev'] * math.sin(tilt) * np.cos(az_diff))
+    poa_beam = sun['dni'] * cos_aoi
+    poa_diffuse = sun['dhi'] * (1.0 + math.cos(tilt)) / 2.0
+    return poa_beam, poa_diffuse
+
+
+def side_energy_series(tilt, azimuth, count, sun, panel_area, efficiency,
+                       panel_power_w, lit_masks=None):
+    """Energy (Wh) per sun sample for `count` panels on one roof face.
+
+    lit_masks (n, t) are optional per-panel lit flags or lit area fractions;
+    their mean is the fraction of panel area receiving beam irradiance. Diffuse always reaches.
+    Output is clamped at the panels' nameplate power.
+    """
+    poa_beam, poa_diffuse = plane_of_array(tilt, azimuth, sun)
+
+    sf = 1.0
+    if lit_masks is not None and len(lit_masks):
+        sf = np.asarray(lit_masks).mean(axis=0)
+
+    poa_effective = poa_beam * sf + poa_diffuse
+    side_w = poa_effective * panel_area * count * efficiency
+    side_w = np.minimum(side_w, count * panel_power_w)
+    return side_w * sun['weight']
+
+
+def layout_series(sides, sun, panel_area, efficiency, panel_power_w, crowns=None,
+                  triangles=None):
+    """Energy (Wh) per sample of `sun` for each side.
+
+    sides is a list of dicts with name, tilt (radians), azimuth (degrees) and
+    positions (n, 3) panel centres. Sides that also carry 'axes' (panel width
+    and length edge vectors) are shaded by lit area fraction with adaptive
+    sub-panel sampling instead of one ray per panel centre. With occluder
+    triangles the scene is shaded by sun-view depth maps shared by all sides
+    (depth_map_lit_groups) instead of the ray/crown test.
+    Returns {side name: Wh array}.
+    """
+    positions = {side['name']: np.asarray(side['positions'], dtype=float).reshape(-1, 3)
+                 for side in sides}
+    shared = {}
+    if triangles is not None:
+        # One depth map per sun direction for all sides together
+        shaded = [side for side in sides if len(positions[side['name']])]
+        masks = depth_map_lit_groups([(positions[side['name']], side.get('axes'))
+                                      for side in shaded],
+                                     sun['directions'], triangles, crowns)
+        shared = {side['name']: lit for side, lit in zip(shaded, masks)}
+
+    results = {}
+    for side in sides:
+        side_positions = positions[side['name']]
+        if len(side_positions) == 0:
+            results[side['name']] = np.zeros(len(sun['sin_elev']))
+            continue
+        lit = None
+        if triangles is not None:
+            lit = shared[side['name']]
+        elif crowns and side.get('axes') is not None:
+            lit = panel_lit_fractions(side_positions, side['axes'][0], side['axes'][1],
+                                      sun['directions'], crowns)
+        elif crowns:
+            lit = ~rays_blocked(side_positions, sun['directions'], crowns)
+        results[side['name']] = side_energy_series(
+            side['tilt'], side['azimuth'], len(side_positions), sun,
+            panel_area, efficiency, panel_power_w, lit_masks=lit)
+    return results
+
+
+@traced('energy.layout_annual', 'energy')
+def layout_energy(sides, sun, panel_area, efficiency, panel_power_w, crowns=None,
+                  triangles=None):
+    """Energy (kWh) per side over all samples of `sun` (see layout_series)"""
+    series = layout_series(sides, sun, panel_area, efficiency, panel_power_w, crowns,
+                           triangles)
+    return {name: float(wh.sum()) / 1000.0 for name, wh in series.items()}
+
+
+class IncrementalEnergyModel:
+    """Daily energy per roof side with per-side and per-panel caching.
+
+    The sun path for a (latitude, day) pair is computed once as arrays.
+    Per-panel shading masks (one lit/blocked flag per time step) are cached by
+    panel position, and per-side energy series are cached by a fingerprint of
+    the side geometry, panel positions and shading inputs. Changing panels on
+    one side only recomputes that side; changing trees or the date drops the
+    shading cache because every panel's inputs changed.
+    """
+
+    def __init__(self, step_hours=0.5):
+        self.step_hours = step_hours
+
+        self._sun_key = None
+        self._sun = None
+
+        self._shading_key = None
+        self._panel_lit = {}       # {position key: bool array (steps,)}
+        self._side_results = {}    # {side name: (fingerprint, wh array (steps,))}
+
+        self.stats = {'side_hits': 0, 'side_misses': 0,
+                      'panel_hits': 0, 'panel_misses': 0}
+
+    def sun_path(self, latitude, day_of_year):
+        """Return the cached sun path for one day (see daily_sun_path)"""
+        key = (round(float(latitude), 6), int(day_of_year), self.step_hours)
+        if key == self._sun_key and self._sun is not None:
+            return self._sun
+
+        self._sun_key = key
+        self._sun = daily_sun_path(latitude, day_of_year, self.step_hours)
+        return self._sun
+
+    @staticmethod
+    def _position_key(position):
+        return tuple(np.round(np.asarray(position, dtype=float), 4))
+
+    @staticmethod
+    def _axes_key(axes):
+        if axes is None:
+            return None
+        return tuple(np.round(np.asarray(axes, dtype=float), 4).ravel())
+
+    def _lit_masks(self, groups, crowns, sun, triangles=None):
+        """Return (n, t) lit masks per (positions, axes) group, computing only
+        panels not already cached.
+
+        With panel axes the masks are lit area fractions from adaptive
+        sub-panel sampling instead of centre-ray flags; with occluder
+        triangles they come from sun-view depth maps, built once per sun
+        direction for the missing panels of all groups together.
+        """
+        keys_by_group = []
+        missing = {}    # {axes key: (axes, {key: position})}
+        for positions, axes in groups:
+            axes_key = self._axes_key(axes)
+            keys = [(self._position_key(p), axes_key) for p in positions]
+            keys_by_group.append(keys)
+            for position, key in zip(positions, keys):
+                if key in self._panel_lit:
+                    self.stats['panel_hits'] += 1
+                    continue
+                self.stats['panel_misses'] += 1
+                missing.setdefault(axes_key, (axes, {}))[1].setdefault(key, position)
+
+        if missing:
+            batches = [(np.array(list(pending.values()), dtype=float), axes, list(pending))
+                       for axes, pending in missing.values()]
+            if triangles is not None:
+                masks = depth_map_lit_groups([(pts, axes) for pts, axes, _ in batches],
+                                             sun['directions'], triangles, crowns)
+            else:
+                masks = [panel_lit_fractions(pts, axes[0], axes[1], sun['directions'], crowns)
+                         if axes is not None else ~rays_blocked(pts, sun['directions'], crowns)
+                         for pts, axes, _ in batches]
+            for (_, _, keys), lit in zip(batches, masks):
+                for row, key in enumerate(keys):
+                    self._panel_lit[key] = lit[row]
+
+        return [np.array([self._panel_lit[k] for k in keys]) for keys in keys_by_group]
+
+    def _side_fingerprint(self, side, positions, panel_area, efficiency, panel_power_w):
+        pos_digest = None
+        if positions is not None and len(positions):
+            pos_digest = hash(np.round(np.asarray(positions, dtype=float), 4).tobytes())
+        return (self._sun_key, self._shading_key, round(side['tilt'], 6),
+                round(side['azimuth'], 6), side['count'], pos_digest,
+                self._axes_key(side.get('axes')), panel_area, efficiency, panel_power_w)
+
+    def _side_series(self, side, sun, panel_area, efficiency, panel_power_w, lit=None):
+        """Energy (Wh) per time step for one side (lit: its (n, t) masks or None)"""
+        return side_energy_series(side['tilt'], side['azimuth'], side['count'], sun,
+                                  panel_area, efficiency, panel_power_w, lit_masks=lit)
+
+    @traced('energy.daily', 'energy')
+    def daily_energy(self, sides_info, positions_by_side, crowns, latitude, day_of_year,
+                     panel_area, efficiency, panel_power_w, triangles=None):
+        """Return (total_kwh, {side: kwh}) for the day, reusing cached sides.
+
+        sides_info is the list produced by ModificationsTab._get_panels_per_side;
+        sides with 'axes' (panel edge vectors) get fractional sub-panel shading.
+        positions_by_side maps side name to panel centre positions (may be empty,
+        in which case that side is treated as unshaded). With occluder
+        triangles, shading uses sun-view depth maps of the whole scene.
+        """
+        sun = self.sun_path(latitude, day_of_year)
+
+        crowns = [tuple(float(v) for v in c) for c in (crowns or [])]
+        shading_key = (self._sun_key, tuple(crowns), triangles_key(triangles))
+        if shading_key != self._shading_key:
+            self._shading_key = shading_key
+            self._panel_lit = {}
+
+        stale = []
+        active = set()
+        for side in sides_info:
+            name = side['name']
+            active.add(name)
+            positions = (positions_by_side or {}).get(name)
+            fingerprint = self._side_fingerprint(side, positions, panel_area,
+                                                 efficiency, panel_power_w)
+            cached = self._side_results.get(name)
+            if cached and cached[0] == fingerprint:
+                self.stats['side_hits'] += 1
+            else:
+                self.stats['side_misses'] += 1
+                stale.append((side, positions, fingerprint))
+
+        # Shade the changed sides in one pass so depth maps are shared
+        shaded = [(side, positions) for side, positions, _ in stale
+                  if (crowns or triangles is not None) and positions is not None
+                  and len(positions)]
+        masks = self._lit_masks([(positions, side.get('axes')) for side, positions in shaded],
+                                crowns, sun, triangles)
+        lit_by_side = {side['name']: lit for (side, _), lit in zip(shaded, masks)}
+        for side, _, fingerprint in stale:
+            series = self._side_series(side, sun, panel_area, efficiency, panel_power_w,
+                                       lit_by_side.get(side['name']))
+            self._side_results[side['name']] = (fingerprint, series)
+
+        per_side = {side['name']: float(self._side_results[side['name']][1].sum()) / 1000.0
+                    for side in sides_info}
+
+        # Drop sides that no longer carry panels
+        for name in list(self._side_results):
+            if name not in active:
+                del self._side_results[name]
+
+        return sum(per_side.values()), per_side
+
+    def invalidate(self, side=None):
+        """Forget cached results for one side, or everything when side is None"""
+        if side is None:
+            self._side_results.clear()
+            self._panel_lit = {}
+            self._shading_key = None
+        else:
+            self._side_results.pop(side, None)
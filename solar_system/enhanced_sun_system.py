@@ -7,6 +7,7 @@ import numpy as np
 import pyvista as pv
 from PyQt5.QtCore import QObject, pyqtSignal, QTimer
 import time
+from utils.tracing import traced
 
 class EnhancedRealisticSunSystem(QObject):
     """High-performance sun system with adaptive quality and OSPRay ray tracing"""
@@ -205,6 +206,7 @@ class EnhancedRealisticSunSystem(QObject):
         self._clear_shadows()
         self.shadow_cache.clear()
 
+    @traced('sun.create', 'sun')
     def create_photorealistic_sun(self, sun_position, solar_settings=None):
         """Create optimized sun with smart rendering - DEBUG VERSION"""
         start_time = time.time()
@@ -761,6 +763,7 @@ class EnhancedRealisticSunSystem(QObject):
             return 60.0
         return sum(self.fps_history) / len(self.fps_history)
 
+    @traced('sun.update', 'sun')
     def update_sun_position(self, sun_position, solar_settings=None):
         """Update sun position with smart caching"""
         # Handle None position (night time)
@@ -802,6 +805,8 @@ class EnhancedRealisticSunSystem(QObject):
         self.camera_moving = interactive
         
         if interactive:
+            # No shadow rebuilds while the camera is being dragged
+            self.update_timer.stop()
             old_mode = self.performance_mode
             if old_mode != 'performance':
                 self.set_performance_mode('performance')
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+solar_system/financial_model.py
+Self-consumption and financial evaluation of PV projects
+
+Combines an hourly production series (see energy_model.hourly_sun_table and
+layout_series) with an hourly load profile built from the project wizard's
+energy_info (EnergyStep) or read from a local CSV file. Every calculation is
+an array operation over (projects, hours), so a whole portfolio is
+evaluated in one call.
+"""
+import csv
+
+import numpy as np
+
+HOURS_PER_YEAR = 8760
+
+# Financial assumptions (overridable per project)
+DEFAULT_FINANCIAL_PARAMS = {
+    'electricity_rate_per_kwh': 0.12,   # €/kWh bought from the grid
+    'feed_in_tariff_per_kwh': 0.05,     # €/kWh paid for exported energy
+    'rate_escalation': 0.02,            # yearly electricity price increase
+    'system_cost_per_kwp': 1200.0,      # € installed
+    'om_cost_per_kwp': 15.0,            # € per kWp and year
+    'degradation': 0.005,               # yearly production loss
+    'discount_rate': 0.04,
+    'lifetime_years': 25,
+}
+
+# Relative hourly consumption of a household (weekday average, 0-23 h)
+RESIDENTIAL_DAILY_SHAPE = np.array([
+    0.55, 0.45, 0.40, 0.40, 0.42, 0.55, 0.85, 1.15, 1.05, 0.90, 0.85, 0.90,
+    0.95, 0.90, 0.85, 0.90, 1.05, 1.35, 1.65, 1.75, 1.60, 1.35, 1.00, 0.70,
+])
+
+
+# ==================== LOAD PROFILES ====================
+
+def _month_of_hour(year_days=365):
+    """Month index (0-11) of every hour of a non-leap year"""
+    month_lengths = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+    day_month = np.repeat(np.arange(12), month_lengths)[:year_days]
+    return np.repeat(day_month, 24)
+
+
+def synthetic_load_profile(annual_kwh, peak_kw=None, monthly_kwh=None):
+    """Hourly load (kWh per hour, 8760 values) for a household.
+
+    The daily shape has morning and evening peaks, with more consumption in
+    winter. monthly_kwh (12 values) rescales each month when given. When
+    peak_kw is given and exceeded, the profile is flattened toward its mean
+    so the maximum hour equals peak_kw while the annual total is preserved.
+    """
+    hours = np.arange(HOURS_PER_YEAR)
+    days = hours // 24
+    seasonal = 1.0 + 0.25 * np.cos(2.0 * np.pi * (days - 15) / 365.0)
+    load = RESIDENTIAL_DAILY_SHAPE[hours % 24] * seasonal
+
+    months = _month_of_hour()
+    if monthly_kwh is not None and len(monthly_kwh) == 12:
+        monthly_kwh = np.asarray(monthly_kwh, dtype=float)
+        month_sums = np.bincount(months, weights=load, minlength=12)
+        load = load * (monthly_kwh / np.where(month_sums > 0, month_sums, 1.0))[months]
+        if annual_kwh is None:
+            annual_kwh = float(monthly_kwh.sum())
+
+    load = load * (float(annual_kwh) / load.sum())
+
+    mean = load.mean()
+    if peak_kw and load.max() > peak_kw > mean:
+        load = mean + (load - mean) * ((peak_kw - mean) / (load.max() - mean))
+    return load
+
+
+def load_profile_from_csv(path, annual_kwh=None):
+    """Hourly load (kWh per hour) from a local CSV file.
+
+    Uses the last numeric column of each row; header and non-numeric rows
+    are skipped. Leap-year files are truncated to 8760 hours and shorter
+    files are tiled. annual_kwh rescales the profile when given.
+    """
+    values = []
+    with open(path, newline='') as f:
+        for row in csv.reader(f):
+            for cell in reversed(row):
+                try:
+                    values.append(float(cell))
+                    break
+                except ValueError:
+                    continue
+
+    if not values:
+        raise ValueError(f"No numeric load values found in {path}")
+
+    load = np.resize(np.asarray(values, dtype=float), HOURS_PER_YEAR)
+    if annual_kwh:
+        load = load * (float(annual_kwh) / load.sum())
+    return load
+
+
+def consumption_from_energy_info(energy_info):
+    """(annual kWh, 12 monthly kWh or None) from the wizard's energy_info.
+
+    EnergyStep stores the annual total and one average month
+    (monthly_consumption_kwh), which it fills in as annual / 12. A monthly
+    value that differs from that was typed in by hand and sets the annual
+    total. A list of 12 values is used as the monthly profile.
+    """
+    annual = energy_info.get('annual_consumption_kwh') or None
+    monthly = energy_info.get('monthly_consumption_kwh', energy_info.get('monthly_profile_kwh'))
+
+    if isinstance(monthly, (list, tuple, np.ndarray)):
+        if len(monthly) == 12:
+            return annual, np.asarray(monthly, dtype=float)
+        monthly = None
+    if monthly:
+        monthly_total = 12.0 * float(monthly)
+        if not annual or abs(monthly_total - annual) > 0.01 * annual:
+            annual = monthly_total
+    return (annual or 12000.0), None
+
+
+def load_profile_for_project(energy_info, csv_path=None):
+    """Hourly load for a project's wizard energy_info (EnergyStep.get_data)"""
+    annual, monthly = consumption_from_energy_info(energy_info)
+    if csv_path:
+        return load_profile_from_csv(csv_path, annual_kwh=annual)
+    return synthetic_load_profile(annual,
+                                  peak_kw=energy_info.get('peak_demand_kw'),
+                                  monthly_kwh=monthly)
+
+
+def monthly_totals(hourly):
+    """Monthly sums (12 values) of an hourly series of a non-leap year"""
+    return np.bincount(_month_of_hour(), weights=np.asarray(hourly, dtype=float)[:HOURS_PER_YEAR],
+                       minlength=12)
+
+
+# ==================== FINANCIALS ====================
+
+def _param_columns(params_list, count):
+    """Per-project parameter arrays (count,) from a list of override dicts"""
+    params_list = list(params_list or [{}] * count)
+    merged = [dict(DEFAULT_FINANCIAL_PARAMS, **(p or {})) for p in params_list]
+    return {key: np.array([p[key] for p in merged], dtype=float)
+            for key in DEFAULT_FINANCIAL_PARAMS}
+
+
+def evaluate_portfolio(production, load, system_kwp, params=None):
+    """Self-consumption and financial results for a batch of projects.
+
+    production and load are (projects, 8760) kWh per hour (a 1-D array is a
+    single project); system_kwp is (projects,). params is a list of dicts
+    overriding DEFAULT_FINANCIAL_PARAMS per project. Returns a dict of
+    (projects,) arrays plus 'cashflow' (projects, years).
+    """
+    production = np.atleast_2d(np.asarray(production, dtype=float))
+    load = np.atleast_2d(np.asarray(load, dtype=float))
+    system_kwp = np.atleast_1d(np.asarray(system_kwp, dtype=float))
+    count = production.shape[0]
+    p = _param_columns(params, count)
+
+    lifetime = int(p['lifetime_years'].max())
+    years = np.arange(lifetime)
+    active = years[None, :] < p['lifetime_years'][:, None]           # (P, Y)
+
+    # Year-one energy balance
+    self_consumed = np.minimum(production, load)
+    year1 = {
+        'production_kwh': production.sum(axis=1),
+        'consumption_kwh': load.sum(axis=1),
+        'self_consumed_kwh': self_consumed.sum(axis=1),
+        'exported_kwh': (production - self_consumed).sum(axis=1),
+        'imported_kwh': (load - self_consumed).sum(axis=1),
+    }
+
+    # Self-consumption is not linear in production, so each degraded year is
+    # re-balanced hour by hour (one vectorized pass over the portfolio per year)
+    factors = (1.0 - p['degradation'][:, None]) ** years[None, :]    # (P, Y)
+    self_by_year = np.empty((count, lifetime))
+    prod_by_year = production.sum(axis=1)[:, None] * factors
+    for y in years:
+        self_by_year[:, y] = np.minimum(production * factors[:, y:y + 1], load).sum(axis=1)
+    export_by_year = prod_by_year - self_by_year
+
+    escalation = (1.0 + p['rate_escalation'][:, None]) ** years[None, :]
+    savings = (self_by_year * p['electricity_rate_per_kwh'][:, None] * escalation +
+               export_by_year * p['feed_in_tariff_per_kwh'][:, None])
+    om_cost = (p['om_cost_per_kwp'] * system_kwp)[:, None]
+    cashflow = np.where(active, savings - om_cost, 0.0)
+
+    capex = p['system_cost_per_kwp'] * system_kwp
+    discount = (1.0 + p['discount_rate'][:, None]) ** (years[None, :] + 1)
+    npv = (cashflow / discount).sum(axis=1) - capex
+
+    # Payback: first year the cumulative cashflow covers the investment,
+    # interpolated within that year
+    cumulative = np.cumsum(cashflow, axis=1)
+    covered = cumulative >= capex[:, None]
+    first = np.argmax(covered, axis=1)
+    before = np.where(first > 0, cumulative[np.arange(count), first - 1], 0.0)
+    in_year = cashflow[np.arange(count), first]
+    fraction = np.where(in_year > 0, (capex - before) / np.where(in_year > 0, in_year, 1.0), 0.0)
+    payback = np.where(covered.any(axis=1), first + fraction, np.inf)
+
+    result = dict(year1)
+    consumption = np.where(year1['consumption_kwh'] > 0, year1['consumption_kwh'], 1.0)
+    produced = np.where(year1['production_kwh'] > 0, year1['production_kwh'], 1.0)
+    result.update({
+        'self_consumption_ratio': year1['self_consumed_kwh'] / produced,
+        'autarky_ratio': year1['self_consumed_kwh'] / consumption,
+        'capex': capex,
+        'first_year_savings': savings[:, 0],
+        'payback_years': payback,
+        'npv': npv,
+        'lifetime_production_kwh': np.where(active, prod_by_year, 0.0).sum(axis=1),
+        'cashflow': cashflow,
+    })
+    return result
+
+
+def evaluate_project(production, energy_info, system_kwp, params=None, load=None):
+    """Financial results for one project as plain floats.
+
+    energy_info is the wizard's energy_info dict; its electricity rate is
+    used unless params overrides it. load defaults to a synthetic profile.
+    """
+    if load is None:
+        load = load_profile_for_project(energy_info)
+    project_params = {'electricity_rate_per_kwh':
+                      energy_info.get('electricity_rate_per_kwh',
+                                      DEFAULT_FINANCIAL_PARAMS['electricity_rate_per_kwh'])}
+    project_params.update(params or {})
+
+    result = evaluate_portfolio(production, load, [system_kwp], [project_params])
+    return {key: (value[0].tolist() if key == 'cashflow' else float(value[0]))
+            for key, value in result.items()}
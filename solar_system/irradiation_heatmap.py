@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+solar_system/irradiation_heatmap.py
+Annual irradiation heatmap on roof faces
+
+Each roof face (from the roof's key points) is subdivided into a triangle
+grid. Annual plane-of-array irradiation (kWh/m²) is computed per grid vertex
+with the vectorized annual sun table and the sun-view depth map shading, and
+shown as mesh scalars with a colour bar. Results are cached per scene
+fingerprint, so toggling the overlay or moving the camera never recomputes.
+
+The scene is read on the UI thread (prepare), the annual sum is pure NumPy
+and may run in a worker thread (evaluate), and the mesh is built and shown
+back on the UI thread (finish / show).
+"""
+import math
+import numpy as np
+
+from solar_system.energy_model import annual_sun_table
+from solar_system.sun_depth_map import (OccluderCache, SunDepthMap, scene_occluder_meshes,
+                                        tree_crowns)
+from utils.tracing import traced
+
+HEATMAP_ACTOR_NAME = 'irradiation_heatmap'
+SCALAR_NAME = 'Annual irradiation (kWh/m²)'
+SURFACE_OFFSET = 0.03   # lift above the roof surface to avoid z-fighting
+
+
+# ==================== ROOF FACES ====================
+
+def roof_faces(roof):
+    """{face name: (k, 3) polygon} of the roof surfaces, counter-clockwise from above"""
+    name = type(roof).__name__.lower()
+    faces = {}
+    if name.startswith('gable'):
+        p = getattr(roof, 'roof_points', None) or {}
+        if p:
+            faces['left'] = [p['eave_left_front'], p['eave_left_back'], p['ridge_back'], p['ridge_front']]
+            faces['right'] = [p['eave_right_front'], p['eave_right_back'], p['ridge_back'], p['ridge_front']]
+    elif name.startswith('hip'):
+        p = getattr(roof, 'roof_points', None) or {}
+        if p:
+            faces['front'] = [p['front_left'], p['front_right'], p['ridge_front']]
+            faces['right'] = [p['front_right'], p['back_right'], p['ridge_back'], p['ridge_front']]
+            faces['back'] = [p['back_right'], p['back_left'], p['ridge_back']]
+            faces['left'] = [p['back_left'], p['front_left'], p['ridge_front'], p['ridge_back']]
+    elif name.startswith('pyramid'):
+        p = getattr(roof, 'rotated_points', None) or {}
+        if p:
+            faces['front'] = [p['front_left'], p['front_right'], p['peak']]
+            faces['right'] = [p['front_right'], p['back_right'], p['peak']]
+            faces['back'] = [p['back_right'], p['back_left'], p['peak']]
+            faces['left'] = [p['back_left'], p['front_left'], p['peak']]
+    elif name.startswith('flat'):
+        mesh = getattr(roof, 'roof_mesh', None)
+        if mesh is not None and mesh.n_points >= 3:
+            faces['center'] = list(np.asarray(mesh.points)[:4])
+    return {face: np.asarray(points, dtype=float) for face, points in faces.items()}
+
+
+def face_normal(polygon):
+    """Upward unit normal of a planar polygon (Newell's method)"""
+    p = np.asarray(polygon, dtype=float)
+    q = np.roll(p, -1, axis=0)
+    normal = np.array([np.sum((p[:, 1] - q[:, 1]) * (p[:, 2] + q[:, 2])),
+                       np.sum((p[:, 2] - q[:, 2]) * (p[:, 0] + q[:, 0])),
+                       np.sum((p[:, 0] - q[:, 0]) * (p[:, 1] + q[:, 1]))])
+    length = np.linalg.norm(normal)
+    if length < 1e-12:
+        return np.array([0.0, 0.0, 1.0])
+    normal /= length
+    return -normal if normal[2] < 0 else normal
+
+
+def subdivide_triangle(a, b, c, n):
+    """Regular subdivision of a triangle into n² triangles.
+
+    Returns (points (m, 3), triangles (n², 3) indices into points).
+    """
+    n = max(1, int(n))
+    i, j = np.array([(i, j) for i in range(n + 1) for j in range(n + 1 - i)]).T
+    points = a + np.outer(i / n, b - a) + np.outer(j / n, c - a)
+
+    # Row offsets of the (i, j) lattice: row i holds n + 1 - i vertices
+    row_start = np.concatenate([[0], np.cumsum(np.arange(n + 1, 0, -1))])
+    index = lambda ii, jj: row_start[ii] + jj
+    tris = []
+    for ii in range(n):
+        jj = np.arange(n - ii)
+        tris.append(np.column_stack([index(ii, jj), index(ii + 1, jj), index(ii, jj + 1)]))
+        if n - ii - 1 > 0:
+            jj = np.arange(n - ii - 1)
+            tris.append(np.column_stack([index(ii + 1, jj), index(ii + 1, jj + 1), index(ii, jj + 1)]))
+    return points, np.concatenate(tris)
+
+
+def sample_face(polygon, spacing=0.5):
+    """Triangle grid over a convex face with edges of about `spacing` metres.
+
+    Returns (points (m, 3), triangles (k, 3)).
+    """
+    polygon = np.asarray(polygon, dtype=float)
+    all_points, all_tris, offset = [], [], 0
+    # Fan triangulation, then subdivide each triangle
+    for k in range(1, len(polygon) - 1):
+        a, b, c = polygon[0], polygon[k], polygon[k + 1]
+        longest = max(np.linalg.norm(b - a), np.linalg.norm(c - a), np.linalg.norm(c - b))
+        points, tris = subdivide_triangle(a, b, c, math.ceil(longest / max(spacing, 0.05)))
+        all_points.append(points)
+        all_tris.append(tris + offset)
+        offset += len(points)
+    if not all_points:
+        return np.zeros((0, 3)), np.zeros((0, 3), dtype=int)
+    return np.concatenate(all_points), np.concatenate(all_tris)
+
+
+# ==================== IRRADIATION ====================
+
+@traced('heatmap.annual', 'energy')
+def annual_irradiation(points, normals, sun, triangles=None, crowns=None, pixel_size=0.15,
+                       on_progress=None):
+    """Annual plane-of-array irradiation (kWh/m²) per receiver point.
+
+    points/normals (n, 3); sun is an annual_sun_table. Beam irradiance is
+    shaded per sun sample with one sun-view depth map of the occluders;
+    diffuse (isotropic sky) always reaches the surface. on_progress(done,
+    total) is called after every sun sample.
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 3)
+    normals = np.asarray(normals, dtype=float).reshape(-1, 3)
+    total_wh = np.zeros(len(points))
+    if len(points) == 0:
+        return total_wh
+
+    # Lift receivers off their own surface so it does not shade them
+    receivers = points + normals * SURFACE_OFFSET
+    diffuse_view = (1.0 + normals[:, 2]) / 2.0
+    cos_aoi = np.maximum(normals @ np.asarray(sun['directions']).T, 0.0)   # (n, t)
+
+    total = len(sun['directions'])
+    for t, direction in enumerate(sun['directions']):
+        weight = sun['weight'][t]
+        total_wh += sun['dhi'][t] * diffuse_view * weight
+        if sun['dni'][t] > 0.0 and cos_aoi[:, t].any():
+            depth = SunDepthMap.for_receivers(direction, receivers, pixel_size=pixel_size)
+            if triangles is not None:
+                depth.add_triangles(triangles)
+            if crowns:
+                depth.add_spheres(crowns)
+            total_wh += sun['dni'][t] * cos_aoi[:, t] * depth.lit(receivers) * weight
+        if on_progress:
+            on_progress(t + 1, total)
+    return total_wh / 1000.0
+
+
+def scene_fingerprint(roof, latitude, spacing):
+    """Hashable key of everything the heatmap depends on"""
+    faces = tuple((name, np.round(poly, 3).tobytes()) for name, poly in roof_faces(roof).items())
+    obstacles = tuple((getattr(o, 'type', None), np.round(np.asarray(o.position, dtype=float), 3).tobytes())
+                      for o in getattr(roof, 'obstacles', None) or [])
+    meshes = tuple(sorted((name, getattr(mesh, 'n_points', 0))
+                          for name, mesh in scene_occluder_meshes(roof).items()))
+    crowns = tuple(tuple(round(v, 3) for v in crown) for crown in tree_crowns(roof))
+    return (type(roof).__name__, faces, obstacles, meshes, crowns,
+            round(float(latitude), 4), float(spacing))
+
+
+class IrradiationHeatmap:
+    """Computes, caches and shows the roof irradiation overlay for one plotter"""
+
+    def __init__(self, spacing=0.5, step_hours=1.0, day_step=14, pixel_size=0.15, max_cached=8):
+        self.spacing = spacing
+        self.step_hours = step_hours
+        self.day_step = day_step
+        self.pixel_size = pixel_size
+        self.max_cached = max_cached
+        self.occluder_cache = OccluderCache()
+        self._results = {}        # fingerprint -> {'mesh', 'per_face', 'range'}
+        self._sun_tables = {}     # latitude -> annual sun table
+        self.actor = None
+        self.plotter = None
+
+    @property
+    def visible(self):
+        return self.actor is not None
+
+    def _sun(self, latitude):
+        key = round(float(latitude), 4)
+        if key not in self._sun_tables:
+            self._sun_tables[key] = annual_sun_table(latitude, self.step_hours, self.day_step)
+        return self._sun_tables[key]
+
+    def cached(self, roof, latitude):
+        """Cached heatmap result for the roof's current scene, or None"""
+        return self._results.get(scene_fingerprint(roof, latitude, self.spacing))
+
+    def prepare(self, roof, latitude):
+        """Gather everything one computation needs from the scene (UI thread).
+
+        Returns a job dict for evaluate/finish, or None when the roof has no
+        sampled faces.
+        """
+        faces = roof_faces(roof)
+        if not faces:
+            return None
+
+        points, normals, tris, face_ids = [], [], [], []
+        offset = 0
+        for index, (name, polygon) in enumerate(faces.items()):
+            face_points, face_tris = sample_face(polygon, self.spacing)
+            points.append(face_points)
+            normals.append(np.repeat(face_normal(polygon)[None], len(face_points), axis=0))
+            tris.append(face_tris + offset)
+            face_ids.append(np.full(len(face_points), index))
+            offset += len(face_points)
+
+        return {
+            'key': scene_fingerprint(roof, latitude, self.spacing),
+            'faces': list(faces),
+            'points': np.concatenate(points),
+            'normals': np.concatenate(normals),
+            'tris': np.concatenate(tris),
+            'face_ids': np.concatenate(face_ids),
+            'occluders': self.occluder_cache.triangles(scene_occluder_meshes(roof)),
+            'crowns': tree_crowns(roof),
+            'sun': self._sun(latitude),
+        }
+
+    def evaluate(self, job, on_progress=None):
+        """Annual irradiation of a prepared job; touches no scene objects, so it
+        can run in a worker thread"""
+        job['values'] = annual_irradiation(job['points'], job['normals'], job['sun'],
+                                           job['occluders'], job['crowns'], self.pixel_size,
+                                           on_progress)
+        return job
+
+    def finish(self, job):
+        """Build the overlay mesh of an evaluated job and cache the result"""
+        import pyvista as pv
+        values, tris, face_ids = job['values'], job['tris'], job['face_ids']
+        faces_array = np.column_stack([np.full(len(tris), 3), tris]).ravel()
+        mesh = pv.PolyData(job['points'] + job['normals'] * SURFACE_OFFSET, faces_array)
+        mesh.point_data[SCALAR_NAME] = values
+
+        result = {
+            'mesh': mesh,
+            'per_face': {name: float(values[face_ids == i].mean())
+                         for i, name in enumerate(job['faces'])},
+            'range': (float(values.min()), float(values.max())),
+        }
+        if len(self._results) >= self.max_cached:
+            self._results.pop(next(iter(self._results)))
+        self._results[job['key']] = result
+        return result
+
+    def compute(self, roof, latitude):
+        """Heatmap result for the roof (cached per scene fingerprint).
+
+        Returns {'mesh', 'per_face': {face: mean kWh/m²}, 'range': (min, max)}
+        or None when the roof has no sampled faces.
+        """
+        result = self.cached(roof, latitude)
+        if result is not None:
+            return result
+        job = self.prepare(roof, latitude)
+        if job is None:
+            return None
+        return self.finish(self.evaluate(job))
+
+    def show(self, roof, latitude, result=None):
+        """Add a heatmap result (computed or reused when not given) to the roof's plotter"""
+        result = result if result is not None else self.compute(roof, latitude)
+        if result is None:
+            return None
+        self.hide()
+        self.plotter = roof.plotter
+        self.actor = self.plotter.add_mesh(
+            result['mesh'], scalars=SCALAR_NAME, cmap='inferno', clim=result['range'],
+            name=HEATMAP_ACTOR_NAME, pickable=False, lighting=False, show_edges=False,
+            scalar_bar_args={'title': SCALAR_NAME, 'vertical': True, 'n_labels': 5,
+                             'fmt': '%.0f', 'position_x': 0.88, 'position_y': 0.25})
+        self.plotter.render()
+        return result
+
+    def hide(self):
+        """Remove the overlay and its colour bar (cached results are kept)"""
+        if self.actor is None or self.plotter is None:
+            self.actor = None
+            return
+        try:
+            self.plotter.remove_actor(HEATMAP_ACTOR_NAME, reset_camera=False)
+            if SCALAR_NAME in getattr(self.plotter, 'scalar_bars', {}):
+                self.plotter.remove_scalar_bar(SCALAR_NAME)
+            self.plotter.render()
+        except Exception:
+            pass
+        self.actor = None
+
+    def clear(self):
+        """Drop cached results (e.g. on roof switch)"""
+        self.hide()
+        self._results.clear()
+        self.occluder_cache.clear()
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+solar_system/parameter_sweep.py
+Parallel parameter sweep for design sensitivity studies
+
+Evaluates the Cartesian grid of building rotation and panel configuration
+scenarios in a process pool. The annual sun table is computed once in the
+parent and shared with workers through shared memory; each worker builds a
+panel layout once per roof/panel geometry and reuses it for every rotation,
+power and side combination that shares it.
+
+Usage:
+    python -m solar_system.parameter_sweep --roof hip --dimensions 10 8 4 \\
+        --rotation 0 15 30 --panel-power 400 450 --sides front,left front,right \\
+        --output sweep.csv
+"""
+import argparse
+import csv
+import itertools
+import math
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from solar_system.energy_model import annual_sun_table, layout_energy
+
+# Axes that can be swept, with the scenario key they set
+SWEEP_AXES = ('rotation', 'panel_width', 'panel_length', 'panel_power', 'panel_gap',
+              'edge_offset', 'horizontal_edge_offset', 'vertical_edge_offset', 'sides')
+
+# Scenario keys that change the panel layout (rotation and power do not)
+LAYOUT_KEYS = ('roof_type', 'dimensions', 'panel_width', 'panel_length', 'panel_gap',
+               'edge_offset', 'horizontal_edge_offset', 'vertical_edge_offset')
+
+DEFAULT_SCENARIO = {
+    'roof_type': 'hip',
+    'dimensions': (10.0, 8.0, 4.0),
+    'rotation': 0.0,
+    'panel_width': 1000,
+    'panel_length': 1600,
+    'panel_power': 400,
+    'panel_gap': 50,
+    'edge_offset': 300,
+    'horizontal_edge_offset': 300,
+    'vertical_edge_offset': 300,
+    'sides': ('front',),
+    'crowns': (),
+}
+
+SUN_COLUMNS = ('dx', 'dy', 'dz', 'sin_elev', 'cos_elev', 'azimuth', 'dni', 'dhi', 'weight')
+
+
+class SharedSunTable:
+    """Annual sun table packed into one shared-memory block (samples x columns)"""
+
+    def __init__(self, shm, n_samples, owner):
+        self.shm = shm
+        self.n_samples = n_samples
+        self.owner = owner
+        self.array = np.ndarray((n_samples, len(SUN_COLUMNS)), dtype=np.float64, buffer=shm.buf)
+
+    @classmethod
+    def create(cls, table):
+        """Copy a sun table (see annual_sun_table) into a new shared block"""
+        n = len(table['sin_elev'])
+        shm = shared_memory.SharedMemory(create=True, size=max(1, n * len(SUN_COLUMNS) * 8))
+        shared = cls(shm, n, owner=True)
+        shared.array[:, 0:3] = table['directions']
+        for col, key in enumerate(SUN_COLUMNS[3:], start=3):
+            shared.array[:, col] = table[key]
+        return shared
+
+    @classmethod
+    def attach(cls, descriptor):
+        """Attach to a block created in another process"""
+        name, n = descriptor
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            # Only the creating process may unlink the block
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        except Exception:
+            pass
+        return cls(shm, n, owner=False)
+
+    @property
+    def descriptor(self):
+        return (self.shm.name, self.n_samples)
+
+    def as_table(self):
+        """Zero-copy dict view with the keys used by the energy model"""
+        table = {'directions': self.array[:, 0:3]}
+        for col, key in enumerate(SUN_COLUMNS[3:], start=3):
+            table[key] = self.array[:, col]
+        return table
+
+    def close(self):
+        self.array = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def build_scenarios(base=None, **axes):
+    """Cartesian grid of scenarios.
+
+    base overrides DEFAULT_SCENARIO; each keyword in SWEEP_AXES takes a list
+    of values. Side combinations above the roof's max_active_sides are dropped.
+    """
+    from roofs.solar_panel_handlers.config import get_default_config
+
+    base = dict(DEFAULT_SCENARIO, **(base or {}))
+    unknown = set(axes) - set(SWEEP_AXES)
+    if unknown:
+        raise ValueError(f"Unknown sweep axes: {sorted(unknown)}. Available: {list(SWEEP_AXES)}")
+
+    names = [name for name in SWEEP_AXES if axes.get(name)]
+    max_sides = get_default_config(base['roof_type']).get('max_active_sides')
+
+    scenarios = []
+    for values in itertools.product(*(axes[name] for name in names)):
+        scenario = dict(base, **dict(zip(names, values)))
+        scenario['sides'] = tuple(scenario['sides'])
+        if max_sides and len(scenario['sides']) > max_sides:
+            continue
+        scenarios.append(scenario)
+    return scenarios
+
+
+def _layout_key(scenario):
+    return tuple(tuple(scenario[k]) if k == 'dimensions' else scenario[k] for k in LAYOUT_KEYS)
+
+
+# ==================== WORKER ====================
+
+_WORKER = {'shared': None, 'sun': None, 'layouts': {}}
+
+
+def _init_worker(descriptor):
+    """Process pool initializer: attach the shared sun table once per worker"""
+    _WORKER['shared'] = SharedSunTable.attach(descriptor)
+    _WORKER['sun'] = _WORKER['shared'].as_table()
+
+
+def _scenario_layout(scenario):
+    """Panel layout for every side of the roof, cached per worker process"""
+    key = _layout_key(scenario)
+    if key not in _WORKER['layouts']:
+        from roofs.headless_scene import create_headless_roof, panel_layout, roof_sides
+
+        roof = create_headless_roof(scenario['roof_type'], scenario['dimensions'])
+        config = {k: scenario[k] for k in LAYOUT_KEYS[2:]}
+        config['panel_power'] = scenario['panel_power']
+        layout = panel_layout(roof, config, roof_sides(scenario['roof_type']))
+        _WORKER['layouts'][key] = (roof, layout)
+        try:
+            roof.plotter.close()
+        except Exception:
+            pass
+    return _WORKER['layouts'][key]
+
+
+def evaluate_scenario(scenario, sun=None):
+    """Annual energy for one scenario; returns a result row (dict)"""
+    from roofs.headless_scene import face_orientation, rotate_positions
+
+    sun = sun if sun is not None else _WORKER['sun']
+    roof, layout = _scenario_layout(scenario)
+    rotation = float(scenario['rotation'])
+
+    panel_area = scenario['panel_width'] * scenario['panel_length'] / 1e6
+    panel_power_w = float(scenario['panel_power'])
+    # STC efficiency implied by nameplate power and module area
+    efficiency = panel_power_w / (panel_area * 1000.0)
+
+    sides = []
+    for name in scenario['sides']:
+        tilt, azimuth = face_orientation(roof, name, rotation)
+        sides.append({'name': name, 'tilt': tilt, 'azimuth': azimuth,
+                      'positions': rotate_positions(layout.get(name, []), rotation)})
+
+    per_side = layout_energy(sides, sun, panel_area, efficiency, panel_power_w,
+                             crowns=list(scenario.get('crowns') or ()))
+
+    panel_count = sum(len(s['positions']) for s in sides)
+    system_kwp = panel_count * panel_power_w / 1000.0
+    annual_kwh = sum(per_side.values())
+
+    row = {k: v for k, v in scenario.items() if k != 'crowns'}
+    row['sides'] = '+'.join(scenario['sides'])
+    row['dimensions'] = 'x'.join(f"{d:g}" for d in scenario['dimensions'])
+    row.update({
+        'panel_count': panel_count,
+        'system_kwp': round(system_kwp, 3),
+        'annual_kwh': round(annual_kwh, 1),
+        'specific_yield': round(annual_kwh / system_kwp, 1) if system_kwp > 0 else 0.0,
+    })
+    for name, kwh in per_side.items():
+        row[f'kwh_{name}'] = round(kwh, 1)
+    return row
+
+
+def _evaluate_chunk(scenarios):
+    return [evaluate_scenario(s) for s in scenarios]
+
+
+# ==================== RUNNER ====================
+
+def run_sweep(scenarios, latitude, workers=None, on_result=None,
+              step_hours=1.0, day_step=7):
+    """Evaluate scenarios in a process pool and stream rows to on_result.
+
+    Scenarios sharing a panel layout are chunked together so each worker
+    builds a layout at most once. Returns all rows in completion order.
+    """
+    workers = workers or max(1, (multiprocessing.cpu_count() or 2) - 1)
+
+    groups = {}
+    for scenario in scenarios:
+        groups.setdefault(_layout_key(scenario), []).append(scenario)
+
+    chunks = []
+    for group in groups.values():
+        size = max(1, math.ceil(len(group) / workers))
+        chunks.extend(group[i:i + size] for i in range(0, len(group), size))
+
+    shared = SharedSunTable.create(annual_sun_table(latitude, step_hours, day_step))
+    rows = []
+    try:
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                 initializer=_init_worker,
+                                 initargs=(shared.descriptor,)) as pool:
+            futures = [pool.submit(_evaluate_chunk, chunk) for chunk in chunks]
+            for future in as_completed(futures):
+                for row in future.result():
+                    rows.append(row)
+                    if on_result:
+                        on_result(row)
+    finally:
+        shared.close()
+    return rows
+
+
+# ==================== CLI ====================
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog='python -m solar_system.parameter_sweep',
+        description='Parallel design sensitivity sweep for PVmizer GEO roofs')
+    parser.add_argument('--roof', default='hip', choices=['flat', 'gable', 'hip', 'pyramid'])
+    parser.add_argument('--dimensions', type=float, nargs=3, default=[10.0, 8.0, 4.0],
+                        metavar=('LENGTH', 'WIDTH', 'HEIGHT'))
+    parser.add_argument('--latitude', type=float, default=48.3061)
+    parser.add_argument('--rotation', type=float, nargs='+', default=[0.0])
+    parser.add_argument('--panel-width', type=float, nargs='+', default=[1000])
+    parser.add_argument('--panel-length', type=float, nargs='+', default=[1600])
+    parser.add_argument('--panel-power', type=float, nargs='+', default=[400])
+    parser.add_argument('--panel-gap', type=float, nargs='+', default=[50])
+    parser.add_argument('--edge-offset', type=float, nargs='+', default=[300])
+    parser.add_argument('--horizontal-edge-offset', type=float, nargs='+', default=[300])
+    parser.add_argument('--vertical-edge-offset', type=float, nargs='+', default=[300])
+    parser.add_argument('--sides', nargs='+', default=None,
+                        help="comma-separated side sets, e.g. front,left back")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--output', default=None, help="CSV file (rows are appended as they finish)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    from roofs.headless_scene import roof_sides
+
+    args = _parse_args(argv if argv is not None else sys.argv[1:])
+    sides = [tuple(s.split(',')) for s in args.sides] if args.sides else \
+        [(side,) for side in roof_sides(args.roof)]
+
+    scenarios = build_scenarios(
+        {'roof_type': args.roof, 'dimensions': tuple(args.dimensions)},
+        rotation=args.rotation,
+        panel_width=args.panel_width,
+        panel_length=args.panel_length,
+        panel_power=args.panel_power,
+        panel_gap=args.panel_gap,
+        edge_offset=args.edge_offset,
+        horizontal_edge_offset=args.horizontal_edge_offset,
+        vertical_edge_offset=args.vertical_edge_offset,
+        sides=sides,
+    )
+    if not scenarios:
+        print("No valid scenarios (check --sides against the roof's side limit)")
+        return 1
+
+    columns = ['roof_type', 'dimensions', 'rotation', 'panel_width', 'panel_length',
+               'panel_power', 'panel_gap', 'edge_offset', 'horizontal_edge_offset',
+               'vertical_edge_offset', 'sides', 'panel_count', 'system_kwp',
+               'annual_kwh', 'specific_yield'] + [f'kwh_{s}' for s in roof_sides(args.roof)]
+
+    out_file = open(args.output, 'w', newline='') if args.output else None
+    writer = csv.DictWriter(out_file, fieldnames=columns, restval='') if out_file else None
+    if writer:
+        writer.writeheader()
+
+    print(f"{'rotation':>8} {'power':>6} {'sides':<16} {'panels':>6} {'kWp':>7} {'kWh/yr':>9} {'kWh/kWp':>8}")
+    started = time.time()
+
+    def on_result(row):
+        print(f"{row['rotation']:>8g} {row['panel_power']:>6g} {row['sides']:<16} "
+              f"{row['panel_count']:>6} {row['system_kwp']:>7.2f} {row['annual_kwh']:>9.0f} "
+              f"{row['specific_yield']:>8.0f}")
+        if writer:
+            writer.writerow(row)
+            out_file.flush()
+
+    try:
+        run_sweep(scenarios, args.latitude, workers=args.workers, on_result=on_result)
+    finally:
+        if out_file:
+            out_file.close()
+
+    print(f"✅ {len(scenarios)} scenarios in {time.time() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
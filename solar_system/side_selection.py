@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+solar_system/side_selection.py
+Best roof-face subset solver for roofs with a max_active_sides limit
+
+Hip and pyramid roofs only allow two active sides. Faces do not shade each
+other in the energy model, so a subset's annual yield is the sum of its
+faces' yields: every face is evaluated once (in parallel, cached by geometry
+and shading inputs) and all allowed subsets are then ranked from those
+per-face results.
+"""
+import itertools
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from solar_system.energy_model import annual_sun_table, layout_energy, triangles_key
+
+
+class SideSelectionSolver:
+    """Rank allowed roof-face subsets by annual yield and yield per panel.
+
+    Keeps the annual sun table per latitude, the panel layouts of the last
+    max_cached roof/panel geometries and the annual kWh per face, so repeated
+    queries (e.g. after moving a tree) only recompute the faces whose inputs
+    changed. solve() builds headless roofs, so the UI calls it off the event
+    thread.
+    """
+
+    def __init__(self, step_hours=1.0, day_step=7, workers=4, max_cached=8):
+        self.step_hours = step_hours
+        self.day_step = day_step
+        self.workers = workers
+        self.max_cached = max_cached
+
+        self._sun_tables = {}     # {latitude: sun table}
+        self._layouts = {}        # {layout key: ({side: (tilt, azimuth)}, {side: positions})}
+        self._face_results = {}   # {face key: kwh}
+
+        self.stats = {'face_hits': 0, 'face_misses': 0}
+
+    # ==================== INPUTS ====================
+
+    def sun_table(self, latitude):
+        """Annual sun table for a latitude (see annual_sun_table), cached"""
+        key = round(float(latitude), 4)
+        if key not in self._sun_tables:
+            self._sun_tables[key] = annual_sun_table(latitude, self.step_hours, self.day_step)
+        return self._sun_tables[key]
+
+    def layout(self, roof_type, dimensions, panel_config, obstacles=None):
+        """Per-side face orientation and panel layout, cached per geometry.
+
+        Returns ({side: (tilt, azimuth)} of the unrotated roof, {side: positions}).
+        obstacles (see headless_scene.roof_obstacle_specs) are placed first,
+        so the layout avoids them just like placement on the live roof. The
+        headless roof is only kept while the layout is built.
+        """
+        from roofs.headless_scene import (create_headless_roof, face_orientation, panel_layout,
+                                          place_roof_obstacles, roof_sides)
+
+        key = (roof_type, tuple(round(float(d), 4) for d in dimensions),
+               tuple(sorted((k, float(v)) for k, v in panel_config.items()
+                            if isinstance(v, (int, float)))),
+               json.dumps(obstacles or [], sort_keys=True))
+        if key not in self._layouts:
+            roof = create_headless_roof(roof_type, dimensions)
+            try:
+                place_roof_obstacles(roof, obstacles)
+                positions = panel_layout(roof, panel_config, roof_sides(roof_type))
+                orientations = {name: face_orientation(roof, name) for name in positions}
+            finally:
+                try:
+                    roof.plotter.close()
+                except Exception:
+                    pass
+            if len(self._layouts) >= self.max_cached:
+                self._layouts.pop(next(iter(self._layouts)))
+            self._layouts[key] = (orientations, positions)
+        return self._layouts[key]
+
+    # ==================== FACES ====================
+
+    @staticmethod
+    def _face_key(face, latitude, crowns, panel_area, efficiency, panel_power_w,
+                  occluders=None):
+        positions = np.round(np.asarray(face['positions'], dtype=float).reshape(-1, 3), 4)
+        return (face['name'], round(face['tilt'], 6), round(face['azimuth'], 6),
+                hash(positions.tobytes()), round(float(latitude), 4), tuple(crowns),
+                occluders, panel_area, efficiency, panel_power_w)
+
+    def face_yields(self, faces, latitude, panel_area, efficiency, panel_power_w, crowns=None,
+                    triangles=None):
+        """Annual kWh per face, evaluating uncached faces in parallel.
+
+        faces is a list of dicts with name, tilt (radians), azimuth (degrees)
+        and positions (n, 3). With occluder triangles the faces are shaded by
+        sun-view depth maps (see layout_series). Returns {name: kwh}.
+        """
+        crowns = tuple(tuple(float(v) for v in c) for c in (crowns or []))
+        occluders = triangles_key(triangles)
+        sun = self.sun_table(latitude)
+
+        results, pending = {}, []
+        for face in faces:
+            key = self._face_key(face, latitude, crowns, panel_area, efficiency, panel_power_w,
+                                 occluders)
+            if key in self._face_results:
+                self.stats['face_hits'] += 1
+                results[face['name']] = self._face_results[key]
+            else:
+                self.stats['face_misses'] += 1
+                pending.append((key, face))
+
+        def evaluate(item):
+            key, face = item
+            kwh = layout_energy([face], sun, panel_area, efficiency, panel_power_w,
+                                crowns=list(crowns), triangles=triangles)[face['name']]
+            return key, face['name'], kwh
+
+        if pending:
+            # NumPy releases the GIL in the ray/sphere products, so threads overlap
+            with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(pending)))) as pool:
+                for key, name, kwh in pool.map(evaluate, pending):
+                    self._face_results[key] = kwh
+                    results[name] = kwh
+        return results
+
+    # ==================== SUBSETS ====================
+
+    @staticmethod
+    def rank_subsets(face_kwh, face_counts, max_sides, panel_power_w):
+        """Every non-empty face subset of at most max_sides faces, as rows.
+
+        Returns (by_yield, by_yield_per_panel); each row has sides,
+        panel_count, system_kwp, annual_kwh, kwh_per_panel and specific_yield.
+        """
+        names = [name for name in face_kwh if face_counts.get(name, 0) > 0]
+        if not names:
+            return [], []
+
+        max_sides = max_sides or len(names)
+        subsets = [combo for size in range(1, min(max_sides, len(names)) + 1)
+                   for combo in itertools.combinations(range(len(names)), size)]
+
+        # Subset membership matrix (subsets x faces) → sums as one product
+        membership = np.zeros((len(subsets), len(names)))
+        for row, combo in enumerate(subsets):
+            membership[row, list(combo)] = 1.0
+        kwh = membership @ np.array([face_kwh[n] for n in names])
+        counts = membership @ np.array([face_counts[n] for n in names], dtype=float)
+
+        rows = []
+        for row, combo in enumerate(subsets):
+            kwp = float(counts[row]) * panel_power_w / 1000.0
+            rows.append({
+                'sides': tuple(names[i] for i in combo),
+                'panel_count': int(counts[row]),
+                'system_kwp': round(kwp, 3),
+                'annual_kwh': round(float(kwh[row]), 1),
+                'kwh_per_panel': round(float(kwh[row] / counts[row]), 1),
+                'specific_yield': round(float(kwh[row] / kwp), 1) if kwp > 0 else 0.0,
+            })
+
+        by_yield = sorted(rows, key=lambda r: r['annual_kwh'], reverse=True)
+        by_panel = sorted(rows, key=lambda r: (r['kwh_per_panel'], r['annual_kwh']), reverse=True)
+        return by_yield, by_panel
+
+    def solve(self, roof_type, dimensions, panel_config, latitude,
+              rotation=0.0, crowns=None, max_sides=None, obstacles=None, triangles=None):
+        """Rank face subsets for a roof built from scratch off-screen.
+
+        panel_config uses the handler's keys in mm plus panel_power in W;
+        obstacles are the live roof's roof_obstacle_specs. Crowns and occluder
+        triangles are in the live (rotated) scene frame. max_sides defaults
+        to the roof type's max_active_sides. Returns a dict with by_yield,
+        by_yield_per_panel and faces.
+        """
+        from roofs.headless_scene import max_active_sides, rotate_positions
+
+        orientations, layout = self.layout(roof_type, dimensions, panel_config, obstacles)
+
+        faces = []
+        for name, positions in layout.items():
+            tilt, azimuth = orientations[name]
+            # Faces turn with the building (see face_orientation)
+            faces.append({'name': name, 'tilt': tilt, 'azimuth': (azimuth - rotation) % 360.0,
+                          'positions': rotate_positions(positions, rotation)})
+
+        panel_power_w = float(panel_config.get('panel_power', 400))
+        panel_area = panel_config.get('panel_width', 1000) * panel_config.get('panel_length', 1600) / 1e6
+        efficiency = panel_power_w / (panel_area * 1000.0)
+
+        face_kwh = self.face_yields(faces, latitude, panel_area, efficiency,
+                                    panel_power_w, crowns, triangles)
+        face_counts = {f['name']: len(f['positions']) for f in faces}
+        by_yield, by_panel = self.rank_subsets(
+            face_kwh, face_counts, max_sides or max_active_sides(roof_type), panel_power_w)
+
+        return {
+            'by_yield': by_yield,
+            'by_yield_per_panel': by_panel,
+            'faces': {name: {'panel_count': face_counts[name], 'annual_kwh': round(kwh, 1)}
+                      for name, kwh in face_kwh.items()},
+        }
+
+
+_DEFAULT_SOLVER = None
+
+
+def best_sides(roof_type, dimensions, panel_config=None, latitude=48.3061,
+               rotation=0.0, crowns=None, max_sides=None, obstacles=None, triangles=None):
+    """Headless API: rank allowed face subsets for a roof.
+
+    Uses a module-level solver so repeated calls share cached layouts and
+    per-face results.
+    """
+    global _DEFAULT_SOLVER
+    if _DEFAULT_SOLVER is None:
+        _DEFAULT_SOLVER = SideSelectionSolver()
+
+    from roofs.solar_panel_handlers.config import DEFAULT_PANEL_CONFIG
+    config = dict(DEFAULT_PANEL_CONFIG, **(panel_config or {}))
+    return _DEFAULT_SOLVER.solve(roof_type, dimensions, config, latitude,
+                                 rotation=rotation, crowns=crowns, max_sides=max_sides,
+                                 obstacles=obstacles, triangles=triangles)
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+solar_system/sun_depth_map.py
+Sun-view depth map shading - orthographic depth buffer aligned with the sun
+
+All occluders (roof and building parts, roof obstacles, trunks, poles, tree
+crowns, any further scene meshes) are rasterized once into a NumPy depth
+buffer looking down the sun direction. Each receiver point is then shaded by
+one projected depth lookup, so the cost grows with triangles + receivers
+instead of receivers x occluders like the per-ray sphere test.
+
+    depth = SunDepthMap.for_receivers(direction, points)
+    depth.add_triangles(triangles)
+    depth.add_spheres(crowns)
+    lit = depth.lit(points)
+"""
+import math
+import numpy as np
+
+# Largest number of candidate pixels expanded in one vectorized batch
+_CHUNK_PIXELS = 1 << 21
+
+# Names of registered scene meshes that are never shadow casters here
+_SKIP_MARKERS = ('ground', 'panel', 'sun', 'sky', 'debug', 'attachment', 'preview',
+                 'highlight', 'shadow', 'hud', 'crown')
+# Plotter actor names of building parts (used when no sun system is attached)
+_BUILDING_MARKERS = ('building', 'foundation', 'roof', 'slope', 'gable', 'wall',
+                     'parapet', 'face', 'ridge')
+
+
+def sun_direction(elevation_deg, azimuth_deg):
+    """Unit vector toward the sun (x east, y north, z up; azimuth 0=N, 90=E)"""
+    elev = math.radians(elevation_deg)
+    az = math.radians(azimuth_deg)
+    return np.array([math.cos(elev) * math.sin(az),
+                     math.cos(elev) * math.cos(az),
+                     math.sin(elev)])
+
+
+def sun_basis(direction):
+    """Orthonormal (u, v, w) with w pointing toward the sun"""
+    w = np.asarray(direction, dtype=float)
+    w = w / np.linalg.norm(w)
+    helper = np.array([0.0, 0.0, 1.0]) if abs(w[2]) < 0.9 else np.array([1.0, 0.0, 0.0])
+    u = np.cross(helper, w)
+    u /= np.linalg.norm(u)
+    v = np.cross(w, u)
+    return np.vstack([u, v, w])
+
+
+# ==================== DEPTH MAP ====================
+
+class SunDepthMap:
+    """Orthographic depth buffer seen from the sun.
+
+    depth[iy, ix] holds the largest sun-axis coordinate (closest to the sun)
+    of any occluder covering that pixel. A receiver is shadowed when the
+    depth at its pixel lies more than `bias` above it.
+    """
+
+    def __init__(self, direction, extent, pixel_size=0.1, max_resolution=2048, bias=0.1):
+        self.basis = sun_basis(direction)
+        u0, u1, v0, v1 = extent
+        span = max(u1 - u0, v1 - v0, 1e-6)
+        self.pixel_size = max(float(pixel_size), span / max_resolution)
+        self.origin = np.array([u0, v0], dtype=float)
+        self.nx = int(math.ceil((u1 - u0) / self.pixel_size)) + 1
+        self.ny = int(math.ceil((v1 - v0) / self.pixel_size)) + 1
+        self.depth = np.full(self.nx * self.ny, -np.inf)
+        # Sloped surfaces change depth across one pixel; allow for up to ~63°
+        self.bias = float(bias) + 2.0 * self.pixel_size
+
+    @classmethod
+    def for_receivers(cls, direction, points, pixel_size=0.1, max_resolution=2048,
+                      bias=0.1, margin=1.0):
+        """Depth map covering just the projected receivers (plus margin metres)"""
+        uvw = np.asarray(points, dtype=float).reshape(-1, 3) @ sun_basis(direction).T
+        if len(uvw) == 0:
+            extent = (0.0, 1.0, 0.0, 1.0)
+        else:
+            extent = (uvw[:, 0].min() - margin, uvw[:, 0].max() + margin,
+                      uvw[:, 1].min() - margin, uvw[:, 1].max() + margin)
+        return cls(direction, extent, pixel_size, max_resolution, bias)
+
+    def project(self, points):
+        """(n, 3) world points -> (n, 3) sun-aligned (u, v, w)"""
+        return np.asarray(points, dtype=float).reshape(-1, 3) @ self.basis.T
+
+    def _pixel(self, uv):
+        """Float pixel coordinates of (n, 2) uv"""
+        return (uv - self.origin) / self.pixel_size
+
+    def _boxes(self, lo, hi):
+        """Clip float pixel boxes to the buffer; returns ints and a keep mask"""
+        x0 = np.maximum(np.floor(lo[:, 0]).astype(int), 0)
+        y0 = np.maximum(np.floor(lo[:, 1]).astype(int), 0)
+        x1 = np.minimum(np.ceil(hi[:, 0]).astype(int), self.nx - 1)
+        y1 = np.minimum(np.ceil(hi[:, 1]).astype(int), self.ny - 1)
+        keep = (x1 >= x0) & (y1 >= y0)
+        return x0[keep], y0[keep], x1[keep], y1[keep], keep
+
+    def _expand(self, x0, y0, x1, y1):
+        """Yield (item index, px, py) for every pixel of each box, in chunks"""
+        widths = x1 - x0 + 1
+        counts = widths * (y1 - y0 + 1)
+        start = 0
+        while start < len(counts):
+            # Take as many boxes as fit into one chunk (at least one)
+            cumulative = np.cumsum(counts[start:])
+            stop = start + max(1, int(np.searchsorted(cumulative, _CHUNK_PIXELS, side='right')))
+            c = counts[start:stop]
+            item = np.repeat(np.arange(start, stop), c)
+            offsets = np.arange(int(c.sum())) - np.repeat(np.cumsum(c) - c, c)
+            w = widths[item]
+            yield item, x0[item] + offsets % w, y0[item] + offsets // w
+            start = stop
+
+    def _write(self, px, py, depth):
+        np.maximum.at(self.depth, py * self.nx + px, depth)
+
+    def add_triangles(self, triangles):
+        """Rasterize (n, 3, 3) world-space triangles"""
+        tris = np.asarray(triangles, dtype=float).reshape(-1, 3, 3)
+        if len(tris) == 0:
+            return
+        uvw = self.project(tris.reshape(-1, 3)).reshape(-1, 3, 3)
+        pix = self._pixel(uvw[:, :, :2].reshape(-1, 2)).reshape(-1, 3, 2)
+        w = uvw[:, :, 2]
+
+        # Splat vertices so occluders thinner than a pixel still cast
+        vx = np.floor(pix[:, :, 0].ravel()).astype(int)
+        vy = np.floor(pix[:, :, 1].ravel()).astype(int)
+        inside = (vx >= 0) & (vx < self.nx) & (vy >= 0) & (vy < self.ny)
+        self._write(vx[inside], vy[inside], w.ravel()[inside])
+
+        a, b, c = pix[:, 0], pix[:, 1], pix[:, 2]
+        area = (b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0])
+        valid = np.abs(area) > 1e-12
+        a, b, c, w, area = a[valid], b[valid], c[valid], w[valid], area[valid]
+
+        x0, y0, x1, y1, keep = self._boxes(np.minimum(np.minimum(a, b), c),
+                                           np.maximum(np.maximum(a, b), c))
+        a, b, c, w, area = a[keep], b[keep], c[keep], w[keep], area[keep]
+        for t, px, py in self._expand(x0, y0, x1, y1):
+            cx = px + 0.5
+            cy = py + 0.5
+            # Barycentric weights of the pixel centre
+            l1 = ((c[t, 0] - b[t, 0]) * (cy - b[t, 1]) - (c[t, 1] - b[t, 1]) * (cx - b[t, 0])) / area[t]
+            l2 = ((a[t, 0] - c[t, 0]) * (cy - c[t, 1]) - (a[t, 1] - c[t, 1]) * (cx - c[t, 0])) / area[t]
+            l3 = 1.0 - l1 - l2
+            hit = (l1 >= -1e-9) & (l2 >= -1e-9) & (l3 >= -1e-9)
+            if hit.any():
+                t = t[hit]
+                depth = l1[hit] * w[t, 0] + l2[hit] * w[t, 1] + l3[hit] * w[t, 2]
+                self._write(px[hit], py[hit], depth)
+
+    def add_spheres(self, spheres):
+        """Rasterize spheres given as (cx, cy, cz, r) - e.g. tree crowns"""
+        spheres = np.asarray(spheres, dtype=float).reshape(-1, 4)
+        if len(spheres) == 0:
+            return
+        centres = self.project(spheres[:, :3])
+        radius = spheres[:, 3] / self.pixel_size
+        pc = self._pixel(centres[:, :2])
+        x0, y0, x1, y1, keep = self._boxes(pc - radius[:, None], pc + radius[:, None])
+        pc, radius, w = pc[keep], radius[keep], centres[keep, 2]
+        r_world = spheres[keep, 3]
+        for s, px, py in self._expand(x0, y0, x1, y1):
+            d2 = (px + 0.5 - pc[s, 0]) ** 2 + (py + 0.5 - pc[s, 1]) ** 2
+            hit = d2 <= radius[s] ** 2
+            if hit.any():
+                s = s[hit]
+                # Front surface of the sphere as seen from the sun
+                height = np.sqrt(np.maximum(r_world[s] ** 2 - d2[hit] * self.pixel_size ** 2, 0.0))
+                self._write(px[hit], py[hit], w[s] + height)
+
+    def lit(self, points, normals=None):
+        """Bool array: True where a receiver point sees the sun.
+
+        Points outside the buffer count as lit. With normals, points on
+        surfaces facing away from the sun are unlit.
+        """
+        uvw = self.project(points)
+        if len(uvw) == 0:
+            return np.zeros(0, dtype=bool)
+        pix = np.floor(self._pixel(uvw[:, :2])).astype(int)
+        inside = (pix[:, 0] >= 0) & (pix[:, 0] < self.nx) & (pix[:, 1] >= 0) & (pix[:, 1] < self.ny)
+        lit = np.ones(len(uvw), dtype=bool)
+        idx = pix[inside, 1] * self.nx + pix[inside, 0]
+        lit[inside] = self.depth[idx] <= uvw[inside, 2] + self.bias
+        if normals is not None:
+            lit &= np.asarray(normals, dtype=float).reshape(-1, 3) @ self.basis[2] > 0.0
+        return lit
+
+
+def depth_map_lit(points, direction, triangles=None, spheres=None, normals=None,
+                  pixel_size=0.1, bias=0.1):
+    """Lit flags of receiver points for one sun direction (see SunDepthMap)"""
+    points = np.asarray(points, dtype=float).reshape(-1, 3)
+    if len(points) == 0 or direction[2] <= 0.0:
+        return np.zeros(len(points), dtype=bool)
+    depth = SunDepthMap.for_receivers(direction, points, pixel_size=pixel_size, bias=bias)
+    if triangles is not None:
+        depth.add_triangles(triangles)
+    if spheres:
+        depth.add_spheres(spheres)
+    return depth.lit(points, normals)
+
+
+# ==================== SCENE OCCLUDERS ====================
+
+def mesh_triangles(mesh):
+    """(n, 3, 3) triangles of a PyVista/VTK mesh (empty array when not possible)"""
+    try:
+        if not hasattr(mesh, 'triangulate'):
+            import pyvista as pv
+            mesh = pv.wrap(mesh)
+        if not hasattr(mesh, 'faces'):
+            mesh = mesh.extract_surface()
+        tri = mesh.triangulate()
+        faces = np.asarray(tri.faces)
+        if faces.size == 0:
+            return np.zeros((0, 3, 3))
+        return np.asarray(tri.points, dtype=float)[faces.reshape(-1, 4)[:, 1:]]
+    except Exception:
+        return np.zeros((0, 3, 3))
+
+
+def _skipped(name):
+    name = str(name).lower()
+    return any(marker in name for marker in _SKIP_MARKERS)
+
+
+def scene_occluder_meshes(roof):
+    """Shadow-casting meshes of a roof scene: {name: mesh}.
+
+    Building parts come from the sun system's registered scene objects (or
+    the plotter's building actors when no sun system is attached), plus roof
+    obstacles and environment meshes. Tree crowns are left out - they are
+    rasterized as exact spheres from the environment obstacles.
+    """
+    meshes = {}
+    sun_system = getattr(roof, 'sun_system', None)
+    scene_objects = getattr(sun_system, 'scene_objects', None) or {}
+    for name, obj in scene_objects.items():
+        if obj.get('cast_shadow', True) and obj.get('mesh') is not None and not _skipped(name):
+            meshes[name] = obj['mesh']
+
+    if not scene_objects:
+        try:
+            for name, actor in roof.plotter.renderer.actors.items():
+                lowered = str(name).lower()
+                if _skipped(lowered) or not any(m in lowered for m in _BUILDING_MARKERS):
+                    continue
+                mapper = actor.GetMapper() if hasattr(actor, 'GetMapper') else None
+                dataset = mapper.GetInputAsDataSet() if mapper is not None else None
+                if dataset is not None:
+                    meshes[name] = dataset
+        except Exception:
+            pass
+
+    for i, obstacle in enumerate(getattr(roof, 'obstacles', None) or []):
+        mesh = getattr(obstacle, 'mesh', None)
+        if mesh is not None:
+            meshes[f'obstacle_{i}'] = mesh
+
+    environment = getattr(roof, 'environment_manager', None)
+    for name, mesh in (getattr(environment, 'environment_meshes', None) or {}).items():
+        if mesh is not None and not _skipped(name):
+            meshes[name] = mesh
+    return meshes
+
+
+def tree_crowns(roof):
+    """(cx, cy, cz, r) crown spheres from the roof's environment obstacles.
+    The crown sphere sits atop the trunk."""
+    crowns = []
+    for obs in getattr(roof, 'environment_obstacles', None) or []:
+        if 'tree' not in obs.get('type', ''):
+            continue
+        pos = obs.get('position', [0, 0])
+        h = obs.get('height', 7.0)
+        r = obs.get('radius', 2.0)
+        crowns.append((float(pos[0]), float(pos[1]), float(h - r), float(r)))
+    return crowns
+
+
+class OccluderCache:
+    """Triangulated scene occluders, re-triangulating only meshes that changed"""
+
+    def __init__(self):
+        self._entries = {}     # name -> (mesh, n_points, triangles)
+        self._key = None
+        self._triangles = np.zeros((0, 3, 3))
+
+    def triangles(self, meshes):
+        """(n, 3, 3) triangles of all meshes in the {name: mesh} dict"""
+        key = tuple((name, id(mesh), getattr(mesh, 'n_points', None)) for name, mesh in meshes.items())
+        if key == self._key:
+            return self._triangles
+
+        entries = {}
+        for name, mesh in meshes.items():
+            n_points = getattr(mesh, 'n_points', None)
+            cached = self._entries.get(name)
+            if cached and cached[0] is mesh and cached[1] == n_points:
+                entries[name] = cached
+            else:
+                entries[name] = (mesh, n_points, mesh_triangles(mesh))
+        self._entries = entries
+        self._key = key
+        parts = [entry[2] for entry in entries.values() if len(entry[2])]
+        self._triangles = np.concatenate(parts) if parts else np.zeros((0, 3, 3))
+        return self._triangles
+
+    def clear(self):
+        self._entries = {}
+        self._key = None
+        self._triangles = np.zeros((0, 3, 3))
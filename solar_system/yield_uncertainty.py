@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+solar_system/yield_uncertainty.py
+Monte Carlo annual yield exceedance (P50 / P75 / P90)
+
+The annual sun table and tree shading are evaluated once into a small
+matrix of monthly energy components per layout (lit beam, tree-shaded beam,
+diffuse). Each Monte Carlo sample then only draws weather, soiling,
+degradation and canopy transmissivity factors and takes a weighted sum
+over that matrix, so thousands of samples take milliseconds.
+"""
+import numpy as np
+
+from solar_system.energy_model import (annual_sun_table, depth_map_lit_groups, plane_of_array,
+                                       rays_blocked)
+
+# Sampling assumptions (all fractions)
+UNCERTAINTY_DEFAULTS = {
+    'clearness_mean': 1.0,        # mean irradiation relative to the clear-sky model
+    'interannual_std': 0.05,      # year-to-year irradiation variability
+    'monthly_std': 0.10,          # independent month-to-month variability
+    'soiling_mean': 0.02,
+    'soiling_std': 0.01,
+    'degradation_mean': 0.005,    # per year
+    'degradation_std': 0.002,
+    'transmissivity_min': 0.05,   # share of beam passing through a tree crown
+    'transmissivity_max': 0.35,
+}
+
+COMPONENTS = ('beam_lit', 'beam_shaded', 'diffuse')
+
+# Fixed seed for the figures shown in the UI and the report, so repeated
+# runs of the same layout agree
+DISPLAY_SEED = 0
+
+
+def exceedance_note(params=None):
+    """One-line caveat shown next to P50/P75/P90 figures"""
+    p = dict(UNCERTAINTY_DEFAULTS, **(params or {}))
+    return (f"Irradiation is sampled around the clear-sky model (clearness_mean = "
+            f"{p['clearness_mean']:g}), so P50 is roughly the clear-sky yield; "
+            f"measured site irradiation is usually lower.")
+
+
+def _month_of_day(days):
+    """Month index (0-11) for day-of-year values"""
+    month_starts = np.array([1, 32, 60, 91, 121, 152, 182, 213, 244, 274, 305, 335])
+    return np.searchsorted(month_starts, np.asarray(days), side='right') - 1
+
+
+def component_matrix(sides, sun, panel_area, efficiency, crowns=None, triangles=None):
+    """Monthly energy components (kWh), shape (3, 12): COMPONENTS x months.
+
+    sides is a list of dicts with name, tilt (radians), azimuth (degrees) and
+    positions (n, 3); a side with shaded=False ignores the crowns (its panel
+    positions are unknown). With occluder triangles shading comes from
+    sun-view depth maps shared by all sides: beam blocked by solid occluders
+    is lost, beam blocked only by crowns is the tree-shaded component. The
+    nameplate clamp of side_energy_series is not applied so that every
+    component scales linearly with its factor.
+    """
+    months = _month_of_day(sun['day'])
+    matrix = np.zeros((len(COMPONENTS), 12))
+    positions = [np.asarray(side['positions'], dtype=float).reshape(-1, 3) for side in sides]
+
+    unblocked_by_side, lit_by_side = {}, {}
+    if triangles is not None:
+        shaded = [i for i, side in enumerate(sides)
+                  if len(positions[i]) and side.get('shaded', True)]
+        groups = [(positions[i], None) for i in shaded]
+        unblocked = depth_map_lit_groups(groups, sun['directions'], triangles)
+        lit = unblocked
+        if crowns:
+            lit = depth_map_lit_groups(groups, sun['directions'], triangles, crowns)
+        unblocked_by_side = {i: mask.mean(axis=0) for i, mask in zip(shaded, unblocked)}
+        lit_by_side = {i: mask.mean(axis=0) for i, mask in zip(shaded, lit)}
+
+    for i, side in enumerate(sides):
+        if len(positions[i]) == 0:
+            continue
+        poa_beam, poa_diffuse = plane_of_array(side['tilt'], side['azimuth'], sun)
+        lit = lit_by_side.get(i, np.ones(len(poa_beam)))
+        # Share of beam not behind a solid occluder
+        unblocked = unblocked_by_side.get(i, np.ones(len(poa_beam)))
+        if triangles is None and crowns and side.get('shaded', True):
+            lit = (~rays_blocked(positions[i], sun['directions'], crowns)).mean(axis=0)
+
+        scale = panel_area * efficiency * len(positions[i]) * sun['weight'] / 1000.0
+        tree_shaded = np.maximum(unblocked - lit, 0.0)
+        for row, series in enumerate((poa_beam * lit, poa_beam * tree_shaded, poa_diffuse)):
+            matrix[row] += np.bincount(months, weights=series * scale, minlength=12)
+    return matrix
+
+
+class YieldUncertainty:
+    """Monte Carlo annual yield distribution for one panel layout"""
+
+    def __init__(self, matrix, params=None):
+        self.matrix = np.asarray(matrix, dtype=float)
+        self.params = dict(UNCERTAINTY_DEFAULTS, **(params or {}))
+        self.samples = None
+        self._samples_key = None     # (n_samples, year, seed) of self.samples
+
+    @classmethod
+    def from_layout(cls, sides, latitude, panel_area, efficiency, crowns=None,
+                    params=None, sun=None, triangles=None):
+        """Precompute the component matrix for a layout (see component_matrix)"""
+        sun = sun if sun is not None else annual_sun_table(latitude)
+        crowns = [tuple(float(v) for v in c) for c in (crowns or [])]
+        return cls(component_matrix(sides, sun, panel_area, efficiency, crowns, triangles),
+                   params)
+
+    @property
+    def deterministic_kwh(self):
+        """Annual yield of the model without uncertainty (fully opaque trees)"""
+        return float(self.matrix[0].sum() + self.matrix[2].sum())
+
+    def sample(self, n_samples=10000, year=1, seed=None):
+        """Draw n_samples annual yields (kWh) for operating year `year`"""
+        p = self.params
+        rng = np.random.default_rng(seed)
+
+        weather = (p['clearness_mean'] *
+                   (1.0 + p['interannual_std'] * rng.standard_normal((n_samples, 1))) *
+                   (1.0 + p['monthly_std'] * rng.standard_normal((n_samples, 12))))
+        weather = np.maximum(weather, 0.0)
+
+        transmissivity = rng.uniform(p['transmissivity_min'], p['transmissivity_max'],
+                                     (n_samples, 1))
+        soiling = np.clip(rng.normal(p['soiling_mean'], p['soiling_std'], n_samples), 0.0, 1.0)
+        degradation = np.clip(rng.normal(p['degradation_mean'], p['degradation_std'], n_samples),
+                              0.0, 1.0)
+
+        beam_lit, beam_shaded, diffuse = self.matrix
+        monthly = weather * (beam_lit + transmissivity * beam_shaded + diffuse)   # (N, 12)
+        losses = (1.0 - soiling) * (1.0 - degradation) ** (year - 1)
+        self.samples = monthly.sum(axis=1) * losses
+        self._samples_key = (n_samples, year, seed)
+        return self.samples
+
+    def exceedance(self, levels=(50, 75, 90), n_samples=10000, year=1, seed=None):
+        """Annual yield exceeded with each probability level, {'P50': kWh, ...}"""
+        if self.samples is None or self._samples_key != (n_samples, year, seed):
+            self.sample(n_samples, year, seed)
+        # P90 is exceeded in 90 % of years: the 10th percentile
+        values = np.percentile(self.samples, [100 - level for level in levels])
+        return {f'P{level}': float(v) for level, v in zip(levels, values)}
@@ -14,9 +14,6 @@ class TranslationManager:
         # Load all translations from separate files
         for lang in self.available_languages:
             try:
-                # Print debugging info
-                print(f"Attempting to load translations for {lang}...")
-                
                 # Dynamic import of language modules
                 module_name = f'translations.{lang}'
                 lang_module = importlib.import_module(module_name)
@@ -24,11 +21,6 @@ class TranslationManager:
                 # Check if the module contains 'translations' attribute
                 if hasattr(lang_module, 'translations'):
                     self.translations[lang] = lang_module.translations
-                    print(f"Loaded {len(self.translations[lang])} translations for {lang}")
-                    
-                    # Print first 3 keys as a sample
-                    sample_keys = list(self.translations[lang].keys())[:3]
-                    print(f"Sample keys for {lang}: {sample_keys}")
                 else:
                     print(f"Error: Module {module_name} does not have a 'translations' dictionary")
                     # Try to print module contents for debugging
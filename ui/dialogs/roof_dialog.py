@@ -5,13 +5,10 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QIntValidator
 
-try:
-    import pyvista as pv
-    from pyvistaqt import QtInteractor
-    PYVISTA_AVAILABLE = True
-except ImportError:
-    PYVISTA_AVAILABLE = False
-    print("Warning: PyVista not available. 3D visualization will be disabled.")
+from utils.lazy_imports import pyvista_installed
+
+# PyVista itself is imported with the 3D view, not at startup
+PYVISTA_AVAILABLE = pyvista_installed()
 
 
 class RoofDimensionDialog(QDialog):
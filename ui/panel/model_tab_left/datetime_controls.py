@@ -5,10 +5,10 @@ Complete enhanced visual styling with crash prevention and proper formatting
 UPDATED: Azimuth first, Time middle, Elevation right
 """
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
-                             QGroupBox, QPushButton, QSpinBox, QComboBox)
-from PyQt5.QtCore import pyqtSignal, Qt, QDate, QTimer, QRect, QPointF
+                             QGroupBox, QPushButton, QSpinBox, QComboBox, QFileDialog)
+from PyQt5.QtCore import pyqtSignal, Qt, QDate, QTimer, QRect, QPointF, QEvent
 from PyQt5.QtGui import (QFont, QPainter, QPen, QBrush, QColor, QRadialGradient, 
-                         QLinearGradient, QPolygonF)
+                         QLinearGradient, QPolygonF, QPixmap)
 import math
 import calendar
 import time
@@ -46,7 +46,11 @@ class ArcSlider(QWidget):
         # Crash prevention flags
         self._in_paint_event = False
         self._in_mouse_event = False
-        self._update_queued = False
+        
+        # Pre-rendered static layers (see _static_pixmap)
+        self._static_layer = None
+        self._static_layer_key = None
+        self._painted_value = self._value
         
         # Enable mouse tracking for smoother interaction
         self.setMouseTracking(True)
@@ -54,14 +58,18 @@ class ArcSlider(QWidget):
         
     def set_sun_times(self, sunrise_minutes, sunset_minutes):
         """Set sunrise and sunset times in minutes"""
+        if (sunrise_minutes, sunset_minutes) == (self._sunrise, self._sunset):
+            return
         self._sunrise = sunrise_minutes
         self._sunset = sunset_minutes
-        self.update()
+        self._invalidate_static_layer()
         
     def set_hemisphere(self, is_southern):
         """Set whether we're in southern hemisphere"""
+        if is_southern == self._is_southern_hemisphere:
+            return
         self._is_southern_hemisphere = is_southern
-        self.update()
+        self._invalidate_static_layer()
         
     def setValue(self, value):
         """Set value with smart throttling and crash prevention"""
@@ -87,10 +95,8 @@ class ArcSlider(QWidget):
                     except Exception as e:
                         pass
                 
-                # Queue update instead of immediate update
-                if not self._update_queued:
-                    self._update_queued = True
-                    self.update()
+                # Only the handle moved: repaint its old and new area
+                self._update_handle()
                 
                 self._last_update = current_time
                 
@@ -102,246 +108,310 @@ class ArcSlider(QWidget):
         return self._value
     
     def paintEvent(self, event):
-        """Paint with crash prevention"""
+        """Paint the cached static layer plus the sun/moon handle"""
         try:
             # Prevent recursive paint events
             if self._in_paint_event:
                 return
-                
+
             self._in_paint_event = True
-            self._update_queued = False
-            
+
+            geometry = self._arc_geometry()
+            if geometry is None:
+                return
+
             painter = QPainter(self)
+            painter.drawPixmap(0, 0, self._static_pixmap(geometry))
             painter.setRenderHint(QPainter.Antialiasing)
-            
-            # Use transparent background to match container
-            widget_rect = self.rect()
-            painter.fillRect(widget_rect, QColor(0, 0, 0, 0))
-            
-            # Cache frequently used values
-            width = self.width()
-            height = self.height()
-            center_x = width // 2
-            center_y = height - 45
-            radius = min(width // 2 - 40, height - 80)
-            
-            # Validate dimensions to prevent crashes
-            if radius <= 0 or width <= 0 or height <= 0:
-                return
-                
-            # Draw enhanced horizon line (ground) with gradient
-            ground_gradient = QLinearGradient(25, center_y, width - 25, center_y)
-            ground_gradient.setColorAt(0, QColor("#34495e"))
-            ground_gradient.setColorAt(0.5, QColor("#2c3e50"))
-            ground_gradient.setColorAt(1, QColor("#34495e"))
-            painter.setPen(QPen(QBrush(ground_gradient), 3))
-            painter.drawLine(25, center_y, width - 25, center_y)
-            
-            # Draw sky gradient background arc
-            sky_gradient = QLinearGradient(center_x, center_y - radius, center_x, center_y)
-            sky_gradient.setColorAt(0, QColor("#3498db"))
-            sky_gradient.setColorAt(0.7, QColor("#5dade2"))
-            sky_gradient.setColorAt(1, QColor("#85c1e9"))
-            painter.setPen(QPen(QBrush(sky_gradient), 10))
-            painter.drawArc(center_x - radius, center_y - radius, 
-                           radius * 2, radius * 2, 
-                           0, 180 * 16)
-            
-            # Draw ENHANCED SUN TRAJECTORY with safe calculations
-            if self._sunrise < self._sunset:
-                try:
-                    start_angle = self._angle_from_time(self._sunrise)
-                    end_angle = self._angle_from_time(self._sunset)
+            self._draw_sun_handle(painter, *geometry)
+            self._painted_value = self._value
+
+        except Exception as e:
+            pass
+        finally:
+            self._in_paint_event = False
+
+    # ==================== STATIC LAYER CACHE ====================
+
+    def _arc_geometry(self):
+        """(width, height, center_x, center_y, radius) or None if too small"""
+        width = self.width()
+        height = self.height()
+        radius = min(width // 2 - 40, height - 80)
+        # Validate dimensions to prevent crashes
+        if radius <= 0 or width <= 0 or height <= 0:
+            return None
+        return width, height, width // 2, height - 45, radius
+
+    def _handle_rect(self, value, geometry):
+        """Widget area covered by the sun/moon handle (glow included) at a value"""
+        _, _, center_x, center_y, radius = geometry
+        angle = math.radians(self._angle_from_time(value))
+        x = center_x + radius * math.cos(angle)
+        y = center_y - radius * math.sin(angle)
+        return QRect(int(x) - 27, int(y) - 27, 55, 55)
+
+    def _update_handle(self):
+        """Schedule a repaint of the last painted and the current handle area"""
+        geometry = self._arc_geometry()
+        if geometry is None:
+            self.update()
+            return
+        self.update(self._handle_rect(self._painted_value, geometry)
+                    | self._handle_rect(self._value, geometry))
+
+    def _invalidate_static_layer(self):
+        """Drop the cached background so the next paint redraws it"""
+        self._static_layer = None
+        self.update()
+
+    def _static_pixmap(self, geometry):
+        """Ground, sky arc, sun trajectory, sunrise/sunset markers and labels.
+
+        Rendered once and reused for every repaint until the size, palette/
+        style, hemisphere or sunrise/sunset changes.
+        """
+        ratio = self.devicePixelRatioF()
+        if self._static_layer is None or self._static_layer_key != (geometry, ratio):
+            pixmap = QPixmap(int(math.ceil(geometry[0] * ratio)), int(math.ceil(geometry[1] * ratio)))
+            pixmap.setDevicePixelRatio(ratio)
+            pixmap.fill(Qt.transparent)
+
+            painter = QPainter(pixmap)
+            try:
+                painter.setRenderHint(QPainter.Antialiasing)
+                self._draw_static_layer(painter, *geometry)
+            finally:
+                painter.end()
+
+            self._static_layer = pixmap
+            self._static_layer_key = (geometry, ratio)
+        return self._static_layer
+
+    def _draw_static_layer(self, painter, width, height, center_x, center_y, radius):
+        """Draw the layers that only change with size, hemisphere or sun times"""
+        # Draw enhanced horizon line (ground) with gradient
+        ground_gradient = QLinearGradient(25, center_y, width - 25, center_y)
+        ground_gradient.setColorAt(0, QColor("#34495e"))
+        ground_gradient.setColorAt(0.5, QColor("#2c3e50"))
+        ground_gradient.setColorAt(1, QColor("#34495e"))
+        painter.setPen(QPen(QBrush(ground_gradient), 3))
+        painter.drawLine(25, center_y, width - 25, center_y)
+
+        # Draw sky gradient background arc
+        sky_gradient = QLinearGradient(center_x, center_y - radius, center_x, center_y)
+        sky_gradient.setColorAt(0, QColor("#3498db"))
+        sky_gradient.setColorAt(0.7, QColor("#5dade2"))
+        sky_gradient.setColorAt(1, QColor("#85c1e9"))
+        painter.setPen(QPen(QBrush(sky_gradient), 10))
+        painter.drawArc(center_x - radius, center_y - radius, 
+                       radius * 2, radius * 2, 
+                       0, 180 * 16)
+
+        # Draw ENHANCED SUN TRAJECTORY with safe calculations
+        if self._sunrise < self._sunset:
+            try:
+                start_angle = self._angle_from_time(self._sunrise)
+                end_angle = self._angle_from_time(self._sunset)
+                span_angle = end_angle - start_angle
+
+                # Validate angles
+                if not (0 <= start_angle <= 180) or not (0 <= end_angle <= 180):
+                    start_angle = max(0, min(180, start_angle))
+                    end_angle = max(0, min(180, end_angle))
                     span_angle = end_angle - start_angle
-                    
-                    # Validate angles
-                    if not (0 <= start_angle <= 180) or not (0 <= end_angle <= 180):
-                        start_angle = max(0, min(180, start_angle))
-                        end_angle = max(0, min(180, end_angle))
-                        span_angle = end_angle - start_angle
-                    
-                    # Draw bright sun trajectory path
-                    trajectory_gradient = QLinearGradient(center_x, center_y - radius, center_x, center_y)
-                    trajectory_gradient.setColorAt(0, QColor("#ffd700"))
-                    trajectory_gradient.setColorAt(0.3, QColor("#ffed4e"))
-                    trajectory_gradient.setColorAt(0.6, QColor("#ffa500"))
-                    trajectory_gradient.setColorAt(1, QColor("#ff6347"))
-                    
-                    painter.setPen(QPen(QBrush(trajectory_gradient), 12))
+
+                # Draw bright sun trajectory path
+                trajectory_gradient = QLinearGradient(center_x, center_y - radius, center_x, center_y)
+                trajectory_gradient.setColorAt(0, QColor("#ffd700"))
+                trajectory_gradient.setColorAt(0.3, QColor("#ffed4e"))
+                trajectory_gradient.setColorAt(0.6, QColor("#ffa500"))
+                trajectory_gradient.setColorAt(1, QColor("#ff6347"))
+
+                painter.setPen(QPen(QBrush(trajectory_gradient), 12))
+                painter.drawArc(center_x - radius, center_y - radius,
+                               radius * 2, radius * 2,
+                               int(start_angle * 16), int(span_angle * 16))
+
+                # Add glow effect
+                glow_gradient = QLinearGradient(center_x, center_y - radius, center_x, center_y)
+                glow_gradient.setColorAt(0, QColor(255, 215, 0, 100))
+                glow_gradient.setColorAt(0.5, QColor(255, 237, 78, 80))
+                glow_gradient.setColorAt(1, QColor(255, 99, 71, 60))
+
+                painter.setPen(QPen(QBrush(glow_gradient), 18))
+                painter.drawArc(center_x - radius, center_y - radius,
+                               radius * 2, radius * 2,
+                               int(start_angle * 16), int(span_angle * 16))
+
+                # Draw night arc sections
+                night_color = QColor("#2c3e50")
+                if self._sunrise > 0:
+                    painter.setPen(QPen(night_color, 6))
                     painter.drawArc(center_x - radius, center_y - radius,
                                    radius * 2, radius * 2,
-                                   int(start_angle * 16), int(span_angle * 16))
-                    
-                    # Add glow effect
-                    glow_gradient = QLinearGradient(center_x, center_y - radius, center_x, center_y)
-                    glow_gradient.setColorAt(0, QColor(255, 215, 0, 100))
-                    glow_gradient.setColorAt(0.5, QColor(255, 237, 78, 80))
-                    glow_gradient.setColorAt(1, QColor(255, 99, 71, 60))
-                    
-                    painter.setPen(QPen(QBrush(glow_gradient), 18))
+                                   0, int(start_angle * 16))
+
+                if self._sunset < 1440:
+                    painter.setPen(QPen(night_color, 6))
                     painter.drawArc(center_x - radius, center_y - radius,
                                    radius * 2, radius * 2,
-                                   int(start_angle * 16), int(span_angle * 16))
-                    
-                    # Draw night arc sections
-                    night_color = QColor("#2c3e50")
-                    if self._sunrise > 0:
-                        painter.setPen(QPen(night_color, 6))
-                        painter.drawArc(center_x - radius, center_y - radius,
-                                       radius * 2, radius * 2,
-                                       0, int(start_angle * 16))
-                    
-                    if self._sunset < 1440:
-                        painter.setPen(QPen(night_color, 6))
-                        painter.drawArc(center_x - radius, center_y - radius,
-                                       radius * 2, radius * 2,
-                                       int(end_angle * 16), int((180 - end_angle) * 16))
-                except Exception as e:
-                    pass
-            
-            # Draw sunrise and sunset markers with safe calculations
-            if self._sunrise < self._sunset:
-                try:
-                    # Calculate sunrise position
-                    sunrise_angle = self._angle_from_time(self._sunrise)
-                    if 0 <= sunrise_angle <= 180:
-                        sunrise_x = center_x + radius * math.cos(math.radians(sunrise_angle))
-                        sunrise_y = center_y - radius * math.sin(math.radians(sunrise_angle))
-                        
-                        # Enhanced sunrise marker
-                        sunrise_glow = QRadialGradient(QPointF(sunrise_x, sunrise_y), 20)
-                        sunrise_glow.setColorAt(0, QColor(255, 150, 100, 180))
-                        sunrise_glow.setColorAt(1, QColor(255, 150, 100, 0))
-                        painter.setBrush(QBrush(sunrise_glow))
-                        painter.setPen(QPen(Qt.NoPen))
-                        painter.drawEllipse(QPointF(sunrise_x, sunrise_y), 20, 20)
-                        
-                        painter.setBrush(QBrush(QColor("#ff9649")))
-                        painter.setPen(QPen(QColor("#e67e22"), 3))
-                        painter.drawEllipse(QPointF(sunrise_x, sunrise_y), 12, 12)
-                    
-                    # Calculate sunset position
-                    sunset_angle = self._angle_from_time(self._sunset)
-                    if 0 <= sunset_angle <= 180:
-                        sunset_x = center_x + radius * math.cos(math.radians(sunset_angle))
-                        sunset_y = center_y - radius * math.sin(math.radians(sunset_angle))
-                        
-                        # Enhanced sunset marker
-                        sunset_glow = QRadialGradient(QPointF(sunset_x, sunset_y), 20)
-                        sunset_glow.setColorAt(0, QColor(255, 100, 100, 180))
-                        sunset_glow.setColorAt(1, QColor(255, 100, 100, 0))
-                        painter.setBrush(QBrush(sunset_glow))
-                        painter.setPen(QPen(Qt.NoPen))
-                        painter.drawEllipse(QPointF(sunset_x, sunset_y), 20, 20)
-                        
-                        painter.setBrush(QBrush(QColor("#e74c3c")))
-                        painter.setPen(QPen(QColor("#c0392b"), 3))
-                        painter.drawEllipse(QPointF(sunset_x, sunset_y), 12, 12)
-                        
-                except Exception as e:
-                    pass
-            
-            # Draw current sun/moon position with safe calculations
-            try:
-                angle = self._angle_from_time(self._value)
-                if 0 <= angle <= 180:
-                    sun_x = center_x + radius * math.cos(math.radians(angle))
-                    sun_y = center_y - radius * math.sin(math.radians(angle))
-                    
-                    if self._sunrise <= self._value <= self._sunset:
-                        # SMALLER daytime sun
-                        sun_glow = QRadialGradient(QPointF(sun_x, sun_y), 25)
-                        sun_glow.setColorAt(0, QColor(255, 220, 100, 150))
-                        sun_glow.setColorAt(0.5, QColor(255, 200, 50, 100))
-                        sun_glow.setColorAt(0.8, QColor(255, 180, 30, 50))
-                        sun_glow.setColorAt(1, QColor(255, 180, 30, 0))
-                        painter.setBrush(QBrush(sun_glow))
-                        painter.setPen(QPen(Qt.NoPen))
-                        painter.drawEllipse(QPointF(sun_x, sun_y), 25, 25)
-                        
-                        # Draw sun rays
-                        painter.setPen(QPen(QColor("#ffd700"), 2))
-                        for i in range(8):
-                            ray_angle = i * 45
-                            ray_start_x = sun_x + 7 * math.cos(math.radians(ray_angle))
-                            ray_start_y = sun_y + 7 * math.sin(math.radians(ray_angle))
-                            ray_end_x = sun_x + 18 * math.cos(math.radians(ray_angle))
-                            ray_end_y = sun_y + 18 * math.sin(math.radians(ray_angle))
-                            painter.drawLine(QPointF(ray_start_x, ray_start_y), QPointF(ray_end_x, ray_end_y))
-                        
-                        # Sun body
-                        sun_body_gradient = QRadialGradient(QPointF(sun_x, sun_y), 8)
-                        sun_body_gradient.setColorAt(0, QColor("#fff5b4"))
-                        sun_body_gradient.setColorAt(0.6, QColor("#ffd32c"))
-                        sun_body_gradient.setColorAt(1, QColor("#f39c12"))
-                        painter.setBrush(QBrush(sun_body_gradient))
-                        painter.setPen(QPen(QColor("#e67e22"), 2))
-                        painter.drawEllipse(QPointF(sun_x, sun_y), 14, 14)
-                        
-                        # Bright center
-                        painter.setBrush(QBrush(QColor("#ffffff")))
-                        painter.setPen(QPen(Qt.NoPen))
-                        painter.drawEllipse(QPointF(sun_x - 1, sun_y - 1), 4, 4)
-                    else:
-                        # Enhanced nighttime moon
-                        moon_glow = QRadialGradient(QPointF(sun_x, sun_y), 18)
-                        moon_glow.setColorAt(0, QColor(200, 200, 255, 100))
-                        moon_glow.setColorAt(1, QColor(200, 200, 255, 0))
-                        painter.setBrush(QBrush(moon_glow))
-                        painter.setPen(QPen(Qt.NoPen))
-                        painter.drawEllipse(QPointF(sun_x, sun_y), 18, 18)
-                        
-                        moon_gradient = QRadialGradient(QPointF(sun_x - 2, sun_y - 2), 6)
-                        moon_gradient.setColorAt(0, QColor("#f8f9fa"))
-                        moon_gradient.setColorAt(1, QColor("#dee2e6"))
-                        painter.setBrush(QBrush(moon_gradient))
-                        painter.setPen(QPen(QColor("#adb5bd"), 1))
-                        painter.drawEllipse(QPointF(sun_x, sun_y), 12, 12)
-                        
-                        # Moon craters
-                        painter.setBrush(QBrush(QColor("#ced4da")))
-                        painter.setPen(QPen(Qt.NoPen))
-                        painter.drawEllipse(QPointF(sun_x + 2, sun_y - 1), 2, 2)
-                        painter.drawEllipse(QPointF(sun_x - 2, sun_y + 2), 1, 1)
-                        
+                                   int(end_angle * 16), int((180 - end_angle) * 16))
             except Exception as e:
                 pass
-            
-            # Draw direction labels with safe calculations
+
+        # Draw sunrise and sunset markers with safe calculations
+        if self._sunrise < self._sunset:
             try:
-                painter.setPen(QPen(QColor("#ffffff"), 2))
-                font = QFont("Arial", 11, QFont.Bold)
-                painter.setFont(font)
-                
-                label_distance = 25
-                
-              
-                # East label
-                east_x = center_x + radius + label_distance
-                east_y = center_y
-                painter.drawText(QRect(east_x - 12, east_y - 10, 25, 20), 
-                                Qt.AlignCenter, "E")
-                
-                # West label
-                west_x = center_x - radius - label_distance
-                west_y = center_y
-                painter.drawText(QRect(west_x - 12, west_y - 10, 25, 20), 
-                                Qt.AlignCenter, "W")
-                
-                # North/South label
-                middle_label = "N" if self._is_southern_hemisphere else "S"
-                south_x = center_x
-                south_y = center_y - radius - label_distance
-                painter.drawText(QRect(south_x - 12, south_y - 10, 25, 20), 
-                                Qt.AlignCenter, middle_label)
-                                
+                # Calculate sunrise position
+                sunrise_angle = self._angle_from_time(self._sunrise)
+                if 0 <= sunrise_angle <= 180:
+                    sunrise_x = center_x + radius * math.cos(math.radians(sunrise_angle))
+                    sunrise_y = center_y - radius * math.sin(math.radians(sunrise_angle))
+
+                    # Enhanced sunrise marker
+                    sunrise_glow = QRadialGradient(QPointF(sunrise_x, sunrise_y), 20)
+                    sunrise_glow.setColorAt(0, QColor(255, 150, 100, 180))
+                    sunrise_glow.setColorAt(1, QColor(255, 150, 100, 0))
+                    painter.setBrush(QBrush(sunrise_glow))
+                    painter.setPen(QPen(Qt.NoPen))
+                    painter.drawEllipse(QPointF(sunrise_x, sunrise_y), 20, 20)
+
+                    painter.setBrush(QBrush(QColor("#ff9649")))
+                    painter.setPen(QPen(QColor("#e67e22"), 3))
+                    painter.drawEllipse(QPointF(sunrise_x, sunrise_y), 12, 12)
+
+                # Calculate sunset position
+                sunset_angle = self._angle_from_time(self._sunset)
+                if 0 <= sunset_angle <= 180:
+                    sunset_x = center_x + radius * math.cos(math.radians(sunset_angle))
+                    sunset_y = center_y - radius * math.sin(math.radians(sunset_angle))
+
+                    # Enhanced sunset marker
+                    sunset_glow = QRadialGradient(QPointF(sunset_x, sunset_y), 20)
+                    sunset_glow.setColorAt(0, QColor(255, 100, 100, 180))
+                    sunset_glow.setColorAt(1, QColor(255, 100, 100, 0))
+                    painter.setBrush(QBrush(sunset_glow))
+                    painter.setPen(QPen(Qt.NoPen))
+                    painter.drawEllipse(QPointF(sunset_x, sunset_y), 20, 20)
+
+                    painter.setBrush(QBrush(QColor("#e74c3c")))
+                    painter.setPen(QPen(QColor("#c0392b"), 3))
+                    painter.drawEllipse(QPointF(sunset_x, sunset_y), 12, 12)
+
             except Exception as e:
                 pass
-                
+
+        # Draw direction labels with safe calculations
+        try:
+            painter.setPen(QPen(QColor("#ffffff"), 2))
+            font = QFont("Arial", 11, QFont.Bold)
+            painter.setFont(font)
+
+            label_distance = 25
+
+
+            # East label
+            east_x = center_x + radius + label_distance
+            east_y = center_y
+            painter.drawText(QRect(east_x - 12, east_y - 10, 25, 20), 
+                            Qt.AlignCenter, "E")
+
+            # West label
+            west_x = center_x - radius - label_distance
+            west_y = center_y
+            painter.drawText(QRect(west_x - 12, west_y - 10, 25, 20), 
+                            Qt.AlignCenter, "W")
+
+            # North/South label
+            middle_label = "N" if self._is_southern_hemisphere else "S"
+            south_x = center_x
+            south_y = center_y - radius - label_distance
+            painter.drawText(QRect(south_x - 12, south_y - 10, 25, 20), 
+                            Qt.AlignCenter, middle_label)
+
         except Exception as e:
             pass
-        finally:
-            self._in_paint_event = False
+
+
+    def _draw_sun_handle(self, painter, width, height, center_x, center_y, radius):
+        """Draw the current sun/moon position (the only per-frame layer)"""
+        # Draw current sun/moon position with safe calculations
+        try:
+            angle = self._angle_from_time(self._value)
+            if 0 <= angle <= 180:
+                sun_x = center_x + radius * math.cos(math.radians(angle))
+                sun_y = center_y - radius * math.sin(math.radians(angle))
+
+                if self._sunrise <= self._value <= self._sunset:
+                    # SMALLER daytime sun
+                    sun_glow = QRadialGradient(QPointF(sun_x, sun_y), 25)
+                    sun_glow.setColorAt(0, QColor(255, 220, 100, 150))
+                    sun_glow.setColorAt(0.5, QColor(255, 200, 50, 100))
+                    sun_glow.setColorAt(0.8, QColor(255, 180, 30, 50))
+                    sun_glow.setColorAt(1, QColor(255, 180, 30, 0))
+                    painter.setBrush(QBrush(sun_glow))
+                    painter.setPen(QPen(Qt.NoPen))
+                    painter.drawEllipse(QPointF(sun_x, sun_y), 25, 25)
+
+                    # Draw sun rays
+                    painter.setPen(QPen(QColor("#ffd700"), 2))
+                    for i in range(8):
+                        ray_angle = i * 45
+                        ray_start_x = sun_x + 7 * math.cos(math.radians(ray_angle))
+                        ray_start_y = sun_y + 7 * math.sin(math.radians(ray_angle))
+                        ray_end_x = sun_x + 18 * math.cos(math.radians(ray_angle))
+                        ray_end_y = sun_y + 18 * math.sin(math.radians(ray_angle))
+                        painter.drawLine(QPointF(ray_start_x, ray_start_y), QPointF(ray_end_x, ray_end_y))
+
+                    # Sun body
+                    sun_body_gradient = QRadialGradient(QPointF(sun_x, sun_y), 8)
+                    sun_body_gradient.setColorAt(0, QColor("#fff5b4"))
+                    sun_body_gradient.setColorAt(0.6, QColor("#ffd32c"))
+                    sun_body_gradient.setColorAt(1, QColor("#f39c12"))
+                    painter.setBrush(QBrush(sun_body_gradient))
+                    painter.setPen(QPen(QColor("#e67e22"), 2))
+                    painter.drawEllipse(QPointF(sun_x, sun_y), 14, 14)
+
+                    # Bright center
+                    painter.setBrush(QBrush(QColor("#ffffff")))
+                    painter.setPen(QPen(Qt.NoPen))
+                    painter.drawEllipse(QPointF(sun_x - 1, sun_y - 1), 4, 4)
+                else:
+                    # Enhanced nighttime moon
+                    moon_glow = QRadialGradient(QPointF(sun_x, sun_y), 18)
+                    moon_glow.setColorAt(0, QColor(200, 200, 255, 100))
+                    moon_glow.setColorAt(1, QColor(200, 200, 255, 0))
+                    painter.setBrush(QBrush(moon_glow))
+                    painter.setPen(QPen(Qt.NoPen))
+                    painter.drawEllipse(QPointF(sun_x, sun_y), 18, 18)
+
+                    moon_gradient = QRadialGradient(QPointF(sun_x - 2, sun_y - 2), 6)
+                    moon_gradient.setColorAt(0, QColor("#f8f9fa"))
+                    moon_gradient.setColorAt(1, QColor("#dee2e6"))
+                    painter.setBrush(QBrush(moon_gradient))
+                    painter.setPen(QPen(QColor("#adb5bd"), 1))
+                    painter.drawEllipse(QPointF(sun_x, sun_y), 12, 12)
+
+                    # Moon craters
+                    painter.setBrush(QBrush(QColor("#ced4da")))
+                    painter.setPen(QPen(Qt.NoPen))
+                    painter.drawEllipse(QPointF(sun_x + 2, sun_y - 1), 2, 2)
+                    painter.drawEllipse(QPointF(sun_x - 2, sun_y + 2), 1, 1)
+
+        except Exception as e:
+            pass
+
+    def resizeEvent(self, event):
+        """Size changes invalidate the static layer"""
+        self._invalidate_static_layer()
+        super().resizeEvent(event)
+
+    def changeEvent(self, event):
+        """Theme (palette/style) changes invalidate the static layer"""
+        if event.type() in (QEvent.PaletteChange, QEvent.StyleChange):
+            self._invalidate_static_layer()
+        super().changeEvent(event)
     
     def mousePressEvent(self, event):
         """Handle mouse press with crash prevention"""
@@ -358,7 +428,7 @@ class ArcSlider(QWidget):
                 except Exception as e:
                     pass
                     
-                self.update()
+                self._update_handle()
         except Exception as e:
             pass
         finally:
@@ -389,7 +459,7 @@ class ArcSlider(QWidget):
                         except Exception as e:
                             pass
                     
-                    self.update()
+                    self._update_handle()
                     self._last_update = current_time
                     
         except Exception as e:
@@ -533,6 +603,16 @@ class DateTimeControls(QWidget):
         self.animation_btn = None
         self.time_container = None
         
+        # Off-screen time-lapse export (runs in a worker process)
+        self.timelapse_btn = None
+        self.timelapse_mode_combo = None
+        self.timelapse_preset_combo = None
+        self.timelapse_pool = None
+        self.timelapse_future = None
+        self.timelapse_path = None
+        self.timelapse_timer = QTimer()
+        self.timelapse_timer.timeout.connect(self._poll_timelapse_export)
+        
         self.setup_ui()
         
     def setup_ui(self):
@@ -746,6 +826,42 @@ class DateTimeControls(QWidget):
         """)
         group_layout.addWidget(self.animation_btn)
         
+        # Time-lapse export: sweep, resolution preset, export button
+        timelapse_layout = QHBoxLayout()
+        self.timelapse_mode_combo = QComboBox()
+        self.timelapse_mode_combo.addItems(["📅 Selected day", "🗓️ Whole year"])
+        timelapse_layout.addWidget(self.timelapse_mode_combo)
+        
+        self.timelapse_preset_combo = QComboBox()
+        self.timelapse_preset_combo.addItems(["preview", "hd", "full_hd"])
+        self.timelapse_preset_combo.setCurrentIndex(1)
+        timelapse_layout.addWidget(self.timelapse_preset_combo)
+        
+        self.timelapse_btn = QPushButton("🎬 Export Time-lapse")
+        self.timelapse_btn.clicked.connect(self._on_timelapse_export_clicked)
+        self.timelapse_btn.setMinimumHeight(32)
+        self.timelapse_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #16a085;
+                border: 2px solid #138d75;
+                border-radius: 8px;
+                color: white;
+                font-size: 12px;
+                font-weight: bold;
+                font-family: Arial;
+                padding: 6px;
+            }
+            QPushButton:hover {
+                background-color: #138d75;
+            }
+            QPushButton:disabled {
+                background-color: #7f8c8d;
+                border: 2px solid #707b7c;
+            }
+        """)
+        timelapse_layout.addWidget(self.timelapse_btn)
+        group_layout.addLayout(timelapse_layout)
+        
         # Initialize
         self._update_sun_times()
         self._calculate_sun_position()
@@ -913,6 +1029,87 @@ class DateTimeControls(QWidget):
         except Exception as e:
             pass
     
+    def _on_timelapse_export_clicked(self):
+        """Render the selected day (or the year) off-screen into a video file"""
+        try:
+            if self.timelapse_future is not None and not self.timelapse_future.done():
+                self._show_status("Time-lapse export is already running")
+                return
+            
+            roof = getattr(self.model_tab, 'current_roof', None) if self.model_tab else None
+            if roof is None:
+                self._show_status("Create a building before exporting a time-lapse")
+                return
+            
+            file_path, _ = QFileDialog.getSaveFileName(
+                self, "Export Time-lapse", "sun_timelapse.mp4", "MP4 Video (*.mp4)")
+            if not file_path:
+                return
+            
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            from utils.report_renderer import scene_spec
+            from utils.timelapse_export import export_timelapse
+            
+            spec = scene_spec(roof, self.latitude, self.longitude)
+            mode = 'year' if self.timelapse_mode_combo.currentIndex() == 1 else 'day'
+            
+            # A separate process keeps the off-screen render context away from the live view
+            self.timelapse_pool = ProcessPoolExecutor(
+                max_workers=1, mp_context=multiprocessing.get_context('spawn'))
+            self.timelapse_future = self.timelapse_pool.submit(
+                export_timelapse, file_path, spec, mode=mode,
+                day_of_year=self._get_day_of_year(),
+                step_minutes=self.animation_step_minutes,
+                preset=self.timelapse_preset_combo.currentText())
+            self.timelapse_path = file_path
+            self.timelapse_btn.setEnabled(False)
+            self.timelapse_timer.start(1000)
+            self._show_status("🎬 Rendering time-lapse...")
+            
+        except Exception as e:
+            self._show_status(f"❌ Time-lapse export failed: {e}")
+    
+    def _poll_timelapse_export(self):
+        """Show segment progress; finish up once the worker returns"""
+        try:
+            future = self.timelapse_future
+            if future is None:
+                self.timelapse_timer.stop()
+                return
+            
+            if not future.done():
+                from utils.timelapse_export import load_progress, SEGMENT_FRAMES
+                progress = load_progress(self.timelapse_path)
+                if progress:
+                    segments = math.ceil(progress['total'] / SEGMENT_FRAMES)
+                    self._show_status(f"🎬 Rendering time-lapse... segment "
+                                      f"{len(progress['done_segments'])}/{segments}")
+                return
+            
+            self.timelapse_timer.stop()
+            self.timelapse_btn.setEnabled(True)
+            self.timelapse_pool.shutdown(wait=False)
+            self.timelapse_pool = None
+            self.timelapse_future = None
+            
+            error = future.exception()
+            if error is not None:
+                # Finished segments are kept; exporting to the same file resumes
+                self._show_status(f"❌ Time-lapse export failed: {error}")
+                return
+            summary = future.result()
+            self._show_status(f"✅ Time-lapse exported: {summary['frames']} frames "
+                              f"in {summary['seconds']}s")
+        except Exception as e:
+            self._show_status(f"❌ Time-lapse export failed: {e}")
+    
+    def _show_status(self, message):
+        try:
+            self.main_window.statusBar().showMessage(message)
+        except Exception:
+            print(message)
+    
     def _on_time_changed(self, value):
         """Time change handler with proper solar updates"""
         try:
@@ -1165,6 +1362,11 @@ class DateTimeControls(QWidget):
             if self.camera_movement_timer:
                 self.camera_movement_timer.stop()
                 self.camera_movement_timer = None
+            if self.timelapse_timer:
+                self.timelapse_timer.stop()
+            if self.timelapse_pool:
+                self.timelapse_pool.shutdown(wait=False, cancel_futures=True)
+                self.timelapse_pool = None
             self.animation_active = False
         except Exception as e:
             pass
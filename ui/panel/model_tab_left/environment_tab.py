@@ -9,11 +9,10 @@ from PyQt5.QtCore import pyqtSignal, Qt, pyqtSlot
 from PyQt5.QtGui import QFont
 import numpy as np
 
-try:
-    import pyvista as pv
-    PYVISTA_AVAILABLE = True
-except ImportError:
-    PYVISTA_AVAILABLE = False
+from utils.lazy_imports import pyvista_installed
+
+# PyVista itself is imported with the 3D view, not at startup
+PYVISTA_AVAILABLE = pyvista_installed()
 
 class EnvironmentTab(QWidget):
     """Environment obstacles tab for adding trees and poles"""
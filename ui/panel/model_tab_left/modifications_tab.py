@@ -5,10 +5,25 @@ Enhanced Modifications tab with proper plotter connection and signal handling
 """
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                             QPushButton, QProgressBar, QGroupBox, QMessageBox, 
-                            QTabWidget, QFrame)
+                            QTabWidget, QFrame, QComboBox)
 from PyQt5.QtCore import pyqtSignal, QTimer, Qt
 from PyQt5.QtGui import QFont
 import math
+import threading
+import numpy as np
+
+from solar_system.energy_model import (IncrementalEnergyModel, adaptive_lit_fractions,
+                                       panel_lit_fractions)
+from solar_system.side_selection import SideSelectionSolver
+from solar_system.irradiation_heatmap import IrradiationHeatmap
+from solar_system.sun_depth_map import (OccluderCache, SunDepthMap, scene_occluder_meshes,
+                                        sun_direction, tree_crowns)
+from solar_system.yield_uncertainty import DISPLAY_SEED, YieldUncertainty, exceedance_note
+from roofs.solar_panel_handlers.config import SIDE_AZIMUTH
+from utils.log import get_logger
+from utils.tracing import traced
+
+log = get_logger('energy')
 
 # Import dialogs with fallback
 try:
@@ -38,6 +53,14 @@ class ModificationsTab(QWidget):
     obstacle_placement_requested = pyqtSignal(str, tuple)
     environment_action_requested = pyqtSignal(str, dict)
     performance_updated = pyqtSignal(float, float, float, float)  # power, energy, efficiency, irradiance
+
+    # Shading modes for shadow factors and the daily and annual energy paths
+    SHADING_MODES = {
+        'ray_sphere': "🌳 Tree crowns (ray test)",
+        'depth_map': "🏠 Full scene (sun depth map)",
+    }
+
+    HEATMAP_LABEL = "🌡️ Irradiation Heatmap"
     
     def __init__(self, main_window, parent=None):
         super().__init__(parent)
@@ -67,6 +90,33 @@ class ModificationsTab(QWidget):
             'panel_area': 1.94,  # m² per panel (1046mm x 1690mm ~Maxeon 6)
             'efficiency': 0.227  # 22.7% efficiency
         }
+
+        # Daily energy model caching per-side and per-panel partial results
+        self.energy_model = IncrementalEnergyModel(step_hours=0.5)
+
+        # Annual best-sides solver (caches layouts and per-face yields)
+        self.side_solver = SideSelectionSolver()
+        self.best_sides_btn = None
+        self.best_sides_label = None
+        self.exceedance_btn = None
+        self.exceedance_label = None
+
+        # Worker-thread jobs by name: (status, title, on_done, button, button label)
+        self.background_jobs = {}
+        self.background_timer = None
+
+        # Shadow factor mode and the triangulated occluders for depth-map shading
+        self.shading_mode = 'ray_sphere'
+        self.shading_mode_combo = None
+        self.occluder_cache = OccluderCache()
+        # Sub-panel shading refinement depth (0 = corners and centre only)
+        self.sub_panel_levels = 2
+
+        # Annual irradiation overlay on the roof faces (results cached per scene)
+        self.irradiation_heatmap = IrradiationHeatmap()
+        self.heatmap_btn = None
+        self.heatmap_job = None       # worker status while a heatmap is computed
+        self.heatmap_timer = None
         
         self.setup_ui()
         self.setup_timers()
@@ -273,6 +323,58 @@ class ModificationsTab(QWidget):
         self.solar_config_btn.clicked.connect(self._open_solar_panel_dialog)
         self.solar_config_btn.setEnabled(SOLAR_PANEL_DIALOG_AVAILABLE)
         panel_layout.addWidget(self.solar_config_btn)
+
+        # Best sides solver button
+        self.best_sides_btn = QPushButton("🧭 Suggest Best Sides")
+        self.best_sides_btn.setMinimumHeight(32)
+        self.best_sides_btn.setMaximumWidth(370)
+        self.best_sides_btn.setToolTip("Rank the allowed roof-face combinations by annual yield")
+        self.best_sides_btn.clicked.connect(self._suggest_best_sides)
+        panel_layout.addWidget(self.best_sides_btn)
+
+        # P50 / P75 / P90 annual yield of the placed panels
+        self.exceedance_btn = QPushButton("📊 Yield P50 / P75 / P90")
+        self.exceedance_btn.setMinimumHeight(32)
+        self.exceedance_btn.setMaximumWidth(370)
+        self.exceedance_btn.setToolTip("Annual yield exceeded in 50 / 75 / 90 % of years (Monte Carlo)")
+        self.exceedance_btn.clicked.connect(self._show_yield_exceedance)
+        panel_layout.addWidget(self.exceedance_btn)
+
+        # Irradiation heatmap toggle
+        self.heatmap_btn = QPushButton(self.HEATMAP_LABEL)
+        self.heatmap_btn.setMinimumHeight(32)
+        self.heatmap_btn.setMaximumWidth(370)
+        self.heatmap_btn.setCheckable(True)
+        self.heatmap_btn.setToolTip("Show annual irradiation (kWh/m²) on the roof faces")
+        self.heatmap_btn.toggled.connect(self._toggle_irradiation_heatmap)
+        panel_layout.addWidget(self.heatmap_btn)
+
+        self.best_sides_label = QLabel("")
+        self.best_sides_label.setWordWrap(True)
+        self.best_sides_label.setMaximumWidth(370)
+        self.best_sides_label.hide()
+        panel_layout.addWidget(self.best_sides_label)
+
+        self.exceedance_label = QLabel("")
+        self.exceedance_label.setWordWrap(True)
+        self.exceedance_label.setMaximumWidth(370)
+        self.exceedance_label.hide()
+        panel_layout.addWidget(self.exceedance_label)
+
+        # Shading mode selector
+        shading_row = QHBoxLayout()
+        shading_row.addWidget(QLabel("🌗 Shading:"))
+        self.shading_mode_combo = QComboBox()
+        self.shading_mode_combo.setMaximumWidth(280)
+        for mode, label in self.SHADING_MODES.items():
+            self.shading_mode_combo.addItem(label, mode)
+        self.shading_mode_combo.setToolTip(
+            "Ray test: tree crowns only, one ray per panel and crown.\n"
+            "Sun depth map: roof, obstacles, trees and poles rasterized once per sun position.")
+        self.shading_mode_combo.currentIndexChanged.connect(
+            lambda index: self.set_shading_mode(self.shading_mode_combo.itemData(index)))
+        shading_row.addWidget(self.shading_mode_combo)
+        panel_layout.addLayout(shading_row)
         
         # Panel status
         if SOLAR_PANEL_DIALOG_AVAILABLE:
@@ -392,6 +494,14 @@ class ModificationsTab(QWidget):
             self.connection_timer = QTimer()
             self.connection_timer.timeout.connect(self._check_connections)
             self.connection_timer.start(2000)  # Check every 2 seconds
+
+            # Polls the irradiation heatmap worker while it runs
+            self.heatmap_timer = QTimer()
+            self.heatmap_timer.timeout.connect(self._poll_irradiation_heatmap)
+
+            # Polls the other worker-thread jobs (see _run_in_background)
+            self.background_timer = QTimer()
+            self.background_timer.timeout.connect(self._poll_background_jobs)
             
             # Initial updates
             self._update_performance()
@@ -672,6 +782,169 @@ class ModificationsTab(QWidget):
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Error opening solar panel dialog: {e}")
     
+    def _suggest_best_sides(self):
+        """Rank allowed face subsets by annual yield in a worker and offer to apply the best"""
+        try:
+            from roofs.headless_scene import max_active_sides, roof_obstacle_specs, roof_type_of
+
+            roof = self.current_roof or self._find_current_roof()
+            handler = getattr(roof, 'solar_panel_handler', None) if roof else None
+            roof_type = roof_type_of(roof) if roof else None
+            if not handler or roof_type in (None, 'flat'):
+                QMessageBox.warning(self, "Not Available",
+                    "Best sides suggestion needs a gable, hip or pyramid roof.")
+                return
+
+            panel_config = {key: getattr(handler, key) for key in
+                            ('panel_width', 'panel_length', 'panel_gap', 'panel_power',
+                             'edge_offset', 'horizontal_edge_offset', 'vertical_edge_offset')
+                            if hasattr(handler, key)}
+
+            # Score with the live roof's side limit and obstacles, so the
+            # suggestion matches what placement on this roof will do. The
+            # scene is read here; the headless layout and yields run in the worker.
+            inputs = dict(
+                rotation=float(getattr(roof, 'rotation_angle', 0.0)),
+                crowns=self._get_tree_crowns(),
+                max_sides=getattr(handler, 'max_active_sides', None) or max_active_sides(roof_type),
+                obstacles=roof_obstacle_specs(roof),
+                triangles=self._occluder_triangles(roof))
+            dimensions = tuple(roof.dimensions)
+            latitude = self.latitude
+
+            self._run_in_background(
+                'best-sides', "Best sides",
+                lambda: self.side_solver.solve(roof_type, dimensions, panel_config, latitude,
+                                               **inputs),
+                lambda result: self._on_best_sides(result, handler),
+                self.best_sides_btn, "🧭 Ranking sides...")
+
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error ranking roof sides: {e}")
+
+    def _on_best_sides(self, result, handler):
+        """Show the ranked face subsets and offer to place the best one"""
+        by_yield = result['by_yield']
+        if not by_yield:
+            QMessageBox.information(self, "Best Sides", "No panels fit on this roof.")
+            return
+
+        lines = ["Annual yield:"]
+        for row in by_yield[:3]:
+            lines.append(f"  {' + '.join(row['sides'])}: {row['annual_kwh']:.0f} kWh "
+                         f"({row['panel_count']} panels)")
+        best_per_panel = result['by_yield_per_panel'][0]
+        lines.append(f"Per panel: {' + '.join(best_per_panel['sides'])} "
+                     f"({best_per_panel['kwh_per_panel']:.0f} kWh/panel)")
+        self.best_sides_label.setText("\n".join(lines))
+        self.best_sides_label.show()
+
+        # The roof may have been replaced while the worker ran
+        roof = self.current_roof or self._find_current_roof()
+        if getattr(roof, 'solar_panel_handler', None) is not handler:
+            return
+
+        best = by_yield[0]
+        answer = QMessageBox.question(self, "Best Sides",
+            "\n".join(lines) + f"\n\nPlace panels on {' + '.join(best['sides'])}?",
+            QMessageBox.Yes | QMessageBox.No)
+        if answer == QMessageBox.Yes:
+            handler.clear_panels()
+            for side in best['sides']:
+                handler.add_panels(side)
+            self._update_performance()
+
+    def _toggle_irradiation_heatmap(self, checked):
+        """Show or hide the annual irradiation overlay on the current roof.
+        Heatmaps not cached yet are computed in a worker thread."""
+        try:
+            if not checked:
+                self.irradiation_heatmap.hide()
+                return
+            if self.heatmap_job is not None:
+                return  # still computing; shown when the worker finishes
+
+            roof = self.current_roof
+            if not roof:
+                model_tab = self._get_model_tab()
+                roof = getattr(model_tab, 'current_roof', None) if model_tab else None
+            if not roof:
+                QMessageBox.information(self, "Irradiation Heatmap", "Create a roof first.")
+                self.heatmap_btn.setChecked(False)
+                return
+
+            result = self.irradiation_heatmap.cached(roof, self.latitude)
+            if result is not None:
+                self._show_irradiation_heatmap(roof, result)
+                return
+
+            # Scene reads stay on the UI thread; the annual sum runs in the worker
+            job = self.irradiation_heatmap.prepare(roof, self.latitude)
+            if job is None:
+                QMessageBox.information(self, "Irradiation Heatmap",
+                                        "This roof type has no faces to analyse.")
+                self.heatmap_btn.setChecked(False)
+                return
+
+            status = {'roof': roof, 'job': job, 'done': 0, 'total': 0,
+                      'error': None, 'finished': False}
+            self.heatmap_job = status
+
+            def on_progress(done, total):
+                status['done'], status['total'] = done, total
+
+            def run():
+                try:
+                    self.irradiation_heatmap.evaluate(job, on_progress)
+                except Exception as e:
+                    status['error'] = str(e)
+                status['finished'] = True
+
+            threading.Thread(target=run, name='irradiation-heatmap', daemon=True).start()
+            self.heatmap_btn.setText("🌡️ Computing heatmap...")
+            if self.heatmap_timer is not None:
+                self.heatmap_timer.start(200)
+        except Exception as e:
+            log.error("❌ Irradiation heatmap failed: %s", e)
+            if self.heatmap_btn:
+                self.heatmap_btn.setChecked(False)
+
+    def _poll_irradiation_heatmap(self):
+        """Show heatmap progress; add the overlay once the worker is done"""
+        status = self.heatmap_job
+        if status is None:
+            self.heatmap_timer.stop()
+            if self.heatmap_btn:
+                self.heatmap_btn.setText(self.HEATMAP_LABEL)
+            return
+
+        if not status['finished']:
+            if status['total']:
+                self.heatmap_btn.setText(
+                    f"🌡️ Computing heatmap... {100 * status['done'] // status['total']}%")
+            return
+
+        self.heatmap_timer.stop()
+        self.heatmap_job = None
+        self.heatmap_btn.setText(self.HEATMAP_LABEL)
+        try:
+            if status['error']:
+                raise RuntimeError(status['error'])
+            result = self.irradiation_heatmap.finish(status['job'])
+            # Switched off meanwhile: keep the cached result, show nothing
+            if self.heatmap_btn.isChecked():
+                self._show_irradiation_heatmap(status['roof'], result)
+        except Exception as e:
+            log.error("❌ Irradiation heatmap failed: %s", e)
+            self.heatmap_btn.setChecked(False)
+
+    def _show_irradiation_heatmap(self, roof, result):
+        """Add a computed heatmap to the roof's plotter and log the face ranking"""
+        self.irradiation_heatmap.show(roof, self.latitude, result)
+        ranking = sorted(result['per_face'].items(), key=lambda item: -item[1])
+        log.info("🌡️ Annual irradiation per face: %s",
+                 ", ".join(f"{name} {value:.0f} kWh/m²" for name, value in ranking))
+
     def _open_obstacle_dialog(self):
         """Open obstacle placement dialog"""
         try:
@@ -696,17 +969,7 @@ class ModificationsTab(QWidget):
     # ==================== PERFORMANCE CALCULATIONS ====================
     
     # Side name → facing azimuth (degrees, 0=N, 90=E, 180=S, 270=W)
-    SIDE_AZIMUTH = {
-        # Gable roof sides (ridge runs along Y-axis)
-        'left': 270.0,   # faces west
-        'right': 90.0,   # faces east
-        # Hip / Pyramid roof sides
-        'front': 180.0,  # faces south
-        'back': 0.0,     # faces north
-        # Flat roof zones — all face up (tilt overrides to 0)
-        'center': 180.0, 'north': 180.0, 'south': 180.0,
-        'east': 180.0, 'west': 180.0,
-    }
+    SIDE_AZIMUTH = SIDE_AZIMUTH
 
     @staticmethod
     def _clear_sky_irradiance(sin_elev):
@@ -836,6 +1099,7 @@ class ModificationsTab(QWidget):
                 tilt_rad = math.radians(handler.panel_tilt)
                 is_flat = False
 
+            panel_axes = getattr(handler, 'panel_axes_by_side', {}) or {}
             sides = []
             for side_name, count in counts.items():
                 if count <= 0:
@@ -843,7 +1107,8 @@ class ModificationsTab(QWidget):
                 face_az = self.SIDE_AZIMUTH.get(side_name, 180.0)
                 face_tilt = 0.0 if is_flat else tilt_rad
                 sides.append({'name': side_name, 'count': count,
-                              'tilt': face_tilt, 'azimuth': face_az})
+                              'tilt': face_tilt, 'azimuth': face_az,
+                              'axes': panel_axes.get(side_name)})
 
             # Update total panel_config count for display
             self.panel_config['panel_count'] = sum(s['count'] for s in sides)
@@ -851,80 +1116,147 @@ class ModificationsTab(QWidget):
         except Exception:
             return []
 
+    @traced('energy.daily_per_side', 'energy')
     def _estimate_daily_energy_per_side(self, sides_info, panel_area, efficiency):
-        """Integrate daily energy across all sides in 30-min steps with shadow ray-tracing"""
+        """Integrate daily energy across all sides in 30-min steps, shaded with the
+        selected shading mode. Only sides whose panels, geometry or shading
+        inputs changed are recomputed."""
         try:
-            lat_rad = math.radians(self.latitude)
-            dec = math.radians(
-                23.45 * math.sin(math.radians(360.0 * (284 + self.day_of_year) / 365.0)))
-
-            cos_ws = max(-1.0, min(1.0, -math.tan(lat_rad) * math.tan(dec)))
-            sunrise_ha = math.acos(cos_ws)
-            sunrise = 12.0 - math.degrees(sunrise_ha) / 15.0
-            sunset = 12.0 + math.degrees(sunrise_ha) / 15.0
-
-            # Pre-fetch tree crowns once for the whole day
             crowns = self._get_tree_crowns()
-            has_trees = len(crowns) > 0
+            triangles = self._occluder_triangles()
 
-            # Get handler for panel positions (used for shadow checks)
-            handler = None
-            if has_trees and self.current_roof:
+            # Panel positions are only needed for shadow checks
+            positions_by_side = {}
+            if (crowns or triangles is not None) and self.current_roof:
                 handler = getattr(self.current_roof, 'solar_panel_handler', None)
+                positions_by_side = getattr(handler, 'panel_positions_by_side', {}) or {}
 
             panel_power_w = self.panel_config.get('panel_power', 440)
-            total_wh = 0.0
-            step = 0.5
-            t = sunrise
-            while t < sunset:
-                ha = math.radians(15.0 * (t - 12.0))
-                sin_elev = (math.sin(lat_rad) * math.sin(dec) +
-                            math.cos(lat_rad) * math.cos(dec) * math.cos(ha))
-                if sin_elev <= 0.01:
-                    t += step
-                    continue
-                elev_rad = math.asin(sin_elev)
-                cos_elev = math.cos(elev_rad)
-
-                # Sun azimuth at this time step
-                cos_az = (math.sin(dec) - math.sin(lat_rad) * sin_elev) / \
-                         (math.cos(lat_rad) * cos_elev) if cos_elev > 0.001 else 0.0
-                cos_az = max(-1.0, min(1.0, cos_az))
-                az_deg = math.degrees(math.acos(cos_az))
-                if t > 12.0:
-                    az_deg = 360.0 - az_deg
-
-                # DNI / DHI clear-sky model (same as _update_performance)
-                dni, dhi = self._clear_sky_irradiance(sin_elev)
-
-                # Shadow factors at this time step
-                step_shadow = {}
-                if has_trees and handler and hasattr(handler, 'panel_positions_by_side'):
-                    elev_deg = math.degrees(elev_rad)
-                    step_shadow = self._shadow_factors_for_sun(
-                        sides_info, elev_deg, az_deg)
-
-                for side in sides_info:
-                    az_diff = math.radians(az_deg - side['azimuth'])
-                    cos_aoi = (sin_elev * math.cos(side['tilt']) +
-                               cos_elev * math.sin(side['tilt']) * math.cos(az_diff))
-                    cos_aoi = max(0.0, cos_aoi)
-                    poa_beam = dni * cos_aoi
-                    poa_diffuse = dhi * (1.0 + math.cos(side['tilt'])) / 2.0
-                    sf = step_shadow.get(side['name'], 1.0)
-                    # Shadow blocks beam only; diffuse still reaches
-                    poa_effective = poa_beam * sf + poa_diffuse
-                    side_w = poa_effective * panel_area * side['count'] * efficiency
-                    # Clamp at nameplate
-                    max_w = side['count'] * panel_power_w
-                    side_w = min(side_w, max_w)
-                    total_wh += side_w * step
-
-                t += step
-            return total_wh / 1000.0
+            total_kwh, _ = self.energy_model.daily_energy(
+                sides_info, positions_by_side, crowns,
+                self.latitude, self.day_of_year,
+                panel_area, efficiency, panel_power_w, triangles=triangles)
+            return total_kwh
         except Exception:
             return 0.0
-    
+
+    def _exceedance_layout(self):
+        """Everything the yield model needs about the placed panels, read from
+        the scene on the UI thread. Returns None when no panels are placed."""
+        sides_info = self._get_panels_per_side()
+        if not sides_info:
+            return None
+
+        handler = getattr(self.current_roof, 'solar_panel_handler', None)
+        positions_by_side = getattr(handler, 'panel_positions_by_side', {}) or {}
+
+        sides = []
+        for side in sides_info:
+            positions = positions_by_side.get(side['name'])
+            shaded = True
+            if positions is None or len(positions) != side['count']:
+                # Without panel positions this side's shading cannot be traced
+                positions = [(0.0, 0.0, 0.0)] * side['count']
+                shaded = False
+            sides.append(dict(side, positions=np.asarray(positions, dtype=float), shaded=shaded))
+
+        return {'sides': sides, 'latitude': self.latitude,
+                'panel_area': self.panel_config['panel_area'],
+                'efficiency': self.panel_config['efficiency'],
+                'crowns': self._get_tree_crowns(), 'triangles': self._occluder_triangles()}
+
+    @staticmethod
+    def _compute_yield_exceedance(layout, n_samples=10000, year=1, params=None, seed=None):
+        """P50/P75/P90 of a prepared layout (NumPy only, safe in a worker thread)"""
+        uncertainty = YieldUncertainty.from_layout(
+            layout['sides'], layout['latitude'], layout['panel_area'], layout['efficiency'],
+            crowns=layout['crowns'], params=params, triangles=layout['triangles'])
+        return uncertainty.exceedance(n_samples=n_samples, year=year, seed=seed)
+
+    def estimate_yield_exceedance(self, n_samples=10000, year=1, params=None, seed=None):
+        """Monte Carlo P50/P75/P90 annual yield (kWh) for the placed panels.
+        Returns {} when no panels are placed."""
+        try:
+            layout = self._exceedance_layout()
+            if layout is None:
+                return {}
+            return self._compute_yield_exceedance(layout, n_samples, year, params, seed)
+        except Exception:
+            return {}
+
+    def _show_yield_exceedance(self):
+        """Sample P50/P75/P90 for the placed panels in a worker and show them"""
+        try:
+            layout = self._exceedance_layout()
+            if layout is None:
+                QMessageBox.information(self, "Yield Exceedance", "Place solar panels first.")
+                return
+            self._run_in_background(
+                'yield-exceedance', "Yield exceedance",
+                lambda: self._compute_yield_exceedance(layout, seed=DISPLAY_SEED),
+                self._on_yield_exceedance, self.exceedance_btn, "📊 Sampling yields...")
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error estimating yield exceedance: {e}")
+
+    def _on_yield_exceedance(self, result):
+        lines = ["Annual yield exceeded in 50 / 75 / 90 % of years:"]
+        lines += [f"  {level}: {kwh:,.0f} kWh" for level, kwh in result.items()]
+        lines.append(exceedance_note())
+        self.exceedance_label.setText("\n".join(lines))
+        self.exceedance_label.show()
+
+    # ==================== BACKGROUND JOBS ====================
+
+    def _run_in_background(self, name, title, work, on_done, button=None, busy_text=None):
+        """Run work() in a worker thread; on_done(result) runs on the UI thread.
+
+        work must not touch Qt or the plotter - read the scene before and
+        pass plain data in. One job per name runs at a time; its button is
+        disabled (and relabelled with busy_text) until the job finishes.
+        Returns False when a job of that name is still running.
+        """
+        if name in self.background_jobs:
+            return False
+
+        status = {'result': None, 'error': None, 'finished': False}
+
+        def run():
+            try:
+                status['result'] = work()
+            except Exception as e:
+                status['error'] = e
+            status['finished'] = True
+
+        label = button.text() if button is not None else None
+        self.background_jobs[name] = (status, title, on_done, button, label)
+        if button is not None:
+            button.setEnabled(False)
+            if busy_text:
+                button.setText(busy_text)
+        threading.Thread(target=run, name=name, daemon=True).start()
+        if self.background_timer is not None:
+            self.background_timer.start(100)
+        return True
+
+    def _poll_background_jobs(self):
+        """Hand finished worker results to their callbacks"""
+        for name, (status, title, on_done, button, label) in list(self.background_jobs.items()):
+            if not status['finished']:
+                continue
+            del self.background_jobs[name]
+            if button is not None:
+                button.setEnabled(True)
+                button.setText(label)
+            try:
+                if status['error'] is not None:
+                    raise status['error']
+                on_done(status['result'])
+            except Exception as e:
+                log.error("❌ %s failed: %s", title, e)
+                QMessageBox.critical(self, "Error", f"{title} failed: {e}")
+        if not self.background_jobs:
+            self.background_timer.stop()
+
     def _calculate_solar_elevation(self):
         """Calculate solar elevation angle"""
         try:
@@ -990,17 +1322,7 @@ class ModificationsTab(QWidget):
         roof = self.current_roof
         if not roof:
             return []
-        obstacles = getattr(roof, 'environment_obstacles', [])
-        crowns = []
-        for obs in obstacles:
-            if 'tree' not in obs.get('type', ''):
-                continue
-            pos = obs.get('position', [0, 0])
-            h = obs.get('height', 7.0)
-            r = obs.get('radius', 2.0)
-            # Crown sphere center sits atop the trunk
-            crowns.append((float(pos[0]), float(pos[1]), float(h - r), float(r)))
-        return crowns
+        return tree_crowns(roof)
 
     @staticmethod
     def _ray_intersects_sphere(px, py, pz, dx, dy, dz, cx, cy, cz, r):
@@ -1019,6 +1341,27 @@ class ModificationsTab(QWidget):
         t2 = (-b + sqrt_d) / 2.0  # far intersection
         return t2 > 0.0
 
+    def set_shading_mode(self, mode):
+        """Select how shadow factors are computed ('ray_sphere' or 'depth_map')"""
+        if mode not in self.SHADING_MODES or mode == self.shading_mode:
+            return
+        self.shading_mode = mode
+        if self.shading_mode_combo is not None:
+            index = self.shading_mode_combo.findData(mode)
+            if index >= 0 and index != self.shading_mode_combo.currentIndex():
+                self.shading_mode_combo.setCurrentIndex(index)
+        self._update_performance()
+
+    def _occluder_triangles(self, roof=None):
+        """Scene occluder triangles when depth-map shading is selected, else None.
+        Every daily and annual energy path passes these on, so one shading mode
+        applies to all numbers."""
+        roof = roof or self.current_roof
+        if self.shading_mode != 'depth_map' or not roof:
+            return None
+        return self.occluder_cache.triangles(scene_occluder_meshes(roof))
+
+    @traced('shading.sun_factors', 'energy')
     def _shadow_factors_for_sun(self, sides_info, solar_elevation, solar_azimuth):
         """Compute per-side shadow factor (0=fully shadowed, 1=fully lit).
         Casts a ray from each stored panel center toward the sun and checks
@@ -1033,6 +1376,10 @@ class ModificationsTab(QWidget):
             if not handler or not hasattr(handler, 'panel_positions_by_side'):
                 return {}
 
+            if self.shading_mode == 'depth_map':
+                return self._depth_map_shadow_factors(
+                    roof, handler, sides_info, solar_elevation, solar_azimuth)
+
             crowns = self._get_tree_crowns()
             if not crowns:
                 return {}  # no trees → no shadow reduction
@@ -1043,12 +1390,21 @@ class ModificationsTab(QWidget):
             sun_dy = math.cos(elev_rad) * math.cos(az_rad)
             sun_dz = math.sin(elev_rad)
 
+            panel_axes = getattr(handler, 'panel_axes_by_side', {}) or {}
+            direction = np.array([[sun_dx, sun_dy, sun_dz]])
             factors = {}
             for side in sides_info:
                 name = side['name']
                 positions = handler.panel_positions_by_side.get(name, [])
                 if not positions:
                     continue
+                axes = panel_axes.get(name)
+                if axes is not None:
+                    # Lit area fraction, sampled finer only near shadow edges
+                    fractions = panel_lit_fractions(positions, axes[0], axes[1], direction,
+                                                    crowns, self.sub_panel_levels)
+                    factors[name] = float(fractions.mean())
+                    continue
                 lit = 0
                 for p in positions:
                     blocked = False
@@ -1066,6 +1422,39 @@ class ModificationsTab(QWidget):
         except Exception:
             return {}
 
+    @traced('shading.sun_depth_map', 'energy')
+    def _depth_map_shadow_factors(self, roof, handler, sides_info, solar_elevation, solar_azimuth):
+        """Per-side shadow factors from one sun-view depth map of the whole scene
+        (building, roof obstacles, trunks, poles and tree crowns)."""
+        points = []
+        for side in sides_info:
+            points.extend(handler.panel_positions_by_side.get(side['name'], []))
+        if not points or solar_elevation <= 0:
+            return {}
+
+        direction = sun_direction(solar_elevation, solar_azimuth)
+        depth = SunDepthMap.for_receivers(direction, points, margin=2.0)
+        depth.add_triangles(self._occluder_triangles(roof))
+        depth.add_spheres(self._get_tree_crowns())
+
+        panel_axes = getattr(handler, 'panel_axes_by_side', {}) or {}
+        factors = {}
+        for side in sides_info:
+            positions = handler.panel_positions_by_side.get(side['name'], [])
+            if not positions:
+                continue
+            axes = panel_axes.get(side['name'])
+            if axes is None:
+                factors[side['name']] = float(depth.lit(positions).mean())
+                continue
+            # Depth lookups are cheap, so every panel is sampled adaptively
+            panels = np.arange(len(positions))
+            fractions = adaptive_lit_fractions(
+                positions, axes[0], axes[1], panels, np.zeros(len(panels), dtype=int),
+                lambda pts, index: ~depth.lit(pts), self.sub_panel_levels)
+            factors[side['name']] = float(fractions.mean())
+        return factors
+
     # ==================== UTILITY METHODS ====================
 
     def _get_model_tab(self):
@@ -1085,6 +1474,12 @@ class ModificationsTab(QWidget):
         """Handle roof creation signal"""
         try:
             self.current_roof = roof
+            self.occluder_cache.clear()
+            # A heatmap still computing belongs to the old roof
+            self.heatmap_job = None
+            self.irradiation_heatmap.clear()
+            if self.heatmap_btn and self.heatmap_btn.isChecked():
+                self.heatmap_btn.setChecked(False)
             self._establish_roof_connections(roof)
             
         except Exception as e:
@@ -9,11 +9,10 @@ import time
 import numpy as np
 from datetime import datetime
 
-try:
-    import pyvista as pv
-    PYVISTA_AVAILABLE = True
-except ImportError:
-    PYVISTA_AVAILABLE = False
+from utils.lazy_imports import pyvista_installed
+
+# PyVista itself is imported with the 3D view, not at startup
+PYVISTA_AVAILABLE = pyvista_installed()
 
 from .model_tab import ModelTab
 from .default_tab import DefaultTab
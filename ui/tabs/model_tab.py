@@ -9,12 +9,17 @@ import math
 import numpy as np
 from datetime import datetime, timedelta
 
-try:
-    import pyvista as pv
-    from pyvistaqt import QtInteractor
-    PYVISTA_AVAILABLE = True
-except ImportError:
-    PYVISTA_AVAILABLE = False
+from utils.lazy_imports import load_pyvista, pyvista_installed
+from utils.startup_timeline import phase as startup_phase
+from utils.tracing import tracer, traced
+
+# PyVista, pyvistaqt and the sun system (VTK) are imported by _load_view_modules()
+# when the 3D view is first shown or used
+PYVISTA_AVAILABLE = pyvista_installed()
+pv = None
+QtInteractor = None
+EnhancedRealisticSunSystem = None
+ENHANCED_SUN_AVAILABLE = False
 
 try:
     from solar_system.solar_calculations import SolarCalculations
@@ -22,11 +27,20 @@ try:
 except ImportError:
     SOLAR_CALCULATIONS_AVAILABLE = False
 
-try:
-    from solar_system.enhanced_sun_system import EnhancedRealisticSunSystem
-    ENHANCED_SUN_AVAILABLE = True
-except ImportError as e:
-    ENHANCED_SUN_AVAILABLE = False
+
+def _load_view_modules():
+    """Import the 3D view modules on first use; returns PYVISTA_AVAILABLE"""
+    global pv, QtInteractor, PYVISTA_AVAILABLE, EnhancedRealisticSunSystem, ENHANCED_SUN_AVAILABLE
+    if pv is None and PYVISTA_AVAILABLE:
+        pv, QtInteractor = load_pyvista()
+        PYVISTA_AVAILABLE = pv is not None
+        if PYVISTA_AVAILABLE:
+            try:
+                from solar_system.enhanced_sun_system import EnhancedRealisticSunSystem
+                ENHANCED_SUN_AVAILABLE = True
+            except ImportError:
+                ENHANCED_SUN_AVAILABLE = False
+    return PYVISTA_AVAILABLE
 
 class ModelTab(QWidget):
     """Model Tab with environment integration"""
@@ -44,7 +58,10 @@ class ModelTab(QWidget):
         self.current_building = None
         self.current_roof = None
         self.environment_tab = None
-        self.plotter = None
+        self._plotter = None
+        self._view_loaded = False
+        self._view_layout = None
+        self._view_placeholder = None
         self.vtk_widget = None
         
         self.ground_plane_actor = None
@@ -72,14 +89,57 @@ class ModelTab(QWidget):
         self.sun_position = None
         
         self.camera_interacting = False
+        self.level_of_detail = None
+        
+        self.performance_hud = None
         
         self.setup_ui()
-        self._initialize_solar_systems()
         self._calculate_initial_sun_position()
-        self._force_create_initial_sun()
+
+    # ==================== LAZY 3D VIEW ====================
+
+    @property
+    def plotter(self):
+        """The PyVista plotter; the 3D view is created on first access"""
+        if not self._view_loaded:
+            self.ensure_view()
+        return self._plotter
+
+    @plotter.setter
+    def plotter(self, plotter):
+        self._plotter = plotter
+
+    def showEvent(self, event):
+        """Create the 3D view the first time the tab becomes visible"""
+        super().showEvent(event)
+        if not self._view_loaded:
+            # Let the placeholder paint before VTK is loaded
+            QTimer.singleShot(0, self.ensure_view)
+
+    def ensure_view(self):
+        """Import VTK/PyVista and build the 3D view and sun system (once)"""
+        if self._view_loaded:
+            return self._plotter
+        self._view_loaded = True
+
+        with startup_phase('model tab 3D view'):
+            layout = self._view_layout
+            if self._view_placeholder is not None:
+                layout.removeWidget(self._view_placeholder)
+                self._view_placeholder.deleteLater()
+                self._view_placeholder = None
+
+            if _load_view_modules():
+                self.setup_pyvista_view(layout)
+            else:
+                self.setup_fallback_3d_view(layout)
+
+            self._initialize_solar_systems()
+            self._force_create_initial_sun()
+        return self._plotter
 
     def setup_ui(self):
-        """Setup the UI with only the 3D plotter"""
+        """Setup the UI; the 3D plotter itself is created by ensure_view()"""
         main_layout = QVBoxLayout(self)
         main_layout.setContentsMargins(0, 0, 0, 0)
         main_layout.setSpacing(0)
@@ -91,9 +151,14 @@ class ModelTab(QWidget):
         view_layout.setContentsMargins(5, 5, 5, 5)
         view_layout.setSpacing(5)
         
+        self._view_layout = view_layout
         if PYVISTA_AVAILABLE:
-            self.setup_pyvista_view(view_layout)
+            self._view_placeholder = QLabel("🏗️ Loading 3D view...")
+            self._view_placeholder.setAlignment(Qt.AlignCenter)
+            self._view_placeholder.setMinimumHeight(500)
+            view_layout.addWidget(self._view_placeholder)
         else:
+            self._view_loaded = True
             self.setup_fallback_3d_view(view_layout)
         
         main_layout.addWidget(view_container)
@@ -105,6 +170,7 @@ class ModelTab(QWidget):
             self.plotter.setMinimumHeight(500)
             
             self.plotter.model_tab = self
+            tracer.instrument_plotter(self.plotter)
             
             if hasattr(self.plotter, 'iren'):
                 try:
@@ -136,6 +202,11 @@ class ModelTab(QWidget):
     def _on_camera_start(self, obj, event):
         """Called when camera interaction starts"""
         self.camera_interacting = True
+        if self.level_of_detail is None and self.plotter:
+            from roofs.base.level_of_detail import LevelOfDetail
+            self.level_of_detail = LevelOfDetail(self.plotter)
+        if self.level_of_detail:
+            self.level_of_detail.enter(self.current_roof)
         if self.enhanced_sun_system:
             self.enhanced_sun_system.set_interactive_mode(True)
     
@@ -144,6 +215,43 @@ class ModelTab(QWidget):
         self.camera_interacting = False
         if self.enhanced_sun_system:
             self.enhanced_sun_system.set_interactive_mode(False)
+        if self.level_of_detail and self.level_of_detail.active:
+            self.level_of_detail.exit()
+            try:
+                self.plotter.render()
+            except Exception:
+                pass
+
+    def _prepare_level_of_detail(self):
+        """Build camera-interaction proxies for the current scene while idle"""
+        if not self.plotter or self.camera_interacting:
+            return
+        try:
+            if self.level_of_detail is None:
+                from roofs.base.level_of_detail import LevelOfDetail
+                self.level_of_detail = LevelOfDetail(self.plotter)
+            self.level_of_detail.prepare(self.current_roof)
+        except Exception as e:
+            print(f"⚠️ Level-of-detail proxies not prepared: {e}")
+
+    def toggle_performance_hud(self, enabled=None):
+        """Show or hide the frame time / span overlay; returns the new state"""
+        if not self.plotter:
+            return False
+        try:
+            if self.performance_hud is None:
+                from utils.performance_hud import PerformanceHUD
+                self.performance_hud = PerformanceHUD(self.plotter)
+            if enabled is None:
+                return self.performance_hud.toggle()
+            if enabled:
+                self.performance_hud.show()
+            else:
+                self.performance_hud.hide()
+            return self.performance_hud.visible
+        except Exception as e:
+            print(f"❌ Performance overlay failed: {e}")
+            return False
 
     def setup_fallback_3d_view(self, layout):
         """Setup fallback 3D view placeholder"""
@@ -360,7 +468,7 @@ class ModelTab(QWidget):
     
     def _update_background_for_time(self):
         """Update background color based on time"""
-        if not self.plotter:
+        if not self._plotter:
             return
             
         try:
@@ -451,6 +559,7 @@ class ModelTab(QWidget):
         
         self._update_all_solar_systems()
 
+    @traced('roof.create_building', 'roof')
     def create_building(self, points, height=3.0, roof_type='flat', roof_pitch=30.0, scale=0.05, dimensions=None):
         """Create building in 3D view - FIXED with explicit dimensions"""
         try:
@@ -526,9 +635,24 @@ class ModelTab(QWidget):
             return False
 
     
-    def _clear_building_actors(self):
+    def _clear_building_actors(self, keep_environment=True):
         """Clear building actors - COMPLETE VERSION with roof cleanup"""
         try:
+            # Layered scene: only the building, panel, obstacle and overlay layers go
+            scene_graph = getattr(self.plotter, 'scene_graph', None) if self.plotter else None
+            if (keep_environment and scene_graph and self.current_roof
+                    and scene_graph.can_retain_environment()):
+                scene_graph.detach_roof(self.current_roof)
+                self.current_roof = None
+                self.building_meshes.clear()
+                self.roof_meshes.clear()
+                self.panel_meshes.clear()
+                self.current_building = None
+                print("✅ Building layers cleared, environment kept")
+                return
+            if scene_graph:
+                scene_graph.reset()
+            
             print("🧹 Clearing all building actors and roof objects...")
             
             # 1. CRITICAL: Cleanup current roof object first
@@ -628,6 +752,7 @@ class ModelTab(QWidget):
             traceback.print_exc()
 
 
+    @traced('roof.create', 'roof')
     def _create_roof_object(self, roof_type, points, height, scale, explicit_dimensions=None):
         """Create roof object with environment support - FIXED dimension calculation"""
         try:
@@ -654,6 +779,8 @@ class ModelTab(QWidget):
                 print(f"⚠️ Using default dimensions: L={length}m, W={width}m")
             
             # Cleanup previous roof
+            if self.level_of_detail:
+                self.level_of_detail.clear()
             if hasattr(self, 'current_roof') and self.current_roof:
                 try:
                     if hasattr(self.current_roof, 'cleanup'):
@@ -712,6 +839,10 @@ class ModelTab(QWidget):
             
             # Reconnect environment tab if it exists
             if self.current_roof:
+                scene_graph = getattr(self.current_roof, 'scene_graph', None)
+                if scene_graph:
+                    scene_graph.register_roof(self.current_roof)
+                
                 if hasattr(self, 'environment_tab') and self.environment_tab:
                     self._reconnect_environment_tab()
                 
@@ -722,6 +853,8 @@ class ModelTab(QWidget):
                 # Set default bright view (no sun system yet)
                 # Sun system activates when user interacts with Solar tab
                 self._setup_default_bright_lighting()
+
+                QTimer.singleShot(0, self._prepare_level_of_detail)
             
         except Exception as e:
             print(f"❌ Error creating roof object: {e}")
@@ -1015,7 +1148,7 @@ class ModelTab(QWidget):
         """Reset plotter"""
         try:
             if PYVISTA_AVAILABLE and self.plotter:
-                self._clear_building_actors()
+                self._clear_building_actors(keep_environment=False)
                 
                 if self.enhanced_sun_system:
                     self.enhanced_sun_system.destroy()
@@ -1024,6 +1157,10 @@ class ModelTab(QWidget):
                         self.enhanced_sun_system.set_quality_level(self.quality_level)
                     if hasattr(self.enhanced_sun_system, 'enable_shadows'):
                         self.enhanced_sun_system.enable_shadows(True)
+                    
+                    scene_graph = getattr(self.plotter, 'scene_graph', None)
+                    if scene_graph:
+                        scene_graph.sun_system = self.enhanced_sun_system
                 
                 self.plotter.set_background('#87CEEB', top='#E6F3FF')
                 
@@ -1046,6 +1183,14 @@ class ModelTab(QWidget):
         if self.animation_timer.isActive():
             self.animation_timer.stop()
         
+        if self.performance_hud:
+            self.performance_hud.hide()
+            self.performance_hud = None
+        
+        if self.level_of_detail:
+            self.level_of_detail.clear()
+            self.level_of_detail = None
+        
         if self.enhanced_sun_system:
             self.enhanced_sun_system.destroy()
             self.enhanced_sun_system = None
@@ -1065,9 +1210,9 @@ class ModelTab(QWidget):
         if hasattr(sys.modules[__name__], '_global_sun_system'):
             delattr(sys.modules[__name__], '_global_sun_system')
         
-        if PYVISTA_AVAILABLE and self.plotter:
-            if hasattr(self.plotter, 'close'):
-                self.plotter.close()
+        if PYVISTA_AVAILABLE and self._plotter:
+            if hasattr(self._plotter, 'close'):
+                self._plotter.close()
 
     def has_building(self):
         """Check if building exists"""
@@ -1089,7 +1234,7 @@ class ModelTab(QWidget):
     def pause_rendering(self):
         """Pause PyVista rendering when switching away from Model tab"""
         try:
-            if self.plotter and self.vtk_widget:
+            if self._plotter and self.vtk_widget:
                 self.vtk_widget.setParent(None)
         except Exception as e:
             pass
@@ -1097,7 +1242,7 @@ class ModelTab(QWidget):
     def resume_rendering(self, layout=None):
         """Resume PyVista rendering when switching back to Model tab"""
         try:
-            if self.plotter and self.vtk_widget:
+            if self._plotter and self.vtk_widget:
                 if layout is None:
                     # Try to re-add back to our own layout
                     layout = self.layout().itemAt(0).widget().layout()
@@ -10,6 +10,7 @@ from PyQt5.QtGui import QIcon, QFont, QPixmap, QPalette, QColor
 from PyQt5.QtCore import QSize, QUrl, Qt, QTimer, pyqtSignal
 import json
 import os
+import threading
 from datetime import datetime
 
 # Import text content
@@ -32,6 +33,11 @@ except ImportError:
     DialogStyles = None
     DIALOG_STYLES_AVAILABLE = False
 
+from utils.tracing import tracer
+from utils.autosave_journal import ProjectJournal
+
+AUTOSAVE_INTERVAL_MS = 60000
+
 # Import the separate ProjectWizard class
 try:
     from ui.wizard_form.project_wizard import ProjectWizard
@@ -55,6 +61,16 @@ class ToolbarManager:
         self.save_as_action = None
         self.edit_action = None
         self.close_action = None
+        self.performance_overlay_action = None
+        self.trace_action = None
+        
+        # Journaled autosave of the active project
+        self.autosave_journal = None
+        self.autosave_timer = None
+        
+        # Background report rendering (status polled on the GUI thread)
+        self.report_status = None
+        self.report_timer = None
     
     def setup_toolbar(self):
         """Setup the enhanced toolbar"""
@@ -216,6 +232,11 @@ class ToolbarManager:
         load_action.triggered.connect(self._load_project)
         self.project_menu.addAction(load_action)
         
+        # Recover from autosave journal
+        recover_action = QAction("♻️ Recover Autosave", self.main_window)
+        recover_action.triggered.connect(self._recover_autosave)
+        self.project_menu.addAction(recover_action)
+        
         self.project_menu.addSeparator()
         
         # Save actions
@@ -261,6 +282,10 @@ class ToolbarManager:
         language_menu = self.settings_menu.addMenu("🌐 Language")
         self._setup_language_menu(language_menu)
         
+        # Performance submenu
+        performance_menu = self.settings_menu.addMenu("⏱️ Performance")
+        self._setup_performance_menu(performance_menu)
+        
         self.settings_menu.addSeparator()
         
         # About
@@ -291,6 +316,73 @@ class ToolbarManager:
             action.triggered.connect(lambda checked, code=lang_code, name=lang_name: self._change_language(code, name))
             language_menu.addAction(action)
     
+    def _setup_performance_menu(self, performance_menu):
+        """Setup performance overlay and tracing actions"""
+        self._apply_menu_styling(performance_menu)
+        
+        self.performance_overlay_action = QAction("📈 Performance Overlay", self.main_window)
+        self.performance_overlay_action.setCheckable(True)
+        self.performance_overlay_action.setShortcut("Ctrl+Shift+P")
+        self.performance_overlay_action.toggled.connect(self._toggle_performance_overlay)
+        performance_menu.addAction(self.performance_overlay_action)
+        self.main_window.addAction(self.performance_overlay_action)
+        
+        self.trace_action = QAction("⏺️ Record Trace", self.main_window)
+        self.trace_action.setCheckable(True)
+        self.trace_action.setChecked(tracer.enabled)
+        self.trace_action.toggled.connect(self._toggle_tracing)
+        performance_menu.addAction(self.trace_action)
+        
+        export_trace_action = QAction("💾 Export Trace...", self.main_window)
+        export_trace_action.triggered.connect(self._export_trace)
+        performance_menu.addAction(export_trace_action)
+    
+    def _toggle_performance_overlay(self, enabled):
+        """Show or hide the in-viewport performance overlay"""
+        try:
+            model_tab = getattr(self.main_window, 'model_tab', None)
+            if not model_tab or not hasattr(model_tab, 'toggle_performance_hud'):
+                self._show_styled_warning("Performance Overlay", "The 3D model view is not available.")
+                return
+            model_tab.toggle_performance_hud(enabled)
+            self.trace_action.setChecked(tracer.enabled)
+        except Exception as e:
+            print(f"❌ Error toggling performance overlay: {e}")
+    
+    def _toggle_tracing(self, enabled):
+        """Start or stop recording tracing spans"""
+        if enabled:
+            tracer.enable()
+        else:
+            tracer.disable()
+    
+    def _export_trace(self):
+        """Export recorded spans as Chrome trace JSON"""
+        try:
+            if not tracer.events:
+                self._show_styled_warning(
+                    "Export Trace",
+                    "No spans recorded yet.\n\nEnable Settings > Performance > Record Trace first."
+                )
+                return
+            
+            default_name = f"pvmizer_trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            file_path, _ = QFileDialog.getSaveFileName(
+                self.main_window, "Export Trace", default_name,
+                "Chrome Trace (*.json);;All Files (*)"
+            )
+            if not file_path:
+                return
+            
+            count = tracer.export_chrome_trace(file_path)
+            self._show_styled_information(
+                "Export Trace",
+                f"Exported {count} trace events to:\n{file_path}\n\n"
+                f"Open it in chrome://tracing or ui.perfetto.dev."
+            )
+        except Exception as e:
+            self._show_styled_error("Export Trace", f"Failed to export trace:\n{e}")
+    
     def _change_language(self, language_code, language_name):
         """Change application language (placeholder)"""
         try:
@@ -462,6 +554,7 @@ class ToolbarManager:
             
             project_name = project_data['basic_info']['project_name']
             self.main_window.statusBar().showMessage(f"Project '{project_name}' updated")
+            self._auto_save_project()
             
         except Exception as e:
             pass
@@ -563,6 +656,7 @@ class ToolbarManager:
             )
             
             if reply == QMessageBox.Yes:
+                self._stop_autosave()
                 self.current_project = None
                 self.main_window.setWindowTitle("PVmizer GEO - Enhanced Building Designer")
                 self.main_window.statusBar().showMessage("Project closed")
@@ -652,26 +746,64 @@ class ToolbarManager:
             traceback.print_exc()
 
     def _auto_save_project(self):
-        """Auto-save project"""
+        """Auto-save project (change record appended to the project's journal
+        on a background thread; repeated every AUTOSAVE_INTERVAL_MS)"""
         try:
             if not self.current_project:
                 return
             
+            project_name = self.current_project['basic_info']['project_name']
             projects_dir = self._get_projects_directory()
-            os.makedirs(projects_dir, exist_ok=True)
+            journal = ProjectJournal(projects_dir, project_name)
+            if self.autosave_journal is None or self.autosave_journal.directory != journal.directory:
+                if self.autosave_journal is not None:
+                    self.autosave_journal.close()
+                self.autosave_journal = journal
             
-            project_name = self.current_project['basic_info']['project_name']
-            safe_name = "".join(c for c in project_name if c.isalnum() or c in (' ', '-', '_')).rstrip()
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"autosave_{safe_name}_{timestamp}.pvgeo"
+            self.autosave_journal.record(self.current_project)
             
-            file_path = os.path.join(projects_dir, filename)
+            if self.autosave_timer is None:
+                self.autosave_timer = QTimer(self.main_window)
+                self.autosave_timer.timeout.connect(self._auto_save_project)
+            if not self.autosave_timer.isActive():
+                self.autosave_timer.start(AUTOSAVE_INTERVAL_MS)
             
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(self.current_project, f, indent=2, ensure_ascii=False)
+        except Exception as e:
+            print(f"❌ Autosave failed: {e}")
+    
+    def _stop_autosave(self):
+        """Write the last autosave record and stop the periodic autosave"""
+        try:
+            if self.autosave_timer is not None:
+                self.autosave_timer.stop()
+            if self.autosave_journal is not None:
+                if self.current_project:
+                    self.autosave_journal.record(self.current_project)
+                self.autosave_journal.close()
+                self.autosave_journal = None
+        except Exception as e:
+            print(f"❌ Autosave shutdown failed: {e}")
+    
+    def _recover_autosave(self):
+        """Restore the most recently autosaved project by replaying its journal"""
+        try:
+            journal = ProjectJournal.latest(self._get_projects_directory())
+            project_data = journal.recover() if journal else None
+            
+            if not project_data or not self._validate_project_data(project_data):
+                self._show_styled_information("Recover Autosave", "No recoverable autosave was found.")
+                return
+            
+            self._stop_autosave()
+            self.current_project = project_data
+            self._update_ui_for_active_project()
+            self._auto_save_project()
+            
+            project_name = project_data['basic_info']['project_name']
+            self.main_window.statusBar().showMessage(f"Project '{project_name}' recovered from autosave")
             
         except Exception as e:
-            pass
+            self._show_styled_error("Recover Error", f"Failed to recover autosave: {str(e)}")
     
     def _validate_project_data(self, data):
         """Validate project data"""
@@ -746,24 +878,121 @@ class ToolbarManager:
             pass
     
     def _export_3d_model(self):
-        """Export 3D model"""
+        """Export the full 3D scene (building, panels, obstacles, vegetation)"""
         try:
-            self._show_styled_information(
+            model_tab = getattr(self.main_window, 'model_tab', None)
+            plotter = getattr(model_tab, 'plotter', None) if model_tab else None
+            if plotter is None:
+                self._show_styled_warning("Export 3D Model", "The 3D view is not available.")
+                return
+            
+            default_name = "scene.gltf"
+            if self.current_project:
+                project_name = self.current_project['basic_info']['project_name']
+                safe_name = "".join(c for c in project_name if c.isalnum() or c in (' ', '-', '_')).rstrip()
+                default_name = f"{safe_name or 'scene'}.gltf"
+            
+            file_path, _ = QFileDialog.getSaveFileName(
+                self.main_window,
                 "Export 3D Model",
-                ToolbarTexts.get_export_info_text("model") if ToolbarTexts else "Export feature not implemented yet."
+                os.path.join(self._get_projects_directory(), default_name),
+                "glTF 2.0 (*.gltf);;Wavefront OBJ (*.obj);;Stanford PLY (*.ply)"
+            )
+            if not file_path:
+                return
+            
+            from utils.scene_export import export_scene
+            summary = export_scene(file_path, plotter, getattr(model_tab, 'current_roof', None))
+            self.main_window.statusBar().showMessage(
+                f"3D model exported to {os.path.basename(file_path)}: "
+                f"{summary['prototypes']} meshes, {summary['instances']} instances"
             )
+            
         except Exception as e:
-            pass
+            self._show_styled_error("Export Error", f"Failed to export 3D model: {str(e)}")
     
     def _export_report(self):
-        """Export report"""
+        """Render the report views off-screen in worker processes and write an HTML report"""
         try:
-            self._show_styled_information(
+            if self.report_status and not self.report_status['finished']:
+                self._show_styled_warning("Export Report", "A report is already being rendered.")
+                return
+            
+            model_tab = getattr(self.main_window, 'model_tab', None)
+            roof = getattr(model_tab, 'current_roof', None) if model_tab else None
+            if roof is None:
+                self._show_styled_warning("Export Report", "Create a building before exporting a report.")
+                return
+            
+            default_name = "report.html"
+            if self.current_project:
+                project_name = self.current_project['basic_info']['project_name']
+                safe_name = "".join(c for c in project_name if c.isalnum() or c in (' ', '-', '_')).rstrip()
+                default_name = f"{safe_name or 'project'}_report.html"
+            
+            file_path, _ = QFileDialog.getSaveFileName(
+                self.main_window,
                 "Export Report",
-                ToolbarTexts.get_export_info_text("report") if ToolbarTexts else "Export feature not implemented yet."
+                os.path.join(self._get_projects_directory(), default_name),
+                "HTML Report (*.html)"
             )
+            if not file_path:
+                return
+            
+            from utils.report_renderer import scene_spec, render_report
+            spec = scene_spec(roof, getattr(model_tab, 'latitude', None),
+                              getattr(model_tab, 'longitude', 0.0))
+            # Saved with the project so the report can be re-rendered from the file
+            if self.current_project:
+                self.current_project['scene'] = spec
+            project = json.loads(json.dumps(self.current_project or {}, default=str))
+            
+            status = {'done': 0, 'total': 0, 'summary': None, 'error': None, 'finished': False}
+            self.report_status = status
+            
+            def on_progress(done, total):
+                status['done'], status['total'] = done, total
+            
+            def run():
+                try:
+                    status['summary'] = render_report(file_path, spec, project, on_progress=on_progress)
+                except Exception as e:
+                    status['error'] = str(e)
+                status['finished'] = True
+            
+            threading.Thread(target=run, name='report-renderer', daemon=True).start()
+            
+            if self.report_timer is None:
+                self.report_timer = QTimer(self.main_window)
+                self.report_timer.timeout.connect(self._poll_report_status)
+            self.report_timer.start(500)
+            self.main_window.statusBar().showMessage("Rendering report...")
+            
         except Exception as e:
-            pass
+            self._show_styled_error("Export Error", f"Failed to export report: {str(e)}")
+    
+    def _poll_report_status(self):
+        """Show report progress; report the result once the workers are done"""
+        status = self.report_status
+        if not status:
+            self.report_timer.stop()
+            return
+        
+        if not status['finished']:
+            if status['total']:
+                self.main_window.statusBar().showMessage(
+                    f"Rendering report... {status['done']}/{status['total']}")
+            return
+        
+        self.report_timer.stop()
+        if status['error']:
+            self._show_styled_error("Export Error", f"Failed to render report: {status['error']}")
+            return
+        summary = status['summary']
+        self.main_window.statusBar().showMessage(
+            f"Report exported to {os.path.basename(summary['path'])}: "
+            f"{summary['images']} images in {summary['seconds']}s"
+        )
     
     # =======================================
     # **APPLICATION METHODS**
@@ -781,6 +1010,7 @@ class ToolbarManager:
             reply = self._show_styled_question("Exit PVmizer GEO", message)
             
             if reply == QMessageBox.Yes:
+                self._stop_autosave()
                 if hasattr(self.main_window, 'config'):
                     try:
                         self.main_window.config.save_settings()
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+utils/autosave_journal.py
+Journaled project autosave - compact change records on a background thread
+
+Layout of one project's autosave directory (~/.pvmizer_geo/projects/autosave/<name>):
+    snapshot_000012.json    full project state of generation 12
+    journal_000012.jsonl    change records applied on top of that snapshot
+
+Each record holds only the keys that changed since the previous record
+({"t": time, "set": [[path, value], ...], "del": [path, ...]}). After
+`compact_every` records the current state becomes the next generation's
+snapshot and only the newest `keep_generations` generations are kept.
+Recovery loads the newest readable snapshot and replays its journal; a
+record torn by a crash is ignored, and cut off the journal before the next
+session appends to it.
+"""
+import copy
+import json
+import os
+import queue
+import re
+import threading
+import time
+
+from utils.log import get_logger
+
+log = get_logger('project')
+
+SNAPSHOT_PATTERN = re.compile(r'^snapshot_(\d+)\.json$')
+
+
+def safe_project_name(project_name):
+    """Project name reduced to characters safe for a directory name"""
+    name = "".join(c for c in str(project_name) if c.isalnum() or c in (' ', '-', '_')).strip()
+    return name or 'untitled'
+
+
+def diff_state(old, new, path=()):
+    """(set, delete) change lists that turn `old` into `new`.
+
+    Dicts are compared key by key; any other changed value is replaced whole.
+    Paths are lists of keys.
+    """
+    sets, deletes = [], []
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key, value in new.items():
+            if key not in old:
+                sets.append([list(path) + [key], value])
+            elif old[key] != value:
+                child_sets, child_deletes = diff_state(old[key], value, path + (key,))
+                sets.extend(child_sets)
+                deletes.extend(child_deletes)
+        deletes.extend(list(path) + [key] for key in old if key not in new)
+    elif old != new:
+        sets.append([list(path), new])
+    return sets, deletes
+
+
+def apply_record(state, record):
+    """Apply one change record to a state dict (returns the new state)"""
+    for path, value in record.get('set', []):
+        if not path:
+            state = value
+            continue
+        target = state
+        for key in path[:-1]:
+            target = target.setdefault(key, {})
+        target[path[-1]] = value
+    for path in record.get('del', []):
+        target = state
+        for key in path[:-1]:
+            target = target.get(key, {}) if isinstance(target, dict) else {}
+        if isinstance(target, dict):
+            target.pop(path[-1], None)
+    return state
+
+
+def _write_atomic(path, text):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class ProjectJournal:
+    """Append-only autosave journal for one project with bounded generations"""
+
+    def __init__(self, projects_dir, project_name, compact_every=50, keep_generations=3):
+        self.directory = os.path.join(projects_dir, 'autosave', safe_project_name(project_name))
+        self.compact_every = compact_every
+        self.keep_generations = keep_generations
+        self.generation = None
+        self.records_in_generation = 0
+        self._state = None              # last state written (worker thread only)
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    # ==================== PUBLIC API ====================
+
+    def record(self, project_data):
+        """Queue the current project state; diffing and disk I/O run on the worker"""
+        try:
+            snapshot = copy.deepcopy(project_data)
+        except Exception as e:
+            log.error("❌ Autosave copy failed: %s", e)
+            return
+        self._queue.put(('record', snapshot))
+        self._ensure_worker()
+
+    def compact(self):
+        """Queue a compaction into a new snapshot generation"""
+        self._queue.put(('compact', None))
+        self._ensure_worker()
+
+    def flush(self, timeout=5.0):
+        """Wait until queued records are on disk"""
+        done = threading.Event()
+        self._queue.put(('flush', done))
+        self._ensure_worker()
+        return done.wait(timeout)
+
+    def close(self, timeout=5.0):
+        """Write pending records and stop the worker"""
+        if self._thread is None:
+            return
+        self.flush(timeout)
+        self._queue.put(('stop', None))
+        self._thread.join(timeout)
+        self._thread = None
+
+    def recover(self):
+        """Newest recoverable project state (snapshot + journal replay) or None"""
+        return self._recover()[1]
+
+    def _recover(self):
+        """(generation, state, records replayed, journal bytes replayed) of the
+        newest readable snapshot"""
+        for generation in reversed(self.generations()):
+            try:
+                with open(self._snapshot_path(generation), 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+            except Exception:
+                continue
+            state, count, valid_bytes = self._replay(state, generation)
+            return generation, state, count, valid_bytes
+        return None, None, 0, 0
+
+    def generations(self):
+        """Generation numbers with a snapshot on disk, oldest first"""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        return sorted(int(m.group(1)) for m in map(SNAPSHOT_PATTERN.match, names) if m)
+
+    @classmethod
+    def latest(cls, projects_dir, **kwargs):
+        """Journal of the most recently autosaved project, or None"""
+        root = os.path.join(projects_dir, 'autosave')
+        try:
+            candidates = [os.path.join(root, name) for name in os.listdir(root)]
+        except OSError:
+            return None
+        candidates = [path for path in candidates if os.path.isdir(path) and os.listdir(path)]
+        if not candidates:
+            return None
+        # Journals are appended in place, so compare the newest file in each directory
+        newest = max(candidates, key=lambda path: max(
+            os.path.getmtime(os.path.join(path, name)) for name in os.listdir(path)))
+        return cls(projects_dir, os.path.basename(newest), **kwargs)
+
+    # ==================== WORKER ====================
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='autosave-journal', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            command, payload = self._queue.get()
+            try:
+                if command == 'stop':
+                    return
+                if command == 'flush':
+                    payload.set()
+                elif command == 'compact':
+                    if self._state is not None:
+                        self._write_snapshot(self._state)
+                elif command == 'record':
+                    self._write_record(payload)
+            except Exception as e:
+                log.error("❌ Autosave failed: %s", e)
+            finally:
+                self._queue.task_done()
+
+    def _snapshot_path(self, generation):
+        return os.path.join(self.directory, f"snapshot_{generation:06d}.json")
+
+    def _journal_path(self, generation):
+        return os.path.join(self.directory, f"journal_{generation:06d}.jsonl")
+
+    def _write_record(self, state):
+        # Normalize to what a replay produces (tuples -> lists, keys -> str)
+        state = json.loads(json.dumps(state, default=str))
+
+        if self.generation is None:
+            generation, self._state, count, valid_bytes = self._recover()
+            if generation is None or generation != self.generations()[-1]:
+                # Nothing on disk, or the newest snapshot is unreadable
+                self._write_snapshot(state)
+                return
+            self._truncate_journal(generation, valid_bytes)
+            self.generation = generation
+            self.records_in_generation = count
+
+        sets, deletes = diff_state(self._state, state)
+        if not sets and not deletes:
+            return
+
+        record = {'t': round(time.time(), 3), 'set': sets}
+        if deletes:
+            record['del'] = deletes
+        with open(self._journal_path(self.generation), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, separators=(',', ':'), ensure_ascii=False) + '\n')
+        self._state = state
+        self.records_in_generation += 1
+
+        if self.records_in_generation >= self.compact_every:
+            self._write_snapshot(state)
+
+    def _write_snapshot(self, state):
+        """Start a new generation from `state` and prune old generations"""
+        os.makedirs(self.directory, exist_ok=True)
+        generations = self.generations()
+        self.generation = (generations[-1] + 1) if generations else 0
+        _write_atomic(self._snapshot_path(self.generation),
+                      json.dumps(state, separators=(',', ':'), ensure_ascii=False))
+        self._state = state
+        self.records_in_generation = 0
+
+        for old in self.generations()[:-self.keep_generations]:
+            for path in (self._snapshot_path(old), self._journal_path(old)):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def _replay(self, state, generation):
+        """Apply the generation's journal; stops at the first torn record.
+
+        Returns (state, number of records applied, bytes of the journal they
+        take up).
+        """
+        count = valid_bytes = 0
+        try:
+            with open(self._journal_path(generation), 'rb') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line.decode('utf-8'))
+                    except ValueError:
+                        break
+                    state = apply_record(state, record)
+                    count += 1
+                    valid_bytes += len(line)
+        except OSError:
+            pass
+        return state, count, valid_bytes
+
+    def _truncate_journal(self, generation, valid_bytes):
+        """Cut a torn tail off the journal so new records start on a fresh line"""
+        path = self._journal_path(generation)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        with open(path, 'rb+') as f:
+            if size > valid_bytes:
+                f.truncate(valid_bytes)
+                log.warning("⚠️ Autosave: dropped %s bytes of a torn journal record",
+                            size - valid_bytes)
+            if valid_bytes:
+                f.seek(valid_bytes - 1)
+                if f.read(1) != b'\n':
+                    # Last record is complete but its newline never made it to disk
+                    f.write(b'\n')
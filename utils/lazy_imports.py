@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+utils/lazy_imports.py
+Deferred loading of heavy optional modules (VTK / PyVista / PyVistaQt)
+
+VTK and PyVista take seconds to import, so startup only checks that they are
+installed; the modules are imported when the 3D view is first needed.
+"""
+import importlib
+import importlib.util
+
+from utils.log import get_logger
+from utils.startup_timeline import phase
+
+log = get_logger('startup')
+
+_PYVISTA = None
+
+
+def module_available(name):
+    """True when `name` can be imported, without importing it"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def pyvista_installed():
+    """Cheap check used by module-level *_AVAILABLE flags"""
+    return module_available('pyvista') and module_available('pyvistaqt')
+
+
+def silence_vtk_output():
+    """Route VTK warnings and errors away from popup output windows"""
+    try:
+        import vtk
+        vtk_out = vtk.vtkOutputWindow()
+        vtk_out.SetInstance(vtk_out)
+        vtk_out.GlobalWarningDisplayOff()
+        vtk.vtkObject.GlobalWarningDisplayOff()
+        log.debug("✅ VTK error suppression enabled")
+    except ImportError:
+        pass
+
+
+def load_pyvista():
+    """Import pyvista and pyvistaqt on first use.
+
+    Returns (pyvista module, QtInteractor class), or (None, None) when they
+    are not installed. The result is cached.
+    """
+    global _PYVISTA
+    if _PYVISTA is None:
+        with phase('import vtk/pyvista'):
+            silence_vtk_output()
+            try:
+                pv = importlib.import_module('pyvista')
+                QtInteractor = importlib.import_module('pyvistaqt').QtInteractor
+                _PYVISTA = (pv, QtInteractor)
+            except ImportError as e:
+                log.warning("⚠️ PyVista not available: %s", e)
+                _PYVISTA = (None, None)
+    return _PYVISTA
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+utils/log.py
+Quiet-by-default logging for the hot paths (panel placement, textures, sun
+system, roof generation, obstacles, camera, energy analysis) and the
+background services (autosave, export, startup, performance overlay)
+
+    from utils.log import get_logger
+    log = get_logger('panels')
+
+    log.debug("🔧 Placed %d panels on %s", count, side)
+
+Messages use %-style arguments, so a disabled level costs one level check
+and the message is never formatted. Every subsystem logs below the
+'pvmizer' logger and only warnings and errors are shown by default.
+
+Levels are set per subsystem with PVMIZER_LOG, e.g.
+
+    PVMIZER_LOG=debug                   everything
+    PVMIZER_LOG=info,panels=debug       info overall, debug for panel placement
+    PVMIZER_LOG=error,sun=warning
+
+The same spec can be applied at runtime with configure().
+"""
+import logging
+import os
+import sys
+
+ENV_FLAG = 'PVMIZER_LOG'
+ROOT_LOGGER = 'pvmizer'
+DEFAULT_LEVEL = logging.WARNING
+
+SUBSYSTEMS = {
+    'panels': "panel placement handlers",
+    'textures': "texture and resource loading",
+    'sun': "sun system, lighting and shadow casters",
+    'roof': "roof generation and roof switching",
+    'buildings': "building generation from drawn footprints",
+    'obstacles': "obstacle detection",
+    'camera': "camera setup",
+    'energy': "energy yield, shading and irradiation analysis",
+    'project': "project files and the autosave journal",
+    'export': "report, time-lapse and scene export",
+    'startup': "startup and deferred imports",
+    'hud': "in-viewport performance overlay",
+}
+
+LEVELS = {
+    'debug': logging.DEBUG,
+    'info': logging.INFO,
+    'warning': logging.WARNING,
+    'warn': logging.WARNING,
+    'error': logging.ERROR,
+    'critical': logging.CRITICAL,
+    'off': logging.CRITICAL + 10,
+}
+
+
+def get_logger(subsystem):
+    """Logger of a subsystem ('panels', 'sun', ...)"""
+    return logging.getLogger(f"{ROOT_LOGGER}.{subsystem}")
+
+
+def parse_spec(spec):
+    """(default level, {subsystem: level}) of a PVMIZER_LOG spec.
+
+    Unknown level names raise ValueError.
+    """
+    default, levels = None, {}
+    for item in filter(None, (part.strip() for part in str(spec).split(','))):
+        name, _, level = item.rpartition('=')
+        level = level.strip().lower()
+        if level not in LEVELS:
+            raise ValueError(f"Unknown log level: {level}. Available: {list(LEVELS)}")
+        if name.strip():
+            levels[name.strip()] = LEVELS[level]
+        else:
+            default = LEVELS[level]
+    return default, levels
+
+
+def configure(spec=None, stream=None):
+    """Apply a level spec to the pvmizer loggers and install the handler once"""
+    root = logging.getLogger(ROOT_LOGGER)
+    if not root.handlers:
+        handler = logging.StreamHandler(stream or sys.stdout)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        root.addHandler(handler)
+        # The app silences the root logger for VTK; keep ours independent of it
+        root.propagate = False
+
+    default, levels = parse_spec(spec or '')
+    root.setLevel(default if default is not None else DEFAULT_LEVEL)
+    for subsystem in set(SUBSYSTEMS) | set(levels):
+        # NOTSET inherits the overall level
+        get_logger(subsystem).setLevel(levels.get(subsystem, logging.NOTSET))
+
+
+def _configure_from_environment():
+    try:
+        configure(os.environ.get(ENV_FLAG, ''))
+    except ValueError as e:
+        configure('')
+        get_logger('log').warning("⚠️ Ignoring %s: %s", ENV_FLAG, e)
+
+
+_configure_from_environment()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+utils/performance_hud.py
+In-viewport performance overlay: frame time, render count, actor count and
+the slowest traced spans (see utils/tracing.py)
+"""
+from PyQt5.QtCore import QTimer
+
+from utils.log import get_logger
+from utils.tracing import tracer
+
+log = get_logger('hud')
+
+HUD_ACTOR_NAME = 'performance_hud'
+UPPER_RIGHT = 3     # vtkCornerAnnotation corner index
+
+
+class PerformanceHUD:
+    """Text overlay in the upper right corner of a plotter, refreshed twice a second"""
+
+    def __init__(self, plotter, interval_ms=500, top_spans=5):
+        self.plotter = plotter
+        self.top_spans = top_spans
+        self.text_actor = None
+        self._last_text = None
+        self._was_tracing = tracer.enabled
+        self.timer = QTimer()
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self.refresh)
+
+    @property
+    def visible(self):
+        return self.timer.isActive()
+
+    def show(self):
+        """Start tracing (if needed) and show the overlay"""
+        self._was_tracing = tracer.enabled
+        tracer.enable()
+        tracer.instrument_plotter(self.plotter)
+        self.timer.start()
+        self.refresh()
+
+    def hide(self):
+        """Remove the overlay; tracing stays on only if it was on before"""
+        self.timer.stop()
+        if not self._was_tracing:
+            tracer.disable()
+        if self.text_actor is not None:
+            try:
+                self.plotter.remove_actor(HUD_ACTOR_NAME, reset_camera=False)
+            except Exception:
+                pass
+        self.text_actor = None
+        self._last_text = None
+
+    def toggle(self):
+        if self.visible:
+            self.hide()
+        else:
+            self.show()
+        return self.visible
+
+    def _actor_count(self):
+        try:
+            return sum(1 for name in self.plotter.renderer.actors if name != HUD_ACTOR_NAME)
+        except Exception:
+            return 0
+
+    def text(self):
+        frame_ms = tracer.frame_time_ms()
+        fps = 1000.0 / frame_ms if frame_ms > 0 else 0.0
+        lines = [
+            f"frame {frame_ms:6.1f} ms ({fps:5.1f} fps)",
+            f"renders {tracer.counters.get('renders', 0)}",
+            f"actors {self._actor_count()}",
+        ]
+        slowest = tracer.slowest(self.top_spans)
+        if slowest:
+            lines.append("slowest spans (max / avg ms):")
+            for name, count, avg_ms, max_ms in slowest:
+                lines.append(f"{name[:28]:<28} {max_ms:7.1f} {avg_ms:7.1f} x{count}")
+        return '\n'.join(lines)
+
+    def refresh(self):
+        """Update the overlay text; renders once only if the text changed"""
+        text = self.text()
+        if text == self._last_text:
+            return
+        self._last_text = text
+
+        try:
+            # Re-create the overlay if a scene reset removed it
+            if self.text_actor is None or HUD_ACTOR_NAME not in self.plotter.renderer.actors:
+                self.text_actor = self.plotter.add_text(
+                    text, position='upper_right', font_size=8, color='white',
+                    shadow=True, name=HUD_ACTOR_NAME, font='courier')
+                return
+            if hasattr(self.text_actor, 'SetText'):
+                self.text_actor.SetText(UPPER_RIGHT, text)
+            else:
+                self.text_actor.SetInput(text)
+
+            # HUD refreshes are recorded as 'render.hud' and excluded from
+            # the render count and frame time
+            tracer.render_tag = 'hud'
+            try:
+                self.plotter.render()
+            finally:
+                tracer.render_tag = None
+        except Exception as e:
+            log.error("❌ Performance overlay update failed: %s", e)
+            self.hide()
@@ -2,20 +2,28 @@
 """
 Enhanced PyVista Integration Manager - Combines both approaches
 """
+import os
 import numpy as np
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel
 from PyQt5.QtCore import Qt, pyqtSignal
 
-try:
-    import pyvista as pv
-    from pyvistaqt import QtInteractor
-    PYVISTA_AVAILABLE = True
-except ImportError:
-    PYVISTA_AVAILABLE = False
+from utils.lazy_imports import load_pyvista, pyvista_installed
+
+# PyVista (and the building generator built on it) are imported on first use
+PYVISTA_AVAILABLE = pyvista_installed()
+if not PYVISTA_AVAILABLE:
     print("⚠ PyVista not available")
+pv = None
+QtInteractor = None
+
 
-# Import the building generator
-from models.pyvista_building_generator import PyVistaBuildingGenerator
+def _require_pyvista():
+    """Import pyvista / pyvistaqt into this module on first use"""
+    global pv, QtInteractor, PYVISTA_AVAILABLE
+    if pv is None and PYVISTA_AVAILABLE:
+        pv, QtInteractor = load_pyvista()
+        PYVISTA_AVAILABLE = pv is not None
+    return PYVISTA_AVAILABLE
 
 class PyVistaIntegration:
     """Enhanced PyVista integration that combines visualization and building generation"""
@@ -24,20 +32,32 @@ class PyVistaIntegration:
         self.main_window = main_window
         self.pyvista_widget = None
         self.plotter = None
-        self.building_generator = None
+        self._building_generator = None
+        self._generator_initialized = False
         self.current_building = None
         
-        # Initialize building generator
-        self._initialize_building_generator()
+    @property
+    def building_generator(self):
+        """Building generator, created on first use"""
+        if not self._generator_initialized:
+            self._initialize_building_generator()
+        return self._building_generator
+    
+    @building_generator.setter
+    def building_generator(self, generator):
+        self._generator_initialized = True
+        self._building_generator = generator
         
     def _initialize_building_generator(self):
         """Initialize the building generator"""
+        self._generator_initialized = True
         try:
-            self.building_generator = PyVistaBuildingGenerator(self.main_window)
+            from models.pyvista_building_generator import PyVistaBuildingGenerator
+            self._building_generator = PyVistaBuildingGenerator(self.main_window)
             print("✅ Building generator initialized in integration")
         except Exception as e:
             print(f"❌ Error initializing building generator: {e}")
-            self.building_generator = None
+            self._building_generator = None
         
     def create_pyvista_model_tab(self):
         """Create comprehensive 3D Model tab with building generation"""
@@ -46,7 +66,7 @@ class PyVistaIntegration:
         layout.setContentsMargins(0, 0, 0, 0)
         layout.setSpacing(0)
         
-        if PYVISTA_AVAILABLE:
+        if _require_pyvista():
             try:
                 # Create PyVista Qt widget
                 self.pyvista_widget = QtInteractor(model_tab)
@@ -220,6 +240,7 @@ class PyVistaIntegration:
     
     def _create_simple_building_mesh(self, vertices, height):
         """Create simple building mesh"""
+        _require_pyvista()
         try:
             if len(vertices) < 3:
                 return None
@@ -263,22 +284,22 @@ class PyVistaIntegration:
     
     def update_building_height(self, height):
         """Update building height"""
-        if self.building_generator:
-            self.building_generator.update_building_height(height)
+        if self._building_generator:
+            self._building_generator.update_building_height(height)
         else:
             print("⚠ Building generator not available for height update")
     
     def update_roof_type(self, roof_type):
         """Update roof type"""
-        if self.building_generator:
-            self.building_generator.update_roof_type(roof_type)
+        if self._building_generator:
+            self._building_generator.update_roof_type(roof_type)
         else:
             print("⚠ Building generator not available for roof type update")
     
     def update_roof_pitch(self, pitch):
         """Update roof pitch"""
-        if self.building_generator:
-            self.building_generator.update_roof_pitch(pitch)
+        if self._building_generator:
+            self._building_generator.update_roof_pitch(pitch)
         else:
             print("⚠ Building generator not available for roof pitch update")
     
@@ -288,29 +309,29 @@ class PyVistaIntegration:
     
     def update_solar_time(self, hour):
         """Update solar time"""
-        if self.building_generator:
-            self.building_generator.update_solar_time(hour)
+        if self._building_generator:
+            self._building_generator.update_solar_time(hour)
         else:
             print("⚠ Building generator not available for solar time update")
     
     def update_solar_day(self, day):
         """Update solar day"""
-        if self.building_generator:
-            self.building_generator.update_solar_day(day)
+        if self._building_generator:
+            self._building_generator.update_solar_day(day)
         else:
             print("⚠ Building generator not available for solar day update")
     
     def start_sun_animation(self):
         """Start sun animation"""
-        if self.building_generator:
-            self.building_generator.start_sun_animation()
+        if self._building_generator:
+            self._building_generator.start_sun_animation()
         else:
             print("⚠ Building generator not available for sun animation")
     
     def stop_sun_animation(self):
         """Stop sun animation"""
-        if self.building_generator:
-            self.building_generator.stop_sun_animation()
+        if self._building_generator:
+            self._building_generator.stop_sun_animation()
         else:
             print("⚠ Building generator not available to stop sun animation")
     
@@ -321,8 +342,8 @@ class PyVistaIntegration:
     def clear_building(self):
         """Clear existing building"""
         try:
-            if self.building_generator:
-                self.building_generator.clear_current_building()
+            if self._building_generator:
+                self._building_generator.clear_current_building()
             elif self.plotter:
                 # Fallback clearing
                 try:
@@ -367,9 +388,21 @@ class PyVistaIntegration:
             return False
     
     def export_model(self, filepath):
-        """Export 3D model"""
+        """Export 3D model - the full scene as glTF/OBJ/PLY, other formats
+        save the building mesh only"""
         try:
-            if self.current_building and filepath:
+            if not filepath:
+                return False
+            
+            from utils.scene_export import WRITERS, export_scene
+            if self.plotter is not None and os.path.splitext(filepath)[1].lower() in WRITERS:
+                model_tab = getattr(self.main_window, 'model_tab', None)
+                summary = export_scene(filepath, self.plotter, getattr(model_tab, 'current_roof', None))
+                print(f"✅ Scene exported to: {filepath} "
+                      f"({summary['prototypes']} meshes, {summary['instances']} instances)")
+                return True
+            
+            if self.current_building:
                 self.current_building.save(filepath)
                 print(f"✅ Model exported to: {filepath}")
                 return True
@@ -398,8 +431,8 @@ class PyVistaIntegration:
     def cleanup(self):
         """Cleanup resources"""
         try:
-            if self.building_generator:
-                self.building_generator.cleanup()
+            if self._building_generator:
+                self._building_generator.cleanup()
             self.clear_scene()
             print("✅ Enhanced PyVista integration cleanup completed")
         except Exception as e:
@@ -0,0 +1,579 @@
+#!/usr/bin/env python3
+"""
+utils/report_renderer.py
+Off-screen parallel report renderer
+
+A report renders a fixed set of camera views at fixed sun times (by default
+the 21st of every month at 9, 12 and 15 h) and assembles the images, the
+project tables and the energy results into one HTML file with an image
+folder next to it.
+
+The interactive plotter is never touched: the scene is described by a plain
+dict (see scene_spec) that is stored in the project data under 'scene'.
+Render jobs are spread over a spawn process pool whose workers each rebuild
+the scene from that dict once on an off-screen plotter and then only move
+the camera and the sun light between jobs.
+
+Usage:
+    python -m utils.report_renderer project.json --output report.html \\
+        --views overview top --months 3 6 9 12 --hours 9 12 15
+"""
+import argparse
+import calendar
+import html
+import json
+import math
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from utils.log import get_logger
+
+log = get_logger('export')
+
+# Camera views: compass azimuth of the camera (0=N, 90=E) and elevation in degrees
+REPORT_VIEWS = {
+    'overview': {'title': 'South-west overview', 'azimuth': 225.0, 'elevation': 30.0},
+    'south': {'title': 'South elevation', 'azimuth': 180.0, 'elevation': 12.0},
+    'east': {'title': 'East elevation', 'azimuth': 90.0, 'elevation': 12.0},
+    'west': {'title': 'West elevation', 'azimuth': 270.0, 'elevation': 12.0},
+    'top': {'title': 'Top view', 'azimuth': 180.0, 'elevation': 89.0},
+}
+DEFAULT_VIEWS = ('overview', 'top')
+DEFAULT_MONTHS = tuple(range(1, 13))
+DEFAULT_HOURS = (9.0, 12.0, 15.0)
+REPORT_DAY = 21
+WINDOW_SIZE = (1024, 768)
+EXCEEDANCE_SAMPLES = 10000     # Monte Carlo samples behind P50/P75/P90
+
+# Latitude used when neither the scene nor the caller provides one
+DEFAULT_LATITUDE = 40.7128
+
+
+# ==================== SCENE SPEC ====================
+
+def scene_spec(roof, latitude=None, longitude=0.0):
+    """Plain-data description of a roof scene (JSON-safe).
+
+    Holds everything a worker needs to rebuild the scene: roof type and
+    dimensions, building rotation, panel configuration and active sides,
+    roof obstacles and environment trees/poles, and the site location.
+    """
+    from roofs.headless_scene import roof_obstacle_specs, roof_type_of
+
+    handler = getattr(roof, 'solar_panel_handler', None)
+    panel_config = {}
+    for key in ('panel_width', 'panel_length', 'panel_gap', 'panel_power', 'edge_offset',
+                'horizontal_edge_offset', 'vertical_edge_offset'):
+        value = getattr(handler, key, None) if handler is not None else None
+        if value is not None:
+            panel_config[key] = float(value)
+
+    roof_obstacles = roof_obstacle_specs(roof)
+
+    environment = []
+    for obstacle in getattr(roof, 'environment_obstacles', None) or []:
+        entry = {'type': obstacle.get('type', ''),
+                 'position': [float(v) for v in obstacle.get('position', (0.0, 0.0))[:2]]}
+        if 'size_multiplier' in obstacle:
+            entry['size_multiplier'] = float(obstacle['size_multiplier'])
+        if 'height_multiplier' in obstacle:
+            entry['height_multiplier'] = float(obstacle['height_multiplier'])
+        environment.append(entry)
+
+    return {
+        'roof_type': roof_type_of(roof),
+        'dimensions': [float(d) for d in (getattr(roof, 'dimensions', None) or (10.0, 8.0, 4.0))[:3]],
+        'rotation': float(getattr(roof, 'building_rotation_angle', 0.0) or 0.0),
+        'panel_config': panel_config,
+        'sides': sorted(getattr(handler, 'active_sides', None) or []),
+        'roof_obstacles': roof_obstacles,
+        'environment': environment,
+        'latitude': float(latitude if latitude is not None else DEFAULT_LATITUDE),
+        'longitude': float(longitude or 0.0),
+    }
+
+
+def build_scene(spec, plotter=None):
+    """Rebuild a scene spec on an off-screen plotter; returns the roof"""
+    from roofs.headless_scene import create_headless_roof, place_roof_obstacles
+
+    roof = create_headless_roof(spec['roof_type'], spec['dimensions'], plotter=plotter)
+
+    place_roof_obstacles(roof, spec.get('roof_obstacles', []))
+
+    # Panels last: add_panels only avoids obstacles already on the roof
+    handler = getattr(roof, 'solar_panel_handler', None)
+    if handler is not None and spec.get('sides'):
+        handler.update_panel_config(spec.get('panel_config') or {})
+        for side in spec['sides']:
+            handler.add_panels(side)
+
+    manager = getattr(roof, 'environment_manager', None)
+    for item in spec.get('environment', []) if manager is not None else []:
+        kind = item.get('type', '')
+        try:
+            if kind.startswith('tree'):
+                tree_type = kind.split('_', 1)[1] if '_' in kind else 'deciduous'
+                manager._add_scaled_tree(tuple(item['position']), tree_type,
+                                         item.get('size_multiplier', 1.0))
+            elif kind == 'pole':
+                manager._add_scaled_pole(tuple(item['position']), item.get('height_multiplier', 1.0))
+        except Exception as e:
+            log.warning("⚠️ Report scene: %s skipped: %s", kind, e)
+    return roof
+
+
+# ==================== JOBS ====================
+
+def day_of_year(month, day=REPORT_DAY):
+    """Day number (1-365) of a date in a non-leap year"""
+    return sum(calendar.monthrange(2001, m)[1] for m in range(1, month)) + day
+
+
+def report_jobs(views=DEFAULT_VIEWS, months=DEFAULT_MONTHS, hours=DEFAULT_HOURS, day=REPORT_DAY):
+    """One render job per (view, month, hour), in report order"""
+    unknown = [view for view in views if view not in REPORT_VIEWS]
+    if unknown:
+        raise ValueError(f"Unknown report views: {unknown}. Available: {list(REPORT_VIEWS)}")
+    jobs = []
+    for view in views:
+        for month in months:
+            for hour in hours:
+                jobs.append({
+                    'view': view, 'month': int(month), 'day': int(day),
+                    'day_of_year': day_of_year(int(month), int(day)), 'hour': float(hour),
+                    'file': f"{view}_{int(month):02d}_{int(day):02d}_{int(round(hour * 100)):04d}.png",
+                })
+    return jobs
+
+
+def sun_position(spec, job):
+    """Sun position (x, y, z) in the building frame for a job, or None at night"""
+    from solar_system.solar_calculations import SolarCalculations
+
+    position = SolarCalculations.calculate_sun_position(
+        job['hour'], job['day_of_year'], spec['latitude'], spec['longitude'],
+        building_height=spec['dimensions'][2])
+    if position is None:
+        return None
+    # A rotated building sees the sun turned the other way
+    rad = math.radians(-spec.get('rotation', 0.0))
+    c, s = math.cos(rad), math.sin(rad)
+    x, y, z = position
+    return (x * c - y * s, x * s + y * c, z)
+
+
+# ==================== WORKER ====================
+
+_WORKER = {'spec': None, 'image_dir': None, 'window_size': WINDOW_SIZE,
+           'plotter': None, 'roof': None}
+
+
+def _init_worker(spec, image_dir, window_size):
+    """Process pool initializer: remember the scene; it is built on first use"""
+    _WORKER['spec'] = spec
+    _WORKER['image_dir'] = image_dir
+    _WORKER['window_size'] = tuple(window_size)
+
+
+def _worker_scene():
+    """Off-screen plotter and roof of this worker, built once"""
+    if _WORKER['roof'] is None:
+        import pyvista as pv
+
+        plotter = pv.Plotter(off_screen=True, window_size=list(_WORKER['window_size']))
+        roof = build_scene(_WORKER['spec'], plotter=plotter)
+        plotter.set_background('white', top='#BFD9F2')
+        try:
+            plotter.enable_shadows()
+        except Exception:
+            pass
+        _WORKER['plotter'] = plotter
+        _WORKER['roof'] = roof
+    return _WORKER['plotter'], _WORKER['roof']
+
+
+def set_view_camera(plotter, spec, view):
+    """Point the camera at the building from a REPORT_VIEWS entry"""
+    length, width, height = spec['dimensions']
+    focal = np.array([0.0, 0.0, height * 0.6])
+    distance = 2.4 * max(length, width, height)
+    azimuth = math.radians(view['azimuth'])
+    elevation = math.radians(view['elevation'])
+    offset = np.array([math.cos(elevation) * math.sin(azimuth),
+                       math.cos(elevation) * math.cos(azimuth),
+                       math.sin(elevation)])
+    up = (0.0, 1.0, 0.0) if view['elevation'] > 80.0 else (0.0, 0.0, 1.0)
+    plotter.camera_position = [tuple(focal + offset * distance), tuple(focal), up]
+
+
+def set_sun_light(plotter, position, intensity=1.0, color='#FFF4E0', ambient=0.25):
+    """Replace the plotter's lights with a dim headlight and the sun (None at night)"""
+    import pyvista as pv
+
+    plotter.remove_all_lights()
+    plotter.add_light(pv.Light(light_type='headlight', intensity=ambient))
+    if position is not None and intensity > 0.0:
+        plotter.add_light(pv.Light(position=tuple(position), focal_point=(0.0, 0.0, 0.0),
+                                   color=color, intensity=intensity, light_type='scene light'))
+
+
+def render_job(job):
+    """Render one job to a PNG; returns the job with path and sun angles"""
+    plotter, _ = _worker_scene()
+    spec = _WORKER['spec']
+    view = REPORT_VIEWS[job['view']]
+
+    position = sun_position(spec, job)
+    set_view_camera(plotter, spec, view)
+    set_sun_light(plotter, position)
+
+    month_name = calendar.month_abbr[job['month']]
+    label = f"{view['title']} - {job['day']} {month_name}, {job['hour']:05.2f} h"
+    if position is None:
+        label += " (sun below horizon)"
+    plotter.add_text(label, position='upper_left', font_size=10, color='black', name='report_label')
+
+    path = os.path.join(_WORKER['image_dir'], job['file'])
+    plotter.screenshot(path)
+
+    result = dict(job, path=path, elevation=None, azimuth=None)
+    if position is not None:
+        x, y, z = position
+        result['elevation'] = round(math.degrees(math.atan2(z, math.hypot(x, y))), 1)
+        result['azimuth'] = round(math.degrees(math.atan2(x, y)) % 360.0, 1)
+    return result
+
+
+def _render_chunk(jobs):
+    return [render_job(job) for job in jobs]
+
+
+def scene_energy(spec=None, energy_info=None):
+    """Annual and monthly energy of the scene's panel layout.
+
+    P50/P75/P90 annual yields from the Monte Carlo model are added under
+    'exceedance' (see solar_system.yield_uncertainty). With the wizard's
+    energy_info, an hourly production series is balanced
+    against the project's load profile and the financial results are added
+    under 'financial' (see solar_system.financial_model.evaluate_project).
+    """
+    from roofs.headless_scene import face_orientation, rotate_positions
+    from solar_system.energy_model import annual_sun_table, hourly_sun_table, layout_series
+    from solar_system.sun_depth_map import tree_crowns
+    from solar_system.yield_uncertainty import DISPLAY_SEED, YieldUncertainty, exceedance_note
+
+    _, roof = _worker_scene()
+    spec = spec or _WORKER['spec']
+    handler = getattr(roof, 'solar_panel_handler', None)
+    rotation = spec.get('rotation', 0.0)
+    config = dict({'panel_width': 1000.0, 'panel_length': 1600.0, 'panel_power': 400.0},
+                  **(spec.get('panel_config') or {}))
+
+    panel_area = config['panel_width'] * config['panel_length'] / 1e6
+    panel_power_w = float(config['panel_power'])
+    # STC efficiency implied by nameplate power and module area
+    efficiency = panel_power_w / (panel_area * 1000.0)
+
+    sides = []
+    for name in spec.get('sides', []):
+        positions = getattr(handler, 'panel_positions_by_side', {}).get(name, [])
+        tilt, azimuth = face_orientation(roof, name, rotation)
+        side = {'name': name, 'tilt': tilt, 'azimuth': azimuth,
+                'positions': rotate_positions(positions, rotation)}
+        axes = getattr(handler, 'panel_axes_by_side', {}).get(name)
+        if axes is not None and len(positions):
+            side['axes'] = tuple(rotate_positions(axis, rotation)[0] for axis in axes)
+        sides.append(side)
+
+    crowns = [tuple(rotate_positions(c[:3], rotation)[0]) + (c[3],) for c in tree_crowns(roof)]
+    sun = annual_sun_table(spec['latitude'])
+    series = layout_series(sides, sun, panel_area, efficiency, panel_power_w, crowns or None)
+
+    # Sun table days -> month (weights already scale samples to a full year)
+    month_of_day = np.searchsorted(np.cumsum([calendar.monthrange(2001, m)[1] for m in range(1, 13)]),
+                                   sun['day'] - 1, side='right') + 1
+    monthly = np.zeros(12)
+    for wh in series.values():
+        monthly += np.bincount(month_of_day - 1, weights=wh, minlength=12)[:12] / 1000.0
+
+    panel_count = sum(len(side['positions']) for side in sides)
+    system_kwp = panel_count * panel_power_w / 1000.0
+    annual_kwh = float(monthly.sum())
+
+    exceedance = None
+    if panel_count:
+        uncertainty = YieldUncertainty.from_layout(sides, spec['latitude'], panel_area, efficiency,
+                                                   crowns=crowns, sun=sun)
+        exceedance = {level: round(kwh, 1) for level, kwh in
+                      uncertainty.exceedance(n_samples=EXCEEDANCE_SAMPLES, seed=DISPLAY_SEED).items()}
+        exceedance['samples'] = EXCEEDANCE_SAMPLES
+        exceedance['note'] = exceedance_note(uncertainty.params)
+
+    financial = None
+    if energy_info and system_kwp > 0:
+        from solar_system.financial_model import evaluate_project, load_profile_for_project, monthly_totals
+
+        hourly = layout_series(sides, hourly_sun_table(spec['latitude']), panel_area, efficiency,
+                               panel_power_w, crowns or None)
+        production = sum(hourly.values()) / 1000.0
+        load = load_profile_for_project(energy_info)
+        financial = evaluate_project(production, energy_info, system_kwp, load=load)
+        financial['monthly_consumption_kwh'] = [round(float(v), 1) for v in monthly_totals(load)]
+
+    return {
+        'per_side': {name: {'panels': len(side['positions']),
+                            'tilt_deg': round(math.degrees(side['tilt']), 1),
+                            'azimuth_deg': round(side['azimuth'], 1),
+                            'kwh': round(float(series[name].sum()) / 1000.0, 1)}
+                     for name, side in zip(spec.get('sides', []), sides)},
+        'monthly_kwh': [round(float(v), 1) for v in monthly],
+        'panel_count': panel_count,
+        'system_kwp': round(system_kwp, 3),
+        'annual_kwh': round(annual_kwh, 1),
+        'specific_yield': round(annual_kwh / system_kwp, 1) if system_kwp > 0 else 0.0,
+        'exceedance': exceedance,
+        'financial': financial,
+    }
+
+
+# ==================== RUNNER ====================
+
+def render_report(output_path, spec, project=None, views=DEFAULT_VIEWS, months=DEFAULT_MONTHS,
+                  hours=DEFAULT_HOURS, workers=None, window_size=WINDOW_SIZE, on_progress=None):
+    """Render all report jobs in a process pool and write the HTML report.
+
+    on_progress(done, total) is called in this process as jobs finish.
+    Returns a summary dict (path, images, energy, seconds).
+    """
+    started = time.time()
+    jobs = report_jobs(views, months, hours)
+    workers = workers or max(1, (multiprocessing.cpu_count() or 2) - 1)
+    workers = min(workers, max(1, len(jobs)))
+
+    stem = os.path.splitext(os.path.basename(output_path))[0]
+    image_dir = os.path.join(os.path.dirname(os.path.abspath(output_path)), f"{stem}_images")
+    os.makedirs(image_dir, exist_ok=True)
+
+    # Consecutive jobs share a view, so chunks keep camera moves small
+    size = max(1, math.ceil(len(jobs) / workers))
+    chunks = [jobs[i:i + size] for i in range(0, len(jobs), size)]
+
+    images, energy = [], None
+    total = len(jobs) + 1
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker,
+                             initargs=(spec, image_dir, tuple(window_size))) as pool:
+        energy_future = pool.submit(scene_energy, None, (project or {}).get('energy_info'))
+        futures = [energy_future] + [pool.submit(_render_chunk, chunk) for chunk in chunks]
+        done = 0
+        for future in as_completed(futures):
+            if future is energy_future:
+                energy = future.result()
+                done += 1
+            else:
+                results = future.result()
+                images.extend(results)
+                done += len(results)
+            if on_progress:
+                on_progress(done, total)
+
+    order = {job['file']: i for i, job in enumerate(jobs)}
+    images.sort(key=lambda image: order[image['file']])
+    write_html_report(output_path, project or {}, spec, energy, images)
+    return {'path': output_path, 'images': len(images), 'energy': energy,
+            'seconds': round(time.time() - started, 1)}
+
+
+# ==================== HTML ====================
+
+def _table(rows, header=None):
+    parts = ['<table>']
+    if header:
+        parts.append('<tr>' + ''.join(f'<th>{html.escape(str(h))}</th>' for h in header) + '</tr>')
+    for row in rows:
+        parts.append('<tr>' + ''.join(f'<td>{html.escape(str(v))}</td>' for v in row) + '</tr>')
+    parts.append('</table>')
+    return '\n'.join(parts)
+
+
+def _section_rows(section):
+    return [(key.replace('_', ' ').capitalize(), value) for key, value in (section or {}).items()]
+
+
+def write_html_report(path, project, spec, energy, images):
+    """Assemble project tables, energy results and the image grid"""
+    basic = project.get('basic_info', {})
+    title = basic.get('project_name') or 'PVmizer GEO Report'
+    image_dir = os.path.dirname(images[0]['path']) if images else ''
+    rel_dir = os.path.basename(image_dir)
+
+    body = [f"<h1>{html.escape(title)}</h1>",
+            f"<p class='meta'>Generated {time.strftime('%Y-%m-%d %H:%M')}</p>"]
+
+    for heading, key in (('Project', 'basic_info'), ('Location', 'location_info'),
+                         ('Energy demand', 'energy_info'), ('Technical', 'technical_info')):
+        if project.get(key):
+            body.append(f"<h2>{heading}</h2>")
+            body.append(_table(_section_rows(project[key])))
+
+    body.append("<h2>System</h2>")
+    length, width, height = spec['dimensions']
+    system_rows = [
+        ('Roof type', spec['roof_type']),
+        ('Dimensions (L x W x H)', f"{length:g} x {width:g} x {height:g} m"),
+        ('Building rotation', f"{spec.get('rotation', 0.0):g}°"),
+        ('Latitude / longitude', f"{spec['latitude']:.4f} / {spec['longitude']:.4f}"),
+        ('Panel sides', ', '.join(spec.get('sides', [])) or '-'),
+    ]
+    system_rows += [(key.replace('_', ' ').capitalize(), f"{value:g}")
+                    for key, value in (spec.get('panel_config') or {}).items()]
+    body.append(_table(system_rows))
+
+    if energy:
+        body.append("<h2>Energy yield</h2>")
+        body.append(_table([
+            ('Panels', energy['panel_count']),
+            ('System size', f"{energy['system_kwp']:.2f} kWp"),
+            ('Annual energy', f"{energy['annual_kwh']:,.0f} kWh"),
+            ('Specific yield', f"{energy['specific_yield']:,.0f} kWh/kWp"),
+        ]))
+        if energy['per_side']:
+            body.append(_table(
+                [(name, s['panels'], s['tilt_deg'], s['azimuth_deg'], f"{s['kwh']:,.0f}")
+                 for name, s in energy['per_side'].items()],
+                header=('Side', 'Panels', 'Tilt (°)', 'Azimuth (°)', 'kWh/year')))
+
+        financial = energy.get('financial')
+        demand = financial['monthly_consumption_kwh'] if financial else None
+        header = ['Month', 'Production (kWh)'] + (['Consumption (kWh)', 'Coverage'] if demand else [])
+        rows = []
+        for month, kwh in enumerate(energy['monthly_kwh'], start=1):
+            row = [calendar.month_name[month], f"{kwh:,.0f}"]
+            if demand:
+                need = demand[month - 1]
+                row += [f"{need:,.0f}", f"{100.0 * kwh / need:.0f} %" if need > 0 else '-']
+            rows.append(row)
+        body.append(_table(rows, header=header))
+
+        exceedance = energy.get('exceedance')
+        if exceedance:
+            body.append("<h2>Yield exceedance</h2>")
+            kwp = energy['system_kwp']
+            body.append(_table(
+                [(level, f"{exceedance[level]:,.0f}",
+                  f"{exceedance[level] / kwp:,.0f}" if kwp > 0 else '-')
+                 for level in ('P50', 'P75', 'P90')],
+                header=('Level', 'kWh/year', 'kWh/kWp')))
+            body.append(f"<p class='meta'>Exceeded in 50 / 75 / 90 % of years "
+                        f"({exceedance['samples']:,} Monte Carlo samples of weather, soiling, "
+                        f"degradation and tree transmissivity). "
+                        f"{html.escape(exceedance['note'])}</p>")
+
+        if financial:
+            payback = financial['payback_years']
+            body.append("<h2>Self-consumption and savings</h2>")
+            body.append(_table([
+                ('Consumption', f"{financial['consumption_kwh']:,.0f} kWh/year"),
+                ('Self-consumed', f"{financial['self_consumed_kwh']:,.0f} kWh "
+                                  f"({100.0 * financial['self_consumption_ratio']:.0f} % of production)"),
+                ('Exported', f"{financial['exported_kwh']:,.0f} kWh"),
+                ('Imported', f"{financial['imported_kwh']:,.0f} kWh"),
+                ('Autarky', f"{100.0 * financial['autarky_ratio']:.0f} %"),
+                ('Investment', f"{financial['capex']:,.0f} €"),
+                ('First-year savings', f"{financial['first_year_savings']:,.0f} €"),
+                ('Payback', f"{payback:.1f} years" if math.isfinite(payback) else 'not within lifetime'),
+                ('NPV', f"{financial['npv']:,.0f} €"),
+            ]))
+
+    by_view = {}
+    for image in images:
+        by_view.setdefault(image['view'], []).append(image)
+    for view, view_images in by_view.items():
+        body.append(f"<h2>{html.escape(REPORT_VIEWS[view]['title'])}</h2>")
+        body.append("<div class='grid'>")
+        for image in view_images:
+            sun = ("sun below horizon" if image['elevation'] is None
+                   else f"sun {image['elevation']:.0f}° elev, {image['azimuth']:.0f}° az")
+            caption = (f"{image['day']} {calendar.month_abbr[image['month']]} "
+                       f"{image['hour']:05.2f} h - {sun}")
+            src = f"{rel_dir}/{image['file']}"
+            body.append(f"<figure><img src='{html.escape(src)}' alt='{html.escape(caption)}'>"
+                        f"<figcaption>{html.escape(caption)}</figcaption></figure>")
+        body.append("</div>")
+
+    document = f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{html.escape(title)}</title>
+<style>
+body {{ font-family: Arial, sans-serif; margin: 2em; color: #222; }}
+table {{ border-collapse: collapse; margin: 0.5em 0 1.5em; }}
+th, td {{ border: 1px solid #ccc; padding: 4px 10px; text-align: left; }}
+th {{ background: #f0f0f0; }}
+.meta {{ color: #777; }}
+.grid {{ display: grid; grid-template-columns: repeat(3, 1fr); gap: 12px; }}
+figure {{ margin: 0; }}
+img {{ width: 100%; border: 1px solid #ddd; }}
+figcaption {{ font-size: 0.85em; color: #555; }}
+</style>
+</head>
+<body>
+{chr(10).join(body)}
+</body>
+</html>
+"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(document)
+    return path
+
+
+# ==================== CLI ====================
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog='python -m utils.report_renderer',
+        description='Render a PVmizer GEO project report off-screen')
+    parser.add_argument('project', help="saved project JSON with a 'scene' section")
+    parser.add_argument('--output', default=None, help="HTML file (default: next to the project)")
+    parser.add_argument('--views', nargs='+', default=list(DEFAULT_VIEWS), choices=list(REPORT_VIEWS))
+    parser.add_argument('--months', type=int, nargs='+', default=list(DEFAULT_MONTHS))
+    parser.add_argument('--hours', type=float, nargs='+', default=list(DEFAULT_HOURS))
+    parser.add_argument('--latitude', type=float, default=None, help="override the scene latitude")
+    parser.add_argument('--workers', type=int, default=None)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = _parse_args(argv if argv is not None else sys.argv[1:])
+    with open(args.project, 'r', encoding='utf-8') as f:
+        project = json.load(f)
+
+    spec = project.get('scene')
+    if not spec:
+        print("❌ Project has no 'scene' section - export a report from the app once to store it")
+        return 1
+    if args.latitude is not None:
+        spec = dict(spec, latitude=args.latitude)
+
+    output = args.output or os.path.splitext(args.project)[0] + '_report.html'
+
+    def on_progress(done, total):
+        print(f"  {done}/{total}")
+
+    summary = render_report(output, spec, project, views=args.views, months=args.months,
+                            hours=args.hours, workers=args.workers, on_progress=on_progress)
+    print(f"✅ Report with {summary['images']} images written to {summary['path']} "
+          f"in {summary['seconds']}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+"""
+utils/scene_export.py
+Full-scene 3D export (glTF 2.0, OBJ, PLY) with instanced repeated geometry
+
+Every visible surface actor of the plotter is exported: building parts,
+panel batches (split into single panels), roof obstacles, trees, poles and
+the ground. Meshes that are the same shape up to a translation and uniform
+scale (panels of one roof side, equal trees and poles) become one prototype
+with a list of instance transforms.
+
+Actors are read one at a time and folded into the prototypes as they are
+read: only each prototype's geometry and the instance transforms are kept,
+never the arrays of the whole scene.
+
+Writers stream prototype by prototype: glTF references each prototype mesh
+once from several nodes and appends its vertex data to the .bin file as it
+goes; OBJ and PLY have no instancing, so instances are expanded while
+writing, one instance at a time, without building the full scene in memory.
+"""
+import json
+import os
+
+import numpy as np
+
+from utils.log import get_logger
+
+log = get_logger('export')
+
+# Actors that are UI overlays, not scene content
+SKIPPED_PREFIXES = ('sun_', 'debug_', 'performance_hud', 'irradiation_heatmap',
+                    'env_attachment_points', 'face_group_highlight', 'attachment')
+
+GLTF_FLOAT = 5126
+GLTF_UINT = 5125
+GLTF_ARRAY_BUFFER = 34962
+GLTF_ELEMENT_ARRAY_BUFFER = 34963
+GLTF_REPEAT = 10497
+
+# glTF is Y-up, the scene is Z-up
+Z_UP_TO_Y_UP = np.array([[1, 0, 0, 0],
+                         [0, 0, 1, 0],
+                         [0, -1, 0, 0],
+                         [0, 0, 0, 1]], dtype=float)
+
+
+# ==================== SCENE COLLECTION ====================
+
+def _actor_matrix(actor):
+    """4x4 user/actor transform as a NumPy array"""
+    try:
+        matrix = actor.GetMatrix()
+        return np.array([[matrix.GetElement(i, j) for j in range(4)] for i in range(4)])
+    except Exception:
+        return np.eye(4)
+
+
+def _surface_arrays(dataset):
+    """(points, triangles, normals, tcoords or None) of a dataset's polygons"""
+    import pyvista as pv
+    mesh = pv.wrap(dataset)
+    if not isinstance(mesh, pv.PolyData):
+        mesh = mesh.extract_surface()
+    if mesh.n_cells == 0:
+        return None
+    mesh = mesh.triangulate()
+    faces = np.asarray(mesh.faces)
+    if faces.size == 0:
+        return None
+    triangles = faces.reshape(-1, 4)[:, 1:].astype(np.uint32)
+    points = np.asarray(mesh.points, dtype=float)
+    try:
+        normals = np.asarray(mesh.point_normals, dtype=float)
+    except Exception:
+        normals = np.zeros_like(points)
+    tcoords = mesh.active_texture_coordinates
+    tcoords = None if tcoords is None else np.asarray(tcoords, dtype=float)
+    return points, triangles, normals, tcoords
+
+
+def _material(actor):
+    """{'color': (r, g, b), 'opacity', 'texture': vtkTexture or None}"""
+    prop = actor.GetProperty()
+    texture = actor.GetTexture() if hasattr(actor, 'GetTexture') else None
+    return {'color': tuple(round(c, 4) for c in prop.GetColor()),
+            'opacity': round(prop.GetOpacity(), 4),
+            'texture': texture}
+
+
+def iter_scene(plotter, roof=None):
+    """Surface items of the scene, one at a time: dicts with name, category,
+    arrays, material and matrix. Panel batches are split per actor."""
+    handler = getattr(roof, 'solar_panel_handler', None)
+    panel_actors = {id(a) for a in getattr(handler, 'panel_actors', None) or [] if a is not None}
+
+    try:
+        actors = list(plotter.renderer.actors.items())
+    except Exception:
+        return
+
+    for name, actor in actors:
+        name = str(name)
+        if name.startswith(SKIPPED_PREFIXES):
+            continue
+        try:
+            if not actor.GetVisibility() or actor.GetMapper() is None:
+                continue
+            dataset = actor.GetMapper().GetInputAsDataSet()
+        except Exception:
+            continue
+        if dataset is None:
+            continue
+
+        category = _category(name, id(actor) in panel_actors)
+        material = _material(actor)
+        matrix = _actor_matrix(actor)
+
+        parts = [dataset]
+        if category == 'panels':
+            # One item per panel so equal panels become instances
+            try:
+                import pyvista as pv
+                parts = list(pv.wrap(dataset).split_bodies())
+            except Exception:
+                parts = [dataset]
+
+        for index, part in enumerate(parts):
+            try:
+                arrays = _surface_arrays(part)
+            except Exception:
+                arrays = None
+            if arrays is None:
+                continue
+            yield {
+                'name': name if len(parts) == 1 else f"{name}_{index}",
+                'category': category,
+                'arrays': arrays,
+                'material': material,
+                'matrix': matrix,
+            }
+
+
+def _category(name, is_panel):
+    lowered = name.lower()
+    if is_panel:
+        return 'panels'
+    if 'tree' in lowered or 'crown' in lowered or 'trunk' in lowered:
+        return 'vegetation'
+    if 'pole' in lowered:
+        return 'poles'
+    if 'ground' in lowered:
+        return 'ground'
+    if 'obstacle' in lowered or 'chimney' in lowered or 'vent' in lowered or 'window' in lowered:
+        return 'obstacles'
+    return 'building'
+
+
+# ==================== INSTANCING ====================
+
+def _geometry_key(points, triangles, tcoords):
+    """Key equal for meshes that match up to translation and uniform scale.
+
+    Returns (key, centre, scale).
+    """
+    centre = points.mean(axis=0)
+    local = points - centre
+    scale = float(np.sqrt((local ** 2).sum(axis=1).mean())) or 1.0
+    normalized = np.round(local / scale, 4) + 0.0    # + 0.0 folds -0.0 into 0.0
+    parts = [normalized.tobytes(), triangles.tobytes()]
+    if tcoords is not None:
+        parts.append(np.round(tcoords, 4).tobytes())
+    return hash(tuple(parts)), centre, scale
+
+
+def _material_key(material):
+    texture = material['texture']
+    return (material['color'], material['opacity'], id(texture) if texture is not None else None)
+
+
+def build_prototypes(items):
+    """Group items into prototypes (normalized geometry + instance transforms).
+
+    items may be a generator (see iter_scene): each item's arrays are
+    dropped once it has been matched, so only unique geometry stays alive.
+    """
+    prototypes = {}
+    for item in items:
+        points, triangles, normals, tcoords = item['arrays']
+        geometry, centre, scale = _geometry_key(points, triangles, tcoords)
+        key = (geometry, _material_key(item['material']), item['category'])
+
+        # Instance transform: actor matrix x translate(centre) x scale
+        local = np.eye(4)
+        local[:3, :3] *= scale
+        local[:3, 3] = centre
+        transform = item['matrix'] @ local
+
+        prototype = prototypes.get(key)
+        if prototype is None:
+            prototype = prototypes[key] = {
+                'name': item['name'],
+                'category': item['category'],
+                'points': (points - centre) / scale,
+                'triangles': triangles,
+                'normals': normals,
+                'tcoords': tcoords,
+                'material': item['material'],
+                'instances': [],
+            }
+        prototype['instances'].append((item['name'], transform))
+    return list(prototypes.values())
+
+
+# ==================== TEXTURES ====================
+
+def _texture_rgb(texture):
+    """(h, w, 3|4) uint8 image of a vtkTexture, top row first"""
+    import pyvista as pv
+    image = pv.wrap(texture.GetInput())
+    width, height = image.dimensions[0], image.dimensions[1]
+    data = np.asarray(image.active_scalars if image.active_scalars is not None
+                      else image.point_data[image.point_data.keys()[0]])
+    channels = data.shape[1] if data.ndim > 1 else 1
+    rgb = data.reshape(height, width, channels)[::-1].astype(np.uint8)
+    if channels == 1:
+        rgb = np.repeat(rgb, 3, axis=2)
+    return np.ascontiguousarray(rgb[:, :, :4] if channels >= 4 else rgb[:, :, :3])
+
+
+def save_texture(texture, path):
+    """Write a vtkTexture as PNG (via Qt); returns True on success"""
+    try:
+        from PyQt5.QtGui import QImage
+        rgb = _texture_rgb(texture)
+        height, width, channels = rgb.shape
+        fmt = QImage.Format_RGBA8888 if channels == 4 else QImage.Format_RGB888
+        image = QImage(rgb.data, width, height, width * channels, fmt)
+        return image.save(path)
+    except Exception as e:
+        log.warning("⚠️ Texture not exported: %s", e)
+        return False
+
+
+class _TextureFiles:
+    """Writes each distinct texture once next to the export file"""
+
+    def __init__(self, path):
+        self.directory = os.path.dirname(os.path.abspath(path))
+        self.stem = os.path.splitext(os.path.basename(path))[0]
+        self.files = {}     # id(texture) -> file name or None
+
+    def file_for(self, texture):
+        if texture is None:
+            return None
+        key = id(texture)
+        if key not in self.files:
+            name = f"{self.stem}_tex{len(self.files)}.png"
+            ok = save_texture(texture, os.path.join(self.directory, name))
+            self.files[key] = name if ok else None
+        return self.files[key]
+
+
+# ==================== WRITERS ====================
+
+def _transformed(prototype, transform):
+    """World points and normals of one instance"""
+    points = prototype['points'] @ transform[:3, :3].T + transform[:3, 3]
+    normal_matrix = np.linalg.inv(transform[:3, :3]).T
+    normals = prototype['normals'] @ normal_matrix.T
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    normals = np.divide(normals, lengths, out=np.zeros_like(normals), where=lengths > 0)
+    return points, normals
+
+
+def write_gltf(path, prototypes):
+    """glTF 2.0 (.gltf + .bin): one mesh per prototype, one node per instance"""
+    bin_name = os.path.splitext(os.path.basename(path))[0] + '.bin'
+    bin_path = os.path.join(os.path.dirname(os.path.abspath(path)), bin_name)
+    textures = _TextureFiles(path)
+    doc = {'asset': {'version': '2.0', 'generator': 'PVmizer GEO'},
+           'scene': 0, 'scenes': [{'nodes': [0]}],
+           'nodes': [{'name': 'scene', 'matrix': Z_UP_TO_Y_UP.T.ravel().tolist(), 'children': []}],
+           'meshes': [], 'materials': [], 'accessors': [], 'bufferViews': [],
+           'samplers': [{'wrapS': GLTF_REPEAT, 'wrapT': GLTF_REPEAT}],
+           'images': [], 'textures': []}
+    image_index = {}
+    offset = 0
+
+    with open(bin_path, 'wb') as bin_file:
+        def add_view(array, component_type, kind, target):
+            nonlocal offset
+            data = array.tobytes()
+            bin_file.write(data)
+            doc['bufferViews'].append({'buffer': 0, 'byteOffset': offset,
+                                       'byteLength': len(data), 'target': target})
+            offset += len(data)
+            accessor = {'bufferView': len(doc['bufferViews']) - 1, 'componentType': component_type,
+                        'count': len(array), 'type': kind}
+            if kind == 'VEC3' and component_type == GLTF_FLOAT:
+                accessor['min'] = array.min(axis=0).tolist()
+                accessor['max'] = array.max(axis=0).tolist()
+            doc['accessors'].append(accessor)
+            return len(doc['accessors']) - 1
+
+        for prototype in prototypes:
+            material = prototype['material']
+            gltf_material = {'name': f"{prototype['category']}_{len(doc['materials'])}",
+                             'pbrMetallicRoughness': {
+                                 'baseColorFactor': list(material['color']) + [material['opacity']],
+                                 'metallicFactor': 0.0, 'roughnessFactor': 0.9},
+                             'doubleSided': True}
+            if material['opacity'] < 1.0:
+                gltf_material['alphaMode'] = 'BLEND'
+            image = textures.file_for(material['texture']) if prototype['tcoords'] is not None else None
+            if image:
+                if image not in image_index:
+                    doc['images'].append({'uri': image})
+                    doc['textures'].append({'sampler': 0, 'source': len(doc['images']) - 1})
+                    image_index[image] = len(doc['textures']) - 1
+                gltf_material['pbrMetallicRoughness']['baseColorFactor'] = [1.0, 1.0, 1.0, material['opacity']]
+                gltf_material['pbrMetallicRoughness']['baseColorTexture'] = {'index': image_index[image]}
+            doc['materials'].append(gltf_material)
+
+            attributes = {
+                'POSITION': add_view(prototype['points'].astype(np.float32), GLTF_FLOAT, 'VEC3', GLTF_ARRAY_BUFFER),
+                'NORMAL': add_view(prototype['normals'].astype(np.float32), GLTF_FLOAT, 'VEC3', GLTF_ARRAY_BUFFER),
+            }
+            if image:
+                # VTK texture v runs bottom-up, glTF top-down
+                uv = prototype['tcoords'].astype(np.float32).copy()
+                uv[:, 1] = 1.0 - uv[:, 1]
+                attributes['TEXCOORD_0'] = add_view(uv, GLTF_FLOAT, 'VEC2', GLTF_ARRAY_BUFFER)
+            indices = add_view(prototype['triangles'].ravel().astype(np.uint32), GLTF_UINT, 'SCALAR',
+                               GLTF_ELEMENT_ARRAY_BUFFER)
+            doc['meshes'].append({'name': prototype['name'],
+                                  'primitives': [{'attributes': attributes, 'indices': indices,
+                                                  'material': len(doc['materials']) - 1}]})
+
+            for name, transform in prototype['instances']:
+                doc['nodes'].append({'name': name, 'mesh': len(doc['meshes']) - 1,
+                                     'matrix': transform.T.ravel().tolist()})
+                doc['nodes'][0]['children'].append(len(doc['nodes']) - 1)
+
+    doc['buffers'] = [{'uri': bin_name, 'byteLength': offset}]
+    for key in ('images', 'textures'):
+        if not doc[key]:
+            del doc[key]
+    if 'textures' not in doc:
+        del doc['samplers']
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(doc, f, separators=(',', ':'))
+    return offset
+
+
+def write_obj(path, prototypes):
+    """Wavefront OBJ + MTL; instances are expanded one at a time while writing"""
+    mtl_name = os.path.splitext(os.path.basename(path))[0] + '.mtl'
+    mtl_path = os.path.join(os.path.dirname(os.path.abspath(path)), mtl_name)
+    textures = _TextureFiles(path)
+    vertex_offset = 1
+    uv_offset = 1
+
+    with open(path, 'w', encoding='utf-8') as obj, open(mtl_path, 'w', encoding='utf-8') as mtl:
+        obj.write(f"# PVmizer GEO scene export\nmtllib {mtl_name}\n")
+        for index, prototype in enumerate(prototypes):
+            material = prototype['material']
+            material_name = f"{prototype['category']}_{index}"
+            mtl.write(f"newmtl {material_name}\nKd {' '.join(f'{c:.4f}' for c in material['color'])}\n"
+                      f"d {material['opacity']:.4f}\n")
+            has_uv = prototype['tcoords'] is not None
+            image = textures.file_for(material['texture']) if has_uv else None
+            if image:
+                mtl.write(f"map_Kd {image}\n")
+            mtl.write("\n")
+
+            for name, transform in prototype['instances']:
+                points, normals = _transformed(prototype, transform)
+                obj.write(f"o {name}\nusemtl {material_name}\n")
+                np.savetxt(obj, points, fmt='v %.6f %.6f %.6f')
+                np.savetxt(obj, normals, fmt='vn %.5f %.5f %.5f')
+                triangles = prototype['triangles'].astype(np.int64)
+                if has_uv:
+                    np.savetxt(obj, prototype['tcoords'], fmt='vt %.5f %.5f')
+                    template = 'f %d/%d/%d %d/%d/%d %d/%d/%d'
+                    # v/vt/vn per corner; vt is numbered separately from v and vn
+                    faces = np.stack([triangles + vertex_offset, triangles + uv_offset,
+                                      triangles + vertex_offset], axis=2).reshape(len(triangles), 9)
+                    uv_offset += len(prototype['tcoords'])
+                else:
+                    template = 'f %d//%d %d//%d %d//%d'
+                    faces = np.repeat(triangles + vertex_offset, 2, axis=1)
+                np.savetxt(obj, faces, fmt=template)
+                vertex_offset += len(points)
+
+
+def write_ply(path, prototypes):
+    """Binary little-endian PLY with per-vertex colour; instances expanded while writing"""
+    n_vertices = sum(len(p['points']) * len(p['instances']) for p in prototypes)
+    n_faces = sum(len(p['triangles']) * len(p['instances']) for p in prototypes)
+    vertex_dtype = np.dtype([('x', '<f4'), ('y', '<f4'), ('z', '<f4'),
+                             ('nx', '<f4'), ('ny', '<f4'), ('nz', '<f4'),
+                             ('red', 'u1'), ('green', 'u1'), ('blue', 'u1')])
+    face_dtype = np.dtype([('n', 'u1'), ('v', '<u4', (3,))])
+
+    with open(path, 'wb') as f:
+        f.write((f"ply\nformat binary_little_endian 1.0\ncomment PVmizer GEO scene export\n"
+                 f"element vertex {n_vertices}\n"
+                 "property float x\nproperty float y\nproperty float z\n"
+                 "property float nx\nproperty float ny\nproperty float nz\n"
+                 "property uchar red\nproperty uchar green\nproperty uchar blue\n"
+                 f"element face {n_faces}\nproperty list uchar uint vertex_indices\n"
+                 "end_header\n").encode('ascii'))
+
+        # PLY stores all vertices before all faces: vertices first ...
+        for prototype in prototypes:
+            color = np.round(np.array(prototype['material']['color']) * 255).astype(np.uint8)
+            for _, transform in prototype['instances']:
+                points, normals = _transformed(prototype, transform)
+                block = np.empty(len(points), dtype=vertex_dtype)
+                block['x'], block['y'], block['z'] = points.T
+                block['nx'], block['ny'], block['nz'] = normals.T
+                block['red'], block['green'], block['blue'] = color
+                f.write(block.tobytes())
+
+        # ... then faces, with the same running vertex offset
+        offset = 0
+        for prototype in prototypes:
+            for _ in prototype['instances']:
+                block = np.empty(len(prototype['triangles']), dtype=face_dtype)
+                block['n'] = 3
+                block['v'] = prototype['triangles'] + offset
+                f.write(block.tobytes())
+                offset += len(prototype['points'])
+    return n_vertices, n_faces
+
+
+WRITERS = {'.gltf': write_gltf, '.obj': write_obj, '.ply': write_ply}
+
+
+def export_scene(path, plotter, roof=None):
+    """Export the plotter's scene to `path` (format from the extension).
+
+    Returns a summary dict: format, prototypes, instances, vertices written
+    once (glTF) or in total (OBJ/PLY).
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.glb':
+        raise ValueError("Binary glTF (.glb) is not supported, use .gltf")
+    writer = WRITERS.get(extension)
+    if writer is None:
+        raise ValueError(f"Unsupported export format: {extension or path}")
+
+    prototypes = build_prototypes(iter_scene(plotter, roof))
+    if not prototypes:
+        raise ValueError("The scene has no surfaces to export")
+    writer(path, prototypes)
+
+    instances = sum(len(p['instances']) for p in prototypes)
+    unique_vertices = sum(len(p['points']) for p in prototypes)
+    total_vertices = sum(len(p['points']) * len(p['instances']) for p in prototypes)
+    return {
+        'format': extension.lstrip('.'),
+        'prototypes': len(prototypes),
+        'instances': instances,
+        'vertices': unique_vertices if extension == '.gltf' else total_vertices,
+        'vertices_without_instancing': total_vertices,
+    }
@@ -6,11 +6,10 @@ import numpy as np
 from PyQt5.QtCore import QTimer
 import math
 
-try:
-    import pyvista as pv
-    PYVISTA_AVAILABLE = True
-except ImportError:
-    PYVISTA_AVAILABLE = False
+from utils.lazy_imports import load_pyvista, pyvista_installed
+
+# PyVista is imported with the 3D view, not at startup
+PYVISTA_AVAILABLE = pyvista_installed()
 
 class SolarEventHandlers:
     """Handles solar simulation with proper time/date calculations"""
@@ -93,6 +92,7 @@ class SolarEventHandlers:
             
             if not plotter or not PYVISTA_AVAILABLE:
                 return False
+            pv, _ = load_pyvista()
             
             # Calculate 3D sun position
             distance = 100  # Distance from origin
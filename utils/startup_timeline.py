@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+utils/startup_timeline.py
+Startup timeline - per-phase and per-import timings up to time-to-interactive
+
+Enabled with `python main.py --startup-report` (or PVMIZER_STARTUP_REPORT=1).
+`--startup-report=timeline.json` also writes the timeline as JSON; the values
+0, false, no and off leave it disabled. When the timeline is disabled,
+phase() is a no-op and no import hook is installed.
+"""
+import builtins
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from utils.log import get_logger
+
+log = get_logger('startup')
+
+CLI_FLAG = '--startup-report'
+ENV_FLAG = 'PVMIZER_STARTUP_REPORT'
+ON_VALUES = ('1', 'true', 'yes', 'on')
+OFF_VALUES = ('0', 'false', 'no', 'off')
+
+
+class StartupTimeline:
+    """Collects startup phases and module import times"""
+
+    def __init__(self):
+        self.enabled = False
+        self.output_path = None
+        self.t0 = time.perf_counter()
+        self.phases = []            # dicts: name, start, duration, depth
+        self.imports = []           # dicts: module, start, duration, self_time, depth
+        self.interactive_at = None
+        self._depth = 0
+        self._import_stack = []     # child time accumulators of open imports
+        self._original_import = None
+        self._main_thread = threading.get_ident()
+
+    # ==================== ENABLE ====================
+
+    def enable(self, output_path=None):
+        """Start recording phases and imports (time zero is process start of recording)"""
+        if self.enabled:
+            return
+        self.enabled = True
+        self.output_path = output_path
+        self.t0 = time.perf_counter()
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._timed_import
+
+    def enable_from_argv(self, argv=None):
+        """Enable when --startup-report or PVMIZER_STARTUP_REPORT is given.
+
+        A value is a JSON output path, an on value (1, true, yes, on) or an
+        off value (0, false, no, off) that keeps the timeline disabled. The
+        flag is removed from argv so Qt never sees it.
+        """
+        argv = sys.argv if argv is None else argv
+        output_path = os.environ.get(ENV_FLAG, '').strip() or None
+        requested = output_path is not None
+
+        for arg in list(argv[1:]):
+            if arg == CLI_FLAG or arg.startswith(CLI_FLAG + '='):
+                requested = True
+                output_path = arg.partition('=')[2].strip() or None
+                argv.remove(arg)
+
+        if output_path is not None and output_path.lower() in OFF_VALUES:
+            requested = False
+        if output_path is not None and output_path.lower() in ON_VALUES + OFF_VALUES:
+            output_path = None
+        if requested:
+            self.enable(output_path)
+        return requested
+
+    def _stop_import_hook(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    # ==================== RECORDING ====================
+
+    def now(self):
+        return time.perf_counter() - self.t0
+
+    @contextmanager
+    def phase(self, name):
+        """Time a named startup phase (nested phases are indented in the report)"""
+        if not self.enabled:
+            yield
+            return
+        start = self.now()
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            self.phases.append({'name': name, 'start': start,
+                                'duration': self.now() - start, 'depth': self._depth})
+            if self.interactive_at is not None:
+                print(f"⏱️ {name} loaded on first use in {(self.now() - start) * 1000:.0f} ms")
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        original = self._original_import
+        if (level or name in sys.modules or original is None
+                or threading.get_ident() != self._main_thread):
+            return original(name, globals, locals, fromlist, level)
+
+        start = time.perf_counter()
+        self._import_stack.append(0.0)
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            duration = time.perf_counter() - start
+            children = self._import_stack.pop()
+            if self._import_stack:
+                self._import_stack[-1] += duration
+            if name in sys.modules:
+                self.imports.append({'module': name, 'start': start - self.t0,
+                                     'duration': duration, 'self_time': duration - children,
+                                     'depth': len(self._import_stack)})
+
+    def mark_interactive(self):
+        """Record time-to-interactive (first event loop turn after show) and report"""
+        if not self.enabled or self.interactive_at is not None:
+            return
+        self.interactive_at = self.now()
+        self._stop_import_hook()
+        print(self.report())
+        if self.output_path:
+            try:
+                with open(self.output_path, 'w') as f:
+                    json.dump(self.as_dict(), f, indent=2)
+                print(f"⏱️ Startup timeline written to {self.output_path}")
+            except OSError as e:
+                log.error("❌ Could not write startup timeline: %s", e)
+
+    # ==================== REPORT ====================
+
+    def as_dict(self):
+        return {
+            'time_to_interactive': self.interactive_at,
+            'phases': sorted(self.phases, key=lambda p: p['start']),
+            'imports': sorted(self.imports, key=lambda i: -i['self_time']),
+        }
+
+    def report(self, top_imports=15):
+        """Human readable timeline"""
+        lines = ["⏱️ Startup timeline"]
+        for p in sorted(self.phases, key=lambda p: p['start']):
+            indent = '  ' * (p['depth'] + 1)
+            lines.append(f"{indent}{p['start'] * 1000:8.0f} ms  +{p['duration'] * 1000:7.0f} ms  {p['name']}")
+
+        slowest = sorted(self.imports, key=lambda i: -i['self_time'])[:top_imports]
+        if slowest:
+            total = sum(i['self_time'] for i in self.imports)
+            lines.append(f"  Imports: {len(self.imports)} modules, {total * 1000:.0f} ms")
+            for i in slowest:
+                lines.append(f"    {i['self_time'] * 1000:7.0f} ms self  "
+                             f"{i['duration'] * 1000:7.0f} ms total  {i['module']}")
+
+        if self.interactive_at is not None:
+            lines.append(f"  Time to interactive: {self.interactive_at * 1000:.0f} ms")
+        return '\n'.join(lines)
+
+
+# Process-wide timeline
+timeline = StartupTimeline()
+
+
+def phase(name):
+    """Shortcut for timeline.phase(name)"""
+    return timeline.phase(name)
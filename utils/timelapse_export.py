@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+utils/timelapse_export.py
+Streaming, resumable time-lapse video export of the sun animation
+
+The live animation (DateTimeControls._animate_time) moves the sun in
+15 minute steps on the interactive plotter. This export renders the same
+kind of sweep off-screen instead: a single day from sunrise to sunset, or a
+year sweep over every `day_step`-th day. Sun position, light intensity and
+colour, shadow strength and sky colour are precomputed for all frames up
+front; the render loop only applies them and hands each frame straight to
+the video writer, so no frame list is kept in memory.
+
+Frames are written in fixed-size segments. A progress file next to the
+output records finished segments, so an interrupted export resumes at the
+first missing segment. Segments are joined without re-encoding at the end.
+
+Usage:
+    python -m utils.timelapse_export project.json --output day.mp4 \\
+        --mode day --day 172 --preset preview
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from utils.log import get_logger
+
+log = get_logger('export')
+
+try:
+    import imageio_ffmpeg
+    IMAGEIO_FFMPEG_AVAILABLE = True
+except ImportError:
+    imageio_ffmpeg = None
+    IMAGEIO_FFMPEG_AVAILABLE = False
+
+# Render resolution / frame rate presets ('preview' is for quick checks)
+PRESETS = {
+    'preview': {'window_size': (640, 360), 'fps': 12, 'quality': 5, 'shadows': False},
+    'hd': {'window_size': (1280, 720), 'fps': 24, 'quality': 7, 'shadows': True},
+    'full_hd': {'window_size': (1920, 1080), 'fps': 30, 'quality': 8, 'shadows': True},
+}
+DEFAULT_PRESET = 'hd'
+SEGMENT_FRAMES = 120
+TIMELAPSE_VIEW = 'overview'
+
+# Shadows reach full strength once the sun is this high
+FULL_SHADOW_ELEVATION = 15.0
+
+
+# ==================== FRAME TABLE ====================
+
+def frame_times(latitude, longitude=0.0, mode='day', day_of_year=172, step_minutes=15,
+                day_step=7):
+    """(days, hours) arrays of all frames of a sweep.
+
+    'day' covers one day from sunrise to sunset; 'year' covers the daylight
+    hours of every `day_step`-th day of the year.
+    """
+    from solar_system.solar_calculations import SolarCalculations
+
+    if mode not in ('day', 'year'):
+        raise ValueError(f"Unknown time-lapse mode: {mode}. Available: ['day', 'year']")
+
+    step = step_minutes / 60.0
+    days = [int(day_of_year)] if mode == 'day' else list(range(1, 366, int(day_step)))
+    all_days, all_hours = [], []
+    for day in days:
+        sunrise, sunset = SolarCalculations.get_time_range(latitude, day, longitude)
+        hours = np.arange(math.ceil(sunrise / step) * step, sunset, step)
+        all_days.append(np.full(len(hours), day))
+        all_hours.append(hours)
+    return np.concatenate(all_days).astype(int), np.concatenate(all_hours)
+
+
+def precompute_frames(spec, mode='day', day_of_year=172, step_minutes=15, day_step=7):
+    """Per-frame lighting for a sweep, as arrays.
+
+    Keys: day, hour, sun (n, 3) positions in the building frame (NaN when the
+    sun is down), intensity, color (n, 3), shadow (0..1 strength) and
+    background (sky colour strings).
+    """
+    from solar_system.solar_calculations import SolarCalculations
+    from utils.report_renderer import sun_position
+
+    days, hours = frame_times(spec['latitude'], spec['longitude'], mode, day_of_year,
+                              step_minutes, day_step)
+    n = len(days)
+    sun = np.full((n, 3), np.nan)
+    intensity = np.zeros(n)
+    color = np.zeros((n, 3))
+    shadow = np.zeros(n)
+    background = []
+    sun_times = {}
+
+    for i, (day, hour) in enumerate(zip(days, hours)):
+        position = sun_position(spec, {'hour': float(hour), 'day_of_year': int(day)})
+        if position is not None:
+            sun[i] = position
+            intensity[i] = SolarCalculations.calculate_sun_intensity(position)
+            color[i] = SolarCalculations.calculate_sun_color(position)
+            elevation = math.degrees(math.atan2(position[2], math.hypot(position[0], position[1])))
+            shadow[i] = min(1.0, max(0.0, elevation / FULL_SHADOW_ELEVATION))
+        if day not in sun_times:
+            sun_times[day] = SolarCalculations.get_time_range(spec['latitude'], int(day), spec['longitude'])
+        background.append(SolarCalculations.get_background_color(float(hour), *sun_times[day]))
+
+    return {'day': days, 'hour': hours, 'sun': sun, 'intensity': intensity,
+            'color': color, 'shadow': shadow, 'background': background}
+
+
+# ==================== PROGRESS ====================
+
+def _fingerprint(spec, settings):
+    text = json.dumps({'spec': spec, 'settings': settings}, sort_keys=True, default=str)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def _parts_dir(output_path):
+    stem, _ = os.path.splitext(os.path.abspath(output_path))
+    return stem + '_timelapse_parts'
+
+
+def _segment_path(parts_dir, index, ext):
+    return os.path.join(parts_dir, f"segment_{index:05d}{ext}")
+
+
+def load_progress(output_path):
+    """Progress record of an unfinished export, or None"""
+    path = os.path.join(_parts_dir(output_path), 'progress.json')
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_progress(parts_dir, progress):
+    path = os.path.join(parts_dir, 'progress.json')
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(progress, f)
+    os.replace(path + '.tmp', path)
+
+
+# ==================== EXPORT ====================
+
+def _apply_frame(plotter, frames, i, shadows):
+    from utils.report_renderer import set_sun_light
+
+    position = None if np.isnan(frames['sun'][i, 0]) else frames['sun'][i]
+    # Deeper shadows need less fill light; at low sun the scene is lit evenly
+    ambient = 0.45 - 0.25 * frames['shadow'][i] if shadows else 0.35
+    set_sun_light(plotter, position, intensity=float(frames['intensity'][i]),
+                  color=tuple(frames['color'][i]), ambient=ambient)
+    plotter.set_background(frames['background'][i])
+
+    hour = frames['hour'][i]
+    label = f"Day {frames['day'][i]:03d}  {int(hour):02d}:{int(round((hour % 1) * 60)) % 60:02d}"
+    plotter.add_text(label, position='upper_left', font_size=12, color='white',
+                     name='timelapse_label')
+
+
+def _join_segments(segments, output_path):
+    """Concatenate finished segments into the output without re-encoding"""
+    if len(segments) == 1:
+        shutil.copyfile(segments[0], output_path)
+        return
+    if not IMAGEIO_FFMPEG_AVAILABLE:
+        raise RuntimeError("imageio-ffmpeg is required to join time-lapse segments")
+
+    list_path = os.path.join(os.path.dirname(segments[0]), 'segments.txt')
+    with open(list_path, 'w', encoding='utf-8') as f:
+        for segment in segments:
+            f.write(f"file '{segment}'\n")
+    subprocess.run([imageio_ffmpeg.get_ffmpeg_exe(), '-y', '-loglevel', 'error', '-f', 'concat',
+                    '-safe', '0', '-i', list_path, '-c', 'copy', output_path], check=True)
+
+
+def export_timelapse(output_path, spec, mode='day', day_of_year=172, step_minutes=15,
+                     day_step=7, preset=DEFAULT_PRESET, view=TIMELAPSE_VIEW,
+                     segment_frames=SEGMENT_FRAMES, on_progress=None):
+    """Render a sun sweep off-screen straight into a video file.
+
+    Resumes an interrupted export of the same scene and settings. Returns a
+    summary dict (path, frames, rendered, seconds).
+    """
+    import pyvista as pv
+    from utils.report_renderer import REPORT_VIEWS, build_scene, set_view_camera
+
+    if preset not in PRESETS:
+        raise ValueError(f"Unknown preset: {preset}. Available: {list(PRESETS)}")
+    settings = dict(PRESETS[preset], mode=mode, day_of_year=day_of_year,
+                    step_minutes=step_minutes, day_step=day_step, view=view,
+                    segment_frames=segment_frames)
+    started = time.time()
+
+    frames = precompute_frames(spec, mode, day_of_year, step_minutes, day_step)
+    total = len(frames['day'])
+    if total == 0:
+        raise ValueError("The sweep has no daylight frames")
+
+    ext = os.path.splitext(output_path)[1] or '.mp4'
+    parts_dir = _parts_dir(output_path)
+    fingerprint = _fingerprint(spec, settings)
+    progress = load_progress(output_path)
+    if not progress or progress.get('fingerprint') != fingerprint:
+        # Different scene or settings: earlier segments are of no use
+        shutil.rmtree(parts_dir, ignore_errors=True)
+        progress = {'fingerprint': fingerprint, 'total': total, 'done_segments': []}
+    os.makedirs(parts_dir, exist_ok=True)
+    _save_progress(parts_dir, progress)
+
+    n_segments = math.ceil(total / segment_frames)
+    pending = [k for k in range(n_segments) if k not in progress['done_segments']]
+    done_frames = total - sum(min(total, (k + 1) * segment_frames) - k * segment_frames for k in pending)
+    rendered = 0
+
+    if pending:
+        plotter = pv.Plotter(off_screen=True, window_size=list(settings['window_size']))
+        try:
+            build_scene(spec, plotter=plotter)
+            if settings['shadows']:
+                try:
+                    plotter.enable_shadows()
+                except Exception:
+                    pass
+            set_view_camera(plotter, spec, REPORT_VIEWS[view])
+
+            for k in pending:
+                tmp_path = _segment_path(parts_dir, k, '.tmp' + ext)
+                plotter.open_movie(tmp_path, framerate=settings['fps'], quality=settings['quality'])
+                try:
+                    for i in range(k * segment_frames, min(total, (k + 1) * segment_frames)):
+                        _apply_frame(plotter, frames, i, settings['shadows'])
+                        plotter.write_frame()
+                        rendered += 1
+                        if on_progress:
+                            on_progress(done_frames + rendered, total)
+                finally:
+                    plotter.mwriter.close()
+                    plotter.mwriter = None
+                os.replace(tmp_path, _segment_path(parts_dir, k, ext))
+                progress['done_segments'].append(k)
+                _save_progress(parts_dir, progress)
+        finally:
+            plotter.close()
+
+    segments = [_segment_path(parts_dir, k, ext) for k in range(n_segments)]
+    _join_segments(segments, output_path)
+    shutil.rmtree(parts_dir, ignore_errors=True)
+
+    log.info("✅ Time-lapse: %s frames (%s rendered) -> %s", total, rendered, output_path)
+    return {'path': output_path, 'frames': total, 'rendered': rendered,
+            'seconds': round(time.time() - started, 1)}
+
+
+# ==================== CLI ====================
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog='python -m utils.timelapse_export',
+        description='Render a sun time-lapse of a PVmizer GEO project off-screen')
+    parser.add_argument('project', help="saved project JSON with a 'scene' section")
+    parser.add_argument('--output', default=None, help="video file (default: next to the project)")
+    parser.add_argument('--mode', default='day', choices=['day', 'year'])
+    parser.add_argument('--day', type=int, default=172, help="day of year for --mode day")
+    parser.add_argument('--step-minutes', type=float, default=15)
+    parser.add_argument('--day-step', type=int, default=7, help="days between sweeps for --mode year")
+    parser.add_argument('--preset', default=DEFAULT_PRESET, choices=list(PRESETS))
+    parser.add_argument('--view', default=TIMELAPSE_VIEW)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = _parse_args(argv if argv is not None else sys.argv[1:])
+    with open(args.project, 'r', encoding='utf-8') as f:
+        project = json.load(f)
+
+    spec = project.get('scene')
+    if not spec:
+        print("❌ Project has no 'scene' section - export a report from the app once to store it")
+        return 1
+
+    output = args.output or os.path.splitext(args.project)[0] + f'_{args.mode}_timelapse.mp4'
+
+    def on_progress(done, total):
+        if done % 50 == 0 or done == total:
+            print(f"  {done}/{total}")
+
+    summary = export_timelapse(output, spec, mode=args.mode, day_of_year=args.day,
+                               step_minutes=args.step_minutes, day_step=args.day_step,
+                               preset=args.preset, view=args.view, on_progress=on_progress)
+    print(f"✅ Time-lapse: {summary['frames']} frames ({summary['rendered']} rendered) "
+          f"-> {summary['path']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+utils/tracing.py
+Lightweight tracing spans for the hot paths (roof generation, panel placement,
+obstacle checks, shading/energy, sun updates and render calls)
+
+    from utils.tracing import tracer, traced
+
+    with tracer.span('panels.batch', side='left'):
+        ...
+
+    @traced('roof.generate', 'roof')
+    def generate_roof(...):
+        ...
+
+Spans cost one attribute check while tracing is disabled. Enable with
+tracer.enable() (Settings > Performance) or PVMIZER_TRACE=1; with
+PVMIZER_TRACE=<file.json> the trace is written at exit. Recorded spans can be
+exported to Chrome trace JSON (chrome://tracing, Perfetto).
+"""
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+ENV_FLAG = 'PVMIZER_TRACE'
+
+
+class _NullSpan:
+    """Shared no-op span returned while tracing is disabled"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'cat', 'args', 'start')
+
+    def __init__(self, tracer, name, cat, args):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.tracer.record(self.name, self.cat, self.start, time.perf_counter_ns(), self.args)
+        return False
+
+
+class Tracer:
+    """Collects spans, per-span statistics, counters and frame times"""
+
+    def __init__(self, max_events=200000):
+        self.enabled = False
+        self.events = deque(maxlen=max_events)   # (name, cat, start_ns, end_ns, tid, args)
+        self.stats = {}                           # name -> [count, total_ns, max_ns, last_ns]
+        self.counters = {}
+        self.frame_times = deque(maxlen=120)      # recent render durations (ms)
+        self.render_tag = None                    # set while the HUD refreshes itself
+        self._t0 = time.perf_counter_ns()
+        self._lock = threading.Lock()
+
+    # ==================== CONTROL ====================
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def clear(self):
+        with self._lock:
+            self.events.clear()
+            self.stats.clear()
+            self.counters.clear()
+            self.frame_times.clear()
+            self._t0 = time.perf_counter_ns()
+
+    # ==================== RECORDING ====================
+
+    def span(self, name, cat='app', **args):
+        """Context manager timing a block (no-op while disabled)"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, cat, args or None)
+
+    def record(self, name, cat, start_ns, end_ns, args=None):
+        duration = end_ns - start_ns
+        with self._lock:
+            self.events.append((name, cat, start_ns, end_ns, threading.get_ident(), args))
+            stat = self.stats.get(name)
+            if stat is None:
+                self.stats[name] = [1, duration, duration, duration]
+            else:
+                stat[0] += 1
+                stat[1] += duration
+                stat[2] = max(stat[2], duration)
+                stat[3] = duration
+
+    def count(self, name, value=1):
+        """Increment a named counter (shown in the HUD and exported as a counter track)"""
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def instrument_plotter(self, plotter):
+        """Record every render of a plotter's render window as a 'render' span"""
+        render_window = getattr(plotter, 'ren_win', None) or getattr(plotter, 'render_window', None)
+        if render_window is None or getattr(plotter, '_tracing_instrumented', False):
+            return False
+
+        state = {'start': 0}
+
+        def on_start(obj, event):
+            if self.enabled:
+                state['start'] = time.perf_counter_ns()
+
+        def on_end(obj, event):
+            if not self.enabled or not state['start']:
+                return
+            end = time.perf_counter_ns()
+            if self.render_tag:
+                self.record(f'render.{self.render_tag}', 'render', state['start'], end)
+            else:
+                self.record('render', 'render', state['start'], end)
+                self.count('renders')
+                self.frame_times.append((end - state['start']) / 1e6)
+            state['start'] = 0
+
+        try:
+            render_window.AddObserver('StartEvent', on_start)
+            render_window.AddObserver('EndEvent', on_end)
+            plotter._tracing_instrumented = True
+            return True
+        except Exception:
+            return False
+
+    # ==================== QUERIES ====================
+
+    def slowest(self, n=5):
+        """[(name, count, avg_ms, max_ms)] of the spans with the largest max duration"""
+        with self._lock:
+            items = [(name, s[0], s[1] / s[0] / 1e6, s[2] / 1e6)
+                     for name, s in self.stats.items() if not name.startswith('render')]
+        return sorted(items, key=lambda item: -item[3])[:n]
+
+    def frame_time_ms(self):
+        """Average render time over the recent frames"""
+        if not self.frame_times:
+            return 0.0
+        return sum(self.frame_times) / len(self.frame_times)
+
+    # ==================== EXPORT ====================
+
+    def chrome_trace(self):
+        """Trace in the Chrome trace event format (complete 'X' events, microseconds)"""
+        pid = os.getpid()
+        with self._lock:
+            events = list(self.events)
+            counters = dict(self.counters)
+        trace = []
+        for name, cat, start, end, tid, args in events:
+            event = {'name': name, 'cat': cat, 'ph': 'X', 'pid': pid, 'tid': tid,
+                     'ts': (start - self._t0) / 1000.0, 'dur': (end - start) / 1000.0}
+            if args:
+                event['args'] = {key: _json_safe(value) for key, value in args.items()}
+            trace.append(event)
+        if counters:
+            ts = (time.perf_counter_ns() - self._t0) / 1000.0
+            trace.append({'name': 'counters', 'ph': 'C', 'pid': pid, 'tid': 0, 'ts': ts,
+                          'args': counters})
+        return {'traceEvents': trace, 'displayTimeUnit': 'ms'}
+
+    def export_chrome_trace(self, path):
+        """Write the recorded spans as Chrome trace JSON; returns the number of events"""
+        trace = self.chrome_trace()
+        with open(path, 'w') as f:
+            json.dump(trace, f)
+        return len(trace['traceEvents'])
+
+
+def _json_safe(value):
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+# Process-wide tracer
+tracer = Tracer()
+
+
+def span(name, cat='app', **args):
+    """Shortcut for tracer.span()"""
+    return tracer.span(name, cat, **args)
+
+
+def traced(name=None, cat='app'):
+    """Decorator recording each call of a function as a span"""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with _Span(tracer, span_name, cat, None):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _enable_from_environment():
+    value = os.environ.get(ENV_FLAG)
+    if not value or value in ('0', 'false', 'no'):
+        return
+    tracer.enable()
+    if value not in ('1', 'true', 'yes'):
+        atexit.register(lambda: print(f"⏱️ Trace written to {value} "
+                                      f"({tracer.export_chrome_trace(value)} events)"))
+
+
+_enable_from_environment()